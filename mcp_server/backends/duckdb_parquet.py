@@ -4,6 +4,17 @@ This backend uses DuckDB to query Parquet files directly without loading
 them fully into memory. DuckDB handles type inference, column pruning,
 and predicate pushdown automatically.
 
+A dataset is either a single Parquet file or a directory written by
+incremental export (output/{code}/), whose fragments are read together.
+Hive-partitioned directories (output/{code}/_period=YYYY-MM/) are read with
+hive_partitioning, so a filter on _period skips other periods' files.
+
+Each dataset gets its own named view, created once and recreated only when
+its files change (path mtimes). Requests run on cursors taken from a small
+pool, each binding its own temporary 'data' view, so concurrent queries on
+different datasets do not interfere. Parquet footers are cached by DuckDB
+(parquet_metadata_cache), so repeat queries skip footer parsing.
+
 Usage:
     backend = DuckDBBackend({'base_path': 'output/'})
     results = backend.execute('output/adhd_prevalence.parquet',
@@ -11,30 +22,98 @@ Usage:
 """
 
 import duckdb
+import hashlib
+import queue
+import re
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 import json
 
+from mcp_server.core.sql_guard import check_sql
+
+DEFAULT_POOL_SIZE = 4  # Concurrent requests served by one backend
+
 
 class DuckDBBackend:
     """Query Parquet files using DuckDB."""
 
+    placeholder = '?'  # Parameter marker for query()
+
     def __init__(self, config: dict):
         """Initialize DuckDB backend.
 
         Args:
-            config: Backend configuration with optional 'base_path'
+            config: Backend configuration with optional 'base_path' and
+                'pool_size' (cursors for concurrent requests)
         """
         self.base_path = config.get('base_path', 'output/')
         self.conn = duckdb.connect(':memory:')
         # Enable progress bar for long queries
         self.conn.execute("SET enable_progress_bar = false")
+        # Keep parsed Parquet footers between queries (re-read when a file changes)
+        self.conn.execute("SET GLOBAL parquet_metadata_cache = true")
+
+        self._views = {}  # resolved path -> (signature, view name)
+        self._views_lock = threading.Lock()
+        self._cursors = queue.Queue()
+        for _ in range(int(config.get('pool_size', DEFAULT_POOL_SIZE))):
+            cursor = self.conn.cursor()
+            cursor.execute("SET enable_progress_bar = false")
+            self._cursors.put(cursor)
+
+    @staticmethod
+    def _scan(parquet_path: str) -> str:
+        """FROM-clause source for a Parquet file or a dataset directory."""
+        path = Path(parquet_path)
+        if path.is_dir():
+            if any(path.glob('_period=*')):
+                return (f"read_parquet('{path / '*' / '*.parquet'}', hive_partitioning = true, "
+                        f"hive_types = {{'_period': VARCHAR}}, union_by_name = true)")
+            return f"read_parquet('{path / '*.parquet'}', union_by_name = true)"
+        return f"'{parquet_path}'"
+
+    @staticmethod
+    def _signature(path: Path) -> tuple:
+        """Newest mtime and entry count of a file or dataset directory."""
+        paths = [path] + (list(path.rglob('*')) if path.is_dir() else [])
+        return max(p.stat().st_mtime_ns for p in paths), len(paths)
+
+    def _view(self, parquet_path: str) -> str:
+        """Name of the dataset's view, (re)created if its files changed."""
+        path = Path(parquet_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Parquet file not found: {parquet_path}")
+        key = str(path.resolve())
+        signature = self._signature(path)
+        with self._views_lock:
+            cached = self._views.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            name = cached[1] if cached else (
+                f"ds_{re.sub(r'[^0-9A-Za-z_]', '_', path.stem)}_{hashlib.md5(key.encode()).hexdigest()[:8]}")
+            self.conn.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {self._scan(parquet_path)}')
+            self._views[key] = (signature, name)
+            return name
+
+    @contextmanager
+    def _cursor(self, parquet_path: str):
+        """Pooled cursor with 'data' bound to the dataset (waits while all are busy)."""
+        view = self._view(parquet_path)
+        cursor = self._cursors.get()
+        try:
+            # Temporary views belong to the cursor, so 'data' is private to this request
+            cursor.execute(f'CREATE OR REPLACE TEMP VIEW data AS SELECT * FROM "{view}"')
+            yield cursor
+        finally:
+            self._cursors.put(cursor)
 
     def execute(self, parquet_path: str, sql: str) -> list[dict]:
         """Execute SQL against a parquet file.
 
-        The SQL should use 'data' as the table name. This method creates
-        a view pointing to the parquet file and executes the query.
+        The SQL should use 'data' as the table name, which is bound to the
+        dataset's view for this query.
 
         Args:
             parquet_path: Path to the parquet file (absolute or relative)
@@ -47,20 +126,45 @@ class DuckDBBackend:
             backend.execute('output/adhd.parquet',
                           'SELECT age_band, COUNT(*) as cnt FROM data GROUP BY age_band')
         """
-        # Ensure path exists
-        path = Path(parquet_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Parquet file not found: {parquet_path}")
-
-        # Register parquet as 'data' view
-        self.conn.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM '{parquet_path}'")
-
         # Execute query and convert to pandas then to dicts
-        result = self.conn.execute(sql).fetchdf()
+        with self._cursor(parquet_path) as cursor:
+            result = cursor.execute(sql).fetchdf()
 
         # Convert to list of dicts, handling special types
         return self._df_to_dicts(result)
 
+    def query(self, parquet_path: str, sql: str, params: list = None, max_rows: int = 10000) -> dict:
+        """Run SQL over the whole dataset and fetch at most max_rows result rows.
+
+        The query is wrapped as SELECT * FROM (sql) LIMIT max_rows + 1, so
+        DuckDB stops scanning once it has enough rows and only the result
+        crosses into Python; the extra row tells whether it was truncated.
+        The SQL may only read 'data' and call allowlisted functions (see
+        core.sql_guard), so it cannot reach other files or DuckDB settings.
+
+        Args:
+            parquet_path: Parquet file or dataset directory
+            sql: SELECT using 'data' as table name (parameters marked with ?)
+            params: Query parameters
+            max_rows: Result size limit
+
+        Returns:
+            Dict with 'columns', 'rows' (dicts of raw Python values) and 'truncated'
+        """
+        problem = check_sql(sql)
+        if problem:
+            raise ValueError(problem)
+        with self._cursor(parquet_path) as cursor:
+            cursor.execute(f"SELECT * FROM ({sql.strip().rstrip(';')}) AS result LIMIT {int(max_rows) + 1}",
+                           params or [])
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchmany(int(max_rows) + 1)
+        return {
+            "columns": columns,
+            "rows": [dict(zip(columns, row)) for row in rows[:max_rows]],
+            "truncated": len(rows) > max_rows
+        }
+
     def _df_to_dicts(self, df) -> list[dict]:
         """Convert DataFrame to list of dicts with JSON-safe values."""
         import pandas as pd
@@ -89,12 +193,8 @@ class DuckDBBackend:
         Returns:
             List of dicts with 'name' and 'type' keys
         """
-        path = Path(parquet_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Parquet file not found: {parquet_path}")
-
-        self.conn.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM '{parquet_path}'")
-        result = self.conn.execute("DESCRIBE data").fetchall()
+        with self._cursor(parquet_path) as cursor:
+            result = cursor.execute("DESCRIBE data").fetchall()
 
         return [
             {"name": row[0], "type": row[1]}
@@ -123,18 +223,16 @@ class DuckDBBackend:
             Dict with row_count, column_count, file_size_kb
         """
         path = Path(parquet_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Parquet file not found: {parquet_path}")
-
-        self.conn.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM '{parquet_path}'")
-
-        count = self.conn.execute("SELECT COUNT(*) FROM data").fetchone()[0]
-
-        # Get column count from schema
-        schema = self.get_schema(parquet_path)
+        with self._cursor(parquet_path) as cursor:
+            count = cursor.execute("SELECT COUNT(*) FROM data").fetchone()[0]
+            # Get column count from schema
+            schema = cursor.execute("DESCRIBE data").fetchall()
 
         # Get file size
-        file_size_kb = path.stat().st_size / 1024
+        if path.is_dir():
+            file_size_kb = sum(p.stat().st_size for p in path.rglob('*.parquet')) / 1024
+        else:
+            file_size_kb = path.stat().st_size / 1024
 
         return {
             "row_count": count,
@@ -169,32 +267,31 @@ class DuckDBBackend:
         Returns:
             Dict with null_count, distinct_count, min, max (if numeric)
         """
-        self.conn.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM '{parquet_path}'")
-
-        # Basic stats
-        result = self.conn.execute(f"""
-            SELECT
-                COUNT(*) as total,
-                COUNT("{column}") as non_null,
-                COUNT(DISTINCT "{column}") as distinct_count
-            FROM data
-        """).fetchone()
-
-        stats = {
-            "total_rows": result[0],
-            "non_null_count": result[1],
-            "null_count": result[0] - result[1],
-            "distinct_count": result[2]
-        }
-
-        # Try to get min/max for numeric columns
-        try:
-            minmax = self.conn.execute(f"""
-                SELECT MIN("{column}"), MAX("{column}") FROM data
+        with self._cursor(parquet_path) as cursor:
+            # Basic stats
+            result = cursor.execute(f"""
+                SELECT
+                    COUNT(*) as total,
+                    COUNT("{column}") as non_null,
+                    COUNT(DISTINCT "{column}") as distinct_count
+                FROM data
             """).fetchone()
-            stats["min"] = minmax[0]
-            stats["max"] = minmax[1]
-        except Exception:
-            pass  # Not numeric
 
-        return stats
+            stats = {
+                "total_rows": result[0],
+                "non_null_count": result[1],
+                "null_count": result[0] - result[1],
+                "distinct_count": result[2]
+            }
+
+            # Try to get min/max for numeric columns
+            try:
+                minmax = cursor.execute(f"""
+                    SELECT MIN("{column}"), MAX("{column}") FROM data
+                """).fetchone()
+                stats["min"] = minmax[0]
+                stats["max"] = minmax[1]
+            except Exception:
+                pass  # Not numeric
+
+            return stats
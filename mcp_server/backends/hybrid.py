@@ -0,0 +1,213 @@
+"""Hybrid backend: exported Parquet history plus live Postgres, in one DuckDB query.
+
+DuckDBBackend only sees what was exported, and PostgreSQLBackend reads
+through pandas. This backend ATTACHes the Postgres database in DuckDB
+(postgres extension) and binds 'data' to:
+
+    Parquet export of the periods unchanged since the export
+    UNION ALL BY NAME
+    staging table rows for every other period (read live from Postgres)
+
+Like incremental export, a period counts as unchanged while its
+(MAX(_load_id), COUNT(*)) in the staging table equals the exported one (the
+incremental export state's periods, or a GROUP BY over a single-file
+export). When every period is unchanged the query runs on Parquet alone.
+Results come back as Arrow tables straight from DuckDB.
+
+Usage:
+    backend = HybridBackend({'base_path': 'output/'})
+    table = backend.query_arrow('adhd_referrals', 'SELECT _period, COUNT(*) FROM data GROUP BY 1')
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+import pyarrow as pa
+
+from datawarp.pipeline.exporter import NULL_PERIOD_KEY, read_export_state
+from mcp_server.backends.duckdb_parquet import DuckDBBackend
+from mcp_server.core.sql_guard import check_sql
+
+
+def _literal(value) -> str:
+    """SQL literal for a value inlined into a view or a postgres_query() string."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _period_key(period) -> str:
+    """Export state key of a _period value."""
+    return NULL_PERIOD_KEY if period is None else str(period)
+
+
+def _postgres_dsn() -> str:
+    """libpq connection string from the same POSTGRES_* settings as get_connection()."""
+    settings = {
+        'host': os.getenv('POSTGRES_HOST', 'localhost'),
+        'port': os.getenv('POSTGRES_PORT', '5432'),
+        'dbname': os.getenv('POSTGRES_DB', 'datawarp'),
+        'user': os.getenv('POSTGRES_USER', 'datawarp'),
+        'password': os.getenv('POSTGRES_PASSWORD', ''),
+    }
+
+    def quote(value):
+        return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+    return ' '.join(f"{key}={quote(value)}" for key, value in settings.items() if value)
+
+
+class HybridBackend:
+    """Query exported Parquet and live Postgres rows together through DuckDB."""
+
+    placeholder = '?'  # Parameter marker for query()
+
+    def __init__(self, config: dict = None):
+        """Initialize hybrid backend.
+
+        Args:
+            config: Backend configuration with optional 'base_path' (Parquet
+                export directory) and 'catalog' (name of the attached database)
+        """
+        config = config or {}
+        self.base_path = Path(config.get('base_path', 'output/'))
+        self.catalog = config.get('catalog', 'pg')
+        self.conn = duckdb.connect(':memory:')
+        self.conn.execute("SET enable_progress_bar = false")
+        self.conn.execute("SET GLOBAL parquet_metadata_cache = true")
+        self._attached = False
+
+    def _attach(self) -> None:
+        """ATTACH Postgres read-only (once per backend)."""
+        if self._attached:
+            return
+        self.conn.execute("INSTALL postgres")
+        self.conn.execute("LOAD postgres")
+        self.conn.execute(f"ATTACH {_literal(_postgres_dsn())} AS {self.catalog} (TYPE postgres, READ_ONLY)")
+        self._attached = True
+
+    def _remote_rows(self, sql: str) -> list:
+        """Run a query entirely inside Postgres (uses its indexes) and fetch the rows."""
+        self._attach()
+        return self.conn.execute(f"SELECT * FROM postgres_query({_literal(self.catalog)}, {_literal(sql)})").fetchall()
+
+    def _parquet_path(self, source_code: str) -> Optional[Path]:
+        for path in (self.base_path / f"{source_code}.parquet", self.base_path / source_code):
+            if path.exists():
+                return path
+        return None
+
+    def _exported_periods(self, path: Path) -> Optional[dict]:
+        """(max _load_id, row count) of each period in an export, keyed like the export state.
+
+        Read from the incremental export state when there is one, else from
+        the Parquet itself; None when the export has no _period/_load_id.
+        """
+        state = read_export_state(path) if path.is_dir() else None
+        if state is not None:
+            return {key: (entry['load_id'], entry['rows']) for key, entry in state['periods'].items()}
+        try:
+            rows = self.conn.execute(
+                f"SELECT _period, MAX(_load_id), COUNT(*) FROM {DuckDBBackend._scan(str(path))} GROUP BY 1"
+            ).fetchall()
+        except duckdb.BinderException:
+            return None
+        return {_period_key(period): (load_id, count) for period, load_id, count in rows}
+
+    def bind(self, source_code: str) -> str:
+        """Point the 'data' view at the dataset's Parquet history plus changed live periods.
+
+        Returns:
+            Where the rows come from: 'parquet', 'postgres' or 'parquet+postgres'
+        """
+        self._attach()
+        found = self._remote_rows(
+            "SELECT COALESCE(schema_name, 'staging'), table_name FROM datawarp.tbl_data_sources "
+            f"WHERE code = {_literal(source_code)}"
+        )
+        if not found:
+            raise ValueError(f"Dataset not found: {source_code}")
+        schema, table = found[0]
+        live = f'{self.catalog}."{schema}"."{table}"'
+
+        path = self._parquet_path(source_code)
+        exported = self._exported_periods(path) if path is not None else None
+        if exported is None:
+            self.conn.execute(f"CREATE OR REPLACE TEMP VIEW data AS SELECT * FROM {live}")
+            return 'postgres'
+
+        # Same comparison as incremental export: a period's Parquet copy is
+        # current only while its (max _load_id, row count) is unchanged, so rows
+        # committed later under a reused or already-exported load id are read live
+        current = self._remote_rows(f'SELECT _period, MAX(_load_id), COUNT(*) FROM "{schema}"."{table}" GROUP BY 1')
+        unchanged = [period for period, load_id, rows in current
+                     if exported.get(_period_key(period)) == (load_id, rows)]
+        scan = DuckDBBackend._scan(str(path))
+        if len(unchanged) == len(current) == len(exported):
+            self.conn.execute(f"CREATE OR REPLACE TEMP VIEW data AS SELECT * FROM {scan}")
+            return 'parquet'
+        if not unchanged:
+            self.conn.execute(f"CREATE OR REPLACE TEMP VIEW data AS SELECT * FROM {live}")
+            return 'postgres'
+
+        # Periods deleted since the export match neither side, so they drop out
+        values = [p for p in unchanged if p is not None]
+        in_list = f"_period IN ({', '.join(_literal(p) for p in values)})" if values else 'FALSE'
+        if None in unchanged:
+            history_filter = f"({in_list} OR _period IS NULL)"
+            live_filter = f"NOT {history_filter}"
+        else:
+            history_filter = in_list
+            live_filter = f"(_period IS NULL OR NOT {in_list})"
+        self.conn.execute(f"""
+            CREATE OR REPLACE TEMP VIEW data AS
+            SELECT * FROM {scan} WHERE {history_filter}
+            UNION ALL BY NAME
+            SELECT * FROM {live} WHERE {live_filter}
+        """)
+        return 'parquet+postgres'
+
+    def query_arrow(self, source_code: str, sql: str, params: list = None,
+                    max_rows: Optional[int] = None) -> pa.Table:
+        """Run SQL ('data' as table name) and return the result as an Arrow table.
+
+        The SQL may only read 'data' and call allowlisted functions (see
+        core.sql_guard); the attached Postgres catalog is not reachable.
+
+        Args:
+            source_code: Canonical source code
+            sql: SELECT using 'data' as table name (parameters marked with ?)
+            params: Query parameters
+            max_rows: Optional result size limit
+        """
+        problem = check_sql(sql)
+        if problem:
+            raise ValueError(problem)
+        self.bind(source_code)
+        sql = sql.strip().rstrip(';')
+        if max_rows is not None:
+            sql = f"SELECT * FROM ({sql}) AS result LIMIT {int(max_rows)}"
+        result = self.conn.execute(sql, params or [])
+        # to_arrow_table() replaced fetch_arrow_table() in DuckDB 1.4
+        return result.to_arrow_table() if hasattr(result, 'to_arrow_table') else result.fetch_arrow_table()
+
+    def query(self, source_code: str, sql: str, params: list = None, max_rows: int = 10000) -> dict:
+        """Run SQL and fetch at most max_rows rows (same result shape as the other backends).
+
+        Returns:
+            Dict with 'columns', 'rows' (dicts of Python values) and 'truncated'
+        """
+        table = self.query_arrow(source_code, sql, params, max_rows=int(max_rows) + 1)
+        return {
+            "columns": table.column_names,
+            "rows": table.slice(0, max_rows).to_pylist(),
+            "truncated": table.num_rows > max_rows
+        }
+
+    def get_columns(self, source_code: str) -> list[str]:
+        """Column names of the bound dataset."""
+        self.bind(source_code)
+        return [row[0] for row in self.conn.execute("DESCRIBE data").fetchall()]
@@ -1,5 +1,6 @@
 """PostgreSQL backend for MCP server - queries database directly."""
 
+import os
 import sys
 import pandas as pd
 from pathlib import Path
@@ -13,11 +14,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from datawarp.storage.connection import get_connection
+from mcp_server.core.sql_guard import check_sql
+
+# Statement timeout for pushed-down MCP queries
+DEFAULT_QUERY_TIMEOUT_MS = 30000
 
 
 class PostgreSQLBackend:
     """Backend that queries PostgreSQL directly for catalog and data."""
 
+    placeholder = '%s'  # Parameter marker for query()
+
     def __init__(self, config: Dict = None):
         """Initialize PostgreSQL backend."""
         self.config = config or {}
@@ -55,29 +62,105 @@ class PostgreSQLBackend:
             """
             return pd.read_sql(query, conn)
 
+    @staticmethod
+    def _table(source_code: str, cur) -> tuple:
+        """(schema, table) of a source's staging table from the registry."""
+        cur.execute("""
+            SELECT COALESCE(schema_name, 'staging'), table_name
+            FROM datawarp.tbl_data_sources
+            WHERE code = %s
+        """, (source_code,))
+        row = cur.fetchone()
+        if not row:
+            raise ValueError(f"Dataset not found: {source_code}")
+        return row
+
     def load_dataset(self, source_code: str, limit: int = 10000) -> pd.DataFrame:
         """Load dataset from PostgreSQL table."""
         with get_connection() as conn:
             # Get table info from registry
             cur = conn.cursor()
-            cur.execute("""
-                SELECT COALESCE(schema_name, 'staging'), table_name
-                FROM datawarp.tbl_data_sources
-                WHERE code = %s
-            """, (source_code,))
-            row = cur.fetchone()
+            schema, table = self._table(source_code, cur)
             cur.close()
-
-            if not row:
-                raise ValueError(f"Dataset not found: {source_code}")
-
-            schema, table = row
             full_table = f"{schema}.{table}"
 
             # Query with limit
             query = f"SELECT * FROM {full_table} LIMIT {limit}"
             return pd.read_sql(query, conn)
 
+    def get_latest_load_id(self, source_code: str) -> Optional[int]:
+        """Highest tbl_load_history id for a source (changes with every load), or None."""
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT MAX(h.id)
+                FROM datawarp.tbl_data_sources s
+                JOIN datawarp.tbl_load_history h ON h.source_id = s.id
+                WHERE s.code = %s
+            """, (source_code,))
+            return cur.fetchone()[0]
+
+    def get_columns(self, source_code: str) -> list[str]:
+        """Column names of a source's staging table, in table order."""
+        with get_connection() as conn:
+            cur = conn.cursor()
+            schema, table = self._table(source_code, cur)
+            cur.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                ORDER BY ordinal_position
+            """, (schema, table))
+            return [row[0] for row in cur.fetchall()]
+
+    def query(self, source_code: str, sql: str, params: list = None, max_rows: int = 10000) -> dict:
+        """Run SQL against a source's staging table and fetch at most max_rows result rows.
+
+        'data' in the SQL is bound to the staging table through an inlined
+        CTE, so Postgres plans the query against the real table (filters and
+        aggregates run in the database). The SQL may only read 'data' and
+        call allowlisted functions (see core.sql_guard); it runs read-only
+        under a statement timeout (DATAWARP_MCP_QUERY_TIMEOUT_MS) and, when
+        DATAWARP_MCP_QUERY_ROLE is set, as that role. One extra row is
+        fetched to tell whether the result was truncated.
+
+        Args:
+            source_code: Canonical source code
+            sql: SELECT using 'data' as table name (parameters marked with %s)
+            params: Query parameters
+            max_rows: Result size limit
+
+        Returns:
+            Dict with 'columns', 'rows' (dicts of raw Python values) and 'truncated'
+        """
+        problem = check_sql(sql)
+        if problem:
+            raise ValueError(problem)
+        timeout_ms = int(os.getenv('DATAWARP_MCP_QUERY_TIMEOUT_MS', str(DEFAULT_QUERY_TIMEOUT_MS)))
+        role = os.getenv('DATAWARP_MCP_QUERY_ROLE')
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SET TRANSACTION READ ONLY")
+            cur.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+            schema, table = self._table(source_code, cur)
+            if role:
+                # Registry lookup above needs the server's own role
+                cur.execute('SET LOCAL ROLE "{}"'.format(role.replace('"', '""')))
+
+            cur.execute(
+                f'WITH data AS NOT MATERIALIZED (SELECT * FROM "{schema}"."{table}") '
+                f"SELECT * FROM ({sql.strip().rstrip(';')}) AS result LIMIT {int(max_rows) + 1}",
+                params
+            )
+            columns = [d[0] for d in cur.description]
+            rows = cur.fetchmany(int(max_rows) + 1)
+            conn.rollback()  # Nothing to commit
+
+        return {
+            "columns": columns,
+            "rows": [dict(zip(columns, row)) for row in rows[:max_rows]],
+            "truncated": len(rows) > max_rows
+        }
+
     def execute_sql(self, sql: str) -> pd.DataFrame:
         """Execute arbitrary SQL query."""
         with get_connection() as conn:
@@ -2,5 +2,6 @@
 
 from mcp_server.core.router import QueryRouter
 from mcp_server.core.registry import DatasetRegistry
+from mcp_server.core.result_cache import ResultCache
 
-__all__ = ['QueryRouter', 'DatasetRegistry']
+__all__ = ['QueryRouter', 'DatasetRegistry', 'ResultCache']
@@ -0,0 +1,135 @@
+"""Result Cache - Bounded cache of MCP tool results per dataset version.
+
+Agents repeat the same get_schema / get_metadata / query calls many times
+in a conversation. Results are cached under (tool, dataset, normalized
+arguments) together with the dataset's version - its latest
+tbl_load_history id and the mtime of its Parquet export - and an entry is
+dropped as soon as the version it was computed for is no longer current.
+
+Usage:
+    cache = ResultCache(max_entries=256)
+    key = cache_key('query', 'adhd_referrals', arguments)
+    text = cache.get(key, version)
+    if text is None:
+        text = run_tool(...)
+        cache.put(key, version, text, elapsed_s)
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# Single- or double-quoted literal/identifier (doubled quotes escape), or anything else
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|[^'\"]+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and drop a trailing ';', leaving quoted text untouched."""
+    parts = []
+    for token in _SQL_TOKEN.findall(sql.strip().rstrip(';').strip()):
+        parts.append(token if token[0] in '\'"' else re.sub(r'\s+', ' ', token))
+    return ''.join(parts)
+
+
+def _normalize(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(tool: str, dataset: str, arguments: dict) -> tuple:
+    """(tool, dataset, normalized arguments) for a tool call.
+
+    A SQL question is whitespace-normalized; a natural-language one is also
+    lower-cased (SQL is generated from its lower-cased form anyway).
+    """
+    arguments = _normalize({k: v for k, v in arguments.items() if k != 'dataset'})
+    question = arguments.get('question')
+    if isinstance(question, str):
+        lowered = question.lower().strip()
+        is_sql = lowered.startswith('select ') or 'from data' in lowered
+        arguments['question'] = normalize_sql(question) if is_sql else ' '.join(lowered.split())
+    return tool, dataset, json.dumps(arguments, sort_keys=True, default=str)
+
+
+class ResultCache:
+    """LRU cache of tool result texts, bounded by entry count and total size."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """Initialize cache.
+
+        Args:
+            max_entries: Most results kept
+            max_bytes: Most result text kept (sum of lengths)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # key -> (version, text, elapsed_s)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key: tuple, version: Hashable) -> Optional[str]:
+        """Cached text for key if it was computed for this dataset version."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                self._drop(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[1]
+
+    def put(self, key: tuple, version: Hashable, text: str, elapsed_s: float) -> None:
+        """Store a result and the time it took to compute."""
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (version, text, elapsed_s)
+            self._bytes += len(text)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        _, text, _ = self._entries.pop(key)
+        self._bytes -= len(text)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit ratio, latency saved and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "size_kb": round(self._bytes / 1024, 1),
+                "max_size_kb": round(self.max_bytes / 1024, 1)
+            }
@@ -61,13 +61,18 @@ class QueryRouter:
             dataset_config: Dataset configuration
 
         Returns:
-            Absolute path (for parquet) or table name (for postgres)
+            Absolute path (for parquet) or table name (for postgres).
+            output/{code}.parquet resolves to the output/{code}/ directory
+            when the dataset is exported incrementally.
         """
         if 'path' in dataset_config:
             # Parquet file path
             path = dataset_config['path']
             if not Path(path).is_absolute():
                 path = str(PROJECT_ROOT / path)
+            dataset_dir = Path(path).with_suffix('')
+            if path.endswith('.parquet') and not Path(path).exists() and dataset_dir.is_dir():
+                return str(dataset_dir)
             return path
         elif 'table' in dataset_config:
             # PostgreSQL table
@@ -0,0 +1,176 @@
+"""SQL Guard - Only let agent SQL read the bound 'data' relation.
+
+Agent SQL is pushed down to the engine: Postgres over the live database,
+DuckDB over Parquet (or both, in the hybrid backend). A read-only
+transaction alone still lets a SELECT read any other relation (datawarp.*,
+other staging tables, pg_catalog, files via DuckDB table functions) and
+call side-effecting functions such as pg_terminate_backend or set_config.
+
+check_sql() tokenizes the query and accepts it only if:
+- it is one read-only SELECT (or WITH ... SELECT) statement, without
+  comments, prefixed or dollar-quoted strings, or SELECT INTO
+- every FROM / JOIN / TABLE source is 'data', a subquery, or a CTE of the query
+- every function called is on an allowlist of aggregate, window and
+  scalar functions, and is not schema-qualified
+
+Usage:
+    problem = check_sql('SELECT region, SUM(patients) FROM data GROUP BY 1')
+    if problem:
+        raise ValueError(problem)
+"""
+
+import re
+from typing import List, Optional, Set
+
+# String literal or quoted identifier
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+# Quoted token, word, parameter marker, or any other single character
+_TOKEN = re.compile(_QUOTED.pattern + r"|[^\W\d][\w$]*|%s|\S")
+
+ALLOWED_FUNCTIONS = {
+    # Aggregates
+    'count', 'sum', 'avg', 'min', 'max', 'stddev', 'stddev_samp', 'stddev_pop', 'variance',
+    'var_samp', 'var_pop', 'median', 'mode', 'percentile_cont', 'percentile_disc', 'string_agg',
+    'array_agg', 'bool_and', 'bool_or', 'every', 'corr', 'covar_pop', 'covar_samp', 'quantile_cont',
+    'quantile_disc', 'approx_count_distinct', 'list',
+    # Window functions
+    'row_number', 'rank', 'dense_rank', 'percent_rank', 'cume_dist', 'ntile', 'lag', 'lead',
+    'first_value', 'last_value', 'nth_value',
+    # Numbers
+    'abs', 'round', 'ceil', 'ceiling', 'floor', 'trunc', 'sqrt', 'power', 'pow', 'exp', 'ln',
+    'log', 'log10', 'mod', 'sign', 'greatest', 'least',
+    # Conditionals, casts and parameterised types
+    'coalesce', 'nullif', 'cast', 'try_cast', 'numeric', 'decimal', 'varchar', 'char',
+    # Dates
+    'extract', 'date_trunc', 'date_part', 'datepart', 'to_char', 'to_date', 'to_timestamp',
+    'make_date', 'age', 'strftime', 'strptime', 'year', 'month', 'day', 'quarter', 'epoch',
+    'last_day',
+    # Text
+    'lower', 'upper', 'initcap', 'length', 'char_length', 'substring', 'substr', 'trim', 'ltrim',
+    'rtrim', 'btrim', 'replace', 'concat', 'concat_ws', 'left', 'right', 'split_part', 'position',
+    'strpos', 'lpad', 'rpad', 'reverse', 'regexp_replace', 'starts_with', 'contains',
+}
+
+# Keywords that may be followed by '(' without being a function call
+_KEYWORDS = {
+    'select', 'with', 'as', 'from', 'join', 'on', 'using', 'where', 'by', 'having', 'limit',
+    'offset', 'union', 'intersect', 'except', 'all', 'distinct', 'and', 'or', 'not', 'in',
+    'exists', 'any', 'some', 'between', 'like', 'ilike', 'is', 'case', 'when', 'then', 'else',
+    'over', 'filter', 'within', 'values', 'array', 'row', 'materialized', 'lateral',
+}
+
+# Data-modifying keywords (e.g. in a writable CTE)
+_WRITES = {'insert', 'update', 'delete', 'merge', 'returning', 'copy', 'drop', 'truncate', 'alter',
+           'create', 'grant', 'revoke'}
+
+# Clause keywords that end a FROM list
+_END_OF_FROM = {'where', 'group', 'having', 'order', 'limit', 'offset', 'union', 'intersect',
+                'except', 'window', 'qualify', 'on', 'using', 'select'}
+
+
+def _word(token: str) -> Optional[str]:
+    """Lower-cased name of a word or quoted-identifier token."""
+    if token.startswith('"'):
+        return token[1:-1].replace('""', '"').lower()
+    if token[0].isalpha() or token[0] == '_':
+        return token.lower()
+    return None
+
+
+def _cte_names(tokens: List[str]) -> Set[str]:
+    """Names defined by a leading WITH clause."""
+    names = set()
+    if tokens[0].lower() != 'with':
+        return names
+    i = 2 if len(tokens) > 1 and tokens[1].lower() == 'recursive' else 1
+    while i < len(tokens) and _word(tokens[i]):
+        names.add(_word(tokens[i]))
+        i += 1
+        while i < len(tokens) and tokens[i] != '(':
+            i += 1
+        depth = 0
+        while i < len(tokens):
+            depth += {'(': 1, ')': -1}.get(tokens[i], 0)
+            i += 1
+            if depth == 0:
+                break
+        if i >= len(tokens) or tokens[i] != ',':
+            break
+        i += 1
+    return names
+
+
+def check_sql(sql: str) -> Optional[str]:
+    """Why the SQL may not run against a dataset, or None if it only reads 'data'."""
+    sql = sql.strip().rstrip(';').strip()
+    matches = list(_TOKEN.finditer(sql))
+    tokens = [m.group() for m in matches]
+    if not tokens or tokens[0].lower() not in ('select', 'with'):
+        return "Only a single SELECT statement is supported"
+
+    for i, match in enumerate(matches):
+        token = match.group()
+        if token == ';':
+            return "Only a single SELECT statement is supported"
+        if token == '$':
+            return "Dollar-quoted strings and $n parameters are not supported"
+        if token in ("'", '"'):
+            return "Unterminated quote"
+        if token[0] == "'" and match.start() and sql[match.start() - 1] not in ' \t\r\n(,=<>!|+-*/%:[':
+            # E'..', U&'..', B'..' etc. change how the literal is read
+            return "Prefixed string literals are not supported"
+    unquoted = _QUOTED.sub(' ', sql)
+    if '--' in unquoted or '/*' in unquoted:
+        return "SQL comments are not supported"
+
+    ctes = _cte_names(tokens)
+    # One frame per open paren: is it a function call, and is it inside a FROM list
+    frames = [{'call': False, 'from': False}]
+    expect_source = False
+    for i, token in enumerate(tokens):
+        lowered = token.lower() if token[0] != '"' else None
+        frame = frames[-1]
+        if expect_source:
+            expect_source = False
+            if token == '(':
+                frames.append({'call': False, 'from': False})
+                continue
+            name = _word(token)
+            following = tokens[i + 1] if i + 1 < len(tokens) else ''
+            if following in ('.', '('):
+                token += following + ' ...'
+            elif name == 'data' or name in ctes:
+                continue
+            return f"Only the dataset table 'data' can be queried, not {token}"
+
+        if token == '(':
+            previous = tokens[i - 1] if i else ''
+            name = previous.lower() if _word(previous) and previous[0] != '"' else None
+            if name in _KEYWORDS or not _word(previous):
+                frames.append({'call': False, 'from': False})
+            elif name in ALLOWED_FUNCTIONS and (i < 2 or tokens[i - 2] != '.'):
+                frames.append({'call': True, 'from': False})
+            else:
+                return f"Function not allowed: {previous}"
+        elif token == ')':
+            if len(frames) == 1:
+                return "Unbalanced parentheses"
+            frames.pop()
+        elif lowered in ('from', 'join', 'table') and not frame['call']:
+            # FROM inside EXTRACT/SUBSTRING/TRIM(...) is an argument, not a source
+            expect_source = True
+            frame['from'] = True
+        elif token == ',' and frame['from']:
+            expect_source = True
+        elif lowered in _END_OF_FROM:
+            frame['from'] = False
+            if lowered == 'select':
+                frame['call'] = False
+        elif lowered == 'into':
+            return "SELECT INTO is not supported"
+        elif lowered in _WRITES:
+            return "Only read-only SELECT statements are supported"
+
+    if expect_source:
+        return "FROM without a source"
+    return None
@@ -166,6 +166,9 @@ def load_dataset_from_parquet(source_code: str) -> pd.DataFrame:
     if not file_path.exists():
         raise FileNotFoundError(f"Dataset file not found: {file_path}")
 
+    if file_path.is_dir():
+        # Exported dataset directory; pandas would skip hive _period= partitions
+        return pd.concat([pd.read_parquet(p) for p in sorted(file_path.rglob('*.parquet'))], ignore_index=True)
     return pd.read_parquet(file_path)
 
 
@@ -1,8 +1,23 @@
 #!/usr/bin/env python3
-"""DataWarp MCP Server - Using official MCP SDK with PostgreSQL backend."""
+"""DataWarp MCP Server - Using official MCP SDK with PostgreSQL backend.
 
+The query and query_metric tools push SQL down to the full dataset: DuckDB
+over the dataset's Parquet export when there is one, otherwise Postgres
+against the staging table. Only result rows (at most DATAWARP_MCP_MAX_ROWS)
+are fetched.
+
+Dataset tool results are cached until the dataset gets a new load or
+Parquet export (see mcp_server.core.result_cache); cache_stats reports
+hit ratio and time saved.
+"""
+
+import os
+import re
 import sys
+import json
+import time
 import logging
+from decimal import Decimal
 from pathlib import Path
 from datetime import date, datetime
 
@@ -15,7 +30,11 @@ import numpy as np
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
+from mcp_server.backends.duckdb_parquet import DuckDBBackend
+from mcp_server.backends.hybrid import HybridBackend
 from mcp_server.backends.postgres import PostgreSQLBackend
+from mcp_server.core.result_cache import ResultCache, cache_key
+from mcp_server.core.sql_guard import check_sql
 
 
 def make_json_safe(val):
@@ -24,6 +43,8 @@ def make_json_safe(val):
         return None
     elif hasattr(val, 'isoformat'):  # datetime, date, Timestamp, etc.
         return val.isoformat()
+    elif isinstance(val, Decimal):
+        return float(val)
     elif isinstance(val, (np.integer, np.int64)):
         return int(val)
     elif isinstance(val, (np.floating, np.float64)):
@@ -47,6 +68,21 @@ app = Server("datawarp-nhs")
 # Initialize PostgreSQL backend
 backend = PostgreSQLBackend()
 
+# Query pushdown: 'auto' prefers a Parquet export and falls back to Postgres;
+# 'hybrid' unions Parquet history with periods loaded since the export (Postgres attached in DuckDB)
+QUERY_ENGINE = os.getenv('DATAWARP_MCP_QUERY_ENGINE', 'auto')  # auto | parquet | postgres | hybrid
+PARQUET_DIR = Path(os.getenv('DATAWARP_MCP_PARQUET_DIR', str(project_root / 'output')))
+MAX_ROWS = int(os.getenv('DATAWARP_MCP_MAX_ROWS', '10000'))
+parquet_backend = DuckDBBackend({'base_path': str(PARQUET_DIR)})
+hybrid_backend = HybridBackend({'base_path': str(PARQUET_DIR)}) if QUERY_ENGINE == 'hybrid' else None
+
+# Result cache for dataset tools, keyed by (tool, dataset, normalized arguments)
+CACHED_TOOLS = {'get_metadata', 'get_schema', 'query', 'query_metric'}
+result_cache = ResultCache(
+    max_entries=int(os.getenv('DATAWARP_MCP_CACHE_ENTRIES', '256')),
+    max_bytes=int(os.getenv('DATAWARP_MCP_CACHE_MB', '64')) * 1024 * 1024
+)
+
 
 def load_catalog() -> pd.DataFrame:
     """Load the catalog of available datasets."""
@@ -58,6 +94,68 @@ def load_dataset(source_code: str, limit: int = 10000) -> pd.DataFrame:
     return backend.load_dataset(source_code, limit)
 
 
+def query_engine(source_code: str) -> tuple:
+    """(backend, target) a dataset's queries run on.
+
+    DuckDB over output/{code}.parquet or the output/{code}/ export directory
+    when present (unless DATAWARP_MCP_QUERY_ENGINE=postgres), else Postgres;
+    with DATAWARP_MCP_QUERY_ENGINE=hybrid, always the hybrid backend.
+    """
+    if hybrid_backend is not None:
+        return hybrid_backend, source_code
+    if QUERY_ENGINE != 'postgres':
+        for path in (PARQUET_DIR / f"{source_code}.parquet", PARQUET_DIR / source_code):
+            if path.exists():
+                return parquet_backend, str(path)
+        if QUERY_ENGINE == 'parquet':
+            raise ValueError(f"No Parquet export for {source_code} in {PARQUET_DIR}")
+    return backend, source_code
+
+
+def dataset_columns(engine: tuple) -> list[str]:
+    """Column names of a dataset, from Parquet metadata or information_schema."""
+    query_backend, target = engine
+    if query_backend is parquet_backend:
+        return [col['name'] for col in parquet_backend.get_schema(target)]
+    return query_backend.get_columns(target)
+
+
+def run_query(engine: tuple, sql: str, params: list = None, max_rows: int = MAX_ROWS) -> dict:
+    """Push SQL ('data' as table name) down to the dataset's engine.
+
+    Returns:
+        Dict with 'columns', JSON-safe 'rows', 'truncated' and 'backend'
+    """
+    query_backend, target = engine
+    result = query_backend.query(target, sql, params, max_rows)
+    result['rows'] = [{col: make_json_safe(val) for col, val in row.items()} for row in result['rows']]
+    result['backend'] = {parquet_backend: 'duckdb-parquet', backend: 'postgresql'}.get(query_backend, 'duckdb-hybrid')
+    return result
+
+
+def sample_frame(engine: tuple, n: int = 100) -> pd.DataFrame:
+    """A few rows as a DataFrame, for column type detection."""
+    query_backend, target = engine
+    result = query_backend.query(target, f"SELECT * FROM data LIMIT {n}", max_rows=n)
+    return pd.DataFrame.from_records([tuple(row.values()) for row in result['rows']],
+                                     columns=result['columns'], coerce_float=True)
+
+
+def dataset_version(source_code: str) -> tuple:
+    """What a cached result for the dataset depends on.
+
+    The latest tbl_load_history id (the staging _load_id) and the newest
+    mtime under its Parquet export; either changing invalidates the entry.
+    """
+    parquet = None
+    for path in (PARQUET_DIR / f"{source_code}.parquet", PARQUET_DIR / source_code):
+        if path.exists():
+            paths = [path] + (list(path.rglob('*')) if path.is_dir() else [])
+            parquet = (max(p.stat().st_mtime_ns for p in paths), len(paths))
+            break
+    return backend.get_latest_load_id(source_code), parquet
+
+
 def generate_sql_from_question(question: str, df: pd.DataFrame) -> tuple[str, str]:
     """Generate SQL from natural language question.
 
@@ -102,65 +200,25 @@ def generate_sql_from_question(question: str, df: pd.DataFrame) -> tuple[str, st
     return "SELECT * FROM data LIMIT 1000", "All rows (limited to 1000)"
 
 
-def validate_sql_query(sql: str, df: pd.DataFrame) -> tuple[bool, str]:
+def validate_sql_query(sql: str, columns: list[str]) -> tuple[bool, str]:
     """Validate SQL query before execution.
 
     Returns: (is_valid, error_message)
     """
-    # Check 1: Empty dataframe
-    if df is None or len(df) == 0:
-        return False, "Dataset is empty"
-
-    # Check 2: Column name validation
-    import re
+    # Check 1: Column name validation (quoted identifiers must exist)
     column_refs = re.findall(r'"([^"]+)"', sql)
-    missing_cols = [col for col in column_refs if col not in df.columns and col != 'data']
+    missing_cols = [col for col in column_refs if col not in columns and col != 'data']
     if missing_cols:
         return False, f"Columns not found: {', '.join(missing_cols)}"
 
-    # Check 3: Query has LIMIT (prevent memory issues)
-    if 'SELECT' in sql.upper() and 'LIMIT' not in sql.upper():
-        logger.warning("Query missing LIMIT clause, this may be expensive")
-
-    # Check 4: Basic SQL injection prevention (shouldn't happen but paranoia)
-    dangerous_keywords = ['DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE']
-    if any(keyword in sql.upper() for keyword in dangerous_keywords):
-        return False, "Query contains potentially dangerous SQL keywords"
+    # Check 2: One SELECT that only reads 'data' and calls allowlisted functions
+    problem = check_sql(sql)
+    if problem:
+        return False, problem
 
     return True, ""
 
 
-def execute_sql_with_duckdb(df: pd.DataFrame, sql: str) -> list[dict]:
-    """Execute SQL query against DataFrame using DuckDB.
-
-    Args:
-        df: DataFrame to query
-        sql: SQL query using 'data' as table name
-
-    Returns:
-        List of result rows as dicts
-    """
-    import duckdb
-
-    # Register DataFrame as 'data' table
-    conn = duckdb.connect(':memory:')
-    conn.register('data', df)
-
-    # Execute query
-    result = conn.execute(sql).fetchdf()
-    conn.close()
-
-    # Convert to list of dicts with JSON-safe values
-    rows = []
-    for _, row in result.iterrows():
-        row_dict = {}
-        for col, val in row.items():
-            row_dict[col] = make_json_safe(val)
-        rows.append(row_dict)
-
-    return rows
-
-
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -216,7 +274,13 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="query",
-            description="Execute a query against a dataset. Supports natural language questions OR SQL queries (use 'data' as table name in SQL).",
+            description=(
+                "Execute a query against a dataset. Supports natural language questions OR SQL queries "
+                "(use 'data' as table name in SQL). SQL must be a single read-only SELECT that only "
+                "reads 'data' (subqueries and CTEs over it are fine) and only calls common aggregate, "
+                "window, date, text and numeric functions; other tables, schemas, files and "
+                "system functions are rejected."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -286,13 +350,51 @@ async def list_tools() -> list[Tool]:
                 },
                 "required": ["dataset", "metric"]
             }
+        ),
+        Tool(
+            name="cache_stats",
+            description="Result cache statistics: hit ratio, time saved, entries and size.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
         )
     ]
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Handle tool calls."""
+    """Handle tool calls, answering repeated dataset calls from the result cache."""
+    if name == "cache_stats":
+        return [TextContent(type="text", text=json.dumps(result_cache.stats(), indent=2))]
+
+    dataset = arguments.get('dataset') if name in CACHED_TOOLS else None
+    if not dataset:
+        return await run_tool(name, arguments)
+
+    try:
+        version = dataset_version(dataset)
+    except Exception as e:
+        logger.warning(f"Result cache bypassed for {dataset}: {e}")
+        return await run_tool(name, arguments)
+
+    key = cache_key(name, dataset, arguments)
+    cached = result_cache.get(key, version)
+    if cached is not None:
+        logger.info(f"Tool {name} answered from cache")
+        return [TextContent(type="text", text=cached)]
+
+    start = time.perf_counter()
+    contents = await run_tool(name, arguments)
+    text = contents[0].text
+    # Errors and fallbacks are not cached: they may be transient
+    if not text.startswith('Error:') and 'error' not in json.loads(text):
+        result_cache.put(key, version, text, time.perf_counter() - start)
+    return contents
+
+
+async def run_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Run a tool."""
     logger.info(f"Tool called: {name} with args: {arguments}")
 
     try:
@@ -425,8 +527,9 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             dataset_code = arguments['dataset']
             question = arguments['question']
 
-            # Load dataset from PostgreSQL
-            df = load_dataset(dataset_code, limit=10000)
+            # Push the query down to the full dataset (Parquet export or staging table)
+            engine = query_engine(dataset_code)
+            columns = dataset_columns(engine)
 
             # Determine if question is SQL or natural language
             question_lower = question.lower().strip()
@@ -439,12 +542,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     query_description = "SQL query"
                     logger.info(f"Executing SQL: {sql}")
                 else:
-                    # Generate SQL from natural language
-                    sql, query_description = generate_sql_from_question(question, df)
+                    # Generate SQL from natural language (column types from a small sample)
+                    sql, query_description = generate_sql_from_question(question, sample_frame(engine))
                     logger.info(f"Generated SQL: {sql}")
 
                 # Validate SQL before execution
-                is_valid, error_msg = validate_sql_query(sql, df)
+                is_valid, error_msg = validate_sql_query(sql, columns)
                 if not is_valid:
                     result = {
                         "error": "Query validation failed",
@@ -453,47 +556,37 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                         "suggestion": "Check column names and query structure"
                     }
                     # Don't execute - return error result
-                    import json
                     return [TextContent(
                         type="text",
                         text=json.dumps(result, indent=2)
                     )]
 
-                # Execute with DuckDB (hybrid approach)
-                rows = execute_sql_with_duckdb(df, sql)
-
-                # Safety limit: prevent memory issues with huge results
-                MAX_ROWS = 10000
-                if len(rows) > MAX_ROWS:
-                    logger.warning(f"Result truncated from {len(rows)} to {MAX_ROWS} rows")
-                    rows = rows[:MAX_ROWS]
+                # Only the result rows are fetched, at most MAX_ROWS of them
+                executed = run_query(engine, sql)
+                rows = executed['rows']
+                if executed['truncated']:
+                    logger.warning(f"Result truncated to {MAX_ROWS} rows")
                     query_description += f" (truncated to {MAX_ROWS} rows)"
 
                 result = {
                     "rows": rows,
                     "row_count": len(rows),
+                    "truncated": executed['truncated'],
                     "query_description": query_description,
                     "sql_executed": sql,
-                    "backend": "postgresql+duckdb"
+                    "backend": executed['backend']
                 }
 
             except Exception as e:
-                # Fallback to simple pandas operations
-                logger.warning(f"SQL query failed: {e}, falling back to pandas")
+                # Fallback to simple queries the engine can always answer
+                logger.warning(f"SQL query failed: {e}, falling back to a simple query")
 
                 if 'count' in question_lower or 'how many' in question_lower:
-                    rows = [{"count": len(df)}]
-                    query_description = "Row count (pandas fallback)"
+                    rows = run_query(engine, "SELECT COUNT(*) AS count FROM data")['rows']
+                    query_description = "Row count (fallback)"
                 else:
-                    result_data = df.head(100)
-                    # Convert to JSON-serializable format
-                    rows = []
-                    for _, row in result_data.iterrows():
-                        row_dict = {}
-                        for col, val in row.items():
-                            row_dict[col] = make_json_safe(val)
-                        rows.append(row_dict)
-                    query_description = "First 100 rows (pandas fallback)"
+                    rows = run_query(engine, "SELECT * FROM data", max_rows=100)['rows']
+                    query_description = "First 100 rows (fallback)"
 
                 result = {
                     "rows": rows,
@@ -614,11 +707,13 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             if not dataset or not metric:
                 raise ValueError("Both dataset and metric parameters are required")
 
-            # Load dataset
-            df = load_dataset(dataset, limit=10000)
+            # Filters and limit run in the engine over the full dataset
+            engine = query_engine(dataset)
+            columns = dataset_columns(engine)
+            marker = engine[0].placeholder
 
             # Check if dataset is empty
-            if len(df) == 0:
+            if not run_query(engine, "SELECT 1 AS present FROM data", max_rows=1)['rows']:
                 result = {
                     "dataset": dataset,
                     "metric": metric,
@@ -626,36 +721,42 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                     "suggestion": "This dataset may not have been loaded yet or contains no data"
                 }
             # Check if metric column exists
-            elif metric not in df.columns:
-                available_cols = list(df.columns)
+            elif metric not in columns:
                 # Try to suggest similar columns
-                similar = [col for col in available_cols if metric.lower() in col.lower() or col.lower() in metric.lower()]
+                similar = [col for col in columns if metric.lower() in col.lower() or col.lower() in metric.lower()]
 
                 result = {
                     "dataset": dataset,
                     "metric": metric,
                     "error": f"Metric '{metric}' not found in dataset",
-                    "available_columns": available_cols[:20],  # Limit to prevent overflow
+                    "available_columns": columns[:20],  # Limit to prevent overflow
                     "suggested_columns": similar[:5] if similar else []
                 }
             else:
-                # Apply filters if provided
-                filtered_df = df.copy()
-                invalid_filters = []
+                # Build filters as query parameters
+                conditions, params, invalid_filters = [], [], []
                 for col, value in filters.items():
-                    if col in filtered_df.columns:
-                        filtered_df = filtered_df[filtered_df[col] == value]
+                    if col in columns:
+                        conditions.append(f'"{col}" = {marker}')
+                        params.append(value)
                     else:
                         invalid_filters.append(col)
                         logger.warning(f"Filter column '{col}' not found in dataset, skipping")
+                where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+                total_after_filter = run_query(
+                    engine, f"SELECT COUNT(*) AS n FROM data{where}", params, max_rows=1
+                )['rows'][0]['n']
 
                 # Check if filters removed all data
-                if len(filtered_df) == 0:
+                if total_after_filter == 0:
                     # Find latest available period for helpful error message
                     latest_period = "unknown"
-                    period_cols = [c for c in df.columns if 'period' in c.lower() or 'date' in c.lower()]
+                    period_cols = [c for c in columns if 'period' in c.lower() or 'date' in c.lower()]
                     if period_cols:
-                        latest_period = str(df[period_cols[0]].max())
+                        latest = run_query(engine, f'SELECT MAX("{period_cols[0]}") AS latest FROM data',
+                                           max_rows=1)['rows'][0]['latest']
+                        latest_period = str(latest)
 
                     result = {
                         "dataset": dataset,
@@ -664,12 +765,13 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                         "error": "No data available matching the specified filters",
                         "suggestion": f"Latest available period: {latest_period}",
                         "invalid_filters": invalid_filters,
-                        "total_rows_before_filter": len(df)
+                        "total_rows_before_filter": run_query(
+                            engine, "SELECT COUNT(*) AS n FROM data", max_rows=1)['rows'][0]['n']
                     }
                 else:
                     # Select relevant columns (metric + filter columns + common dimensions)
                     result_cols = [metric]
-                    for col in df.columns:
+                    for col in columns:
                         col_lower = col.lower()
                         if any(dim in col_lower for dim in ['date', 'period', 'age', 'geography', 'icb', 'provider']):
                             if col not in result_cols:
@@ -687,13 +789,9 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                                 break
 
                     # Return results
-                    result_data = filtered_df[result_cols].head(limit)
-                    rows = []
-                    for _, row in result_data.iterrows():
-                        row_dict = {}
-                        for col, val in row.items():
-                            row_dict[col] = make_json_safe(val)
-                        rows.append(row_dict)
+                    select = ', '.join(f'"{col}"' for col in result_cols)
+                    rows = run_query(engine, f"SELECT {select} FROM data{where}", params,
+                                     max_rows=min(int(limit), MAX_ROWS))['rows']
 
                     result = {
                         "dataset": dataset,
@@ -704,15 +802,14 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                         "invalid_filters": invalid_filters,
                         "rows": rows,
                         "row_count": len(rows),
-                        "total_after_filter": len(filtered_df),
-                        "truncated": len(filtered_df) > limit
+                        "total_after_filter": total_after_filter,
+                        "truncated": total_after_filter > len(rows)
                     }
 
         else:
             raise ValueError(f"Unknown tool: {name}")
 
         # Format result as JSON text
-        import json
         return [TextContent(
             type="text",
             text=json.dumps(result, indent=2)
@@ -729,7 +826,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 async def main():
     """Main entry point for stdio server."""
     logger.info("DataWarp MCP stdio server starting...")
-    logger.info("Backend: PostgreSQL + DuckDB hybrid")
+    logger.info(f"Backend: PostgreSQL catalog, queries on {QUERY_ENGINE} (Parquet: {PARQUET_DIR})")
 
     # Check PostgreSQL connection
     try:
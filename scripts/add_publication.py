@@ -96,11 +96,11 @@ def classify_url(url: str) -> dict:
     redirects_to_england = False
     if source == 'nhs_digital' and is_landing_page:
         try:
-            import requests
             from bs4 import BeautifulSoup
+            from datawarp.utils import http
             
             # Fetch the landing page
-            response = requests.get(url, timeout=10)
+            response = http.get(url, timeout=10)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
                 
@@ -122,7 +122,7 @@ def classify_url(url: str) -> dict:
                         subpage_url = subpage_links[0].get('href')
                         if subpage_url and subpage_url.startswith('http'):
                             try:
-                                subpage_response = requests.get(subpage_url, timeout=10)
+                                subpage_response = http.get(subpage_url, timeout=10)
                                 if subpage_response.status_code == 200:
                                     subpage_soup = BeautifulSoup(subpage_response.content, 'html.parser')
                                     subpage_england_links = subpage_soup.find_all('a', href=re.compile(r'england\.nhs\.uk'))
@@ -212,11 +212,11 @@ def detect_nhs_digital_periods(landing_page: str) -> tuple:
         (periods_list, frequency, earliest_period, latest_period)
     """
     try:
-        import requests
         from bs4 import BeautifulSoup
         from collections import Counter
+        from datawarp.utils import http
 
-        response = requests.get(landing_page, timeout=10)
+        response = http.get(landing_page, timeout=10)
         if response.status_code != 200:
             return ([], 'monthly', None, None)
 
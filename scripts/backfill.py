@@ -30,11 +30,13 @@ warnings.filterwarnings('ignore', category=FutureWarning)
 warnings.filterwarnings('ignore', message='.*pandas only supports SQLAlchemy.*')
 
 from datawarp.pipeline import generate_manifest, enrich_manifest, export_publication_to_parquet
-from datawarp.pipeline.canonicalize import canonicalize_manifest
+from datawarp.pipeline.canonicalize import canonicalize_manifest, match_registry_sources
 from datawarp.loader.batch import load_from_manifest
 from datawarp.supervisor.events import EventStore, EventType, EventLevel, create_event
 from datawarp.cli.display import ProgressDisplay, PeriodResult, SourceResult
-from datawarp.utils.url_resolver import resolve_urls, get_all_periods
+from datawarp.utils.url_resolver import resolve_all_urls, get_all_periods
+from datawarp.utils.download import get_download_stats, reset_download_stats, format_download_stats
+from datawarp.utils.http import get_http_stats, format_http_stats
 
 
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -233,6 +235,44 @@ def extract_period_from_manifest(path: Path) -> str:
     return "0000-00"  # Fallback for sorting
 
 
+# Reference candidates per publication: scanned once per run, then extended as
+# each period writes its enriched/canonical manifest (see register_reference_manifest)
+_reference_candidates: dict = {}
+
+
+def _reference_groups(pub_code: str) -> list:
+    """(directory, glob) groups in precedence order for equal periods."""
+    production_dir = PROJECT_ROOT / "manifests" / "production" / pub_code
+    backfill_dir = MANIFESTS_DIR / pub_code
+    return [(directory, pattern)
+            for directory in [production_dir, backfill_dir]
+            for pattern in [f"{pub_code}_*_enriched.yaml", f"{pub_code}_*_canonical.yaml"]]
+
+
+def _scan_reference_candidates(pub_code: str) -> list:
+    """All enriched/canonical manifests for a publication as (period, group rank, path)."""
+    if pub_code not in _reference_candidates:
+        candidates = []
+        for rank, (directory, pattern) in enumerate(_reference_groups(pub_code)):
+            if directory.exists():
+                candidates.extend((extract_period_from_manifest(m), rank, m) for m in directory.glob(pattern))
+        _reference_candidates[pub_code] = candidates
+    return _reference_candidates[pub_code]
+
+
+def register_reference_manifest(pub_code: str, path: Path) -> None:
+    """Make a manifest written during this run visible to find_reference_manifest."""
+    if pub_code not in _reference_candidates:
+        return  # Not scanned yet - the first scan will pick it up
+    path = Path(path)
+    for rank, (directory, pattern) in enumerate(_reference_groups(pub_code)):
+        if path.parent == directory and path.match(pattern):
+            entry = (extract_period_from_manifest(path), rank, path)
+            if entry not in _reference_candidates[pub_code]:
+                _reference_candidates[pub_code].append(entry)
+            return
+
+
 def find_reference_manifest(pub_code: str, period: str, manual_reference: str = None) -> str:
     """Find the best reference manifest for a period using ROLLING REFERENCE logic.
 
@@ -272,16 +312,7 @@ def find_reference_manifest(pub_code: str, period: str, manual_reference: str =
 
     # Priority 2: Find latest enriched manifest by PERIOD (not modification time)
     # This implements the "rolling reference" - each period inherits from previous
-    production_dir = PROJECT_ROOT / "manifests" / "production" / pub_code
-    backfill_dir = MANIFESTS_DIR / pub_code
-
-    enriched_manifests = []
-
-    # Collect all enriched and canonical manifests
-    for directory in [production_dir, backfill_dir]:
-        if directory.exists():
-            enriched_manifests.extend(directory.glob(f"{pub_code}_*_enriched.yaml"))
-            enriched_manifests.extend(directory.glob(f"{pub_code}_*_canonical.yaml"))
+    enriched_manifests = _scan_reference_candidates(pub_code)
 
     if not enriched_manifests:
         # First ever run - no reference available
@@ -289,18 +320,16 @@ def find_reference_manifest(pub_code: str, period: str, manual_reference: str =
 
     # Filter: Only use manifests from periods BEFORE the current one
     # (can't reference future or current period)
-    current_manifests = [
-        m for m in enriched_manifests
-        if extract_period_from_manifest(m) < period
-    ]
+    current_manifests = [m for m in enriched_manifests if m[0] < period]
 
     if not current_manifests:
         # No prior periods available (this is the first period)
         return None
 
-    # Sort by period and return the most recent (latest period, not file mtime)
-    latest = max(current_manifests, key=extract_period_from_manifest)
-    return str(latest)
+    # Sort by period and return the most recent (latest period, not file mtime);
+    # for equal periods production beats backfill, enriched beats canonical
+    latest = max(current_manifests, key=lambda m: (m[0], -m[1]))
+    return str(latest[2])
 
 
 def process_period(
@@ -445,6 +474,8 @@ def process_period(
             ))
             return False, {}
 
+        register_reference_manifest(pub_code, enriched_manifest)
+
         event_store.emit(create_event(
             EventType.STAGE_COMPLETED,
             event_store.run_id,
@@ -471,11 +502,42 @@ def process_period(
             # Apply canonicalization
             canonical_manifest_data = canonicalize_manifest(manifest_data)
 
+            # Register sources and report likely renames (LSH lookup); the manifest is not changed
+            try:
+                from datawarp.storage.connection import get_connection
+                with get_connection() as conn:
+                    matches = match_registry_sources(canonical_manifest_data, conn, pub_code, period)
+                for original_code, (canonical_code, confidence) in matches.items():
+                    event_store.emit(create_event(
+                        EventType.INFO,
+                        event_store.run_id,
+                        message=f"New source {original_code} resembles {canonical_code} ({confidence:.0%}); "
+                                f"recorded in tbl_source_mappings for review",
+                        publication=pub_code,
+                        period=period,
+                        stage="canonicalize",
+                        context={'original_code': original_code, 'canonical_code': canonical_code,
+                                 'confidence': confidence}
+                    ))
+            except Exception as e:
+                event_store.emit(create_event(
+                    EventType.WARNING,
+                    event_store.run_id,
+                    message=f"Fingerprint registry matching failed (non-fatal): {str(e)}",
+                    publication=pub_code,
+                    period=period,
+                    stage="canonicalize",
+                    level=EventLevel.WARNING,
+                    error=str(e)
+                ))
+
             # Save canonical manifest
             canonical_manifest = manifest_dir / f"{pub_code}_{period}_canonical.yaml"
             with open(canonical_manifest, 'w') as f:
                 yaml.dump(canonical_manifest_data, f, sort_keys=False)
 
+            register_reference_manifest(pub_code, canonical_manifest)
+
             # Update enriched_manifest path to use canonical version
             enriched_manifest = canonical_manifest
 
@@ -935,6 +997,7 @@ Examples:
     use_quiet = args.quiet or (display is not None)
     with EventStore(run_id, LOGS_DIR, quiet=use_quiet) as event_store:
 
+        reset_download_stats()
         event_store.emit(create_event(
             EventType.RUN_STARTED,
             run_id,
@@ -962,25 +1025,31 @@ Examples:
         total_columns = 0
         processed_details = []  # Track what was processed
 
-        for pub_code, pub_config in config.get("publications", {}).items():
-            # Filter by publication if specified
-            if args.pub and pub_code != args.pub:
-                continue
-
-            # Use url_resolver to iterate over periods (works with both template and explicit modes)
-            # Pass period filter to avoid unnecessary discovery
-            try:
-                url_pairs = list(resolve_urls(pub_config, period_filter=args.period))
-            except NotImplementedError as e:
+        # Resolve period/URL pairs for all selected publications in one concurrent sweep
+        # (discover-mode landing pages are fetched in parallel; period filter avoids unnecessary discovery)
+        selected_pubs = {
+            pub_code: pub_config
+            for pub_code, pub_config in config.get("publications", {}).items()
+            if not args.pub or pub_code == args.pub
+        }
+        resolved_urls, resolve_errors = resolve_all_urls(selected_pubs, period_filter=args.period)
+
+        for pub_code, pub_config in selected_pubs.items():
+            error = resolve_errors.get(pub_code)
+            if error is not None:
+                if not isinstance(error, NotImplementedError):
+                    raise error
                 event_store.emit(create_event(
                     EventType.WARNING,
                     run_id,
-                    message=f"Skipping {pub_code} - {str(e)}",
+                    message=f"Skipping {pub_code} - {str(error)}",
                     publication=pub_code,
                     level=EventLevel.WARNING
                 ))
                 continue
 
+            url_pairs = resolved_urls[pub_code]
+
             if not url_pairs:
                 continue
 
@@ -1055,19 +1124,23 @@ Examples:
                 # Note: No state.json tracking - database IS the state
 
         # Summary
+        download_stats = get_download_stats()
+        http_stats = get_http_stats()
         event_store.emit(create_event(
             EventType.RUN_COMPLETED,
             run_id,
             message=f"Backfill completed: {processed} processed, {skipped} skipped, {failed} failed",
             processed=processed,
             skipped=skipped,
-            failed=failed
+            failed=failed,
+            download_stats=download_stats,
+            http_stats=http_stats
         ))
 
         # Print comprehensive summary using balanced display
         if display:
             # Periods were already added during processing
-            display.print_summary()
+            display.print_summary(download_stats=download_stats, http_stats=http_stats)
         else:
             # Fallback to old summary for multi-pub runs
             print("\n" + "=" * 80)
@@ -1080,6 +1153,10 @@ Examples:
             print(f"{'Total Sources:':<20} {total_sources} tables loaded")
             print(f"{'Total Rows:':<20} {total_rows:,}")
             print(f"{'Total Columns:':<20} {total_columns} new columns added")
+            if download_stats['requests']:
+                print(f"{'Downloads:':<20} {format_download_stats(download_stats)}")
+            if http_stats:
+                print(f"{'Network:':<20} {format_http_stats(http_stats)}")
 
             if processed_details:
                 print()
@@ -9,7 +9,6 @@ warnings.filterwarnings('ignore')
 
 from urllib.parse import urljoin, urlparse
 import google.generativeai as genai
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 load_dotenv()
@@ -24,7 +23,7 @@ SKIP_SOURCES = ['IPS', 'MH Core Data Pack', 'Operational Planning', 'Oversight F
 def fetch_page(url):
     """Fetch page and return soup + basic info."""
     try:
-        resp = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+        resp = http.get(url, timeout=30)
         soup = BeautifulSoup(resp.content, 'html.parser')
         h1 = soup.find('h1')
         title = h1.get_text(strip=True) if h1 else soup.find('title').get_text(strip=True) if soup.find('title') else ''
@@ -58,6 +57,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from datawarp.utils.period import parse_period
+from datawarp.utils import http
 
 def analyze_page_structure(url):
     """
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark indexed vs linear fuzzy column matching for reference enrichment.
+
+Builds wide synthetic sheets (NHS-style column names, with a share renamed
+between periods) and times match_columns_to_reference with and without the
+ColumnNameIndex. Also checks that both give identical matches.
+
+Usage:
+    python scripts/benchmark_column_matching.py
+    python scripts/benchmark_column_matching.py --columns 100 300 600 --sources 20 --renamed 0.3
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datawarp.pipeline.enricher import match_columns_to_reference
+
+WORDS = ['total', 'patients', 'referrals', 'waiting', 'weeks', 'age', 'group', 'count', 'rate',
+         'icb', 'sub', 'org', 'code', 'name', 'region', 'male', 'female', 'under', 'over', 'fte',
+         'appointments', 'attended', 'booked', 'gp', 'practice', 'median', 'percent', 'month']
+
+
+def make_sheet(rng: random.Random, n_columns: int, renamed: float, added: float):
+    """Return (draft_columns, ref_columns) for one source."""
+    ref = []
+    seen = set()
+    while len(ref) < n_columns:
+        name = '_'.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f"_{rng.randint(0, 99)}"
+        if name not in seen:
+            seen.add(name)
+            ref.append({'name': name, 'description': f"Reference {name}"})
+
+    draft = []
+    for col in ref:
+        name = col['name']
+        if rng.random() < renamed:
+            i = rng.randrange(len(name))
+            name = name[:i] + rng.choice('abcdefgh') + name[i + 1:]
+        draft.append(name.upper().replace('_', ' '))
+    draft += [f"New Measure {i}" for i in range(int(n_columns * added))]
+    rng.shuffle(draft)
+    return draft, ref
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fuzzy column matching')
+    parser.add_argument('--columns', type=int, nargs='+', default=[50, 200, 500])
+    parser.add_argument('--sources', type=int, default=10, help='Sources (sheets) per run')
+    parser.add_argument('--renamed', type=float, default=0.3, help='Share of columns renamed between periods')
+    parser.add_argument('--added', type=float, default=0.1, help='New columns as a share of width')
+    parser.add_argument('--threshold', type=float, default=0.8)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'COLUMNS':>8} {'SOURCES':>8} {'LINEAR':>10} {'INDEXED':>10} {'SPEEDUP':>8}  MATCHES")
+    for n_columns in args.columns:
+        rng = random.Random(args.seed)
+        sheets = [make_sheet(rng, n_columns, args.renamed, args.added) for _ in range(args.sources)]
+
+        timings, results = {}, {}
+        for use_index in (False, True):
+            start = time.perf_counter()
+            results[use_index] = [match_columns_to_reference(draft, ref, args.threshold, use_index=use_index)
+                                  for draft, ref in sheets]
+            timings[use_index] = time.perf_counter() - start
+
+        same = results[True] == results[False]
+        n_matched = sum(len(matched) for matched, _ in results[True])
+        print(f"{n_columns:>8} {args.sources:>8} {timings[False]:>9.2f}s {timings[True]:>9.2f}s "
+              f"{timings[False] / max(timings[True], 1e-9):>7.1f}x  {n_matched} "
+              f"{'(identical)' if same else '(MISMATCH)'}")
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
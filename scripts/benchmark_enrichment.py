@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Offline enrichment benchmark against the stub LLM server.
+
+Runs enrich_manifest against scripts/stub_llm.py (deterministic latency
+and failure injection) and reports wall time, prompt sizes and parse-failure
+recovery for each concurrency / batch-size setting.
+
+Usage:
+    python scripts/benchmark_enrichment.py manifests/draft/adhd/adhd_2025-11.yaml
+    python scripts/benchmark_enrichment.py --synthetic 40 --latency-ms 1500 --fail-rate 0.1
+    python scripts/benchmark_enrichment.py --synthetic 40 --concurrency 1 4 8 --batch-tokens 4000 12000
+    python scripts/benchmark_enrichment.py draft.yaml --recordings logs/llm_recordings.jsonl
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import yaml
+
+# Add src and scripts to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from datawarp.pipeline import enricher
+from stub_llm import StubLLMServer, FAIL_MODES
+
+
+def synthetic_manifest(n_sources: int, n_columns: int) -> dict:
+    """Draft manifest with n_sources single-sheet sources."""
+    return {
+        'manifest': {'name': 'benchmark', 'source_url': 'https://example.org/benchmark'},
+        'sources': [{
+            'code': f'table_{i}',
+            'name': f'Table {i}',
+            'files': [{
+                'url': f'https://example.org/benchmark/file_{i // 5}.xlsx',
+                'sheet': f'Table {i}',
+                'preview': {'columns': ['Org Code', 'Org Name'] + [f'Measure {i}.{c}' for c in range(n_columns)]}
+            }]
+        } for i in range(n_sources)]
+    }
+
+
+def run_once(manifest_path: Path, work_dir: Path, args, concurrency: int, batch_tokens: int) -> dict:
+    server = StubLLMServer(
+        recordings=args.recordings,
+        latency_ms=args.latency_ms,
+        latency_per_1k_tokens_ms=args.latency_per_1k_tokens_ms,
+        fail_rate=args.fail_rate,
+        fail_mode=args.fail_mode,
+        fail_attempts=args.fail_attempts
+    )
+    os.environ.update({
+        'DATAWARP_LLM_ENDPOINT': server.url,
+        'DATAWARP_LLM_CACHE': '0',  # Every run must reach the model
+        'DATAWARP_LLM_CONCURRENCY': str(concurrency),
+        'DATAWARP_LLM_BATCH_TOKENS': str(batch_tokens),
+        'DATAWARP_LLM_RPM': str(args.rpm)
+    })
+    output_path = work_dir / f'enriched_c{concurrency}_b{batch_tokens}.yaml'
+
+    with server:
+        start = time.time()
+        result = enricher.enrich_manifest(str(manifest_path), str(output_path))
+        wall_s = time.time() - start
+
+    disabled = 0
+    if result.success:
+        with open(output_path) as f:
+            enriched = yaml.safe_load(f)
+        disabled = sum(1 for s in enriched['sources'] if s.get('enabled') is False)
+
+    sizes = sorted(server.stats['prompt_chars']) or [0]
+    return {
+        'concurrency': concurrency,
+        'batch_tokens': batch_tokens,
+        'success': result.success,
+        'error': result.error,
+        'wall_s': wall_s,
+        'requests': server.stats['requests'],
+        'max_in_flight': server.stats['concurrent_max'],
+        'prompt_median': sizes[len(sizes) // 2],
+        'prompt_max': sizes[-1],
+        'prompt_total': sum(sizes),
+        'failures_injected': server.stats['failures_injected'],
+        'disabled': disabled
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark manifest enrichment against a stub LLM')
+    parser.add_argument('manifest', nargs='?', help='Draft manifest YAML (default: synthetic)')
+    parser.add_argument('--synthetic', type=int, default=20, help='Synthetic source count (no manifest given)')
+    parser.add_argument('--columns', type=int, default=12, help='Columns per synthetic source')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--batch-tokens', type=int, nargs='+', default=[enricher.DEFAULT_BATCH_TOKENS])
+    parser.add_argument('--rpm', type=float, default=0, help='Rate limit (0 = unlimited)')
+    parser.add_argument('--recordings', type=Path, help='Replay JSONL from DATAWARP_LLM_RECORD_FILE')
+    parser.add_argument('--latency-ms', type=float, default=500)
+    parser.add_argument('--latency-per-1k-tokens-ms', type=float, default=50)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--fail-mode', choices=FAIL_MODES, default='bad_yaml')
+    parser.add_argument('--fail-attempts', type=int, default=1, help='-1 = failing prompts never recover')
+    parser.add_argument('--log-db', action='store_true', help='Keep enrichment run/API-call logging to the database')
+    args = parser.parse_args()
+
+    if not args.log_db:
+        # Benchmark runs shouldn't pollute (or wait on) tbl_enrichment_runs / tbl_enrichment_api_calls
+        enricher._log_enrichment_start = lambda **kw: None
+        enricher._log_enrichment_complete = lambda **kw: None
+        enricher._log_api_call = lambda **kw: 0.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        if args.manifest:
+            manifest_path = Path(args.manifest)
+        else:
+            manifest_path = work_dir / 'synthetic.yaml'
+            with open(manifest_path, 'w') as f:
+                yaml.safe_dump(synthetic_manifest(args.synthetic, args.columns), f)
+
+        print(f"Manifest: {manifest_path if args.manifest else f'synthetic ({args.synthetic} sources)'}")
+        print(f"Stub: latency {args.latency_ms:.0f}ms + {args.latency_per_1k_tokens_ms:.0f}ms/1k tokens, "
+              f"fail rate {args.fail_rate:.0%} ({args.fail_mode}, {args.fail_attempts} attempts)\n")
+        print(f"{'CONC':>4} {'BATCH':>7} {'WALL':>8} {'REQS':>5} {'INFL':>5} {'PROMPT MED':>11} "
+              f"{'PROMPT MAX':>11} {'FAILS':>6} {'DISABLED':>9}  STATUS")
+
+        for batch_tokens in args.batch_tokens:
+            for concurrency in args.concurrency:
+                r = run_once(manifest_path, work_dir, args, concurrency, batch_tokens)
+                status = 'ok' if r['success'] else f"FAILED: {r['error']}"
+                print(f"{r['concurrency']:>4} {r['batch_tokens']:>7} {r['wall_s']:>7.2f}s {r['requests']:>5} "
+                      f"{r['max_in_flight']:>5} {r['prompt_median']:>11,} {r['prompt_max']:>11,} "
+                      f"{r['failures_injected']:>6} {r['disabled']:>9}  {status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,6 @@ warnings.filterwarnings('ignore')
 
 from urllib.parse import urljoin, urlparse
 import google.generativeai as genai
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 load_dotenv()
@@ -21,7 +20,7 @@ MSHORT = ['jan','feb','mar','apr','may','jun','jul','aug','sep','oct','nov','dec
 def fetch_page(url, timeout=30):
     """Fetch page and return soup."""
     try:
-        resp = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=timeout)
+        resp = http.get(url, timeout=timeout)
         return BeautifulSoup(resp.content, 'html.parser')
     except Exception as e:
         print(f"      ❌ Failed: {e}")
@@ -90,6 +89,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from datawarp.utils.period import parse_period
+from datawarp.utils import http
 
 def llm_analyze_page(url, title, sub_pages, files):
     """Use LLM to understand page structure and recommend what to explore."""
@@ -192,6 +192,35 @@ def deep_explore(url, max_depth=4, visited=None):
 
     return results
 
+def probe_latest_files(results):
+    """Print sheet headers of the latest Excel/CSV file in each category (header probe, no full load)."""
+    from datawarp.utils.download import download_file
+    from datawarp.core.extractor import probe_workbook
+    import pandas as pd
+
+    latest = {}
+    for r in results:
+        if r['url'].lower().endswith(('.xlsx', '.xlsm', '.csv')):
+            cat = r.get('category', 'default')
+            if cat not in latest or r['sort'] > latest[cat]['sort']:
+                latest[cat] = r
+
+    for cat, r in latest.items():
+        print(f"\n   🔬 {cat}: {r['url'].split('/')[-1]} ({r['period']})")
+        try:
+            path = download_file(r['url'])
+            if r['url'].lower().endswith('.csv'):
+                print(f"      {', '.join(pd.read_csv(path, nrows=0).columns[:8])}")
+                continue
+            for sheet, probe in probe_workbook(path).items():
+                if probe.is_valid:
+                    cols = probe.columns
+                    print(f"      {sheet[:30]:<30} row {probe.data_start_row:<3} {', '.join(cols[:6])}{'...' if len(cols) > 6 else ''}")
+                else:
+                    print(f"      {sheet[:30]:<30} ({probe.structure.sheet_type.name.lower()})")
+        except Exception as e:
+            print(f"      ❌ Probe failed: {e}")
+
 def generate_yaml(code, name, url, results):
     """Generate YAML config for this source."""
     # Deduplicate by period, keeping first occurrence
@@ -221,14 +250,17 @@ def generate_yaml(code, name, url, results):
     return yaml, len(periods)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/deep_explore_source.py <url> [code]")
+    probe = '--probe' in sys.argv  # Show sheet headers of the latest file per category
+    args = [a for a in sys.argv[1:] if a != '--probe']
+
+    if not args:
+        print("Usage: python scripts/deep_explore_source.py <url> [code] [--probe]")
         print("\nExample:")
         print("  python scripts/deep_explore_source.py https://www.england.nhs.uk/.../bed-availability-and-occupancy/")
         sys.exit(1)
 
-    url = sys.argv[1].rstrip('/')
-    code = sys.argv[2] if len(sys.argv) > 2 else None
+    url = args[0].rstrip('/')
+    code = args[1] if len(args) > 1 else None
 
     print(f"\n🔍 Deep exploring: {url}\n")
 
@@ -254,6 +286,9 @@ def main():
         periods = sorted(set(r['period'] for r in items))
         print(f"   Periods: {periods[:5]}{'...' if len(periods) > 5 else ''}")
 
+    if probe:
+        probe_latest_files(results)
+
     # Generate YAML
     if not code:
         code = re.sub(r'[^a-z0-9]+', '_', url.split('/')[-1])[:20] or 'source'
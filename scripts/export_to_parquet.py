@@ -7,15 +7,19 @@ Usage:
     python export_to_parquet.py SOURCE_CODE output/
     python export_to_parquet.py --publication adhd output/
     python export_to_parquet.py --all output/
+    python export_to_parquet.py --publication adhd --incremental output/
+    python export_to_parquet.py --publication adhd --layout hive output/
+    python export_to_parquet.py --publication adhd --profile query --bloom-filter org_code output/
 """
 import sys
+import time
 import argparse
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from datawarp.pipeline import export_source_to_parquet, export_publication_to_parquet
+from datawarp.pipeline import export_sources_to_parquet, export_publication_to_parquet
 from datawarp.storage.connection import get_connection
 
 
@@ -29,6 +33,21 @@ def main():
     parser.add_argument('--all', action='store_true',
                         help='Export all sources')
     parser.add_argument('--publication', help='Export all sources from a publication (e.g., adhd)')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='Write output/{code}/ and rewrite only periods loaded since the last export '
+                             '(default: DATAWARP_EXPORT_INCREMENTAL)')
+    parser.add_argument('--layout', choices=['file', 'hive'],
+                        help='file: {code}.parquet; hive: {code}/_period=YYYY-MM/part-*.parquet '
+                             '(default: DATAWARP_EXPORT_LAYOUT or file)')
+    parser.add_argument('--workers', type=int,
+                        help='Sources exported in parallel (default: DATAWARP_EXPORT_WORKERS, '
+                             'capped by DB connections and memory)')
+    parser.add_argument('--profile', choices=['default', 'query'],
+                        help='query: sort by period and dimensions, fixed-size row groups, page index and '
+                             'dimension-only dictionaries (default: DATAWARP_EXPORT_PROFILE or default)')
+    parser.add_argument('--bloom-filter', action='append', metavar='COLUMN',
+                        help='Write a bloom filter for this column with --profile query (repeatable; '
+                             'default: DATAWARP_EXPORT_BLOOM_FILTERS)')
 
     args = parser.parse_args()
 
@@ -38,6 +57,7 @@ def main():
 
     # Determine which sources to export
     sources_to_export = []
+    start_time = time.time()
 
     if args.all:
         # Export all sources
@@ -54,7 +74,12 @@ def main():
             publication=args.publication,
             output_dir=args.output_dir,
             event_store=None,  # CLI doesn't use EventStore
-            period=None
+            period=None,
+            incremental=args.incremental,
+            layout=args.layout,
+            max_workers=args.workers,
+            profile=args.profile,
+            bloom_filters=args.bloom_filter
         )
 
         successful = [r for r in results if r.success]
@@ -70,6 +95,7 @@ def main():
 
         print(f"Total rows: {total_rows:,}")
         print(f"Total size: {total_size:.2f} MB")
+        print(f"Wall time: {time.time() - start_time:.1f}s")
         print(f"Output directory: {Path(args.output_dir).absolute()}")
 
         sys.exit(0 if not failed else 1)
@@ -77,20 +103,23 @@ def main():
     else:
         sources_to_export = [args.source]
 
-    # Export each source individually
-    results = []
-    for source_code in sources_to_export:
-        result = export_source_to_parquet(
-            canonical_code=source_code,
-            output_dir=args.output_dir,
-            event_store=None,  # CLI doesn't use EventStore
-            publication=None,
-            period=None
-        )
-        results.append(result)
-
+    # Export sources (in parallel up to --workers)
+    results = export_sources_to_parquet(
+        sources_to_export,
+        output_dir=args.output_dir,
+        event_store=None,  # CLI doesn't use EventStore
+        publication=None,
+        period=None,
+        incremental=args.incremental,
+        layout=args.layout,
+        max_workers=args.workers,
+        profile=args.profile,
+        bloom_filters=args.bloom_filter
+    )
+    for source_code, result in zip(sources_to_export, results):
         if result.success:
-            print(f"  {source_code}: {result.row_count:,} rows, {result.parquet_size_mb:.2f} MB")
+            written = f" ({result.rows_written:,} rewritten)" if result.periods_written is not None else ""
+            print(f"  {source_code}: {result.row_count:,} rows{written}, {result.parquet_size_mb:.2f} MB")
         else:
             print(f"  {source_code}: FAILED - {result.error}", file=sys.stderr)
 
@@ -108,6 +137,7 @@ def main():
 
     print(f"Total rows: {total_rows:,}")
     print(f"Total size: {total_size:.2f} MB")
+    print(f"Wall time: {time.time() - start_time:.1f}s")
     print(f"Output directory: {Path(args.output_dir).absolute()}")
 
     sys.exit(0 if not failed else 1)
@@ -6,17 +6,18 @@ warnings.filterwarnings('ignore')
 
 from urllib.parse import urljoin, urlparse
 import google.generativeai as genai
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 load_dotenv()
 
+from datawarp.utils import http
+
 MONTHS = {'january':1,'february':2,'march':3,'april':4,'may':5,'june':6,
           'july':7,'august':8,'september':9,'october':10,'november':11,'december':12}
 MSHORT = ['jan','feb','mar','apr','may','jun','jul','aug','sep','oct','nov','dec']
 
 def fetch(url):
-    soup = BeautifulSoup(requests.get(url, headers={'User-Agent':'Mozilla/5.0'}, timeout=30).content, 'html.parser')
+    soup = BeautifulSoup(http.get(url, timeout=30).content, 'html.parser')
     h1, title = soup.find('h1'), soup.find('title')
     base = urlparse(url).path.rstrip('/')
     files, pages = [], []
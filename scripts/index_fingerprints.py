@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Backfill MinHash signatures and LSH buckets for the canonical source registry.
+
+New registrations get their signature when backfill canonicalizes a
+manifest (match_registry_sources). Rows registered before
+09_fingerprint_lsh.sql have NULL buckets and are invisible to
+fingerprint matching until this has run.
+
+Usage:
+    python scripts/index_fingerprints.py              # Index rows without a signature
+    python scripts/index_fingerprints.py --match adhd_referrals_by_age
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datawarp.registry.fingerprint import index_registry_fingerprints, find_registry_match, fingerprint_from_json
+from datawarp.storage import repository
+from datawarp.storage.connection import get_connection
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index canonical source fingerprints for LSH matching')
+    parser.add_argument('--match', metavar='CODE',
+                        help='After indexing, show the best registry match for this canonical source')
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        indexed = index_registry_fingerprints(conn)
+        print(f"Indexed {indexed} canonical source fingerprints")
+
+        if args.match:
+            row = repository.get_canonical_source(args.match, conn)
+            if not row:
+                print(f"Canonical source '{args.match}' not found", file=sys.stderr)
+                sys.exit(1)
+            code, confidence = find_registry_match(fingerprint_from_json(row['fingerprint']), conn,
+                                                   publication_id=row['publication_id'])
+            print(f"{args.match} → {code or 'no match'} ({confidence:.0%})")
+
+
+if __name__ == '__main__':
+    main()
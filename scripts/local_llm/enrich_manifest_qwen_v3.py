@@ -21,9 +21,11 @@ Usage:
     python scripts/local_llm/enrich_manifest_qwen_v3.py input.yaml output.yaml
     
 Recommended: Use Q4_K_M quantization with Ollama for best performance
+Set OLLAMA_URL to target another server (e.g. scripts/stub_llm.py)
 """
 
 import json
+import os
 import requests
 import yaml
 import sys
@@ -161,7 +163,7 @@ def call_ollama(prompt, model="qwen3-vl:8b", step_name="unknown"):
     # Make API call
     print(f"⏳ Waiting for Qwen response...")
     response = requests.post(
-        'http://localhost:11434/api/generate',
+        f"{os.getenv('OLLAMA_URL', 'http://localhost:11434').rstrip('/')}/api/generate",
         json=request_payload,
         timeout=600
     )
@@ -1,58 +1,178 @@
 #!/usr/bin/env python3
 """Rebuild catalog.parquet from all individual parquet files in output/.
 
-This scans the output directory, reads metadata from each parquet file,
-and builds a master catalog.parquet index for the MCP server.
+This scans the output directory (each parquet file, or output/{code}/
+directory from incremental export) and builds a master catalog.parquet
+index for the MCP server.
+
+Row counts come from the Parquet footers, and so does the date range when
+the date column is date/timestamp typed or holds ISO strings (_period);
+other date columns (DD/MM/YYYY, free text) are read and parsed. Entries
+whose files have not changed since the last rebuild (same mtime and size)
+are carried over from the existing catalog, so a rebuild over hundreds of
+datasets takes seconds.
+
+Usage:
+    python scripts/rebuild_catalog.py [output_dir] [--full]
 """
-import pandas as pd
-from pathlib import Path
+import argparse
+import os
+import re
 import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datawarp.pipeline.exporter import EXPORT_STATE_FILE, dataset_files
+
+
+def _date_column(schema: pa.Schema):
+    """Column the catalog takes its date range from.
+
+    Same candidates as before (name contains 'date' or 'period'), preferring
+    a date/timestamp column, whose statistics order like dates; a string
+    column's min/max is lexicographic.
+    """
+    candidates = [f for f in schema if 'date' in f.name.lower() or 'period' in f.name.lower()]
+    typed = [f for f in candidates if pa.types.is_date(f.type) or pa.types.is_timestamp(f.type)]
+    return (typed or candidates or [None])[0]
+
+
+# ISO year-month or date ('2025-10', '2025-10-01'): orders lexicographically like dates
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}(-\d{2})?$')
+
+
+def _parse_dates(values):
+    values = pd.Series(values, dtype=object)
+    if values.map(lambda v: isinstance(v, str) and bool(_ISO_DATE.match(v))).all():
+        dates = pd.to_datetime(values, errors='coerce', format='ISO8601')
+    else:
+        # Dates/timestamps, or text: NHS files write dates day-first
+        dates = pd.to_datetime(values, errors='coerce', dayfirst=True)
+    dates = dates.dropna()
+    return (dates.min(), dates.max()) if len(dates) else (None, None)
+
+
+def _column_range(parquet: pq.ParquetFile, field: pa.Field):
+    """(min, max) dates of a column, from row group statistics where they order like dates.
 
-def rebuild_catalog(output_dir="output"):
-    """Rebuild catalog from all parquet files in directory."""
+    Statistics are used for date/timestamp columns, and for string columns
+    whose min and max are both ISO dates (then every value in between sorts
+    like a date too). Anything else - DD/MM/YYYY, 'Unknown', row groups
+    without statistics - is read and parsed, dropping values that don't
+    parse.
+    """
+    typed = pa.types.is_date(field.type) or pa.types.is_timestamp(field.type)
+    index = parquet.schema_arrow.get_field_index(field.name)
+    values = []
+    for i in range(parquet.metadata.num_row_groups):
+        group = parquet.metadata.row_group(i)
+        if not group.num_rows:
+            continue
+        stats = group.column(index).statistics
+        if stats is not None and stats.has_min_max and (
+                typed or all(isinstance(v, str) and _ISO_DATE.match(v) for v in (stats.min, stats.max))):
+            values += [stats.min, stats.max]
+        elif stats is None or stats.null_count != group.num_rows:
+            values += parquet.read_row_group(i, columns=[field.name]).column(0).drop_null().to_pylist()
+    return _parse_dates(values)
+
+
+def _signature(dataset: Path):
+    """(latest mtime, total bytes) over a dataset's files and export state."""
+    files = dataset_files(dataset)
+    if dataset.is_dir() and (dataset / EXPORT_STATE_FILE).exists():
+        files.append(dataset / EXPORT_STATE_FILE)
+    stats = [p.stat() for p in files]
+    return max((s.st_mtime for s in stats), default=0.0), sum(s.st_size for s in stats)
+
+
+def catalog_entry(dataset: Path, output_path: Path) -> dict:
+    """Catalog row for one dataset, built from Parquet footers only."""
+    files = dataset_files(dataset)
+    source_code = dataset.stem
+    md_path = output_path / f"{source_code}.md"
+
+    row_count = 0
+    schema = None
+    min_date = max_date = None
+    for path in files:
+        parquet = pq.ParquetFile(path)
+        row_count += parquet.metadata.num_rows
+        schema = schema or parquet.schema_arrow
+        column = _date_column(parquet.schema_arrow)
+        if column is None:
+            continue
+        low, high = _column_range(parquet, column)
+        if low is not None:
+            min_date = low if min_date is None else min(min_date, low)
+            max_date = high if max_date is None else max(max_date, high)
+
+    mtime, size = _signature(dataset)
+    return {
+        'source_code': source_code,
+        'domain': 'nhs',  # Could be extracted from manifest
+        'description': f'DataWarp source: {source_code}',
+        'row_count': row_count,
+        'column_count': len(schema) if schema is not None else 0,
+        'file_size_kb': round(sum(p.stat().st_size for p in files) / 1024, 2),
+        'min_date': min_date,
+        'max_date': max_date,
+        'file_path': str(dataset),
+        'md_path': str(md_path) if md_path.exists() else None,
+        'file_mtime': mtime,
+        'file_bytes': size
+    }
+
+
+def _previous_entries(catalog_path: Path) -> dict:
+    if not catalog_path.exists():
+        return {}
+    try:
+        previous = pq.read_table(catalog_path).to_pandas()
+    except (OSError, pa.ArrowInvalid):
+        return {}
+    if not {'file_mtime', 'file_bytes'} <= set(previous.columns):
+        return {}  # Catalog from before incremental rebuilds
+    return {row['file_path']: row for row in previous.to_dict('records')}
+
+
+def rebuild_catalog(output_dir="output", full=False):
+    """Rebuild catalog from all parquet files in directory.
+
+    Args:
+        output_dir: Export output directory
+        full: Re-read every footer instead of reusing unchanged entries
+    """
     output_path = Path(output_dir)
+    catalog_path = output_path / "catalog.parquet"
+    previous = {} if full else _previous_entries(catalog_path)
 
-    catalog_entries = []
+    datasets = list(output_path.glob("*.parquet"))
+    datasets += [d for d in output_path.iterdir() if (d / EXPORT_STATE_FILE).exists()]
 
-    for parquet_file in sorted(output_path.glob("*.parquet")):
+    catalog_entries = []
+    reused = 0
+    for parquet_file in sorted(datasets):
         # Skip catalog.parquet itself
         if parquet_file.name == "catalog.parquet":
             continue
 
         try:
-            # Read parquet file to get metadata
-            df = pd.read_parquet(parquet_file)
-
-            source_code = parquet_file.stem
-            md_path = output_path / f"{source_code}.md"
-
-            # Extract date range if possible
-            date_cols = [col for col in df.columns if 'date' in col.lower() or 'period' in col.lower()]
-            min_date = None
-            max_date = None
-            if date_cols:
-                try:
-                    dates = pd.to_datetime(df[date_cols[0]], errors='coerce').dropna()
-                    if len(dates) > 0:
-                        min_date = dates.min()
-                        max_date = dates.max()
-                except:
-                    pass
-
-            catalog_entries.append({
-                'source_code': source_code,
-                'domain': 'nhs',  # Could be extracted from manifest
-                'description': f'DataWarp source: {source_code}',
-                'row_count': len(df),
-                'column_count': len(df.columns),
-                'file_size_kb': round(parquet_file.stat().st_size / 1024, 2),
-                'min_date': min_date,
-                'max_date': max_date,
-                'file_path': str(parquet_file),
-                'md_path': str(md_path) if md_path.exists() else None
-            })
-
-            print(f"✓ {source_code:50} {len(df):>10,} rows")
+            entry = previous.get(str(parquet_file))
+            if entry is not None and (entry['file_mtime'], entry['file_bytes']) == _signature(parquet_file):
+                md_path = output_path / f"{parquet_file.stem}.md"
+                entry['md_path'] = str(md_path) if md_path.exists() else None
+                reused += 1
+            else:
+                entry = catalog_entry(parquet_file, output_path)
+                print(f"✓ {entry['source_code']:50} {entry['row_count']:>10,} rows")
+            catalog_entries.append(entry)
 
         except Exception as e:
             print(f"✗ {parquet_file.name}: {e}")
@@ -60,16 +180,22 @@ def rebuild_catalog(output_dir="output"):
     # Build catalog dataframe
     catalog_df = pd.DataFrame(catalog_entries)
 
-    # Write catalog
-    catalog_path = output_path / "catalog.parquet"
-    catalog_df.to_parquet(catalog_path, index=False)
+    # Write catalog (temp file + rename, so the MCP server never reads half a catalog)
+    tmp_path = catalog_path.with_name(f".catalog.parquet.{os.getpid()}.tmp")
+    catalog_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, catalog_path)
 
-    print(f"\n✅ Catalog rebuilt: {len(catalog_entries)} sources")
+    print(f"\n✅ Catalog rebuilt: {len(catalog_entries)} sources ({reused} unchanged)")
     print(f"📁 Written to: {catalog_path}")
-    print(f"📊 Total rows: {catalog_df['row_count'].sum():,}")
+    if len(catalog_df):
+        print(f"📊 Total rows: {catalog_df['row_count'].sum():,}")
 
     return catalog_df
 
+
 if __name__ == "__main__":
-    output_dir = sys.argv[1] if len(sys.argv) > 1 else "output"
-    rebuild_catalog(output_dir)
+    parser = argparse.ArgumentParser(description='Rebuild output/catalog.parquet from Parquet footers')
+    parser.add_argument('output_dir', nargs='?', default='output')
+    parser.add_argument('--full', action='store_true', help='Re-read every dataset, ignoring the existing catalog')
+    args = parser.parse_args()
+    rebuild_catalog(args.output_dir, full=args.full)
@@ -233,6 +233,15 @@ def reset_database():
         print("\n📊 Creating metadata tables (Track A)...")
         run_sql_file(schema_dir / '05_create_metadata_tables.sql', conn)
 
+        print("\n📍 Creating load checkpoints (resumable loads)...")
+        run_sql_file(schema_dir / '07_load_checkpoints.sql', conn)
+
+        print("\n🗄️  Creating enrichment response cache...")
+        run_sql_file(schema_dir / '08_enrichment_cache.sql', conn)
+
+        print("\n🔎 Creating fingerprint LSH index...")
+        run_sql_file(schema_dir / '09_fingerprint_lsh.sql', conn)
+
         print("\n🌍 Configuring UK date format support...")
         cur = conn.cursor()
         dbname = os.getenv('POSTGRES_DB', 'datawarp')
@@ -259,8 +268,10 @@ def reset_database():
         print("  - datawarp.tbl_load_history (Phase 4)")
         print("  - datawarp.tbl_pipeline_log (observability)")
         print("  - datawarp.tbl_manifest_files (batch loading)")
+        print("  - datawarp.tbl_load_checkpoints (resumable loads)")
         print("  - datawarp.tbl_enrichment_runs (LLM observability)")
         print("  - datawarp.tbl_enrichment_api_calls (LLM metrics)")
+        print("  - datawarp.tbl_enrichment_cache (LLM response cache)")
 
         
     except Exception as e:
@@ -0,0 +1,30 @@
+-- Chunk-level Load Checkpoints
+-- Records each committed chunk of a chunked load against its tbl_manifest_files record
+-- so a failed load can resume from the last committed chunk instead of starting over
+
+CREATE TABLE IF NOT EXISTS datawarp.tbl_load_checkpoints (
+    id SERIAL PRIMARY KEY,
+
+    -- Anchor: one set of checkpoints per manifest file record
+    manifest_file_id INTEGER NOT NULL REFERENCES datawarp.tbl_manifest_files(id) ON DELETE CASCADE,
+    load_id INTEGER NOT NULL REFERENCES datawarp.tbl_load_history(id) ON DELETE CASCADE,
+
+    -- Chunk position
+    chunk_index INTEGER NOT NULL,
+    row_start INTEGER NOT NULL,          -- Inclusive DataFrame row offset
+    row_end INTEGER NOT NULL,            -- Exclusive DataFrame row offset
+    rows_committed INTEGER NOT NULL,
+    total_rows INTEGER NOT NULL,         -- Rows in the full file (detects changed source on resume)
+
+    committed_at TIMESTAMP DEFAULT NOW(),
+
+    UNIQUE(manifest_file_id, chunk_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_checkpoints_manifest_file ON datawarp.tbl_load_checkpoints(manifest_file_id);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_load_id ON datawarp.tbl_load_checkpoints(load_id);
+
+-- Comments
+COMMENT ON TABLE datawarp.tbl_load_checkpoints IS 'Per-chunk commit log for resumable loads (written in the same transaction as the chunk)';
+COMMENT ON COLUMN datawarp.tbl_load_checkpoints.load_id IS 'The _load_id stamped on the chunk rows; reused on resume so each row is loaded exactly once';
+COMMENT ON COLUMN datawarp.tbl_load_checkpoints.total_rows IS 'File row count at first attempt; a mismatch on resume discards checkpoints and restarts';
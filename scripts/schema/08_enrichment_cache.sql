@@ -0,0 +1,38 @@
+-- LLM Enrichment Response Cache
+-- Parsed enrichment responses keyed by (prompt hash, model, generation config) so
+-- rerunning enrichment for the same draft manifest skips the API call entirely
+
+CREATE TABLE IF NOT EXISTS datawarp.tbl_enrichment_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,   -- sha256 of prompt_hash + model_name + generation_config
+
+    -- Key components (for inspection and invalidation by model)
+    prompt_hash VARCHAR(64) NOT NULL,
+    model_name VARCHAR(100) NOT NULL,
+    generation_config JSONB NOT NULL,
+
+    -- Cached response (cleaned YAML text; re-parsed on hit so types round-trip exactly)
+    response_yaml TEXT NOT NULL,
+
+    -- Cost of the original call (what each hit saves)
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    latency_ms INTEGER,
+
+    created_at TIMESTAMP DEFAULT NOW(),
+    hit_count INTEGER DEFAULT 0,
+    last_hit_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_enrichment_cache_prompt_hash ON datawarp.tbl_enrichment_cache(prompt_hash);
+CREATE INDEX IF NOT EXISTS idx_enrichment_cache_created ON datawarp.tbl_enrichment_cache(created_at);
+
+-- Record cache hits alongside real API calls
+ALTER TABLE datawarp.tbl_enrichment_api_calls
+ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN DEFAULT FALSE;
+
+ALTER TABLE datawarp.tbl_enrichment_api_calls
+ADD COLUMN IF NOT EXISTS latency_saved_ms INTEGER;
+
+-- Comments
+COMMENT ON TABLE datawarp.tbl_enrichment_cache IS 'Persistent LLM response cache for manifest enrichment (TTL applied at lookup via DATAWARP_LLM_CACHE_TTL_HOURS)';
+COMMENT ON COLUMN datawarp.tbl_enrichment_api_calls.latency_saved_ms IS 'For cache hits: latency of the original API call that was avoided';
@@ -0,0 +1,17 @@
+-- MinHash/LSH Fingerprint Index
+-- Persists a MinHash signature and its LSH band buckets next to each canonical
+-- source fingerprint, so cross-period matching fetches only candidates that share
+-- a bucket (GIN array overlap) and runs exact Jaccard on those alone
+
+ALTER TABLE datawarp.tbl_canonical_sources
+  ADD COLUMN IF NOT EXISTS minhash_signature BIGINT[],
+  ADD COLUMN IF NOT EXISTS lsh_buckets BIGINT[];
+
+CREATE INDEX IF NOT EXISTS idx_canonical_lsh_buckets
+  ON datawarp.tbl_canonical_sources USING gin(lsh_buckets);
+
+-- Comments
+COMMENT ON COLUMN datawarp.tbl_canonical_sources.minhash_signature IS
+  'MinHash of fingerprint.column_names (registry.fingerprint.minhash_signature, 128 permutations)';
+COMMENT ON COLUMN datawarp.tbl_canonical_sources.lsh_buckets IS
+  'One bucket id per LSH band (32 bands x 4 rows); candidates are rows where lsh_buckets && query buckets';
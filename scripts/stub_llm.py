@@ -0,0 +1,252 @@
+"""Deterministic stand-in LLM server for offline enrichment testing and benchmarks.
+
+Speaks the Ollama /api/generate protocol, so enrichment uses it by setting
+DATAWARP_LLM_ENDPOINT to its URL (see enricher.call_gemini_api).
+
+Responses:
+- Replayed from recordings (JSONL of {"prompt_hash", "response"}, as written
+  by DATAWARP_LLM_RECORD_FILE during a real run) when the prompt matches
+- Otherwise synthesised: the sources YAML in the prompt is echoed back with
+  deterministic codes, names, tables and column metadata
+
+Latency and failures are configurable. Failure decisions depend only on the
+prompt hash and how many times that prompt has been seen, so they are
+reproducible however requests are interleaved.
+
+Usage:
+    python scripts/stub_llm.py --port 11434 --latency-ms 800 --fail-rate 0.1
+"""
+
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+FAIL_MODES = ('bad_yaml', 'http_500')
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def _snake(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_') or 'column'
+
+
+def synthesize_enrichment(prompt: str) -> str:
+    """Build a valid enrichment response from the sources YAML embedded in the prompt."""
+    match = re.search(r'```yaml\n(.*?)```', prompt, re.S)
+    sources = yaml.safe_load(match.group(1)) if match else []
+
+    enriched = []
+    for source in sources or []:
+        code = _snake(source.get('code') or source.get('name') or 'source')
+        files = []
+        for file_entry in source.get('files', []):
+            file_out = {k: v for k, v in file_entry.items() if k != 'preview'}
+            columns = (file_entry.get('preview') or {}).get('columns', [])
+            file_out['preview'] = {'columns': [
+                {
+                    'name': _snake(col),
+                    'original_name': str(col),
+                    'description': f"{col} ({code})",
+                    'data_type': 'VARCHAR',
+                    'is_dimension': True,
+                    'is_measure': False,
+                    'query_keywords': [_snake(col)]
+                }
+                for col in columns
+            ]}
+            files.append(file_out)
+        enriched.append({
+            'code': code,
+            'name': f"Stub {source.get('name') or code}",
+            'table': f"tbl_stub_{code}"[:30],
+            'description': f"Synthesised enrichment for {code}",
+            'files': files
+        })
+    return yaml.safe_dump({'sources': enriched}, sort_keys=False)
+
+
+class StubLLMServer:
+    """Threaded Ollama-compatible stub model server.
+
+    Args:
+        recordings: JSONL file of recorded responses to replay by prompt hash
+        latency_ms: Fixed latency added to every response
+        latency_per_1k_tokens_ms: Extra latency per 1000 prompt tokens (~4 chars/token)
+        fail_rate: Fraction of distinct prompts that fail (chosen by prompt hash)
+        fail_mode: 'bad_yaml' (unparseable 200 response) or 'http_500'
+        fail_attempts: How many attempts of a failing prompt fail before it succeeds
+            (-1 = always fail)
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Path] = None,
+        latency_ms: float = 0,
+        latency_per_1k_tokens_ms: float = 0,
+        fail_rate: float = 0.0,
+        fail_mode: str = 'bad_yaml',
+        fail_attempts: int = 1,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        if fail_mode not in FAIL_MODES:
+            raise ValueError(f"fail_mode must be one of {FAIL_MODES}")
+        self.latency_ms = latency_ms
+        self.latency_per_1k_tokens_ms = latency_per_1k_tokens_ms
+        self.fail_rate = fail_rate
+        self.fail_mode = fail_mode
+        self.fail_attempts = fail_attempts
+        self.recordings: Dict[str, str] = {}
+        if recordings:
+            for line in Path(recordings).read_text().splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    self.recordings[record['prompt_hash']] = record['response']
+
+        self._lock = threading.Lock()
+        self._attempts = defaultdict(int)
+        self.stats = {'requests': 0, 'replayed': 0, 'synthesised': 0, 'failures_injected': 0,
+                      'prompt_chars': [], 'concurrent_max': 0}
+        self._active = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubLLMServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self, prompt_hash: str) -> bool:
+        """Deterministic: same prompt, same attempt number → same outcome."""
+        with self._lock:
+            attempt = self._attempts[prompt_hash]
+            self._attempts[prompt_hash] += 1
+        selected = int(prompt_hash[:8], 16) / 0xFFFFFFFF < self.fail_rate
+        return selected and (self.fail_attempts < 0 or attempt < self.fail_attempts)
+
+    def generate(self, prompt: str) -> Optional[dict]:
+        """Produce an Ollama-style response body, or None for an injected HTTP 500."""
+        prompt_hash = _prompt_hash(prompt)
+        prompt_tokens = len(prompt) // 4
+
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['prompt_chars'].append(len(prompt))
+            self._active += 1
+            self.stats['concurrent_max'] = max(self.stats['concurrent_max'], self._active)
+        try:
+            time.sleep((self.latency_ms + self.latency_per_1k_tokens_ms * prompt_tokens / 1000) / 1000)
+
+            if self._should_fail(prompt_hash):
+                with self._lock:
+                    self.stats['failures_injected'] += 1
+                if self.fail_mode == 'http_500':
+                    return None
+                text = "sources:\n  - code: [unterminated\n"
+            elif prompt_hash in self.recordings:
+                text = self.recordings[prompt_hash]
+                with self._lock:
+                    self.stats['replayed'] += 1
+            else:
+                text = synthesize_enrichment(prompt)
+                with self._lock:
+                    self.stats['synthesised'] += 1
+
+            return {'response': text, 'done': True,
+                    'prompt_eval_count': prompt_tokens, 'eval_count': len(text) // 4}
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._send(200, {'status': 'ok', **{k: v for k, v in server.stats.items() if k != 'prompt_chars'}})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/api/generate':
+                    self._send(404, {'error': 'not found'})
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                body = server.generate(payload.get('prompt', ''))
+                if body is None:
+                    self._send(500, {'error': 'injected failure'})
+                else:
+                    self._send(200, {'model': payload.get('model', 'stub'), **body})
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the stub LLM server (Ollama /api/generate protocol)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--recordings', type=Path, help='JSONL of recorded responses to replay')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--latency-per-1k-tokens-ms', type=float, default=0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--fail-mode', choices=FAIL_MODES, default='bad_yaml')
+    parser.add_argument('--fail-attempts', type=int, default=1)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        recordings=args.recordings, latency_ms=args.latency_ms,
+        latency_per_1k_tokens_ms=args.latency_per_1k_tokens_ms, fail_rate=args.fail_rate,
+        fail_mode=args.fail_mode, fail_attempts=args.fail_attempts, host=args.host, port=args.port
+    )
+    print(f"Stub LLM listening on {server.url} (set DATAWARP_LLM_ENDPOINT={server.url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ import yaml
 import argparse
 import requests
 from pathlib import Path
+
+from datawarp.utils import http
 from collections import Counter
 from typing import List, Tuple
 
@@ -23,17 +25,18 @@ def check_url_reachability(url: str, timeout: int = 10) -> Tuple[bool, str]:
     """
     try:
         # Try HEAD first (faster, doesn't download content)
-        response = requests.head(url, timeout=timeout, allow_redirects=True)
+        response = http.head(url, timeout=timeout)
 
         if response.status_code == 200:
             return True, "OK"
         elif response.status_code == 405:  # Method Not Allowed
             # Some servers don't support HEAD, try GET with stream
-            response = requests.get(url, timeout=timeout, stream=True, allow_redirects=True)
-            if response.status_code == 200:
+            with http.get(url, timeout=timeout, stream=True) as response:
+                status = response.status_code
+            if status == 200:
                 return True, "OK (via GET)"
             else:
-                return False, f"HTTP {response.status_code}"
+                return False, f"HTTP {status}"
         else:
             return False, f"HTTP {response.status_code}"
 
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
-"""Validate Parquet Export - Compare PostgreSQL vs DuckDB vs Pandas
+"""Validate Parquet Export - Compare PostgreSQL vs DuckDB
 
-Runs standardized queries across three tools to verify data integrity:
-1. PostgreSQL (source of truth)
-2. DuckDB (query engine)
-3. Pandas (Python data frames)
+Verifies data integrity of every exported row without pulling rows into Python:
+1. PostgreSQL (source of truth) and DuckDB (over the Parquet files) each
+   compute order-independent per-column checksums in one scan
+   (datawarp.pipeline.export_checksum)
+2. The fingerprints (row count, null counts, min/max, value hash sums and a
+   row checksum) must match
 
 Includes meta-testing (self-tests) to verify the validator catches corruption.
 
@@ -19,14 +21,22 @@ from pathlib import Path
 from dotenv import load_dotenv
 import psycopg2
 import duckdb
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import box
 import tempfile
-import shutil
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datawarp.pipeline.export_checksum import (
+    column_kinds, compare_fingerprints, parquet_fingerprint, postgres_fingerprint
+)
+from datawarp.pipeline.exporter import EXPORT_STATE_FILE, dataset_files
 
 load_dotenv()
 
@@ -91,22 +101,16 @@ def meta_test_row_deletion(source_file: Path) -> bool:
         tmp_path = Path(tmp.name)
 
     try:
-        # Read original, delete first row, write corrupted
-        df_original = pd.read_parquet(source_file)
-        original_count = len(df_original)
-        df_corrupted = df_original.iloc[1:]  # Delete first row
-        df_corrupted.to_parquet(tmp_path, index=False, engine='pyarrow', compression='snappy')
-
-        # Read corrupted file
-        df_test = pd.read_parquet(tmp_path)
-        corrupted_count = len(df_test)
+        table = pq.read_table(source_file)
+        pq.write_table(table.slice(1), tmp_path, compression='snappy')
 
-        console.print(f"  Original rows: {original_count}")
-        console.print(f"  Corrupted rows: {corrupted_count} (1 row deleted)")
+        problems = compare_fingerprints(parquet_fingerprint(source_file), parquet_fingerprint(tmp_path))
+        console.print(f"  Original rows: {table.num_rows}")
+        console.print(f"  Corrupted rows: {table.num_rows - 1} (1 row deleted)")
 
         # Validator should detect this
-        if corrupted_count == original_count - 1:
-            console.print("[green]✓ Validator CAN detect row deletion[/green]")
+        if problems:
+            console.print(f"[green]✓ Validator CAN detect row deletion ({problems[0]})[/green]")
             return True
         else:
             console.print("[red]✗ Validator CANNOT detect row deletion[/red]")
@@ -124,33 +128,31 @@ def meta_test_value_corruption(source_file: Path) -> bool:
         tmp_path = Path(tmp.name)
 
     try:
-        # Read original, corrupt a value, write corrupted
-        df_original = pd.read_parquet(source_file)
-        df_corrupted = df_original.copy()
+        table = pq.read_table(source_file)
 
-        # Find first numeric column and corrupt it
-        numeric_cols = df_corrupted.select_dtypes(include=['int64', 'float64']).columns
-        if len(numeric_cols) == 0:
+        # Find first numeric column with a value in the first row and corrupt it
+        numeric_cols = [f.name for f in table.schema
+                        if (pa.types.is_integer(f.type) or pa.types.is_floating(f.type))
+                        and table.num_rows and table[f.name][0].is_valid]
+        if not numeric_cols:
             console.print("[yellow]⚠ No numeric columns to corrupt, skipping test[/yellow]")
             return True
 
         corrupt_col = numeric_cols[0]
-        original_value = df_corrupted.iloc[0][corrupt_col]
-        df_corrupted.iloc[0, df_corrupted.columns.get_loc(corrupt_col)] = original_value + 9999
-        corrupted_value = df_corrupted.iloc[0][corrupt_col]
-
-        df_corrupted.to_parquet(tmp_path, index=False, engine='pyarrow', compression='snappy')
-
-        # Read back and verify corruption persisted
-        df_test = pd.read_parquet(tmp_path)
-        test_value = df_test.iloc[0][corrupt_col]
-
+        values = table[corrupt_col].to_pylist()
+        original_value = values[0]
+        values[0] = original_value + 9999
+        index = table.schema.get_field_index(corrupt_col)
+        corrupted = table.set_column(index, corrupt_col, pa.array(values, table.schema.field(index).type))
+        pq.write_table(corrupted, tmp_path, compression='snappy')
+
+        problems = compare_fingerprints(parquet_fingerprint(source_file), parquet_fingerprint(tmp_path))
         console.print(f"  Column: {corrupt_col}")
         console.print(f"  Original value: {original_value}")
-        console.print(f"  Corrupted value: {test_value}")
+        console.print(f"  Corrupted value: {values[0]}")
 
-        # Validator should detect this (values don't match)
-        if test_value == corrupted_value and test_value != original_value:
+        # Validator should detect this (checksums don't match)
+        if any(p.startswith(f"{corrupt_col}:") for p in problems):
             console.print("[green]✓ Validator CAN detect value corruption[/green]")
             return True
         else:
@@ -165,6 +167,8 @@ def validate_single_export(canonical_code: str, output_dir: str = "output") -> d
     """Run validation tests for a single Parquet export."""
 
     parquet_path = Path(output_dir) / f"{canonical_code}.parquet"
+    if not parquet_path.exists() and (Path(output_dir) / canonical_code).is_dir():
+        parquet_path = Path(output_dir) / canonical_code  # Incremental / hive export directory
     md_path = Path(output_dir) / f"{canonical_code}.md"
 
     # Check files exist
@@ -200,26 +204,20 @@ def validate_single_export(canonical_code: str, output_dir: str = "output") -> d
     results['tests'].append(schema_test)
     display_test_result(schema_test)
 
-    # Test 3: Sample Data Comparison (with sorting)
-    console.print("\n[bold]Test 3: Sample Data Comparison (First 3 Rows, Sorted)[/bold]")
-    data_test = compare_sample_data(table_name, parquet_path)
-    results['tests'].append(data_test)
-    display_test_result(data_test)
-
-    # Test 4: DuckDB vs Pandas Consistency
-    console.print("\n[bold]Test 4: DuckDB vs Pandas Consistency[/bold]")
-    consistency_test = compare_duckdb_vs_pandas(parquet_path)
-    results['tests'].append(consistency_test)
-    display_test_result(consistency_test)
+    # Test 3: Full-data checksums (every row, every column)
+    console.print("\n[bold]Test 3: Column Checksums (PostgreSQL vs DuckDB)[/bold]")
+    checksum_test = compare_checksums(table_name, parquet_path)
+    results['tests'].append(checksum_test)
+    display_test_result(checksum_test)
 
-    # Test 5: Metadata Quality Check
-    console.print("\n[bold]Test 5: Metadata Quality Check[/bold]")
+    # Test 4: Metadata Quality Check
+    console.print("\n[bold]Test 4: Metadata Quality Check[/bold]")
     metadata_test = check_metadata_quality(md_path)
     results['tests'].append(metadata_test)
     display_test_result(metadata_test)
 
-    # Test 6: Metadata Column Names Match Parquet (CRITICAL for agent queries)
-    console.print("\n[bold]Test 6: Metadata Column Names Match Parquet[/bold]")
+    # Test 5: Metadata Column Names Match Parquet (CRITICAL for agent queries)
+    console.print("\n[bold]Test 5: Metadata Column Names Match Parquet[/bold]")
     column_match_test = validate_metadata_column_names(md_path, parquet_path)
     results['tests'].append(column_match_test)
     display_test_result(column_match_test)
@@ -237,8 +235,14 @@ def validate_single_export(canonical_code: str, output_dir: str = "output") -> d
     return results
 
 
+def _duckdb_source(parquet_path: Path) -> str:
+    """DuckDB table expression over an export file or every file of a dataset directory."""
+    files = ', '.join(f"'{p}'" for p in dataset_files(parquet_path))
+    return f"read_parquet([{files}], hive_partitioning = false, union_by_name = true)"
+
+
 def compare_row_counts(table_name: str, parquet_path: Path) -> dict:
-    """Compare row counts across PostgreSQL, DuckDB, and Pandas."""
+    """Compare row counts in PostgreSQL, DuckDB and the Parquet footers."""
     try:
         # PostgreSQL count
         conn = psycopg2.connect(
@@ -256,15 +260,14 @@ def compare_row_counts(table_name: str, parquet_path: Path) -> dict:
         # DuckDB count
         duck_conn = duckdb.connect()
         duck_count = duck_conn.execute(
-            f"SELECT COUNT(*) FROM '{parquet_path}'"
+            f"SELECT COUNT(*) FROM {_duckdb_source(parquet_path)}"
         ).fetchone()[0]
 
-        # Pandas count
-        df = pd.read_parquet(parquet_path)
-        pandas_count = len(df)
+        # Footer count
+        footer_count = sum(pq.ParquetFile(p).metadata.num_rows for p in dataset_files(parquet_path))
 
         # Compare
-        all_match = (pg_count == duck_count == pandas_count)
+        all_match = (pg_count == duck_count == footer_count)
 
         return {
             'name': 'Row Count',
@@ -272,7 +275,7 @@ def compare_row_counts(table_name: str, parquet_path: Path) -> dict:
             'details': {
                 'PostgreSQL': pg_count,
                 'DuckDB': duck_count,
-                'Pandas': pandas_count,
+                'Parquet footer': footer_count,
                 'Match': '✓' if all_match else '✗'
             }
         }
@@ -308,20 +311,18 @@ def compare_schemas(table_name: str, parquet_path: Path) -> dict:
         # DuckDB schema
         duck_conn = duckdb.connect()
         duck_schema = duck_conn.execute(
-            f"DESCRIBE SELECT * FROM '{parquet_path}'"
+            f"DESCRIBE SELECT * FROM {_duckdb_source(parquet_path)}"
         ).fetchall()
         duck_columns = {row[0]: row[1] for row in duck_schema}
 
-        # Pandas schema
-        df = pd.read_parquet(parquet_path)
-        pandas_columns = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        # Parquet footer schema
+        footer_cols = set(pq.read_schema(dataset_files(parquet_path)[0]).names)
 
         # Compare column names (order independent)
         pg_cols = set(pg_columns.keys())
         duck_cols = set(duck_columns.keys())
-        pandas_cols = set(pandas_columns.keys())
 
-        all_match = (pg_cols == duck_cols == pandas_cols)
+        all_match = (pg_cols == duck_cols == footer_cols)
 
         return {
             'name': 'Schema',
@@ -329,7 +330,7 @@ def compare_schemas(table_name: str, parquet_path: Path) -> dict:
             'details': {
                 'PostgreSQL columns': len(pg_cols),
                 'DuckDB columns': len(duck_cols),
-                'Pandas columns': len(pandas_cols),
+                'Parquet footer columns': len(footer_cols),
                 'Column names match': '✓' if all_match else '✗',
                 'Missing in Parquet': list(pg_cols - duck_cols) if pg_cols != duck_cols else None,
                 'Extra in Parquet': list(duck_cols - pg_cols) if pg_cols != duck_cols else None
@@ -343,10 +344,15 @@ def compare_schemas(table_name: str, parquet_path: Path) -> dict:
         }
 
 
-def compare_sample_data(table_name: str, parquet_path: Path) -> dict:
-    """Compare first 3 rows of actual data (SORTED for deterministic comparison)."""
+def compare_checksums(table_name: str, parquet_path: Path) -> dict:
+    """Compare order-independent per-column checksums of every row.
+
+    PostgreSQL and DuckDB each aggregate in a single scan; only the
+    fingerprints reach Python.
+    """
     try:
-        # Get first column name for sorting
+        kinds = column_kinds(pq.read_schema(dataset_files(parquet_path)[0]))
+
         conn = psycopg2.connect(
             host=os.getenv('POSTGRES_HOST'),
             port=os.getenv('POSTGRES_PORT'),
@@ -354,90 +360,28 @@ def compare_sample_data(table_name: str, parquet_path: Path) -> dict:
             password=os.getenv('POSTGRES_PASSWORD'),
             database=os.getenv('POSTGRES_DATABASE')
         )
-        cur = conn.cursor()
-        cur.execute(f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema || '.' || table_name = %s
-            ORDER BY ordinal_position
-            LIMIT 1
-        """, (table_name,))
-        first_col = cur.fetchone()[0]
-
-        # PostgreSQL data (sorted)
-        pg_df = pd.read_sql(f"SELECT * FROM {table_name} ORDER BY {first_col} LIMIT 3", conn)
-        conn.close()
-
-        # DuckDB data (sorted)
-        duck_conn = duckdb.connect()
-        duck_df = duck_conn.execute(
-            f"SELECT * FROM '{parquet_path}' ORDER BY {first_col} LIMIT 3"
-        ).df()
-
-        # Pandas data (sorted)
-        pandas_df = pd.read_parquet(parquet_path).sort_values(by=first_col).head(3).reset_index(drop=True)
-
-        # Compare shapes
-        shapes_match = (pg_df.shape == duck_df.shape == pandas_df.shape)
-
-        # Compare values (DuckDB vs Pandas should be identical)
-        duck_pandas_match = duck_df.equals(pandas_df)
-
-        return {
-            'name': 'Sample Data',
-            'passed': shapes_match and duck_pandas_match,
-            'details': {
-                'PostgreSQL shape': pg_df.shape,
-                'DuckDB shape': duck_df.shape,
-                'Pandas shape': pandas_df.shape,
-                'Shapes match': '✓' if shapes_match else '✗',
-                'DuckDB = Pandas': '✓' if duck_pandas_match else '✗',
-                'Sort column': first_col
-            },
-            'sample_data': {
-                'PostgreSQL': pg_df.to_dict('records'),
-                'DuckDB': duck_df.to_dict('records'),
-                'Pandas': pandas_df.to_dict('records')
-            }
-        }
-    except Exception as e:
-        return {
-            'name': 'Sample Data',
-            'passed': False,
-            'error': str(e)
-        }
-
-
-def compare_duckdb_vs_pandas(parquet_path: Path) -> dict:
-    """Verify DuckDB and Pandas read the same Parquet file identically."""
-    try:
-        # DuckDB query
-        duck_conn = duckdb.connect()
-        duck_df = duck_conn.execute(f"SELECT * FROM '{parquet_path}'").df()
-        duck_total = len(duck_df)
-        duck_distinct = len(duck_df.drop_duplicates())
-
-        # Pandas equivalent
-        df = pd.read_parquet(parquet_path)
-        pandas_total = len(df)
-        pandas_distinct = len(df.drop_duplicates())
+        try:
+            pg = postgres_fingerprint(conn, table_name, kinds)
+        finally:
+            conn.close()
 
-        match = (duck_total == pandas_total and duck_distinct == pandas_distinct)
+        duck = parquet_fingerprint(parquet_path, kinds)
+        problems = compare_fingerprints(pg, duck)
 
         return {
-            'name': 'DuckDB vs Pandas',
-            'passed': match,
+            'name': 'Column Checksums',
+            'passed': not problems,
             'details': {
-                'DuckDB total rows': duck_total,
-                'Pandas total rows': pandas_total,
-                'DuckDB distinct rows': duck_distinct,
-                'Pandas distinct rows': pandas_distinct,
-                'Match': '✓' if match else '✗'
+                'Rows checked': duck.rows,
+                'Columns checked': len(kinds),
+                'Row checksum': '✓' if pg.row_checksum == duck.row_checksum else '✗',
+                'Match': '✓' if not problems else '✗',
+                'Differences': '; '.join(problems[:5]) if problems else None
             }
         }
     except Exception as e:
         return {
-            'name': 'DuckDB vs Pandas',
+            'name': 'Column Checksums',
             'passed': False,
             'error': str(e)
         }
@@ -509,9 +453,8 @@ def validate_metadata_column_names(md_path: Path, parquet_path: Path) -> dict:
         matches = re.findall(pattern, content)
         md_columns = set(matches)
 
-        # 2. Get actual column names from Parquet
-        df = pd.read_parquet(parquet_path)
-        parquet_columns = set(df.columns)
+        # 2. Get actual column names from the Parquet footer
+        parquet_columns = set(pq.read_schema(dataset_files(parquet_path)[0]).names)
 
         # 3. Find mismatches
         md_only = md_columns - parquet_columns  # In .md but NOT in Parquet (BROKEN QUERIES!)
@@ -605,7 +548,8 @@ def main():
 
     if args.all:
         # Find all Parquet files
-        parquet_files = list(Path(args.output_dir).glob("*.parquet"))
+        parquet_files = [p for p in Path(args.output_dir).glob("*.parquet") if p.name != "catalog.parquet"]
+        parquet_files += [d for d in Path(args.output_dir).iterdir() if (d / EXPORT_STATE_FILE).exists()]
         console.print(f"\n[cyan]Found {len(parquet_files)} Parquet files[/cyan]\n")
 
         results = []
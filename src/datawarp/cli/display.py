@@ -139,8 +139,13 @@ class ProgressDisplay:
         # Store result
         self.periods.append(result)
 
-    def print_summary(self):
-        """Print final summary."""
+    def print_summary(self, download_stats: Optional[dict] = None, http_stats: Optional[dict] = None):
+        """Print final summary.
+
+        Args:
+            download_stats: Optional stats from utils.download.get_download_stats()
+            http_stats: Optional per-host stats from utils.http.get_http_stats()
+        """
         print()
         print("━" * 80)
 
@@ -162,6 +167,13 @@ class ProgressDisplay:
 
         print(f"{status}: {' | '.join(parts)}")
 
+        if download_stats and download_stats.get('requests'):
+            from datawarp.utils.download import format_download_stats
+            print(f"Downloads: {format_download_stats(download_stats)}")
+        if http_stats:
+            from datawarp.utils.http import format_http_stats
+            print(f"Network: {format_http_stats(http_stats)}")
+
         # Collect all warnings
         all_warnings = []
         for period in self.periods:
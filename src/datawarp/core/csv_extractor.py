@@ -2,18 +2,25 @@
 
 import re
 import pandas as pd
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 from datawarp.core.extractor import TableStructure, ColumnInfo, SheetType, DataOrientation, FirstColumnType
+from datawarp.utils.zip_handler import ZipMember
 
 
 class CSVExtractor:
     """Fast CSV extractor - directly infers structure without Excel conversion."""
 
-    def __init__(self, filepath: str, sheet_name: Optional[str] = None):
-        """Initialize CSV extractor."""
+    def __init__(self, filepath: Union[str, ZipMember], sheet_name: Optional[str] = None):
+        """Initialize CSV extractor (path on disk, or a ZipMember streamed from its archive)."""
         self.filepath = filepath
         # sheet_name ignored for CSV (no sheets)
 
+    def _read_csv(self, **kwargs) -> pd.DataFrame:
+        if isinstance(self.filepath, ZipMember):
+            with self.filepath.open() as f:
+                return pd.read_csv(f, **kwargs)
+        return pd.read_csv(self.filepath, **kwargs)
+
     def _to_db_identifier(self, name: str) -> str:
         """Convert column name to valid PostgreSQL identifier."""
         clean = name.lower()
@@ -69,7 +76,7 @@ class CSVExtractor:
     def infer_structure(self) -> TableStructure:
         """Infer structure directly from CSV (fast, no Excel conversion)."""
         # Read just enough for structure inference
-        df = pd.read_csv(self.filepath, nrows=100)
+        df = self._read_csv(nrows=100)
 
         columns: Dict[int, ColumnInfo] = {}
         used_names = {}
@@ -112,7 +119,7 @@ class CSVExtractor:
 
     def to_dataframe(self) -> pd.DataFrame:
         """Read CSV to DataFrame with lowercased column names."""
-        df = pd.read_csv(self.filepath)
+        df = self._read_csv()
         # Lowercase column names to match CREATE TABLE
         df.columns = [self._to_db_identifier(str(col)) for col in df.columns]
         return df
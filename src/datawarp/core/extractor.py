@@ -6,17 +6,23 @@ Additional optimization: Workbook caching across multiple sheet extractions.
 """
 
 import openpyxl
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, range_boundaries
 import re
 import logging
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from io import BytesIO
 from pathlib import Path
 
+from datawarp.utils.zip_handler import ZipMember
+
 logger = logging.getLogger(__name__)
 
-# Workbook cache: filepath → openpyxl.Workbook
+# Workbook cache: filepath (or ZipMember) → openpyxl.Workbook
 # Prevents re-loading the same Excel file for multiple sheet extractions
 _workbook_cache: Dict[str, Any] = {}
 
@@ -31,14 +37,23 @@ def clear_workbook_cache():
     _workbook_cache.clear()
 
 
-def _get_cached_workbook(filepath: str):
+def _load_workbook(filepath):
+    """Load a workbook from disk, or from memory for a ZipMember (never extracted to disk)."""
+    if isinstance(filepath, ZipMember):
+        # openpyxl seeks heavily; an in-memory copy beats re-decompressing on every seek
+        return openpyxl.load_workbook(BytesIO(filepath.read_bytes()), data_only=True)
+    return openpyxl.load_workbook(str(filepath), data_only=True)
+
+
+def _get_cached_workbook(filepath):
     """Get workbook from cache or load and cache it."""
-    if filepath not in _workbook_cache:
-        logger.debug(f"Loading workbook: {Path(filepath).name}")
-        _workbook_cache[filepath] = openpyxl.load_workbook(filepath, data_only=True)
+    key = filepath.cache_key if isinstance(filepath, ZipMember) else str(Path(filepath).resolve())
+    if key not in _workbook_cache:
+        logger.debug(f"Loading workbook: {key}")
+        _workbook_cache[key] = _load_workbook(filepath)
     else:
-        logger.debug(f"Using cached workbook: {Path(filepath).name}")
-    return _workbook_cache[filepath]
+        logger.debug(f"Using cached workbook: {key}")
+    return _workbook_cache[key]
 
 
 # =============================================================================
@@ -151,7 +166,7 @@ class FileExtractor:
         import warnings
         warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
         
-        self.filepath = Path(filepath)
+        self.filepath = filepath if isinstance(filepath, ZipMember) else Path(filepath)
         self.preview_mode = preview_mode
         
         if workbook:
@@ -212,9 +227,8 @@ class FileExtractor:
     # =========================================================================
     
     @classmethod
-    def get_sheet_names(cls, filepath: str) -> List[str]:
-        wb = openpyxl.load_workbook(filepath, data_only=True)
-        return wb.sheetnames
+    def get_sheet_names(cls, filepath) -> List[str]:
+        return _get_cached_workbook(filepath).sheetnames
     
     def _build_merged_map(self):
         for mr in self.ws.merged_cells.ranges:
@@ -987,3 +1001,179 @@ class FileExtractor:
             return pd.DataFrame(self.extract_data())
         except ImportError:
             raise ImportError("pandas is required for to_dataframe()")
+
+
+# =============================================================================
+# Header probe: headers + sample rows from the top of each sheet only
+# =============================================================================
+
+PROBE_ROWS = 60  # Rows streamed per sheet; enough for NHS title blocks + header + samples
+
+
+@dataclass
+class SheetProbe:
+    sheet_name: str
+    structure: TableStructure  # Detected from the probed rows only (data_end_row is capped)
+    sample_rows: List[Dict[str, Any]]
+
+    @property
+    def is_valid(self) -> bool:
+        return self.structure.is_valid
+
+    @property
+    def columns(self) -> List[str]:
+        return [col.pg_name for col in self.structure.columns.values()]
+
+    @property
+    def data_start_row(self) -> int:
+        return self.structure.data_start_row
+
+
+class _ProbeWorkbook(dict):
+    """sheet name → in-memory worksheet holding only the probed rows."""
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self)
+
+
+# A <row> start tag, or a <mergeCell> with its range (optionally namespace-prefixed)
+_SHEET_TAG_RE = re.compile(rb'<(?:\w+:)?row[\s>/]|<(?:\w+:)?mergeCell\s+ref="([A-Z]+\d+):([A-Z]+\d+)"')
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _sheet_parts(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Sheet name → worksheet XML member, from workbook.xml and its relationships."""
+    targets = {
+        rel.get('Id'): rel.get('Target')
+        for rel in ET.fromstring(archive.read('xl/_rels/workbook.xml.rels')).iter(f'{_PKG_REL_NS}Relationship')
+    }
+    parts = {}
+    for sheet in ET.fromstring(archive.read('xl/workbook.xml')).iter(f'{_MAIN_NS}sheet'):
+        target = targets.get(sheet.get(f'{_REL_NS}id'))
+        if target:
+            parts[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+    return parts
+
+
+def _read_merged_ranges(source, sheet_name: str, max_rows: int) -> Optional[List[str]]:
+    """Merged ranges of a sheet with at most max_rows rows, clipped to max_rows.
+
+    <mergeCell> elements follow sheetData in the sheet XML, so they can only
+    be reached by reading every row. The sheet part is streamed from the
+    xlsx archive and the scan gives up (returns None) as soon as it passes
+    max_rows <row> elements, so large sheets cost no more than the probe.
+    """
+    with zipfile.ZipFile(source) as archive:
+        part = _sheet_parts(archive).get(sheet_name)
+        if part is None:
+            return None
+        ranges = []
+        rows = 0
+        tail = b''
+        with archive.open(part) as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                data = tail + chunk
+                for m in _SHEET_TAG_RE.finditer(data):
+                    if m.end() <= len(tail):
+                        continue  # Counted with the previous chunk
+                    if m.group(1) is None:
+                        rows += 1
+                        if rows > max_rows:
+                            return None
+                        continue
+                    min_col, min_row, max_col, max_row = range_boundaries(f"{m.group(1).decode()}:{m.group(2).decode()}")
+                    if min_row <= max_rows:
+                        ranges.append((min_col, min_row, max_col, min(max_row, max_rows)))
+                tail = data[-64:]  # A tag may straddle chunks
+    return [f"{get_column_letter(c1)}{r1}:{get_column_letter(c2)}{r2}"
+            for c1, r1, c2, r2 in ranges if (c1, r1) != (c2, r2)]
+
+
+def _implied_header_merges(ws, data_start_row: int) -> List[str]:
+    """Horizontal spans of group labels in header rows, for sheets whose merges were not read.
+
+    A header cell left blank after a label, with sub-headers under both, is
+    taken as part of the label's span (as in 'Attendances' over 'Type 1' and
+    'Type 2').
+    """
+    spans = []
+    for row in range(1, data_start_row - 1):
+        start = end = None
+        for col in range(1, ws.max_column + 2):
+            value = ws.cell(row=row, column=col).value if col <= ws.max_column else None
+            below = ws.cell(row=row + 1, column=col).value if col <= ws.max_column else None
+            if value is None and start is not None and below is not None:
+                end = col
+                continue
+            if start is not None and end is not None:
+                spans.append(f"{get_column_letter(start)}{row}:{get_column_letter(end)}{row}")
+            start = col if value is not None and below is not None else None
+            end = None
+    return spans
+
+
+def probe_workbook(filepath, sheets: Optional[List] = None, max_rows: int = PROBE_ROWS,
+                   sample_size: int = 3) -> Dict[Any, SheetProbe]:
+    """Probe sheets for headers, data start and sample rows without a full load.
+
+    Opens the workbook once in read-only (streaming) mode and reads only the
+    first max_rows rows of each sheet into a small in-memory worksheet, which
+    FileExtractor then analyses with its normal header detection. Merged
+    ranges in those rows are copied over, so merged header spans expand to
+    the same column names as a full extraction. Sheets longer than max_rows
+    are not scanned for merges; group header spans are inferred instead.
+
+    Args:
+        filepath: Workbook path or ZipMember
+        sheets: Sheet names or indexes to probe (default: all sheets)
+
+    Returns:
+        {requested sheet: SheetProbe}
+    """
+    content = filepath.read_bytes() if isinstance(filepath, ZipMember) else None
+    source = BytesIO(content) if content is not None else str(filepath)
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+    try:
+        probes = {}
+        for key in (wb.sheetnames if sheets is None else sheets):
+            name = wb.sheetnames[key] if isinstance(key, int) else key
+            if name not in wb.sheetnames:
+                raise ValueError(f"Sheet '{name}' not found. Available: {wb.sheetnames}")
+
+            probe_ws = openpyxl.Workbook().active
+            for row in wb[name].iter_rows(max_row=max_rows, values_only=True):
+                probe_ws.append(row)
+            merged = _read_merged_ranges(BytesIO(content) if content is not None else source, name, max_rows)
+            for merged_range in merged or []:
+                probe_ws.merge_cells(merged_range)
+
+            extractor = FileExtractor(filepath, name, workbook=_ProbeWorkbook({name: probe_ws}), preview_mode=True)
+            extractor._build_merged_map()
+            structure = extractor.infer_structure()
+            if merged is None and structure.is_valid:
+                # Sheet longer than the probe: merges unknown, infer group header spans
+                implied = _implied_header_merges(probe_ws, structure.data_start_row)
+                for merged_range in implied:
+                    probe_ws.merge_cells(merged_range)
+                if implied:
+                    extractor = FileExtractor(filepath, name, workbook=_ProbeWorkbook({name: probe_ws}),
+                                              preview_mode=True)
+                    extractor._build_merged_map()
+                    structure = extractor.infer_structure()
+
+            sample_rows = []
+            if structure.is_valid:
+                last = min(structure.data_start_row + sample_size - 1, structure.data_end_row)
+                sample_rows = [
+                    {col.pg_name: extractor._get_cached_value(row_num, col_idx)
+                     for col_idx, col in structure.columns.items()}
+                    for row_num in range(structure.data_start_row, last + 1)
+                ]
+            probes[key] = SheetProbe(sheet_name=name, structure=structure, sample_rows=sample_rows)
+        return probes
+    finally:
+        wb.close()
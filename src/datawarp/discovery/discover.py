@@ -109,3 +109,4 @@ def discover_urls_for_periods(landing_page: str, periods: list,
         results[period] = url
 
     return results
+
@@ -2,19 +2,82 @@
 HTML Parser for NHS Publication Discovery
 
 Extracts download links from NHS England landing pages.
+
+Fetches share a TTL'd HTML cache (a landing page used by several
+publications is fetched once per run) and a global concurrency cap, so
+callers can fan out across thread pools safely.
 """
 
+import os
 import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Set
 from urllib.parse import urljoin, urlparse
-import requests
+
+from datawarp.utils import http
+
+logger = logging.getLogger(__name__)
+
+HTML_CACHE_TTL = 900  # seconds; landing pages change at most daily
+DISCOVERY_CONCURRENCY = int(os.getenv('DATAWARP_DISCOVERY_CONCURRENCY', '8'))
+
+# url → (expires_at, html)
+_html_cache: dict[str, tuple[float, str]] = {}
+_html_cache_lock = threading.Lock()
+_inflight: dict[str, threading.Lock] = {}  # Per-URL locks so concurrent callers fetch once
+_fetch_slots = threading.BoundedSemaphore(DISCOVERY_CONCURRENCY)  # Global cap across all publications
 
 
-def fetch_html(url: str, timeout: int = 30) -> str:
-    """Fetch HTML content from URL."""
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
+def clear_html_cache():
+    """Clear the shared HTML cache."""
+    with _html_cache_lock:
+        _html_cache.clear()
+
+
+def _cached_html(url: str):
+    with _html_cache_lock:
+        entry = _html_cache.get(url)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def fetch_html(url: str, timeout: int = 30, ttl: int = HTML_CACHE_TTL) -> str:
+    """Fetch HTML content from URL (shared session: keep-alive, retries, per-host limit).
+
+    Results are cached for ttl seconds; concurrent requests for the same URL
+    wait for a single fetch. Pass ttl=0 to bypass the cache.
+    """
+    if ttl <= 0:
+        with _fetch_slots:
+            response = http.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    html = _cached_html(url)
+    if html is not None:
+        return html
+
+    with _html_cache_lock:
+        url_lock = _inflight.setdefault(url, threading.Lock())
+
+    with url_lock:
+        # Another thread may have filled the cache while we waited
+        html = _cached_html(url)
+        if html is not None:
+            return html
+
+        with _fetch_slots:
+            response = http.get(url, timeout=timeout)
+        response.raise_for_status()
+
+        with _html_cache_lock:
+            _html_cache[url] = (time.monotonic() + ttl, response.text)
+            _inflight.pop(url, None)
+        return response.text
 
 
 def extract_download_links(html: str, base_url: str, extensions: List[str] = None) -> Set[str]:
@@ -100,16 +163,19 @@ def extract_nhs_england_links(landing_page_url: str) -> Set[str]:
     # Extract publication sub-page links
     subpage_urls = extract_publication_subpage_links(html, landing_page_url)
 
-    all_download_links = set()
-    for subpage_url in subpage_urls:
+    def fetch_subpage_links(subpage_url: str) -> Set[str]:
         try:
-            subpage_html = fetch_html(subpage_url)
-            download_links = extract_download_links(subpage_html, subpage_url)
-            all_download_links.update(download_links)
+            return extract_download_links(fetch_html(subpage_url), subpage_url)
         except Exception as e:
             # Log but continue with other sub-pages
-            import logging
-            logging.getLogger(__name__).warning(f"Failed to fetch {subpage_url}: {e}")
-            continue
+            logger.warning(f"Failed to fetch {subpage_url}: {e}")
+            return set()
+
+    # Sub-pages are fetched concurrently; fetch_html enforces the global cap
+    all_download_links = set()
+    if subpage_urls:
+        with ThreadPoolExecutor(max_workers=min(DISCOVERY_CONCURRENCY, len(subpage_urls))) as pool:
+            for links in pool.map(fetch_subpage_links, sorted(subpage_urls)):
+                all_download_links.update(links)
 
     return all_download_links
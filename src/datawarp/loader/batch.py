@@ -18,10 +18,6 @@ from datawarp.observability import init as init_logger, print_summary as observa
 
 logger = logging.getLogger(__name__)
 
-# File cache: url → Path (session-scoped, cleared per manifest)
-_file_cache = {}
-
-
 @dataclass
 class FileResult:
     """Result of loading a single file."""
@@ -47,6 +43,7 @@ class BatchStats:
     total_duration: float = 0.0
     file_results: List[FileResult] = field(default_factory=list)
     errors: List[Dict] = None
+    download_stats: Dict = field(default_factory=dict)  # Delta of utils.download stats for this batch
 
     def __post_init__(self):
         if self.errors is None:
@@ -112,6 +109,7 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
     Features:
     - Idempotent: skips already-loaded files
     - Resilient: continues on errors
+    - Resumable: a failed file restarts from its last committed chunk
     - Trackable: full audit trail in database
     - Chronological: loads oldest files first
 
@@ -124,6 +122,24 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
     Returns:
         BatchStats with load results
     """
+    from datawarp.utils.download import clear_download_cache
+    from datawarp.core.extractor import clear_workbook_cache
+    from datawarp.utils.zip_handler import hold_zip_cache, release_zip_cache
+
+    # Keep ZIP archives open across files (members of one archive share a handle)
+    hold_zip_cache()
+    try:
+        return _load_from_manifest(manifest_path, force_reload, auto_heal_mode, unpivot_enabled, quiet)
+    finally:
+        # Clear file caches after manifest completes, also on errors and Ctrl+C
+        clear_download_cache()
+        clear_workbook_cache()
+        release_zip_cache()
+
+
+def _load_from_manifest(manifest_path: str, force_reload: bool, auto_heal_mode: str,
+                        unpivot_enabled: bool, quiet: bool) -> BatchStats:
+    """Body of load_from_manifest; the caller holds and clears the file caches."""
     # Suppress Python logger warnings and pandas warnings when quiet mode is active
     if quiet:
         import logging as log_module
@@ -141,6 +157,8 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
 
     batch_start = time.time()
     stats = BatchStats()
+    from datawarp.utils.download import get_download_stats
+    downloads_before = get_download_stats()
     
     # Initialize observability logger
     obs_logger = None
@@ -349,21 +367,10 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
                             else:
                                 print(f"         Consider --unpivot transformation for schema stability")
 
-                # Handle ZIP extraction (extract_filename already set above)
-                file_url = url
-                
-                if extract_filename:
-                    # This is a ZIP file - extract the specified file
-                    from datawarp.utils.download import download_file
-                    from datawarp.utils.zip_handler import extract_file_from_zip
-                    
-                    # Download ZIP once and cache for reuse
-                    if url not in _file_cache:
-                        _file_cache[url] = download_file(url)
-                    
-                    # Extract the specific file from ZIP
-                    file_url = str(extract_file_from_zip(_file_cache[url], extract_filename))
-                
+                # ZIP members (extract_filename set above) are streamed by load_file from
+                # the downloaded archive; download_file's session cache downloads it once
+                # per manifest however many members are loaded from it
+
                 # Force reload: delete existing manifest record if it exists
                 if force_reload:
                     with get_connection() as conn:
@@ -391,7 +398,7 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
                     )
                 
                 result = load_file(
-                    url=file_url,  # Use extracted file path or original URL
+                    url=url,
                     source_id=source_code,
                     sheet_name=sheet_name,
                     mode=file_mode,
@@ -402,7 +409,8 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
                     column_mappings=column_mappings,  # Enriched manifest column semantics
                     unpivot=unpivot_enabled,  # Optional wide→long transformation
                     wide_date_info=wide_date_info,  # Pre-computed wide date detection
-                    quiet=quiet  # Suppress output for progress display
+                    quiet=quiet,  # Suppress output for progress display
+                    extract=extract_filename  # Member to stream when url is a ZIP
                 )
 
                 # Stop spinner before checking result
@@ -524,7 +532,7 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
                             # Retry the load
 
                             result = load_file(
-                                url=file_url,
+                                url=url,
                                 source_id=source_code,
                                 sheet_name=sheet_name,
                                 mode=file_mode,
@@ -533,7 +541,8 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
                                 manifest_file_id=manifest_file_id,
                                 progress_callback=update_stage,
                                 column_mappings=column_mappings,
-                                quiet=quiet  # Suppress output for progress display
+                                quiet=quiet,  # Suppress output for progress display
+                                extract=extract_filename
                             )
                             
                             # Success! Record it
@@ -681,6 +690,8 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
 
     # Calculate total duration and get actual DB stats
     stats.total_duration = time.time() - batch_start
+    downloads_after = get_download_stats()
+    stats.download_stats = {k: downloads_after[k] - downloads_before[k] for k in downloads_after}
 
     # Get actual final column count from the table
     try:
@@ -703,13 +714,6 @@ def load_from_manifest(manifest_path: str, force_reload: bool = False, auto_heal
         else:
             print_summary(stats, manifest_name)  # Fallback to old summary
 
-    # Clear file caches after manifest completes
-    _file_cache.clear()
-    from datawarp.utils.download import clear_download_cache
-    from datawarp.core.extractor import clear_workbook_cache
-    clear_download_cache()
-    clear_workbook_cache()
-
     return stats
 
 
@@ -726,6 +730,9 @@ def print_summary(stats: BatchStats, manifest_name: str):
     print(f"  • Loaded: {stats.loaded} files ({stats.total_rows:,} rows)")
     if stats.failed > 0:
         print(f"  • Failed: {stats.failed} files ❌")
+    if stats.download_stats.get('requests'):
+        from datawarp.utils.download import format_download_stats
+        print(f"  • Downloads: {format_download_stats(stats.download_stats)}")
     
     # 3. Insights (only if we successfully loaded something)
     if stats.loaded > 0:
@@ -9,6 +9,7 @@ from typing import Any, Optional
 # Include both statistical suppression (*, c, z, x) and data quality markers
 SUPPRESSED_VALUES = {':', '..', '.', '-', '*', 'c', 'z', 'x', '[c]', '[z]', '[x]', 'n/a', 'na', 'low dq', 'unknown'}
 BATCH_SIZE = 1000
+CHUNK_SIZE = 50000  # Rows per committed chunk for resumable loads
 
 
 def is_null(value: Any) -> bool:
@@ -150,34 +151,20 @@ def cast_value(value: Any, target_type: str) -> Any:
     return cast_text(value)
 
 
-def insert_dataframe(
+def prepare_dataframe(
     df: pd.DataFrame,
-    table_name: str,
-    schema_name: str,
-    load_id: int,  # ← Added: Load ID for lineage tracking
-    period: Optional[str] = None,  # ← NEW: Time period from manifest
-    manifest_file_id: Optional[int] = None,  # ← NEW: Manifest file tracking ID
-    conn=None
-) -> int:
-    """Insert DataFrame rows into table.
-    
-    Args:
-        df: DataFrame to insert
-        table_name: Table name (no schema prefix)
-        schema_name: Schema name
-        load_id: Load ID from tbl_load_history for row-level lineage
-        conn: Database connection (if None, will get from env)
-        
+    load_id: int,
+    period: Optional[str] = None,
+    manifest_file_id: Optional[int] = None
+) -> pd.DataFrame:
+    """Stamp provenance columns and clean values ready for COPY.
+
+    Runs over the whole DataFrame so type fixes (float → Int64, month-year
+    dates) are decided once, not differently per chunk.
+
     Returns:
-        Number of rows inserted
+        New DataFrame (input is not mutated)
     """
-    if conn is None:
-        from datawarp.storage.repository import get_connection
-        conn = get_connection()
-    
-    if df.empty:
-        return 0
-    
     # Stamp rows with provenance
     df = df.copy()  # Don't mutate the original
     df['_load_id'] = load_id
@@ -229,21 +216,21 @@ def insert_dataframe(
                 if re.match(r'^[A-Z]{3}\d{4}$', sample_val):
                     # Convert NOV2022 -> 2022-11-01
                     df[col] = df[col].apply(lambda x: cast_date(x).strftime("%Y-%m-%d") if pd.notna(x) else None)
-    
-    
-    cursor = conn.cursor()
-    
-    # Build INSERT statement
-    columns = list(df.columns)
-    # Quote column names to handle special characters
-    col_names = ", ".join([f'"{col}"' for col in columns])
-    placeholders = ", ".join(["%s"] * len(columns))
-    
-    qualified_table = f"{schema_name}.{table_name}"
-    
+
+    return df
+
+
+def copy_rows(df: pd.DataFrame, table_name: str, schema_name: str, conn) -> int:
+    """COPY a prepared DataFrame into the table. Does NOT commit.
+
+    Returns:
+        Number of rows copied
+    """
     # Use PostgreSQL COPY for 10-100x faster bulk insert
     import io
-    
+
+    qualified_table = f"{schema_name}.{table_name}"
+
     # Prepare data as CSV in memory
     buffer = io.StringIO()
     df.to_csv(buffer, index=False, header=False, na_rep='\\N')
@@ -251,13 +238,110 @@ def insert_dataframe(
     
     # COPY from buffer
     cursor = conn.cursor()
-    columns = list(df.columns)
-    col_names = ", ".join([f'"{col}"' for col in columns])
+    # Quote column names to handle special characters
+    col_names = ", ".join([f'"{col}"' for col in df.columns])
     
     copy_sql = f"COPY {qualified_table} ({col_names}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
     cursor.copy_expert(copy_sql, buffer)
-    
-    conn.commit()
     cursor.close()
     
     return len(df)
+
+
+def insert_dataframe(
+    df: pd.DataFrame,
+    table_name: str,
+    schema_name: str,
+    load_id: int,  # ← Added: Load ID for lineage tracking
+    period: Optional[str] = None,  # ← NEW: Time period from manifest
+    manifest_file_id: Optional[int] = None,  # ← NEW: Manifest file tracking ID
+    conn=None
+) -> int:
+    """Insert DataFrame rows into table.
+    
+    Args:
+        df: DataFrame to insert
+        table_name: Table name (no schema prefix)
+        schema_name: Schema name
+        load_id: Load ID from tbl_load_history for row-level lineage
+        conn: Database connection (if None, will get from env)
+        
+    Returns:
+        Number of rows inserted
+    """
+    if conn is None:
+        from datawarp.storage.repository import get_connection
+        conn = get_connection()
+    
+    if df.empty:
+        return 0
+    
+    df = prepare_dataframe(df, load_id, period, manifest_file_id)
+    rows = copy_rows(df, table_name, schema_name, conn)
+    conn.commit()
+    
+    return rows
+
+
+def insert_dataframe_chunked(
+    df: pd.DataFrame,
+    table_name: str,
+    schema_name: str,
+    load_id: int,
+    manifest_file_id: int,
+    period: Optional[str] = None,
+    conn=None,
+    chunk_size: int = CHUNK_SIZE,
+    start_chunk: int = 0,
+    on_chunk=None,
+    start_row: Optional[int] = None
+) -> int:
+    """Insert DataFrame in fixed-size chunks, checkpointing each commit.
+
+    Each chunk's COPY and its tbl_load_checkpoints row are committed in one
+    transaction, so a checkpoint exists if and only if the chunk's rows do.
+    A rerun passes start_row = last checkpoint's row_end and start_chunk =
+    its chunk_index + 1 with the same load_id, giving exactly-once rows per
+    _load_id even if chunk_size differs from the interrupted run.
+
+    Args:
+        df: DataFrame to insert (full file, not just the remaining rows)
+        manifest_file_id: tbl_manifest_files.id the checkpoints belong to
+        chunk_size: Rows per chunk/transaction
+        start_chunk: Index of the first chunk written by this call
+        start_row: DataFrame row to resume from (default start_chunk * chunk_size)
+        on_chunk: Optional callback(chunk_index, rows_done, total_rows)
+
+    Returns:
+        Number of rows inserted in THIS call (excludes resumed chunks)
+    """
+    from datawarp.storage import repository
+
+    if df.empty:
+        return 0
+
+    df = prepare_dataframe(df, load_id, period, manifest_file_id)
+    total_rows = len(df)
+    inserted = 0
+
+    if start_row is None:
+        start_row = start_chunk * chunk_size
+
+    for chunk_index, row_start in enumerate(range(start_row, total_rows, chunk_size), start_chunk):
+        row_end = min(row_start + chunk_size, total_rows)
+        try:
+            rows = copy_rows(df.iloc[row_start:row_end], table_name, schema_name, conn)
+            repository.record_load_checkpoint(
+                manifest_file_id, load_id, chunk_index, row_start, row_end, rows, total_rows, conn
+            )
+            conn.commit()
+        except Exception:
+            # Only this chunk is lost; earlier chunks stay committed for resume
+            conn.rollback()
+            raise
+
+        inserted += rows
+        if on_chunk:
+            on_chunk(chunk_index, row_end, total_rows)
+
+    return inserted
@@ -11,9 +11,10 @@ from datawarp.core.drift import detect_drift
 from datawarp.storage.connection import get_connection
 from datawarp.storage import repository
 from datawarp.loader.ddl import create_table, add_columns
-from datawarp.loader.insert import insert_dataframe
+from datawarp.loader.insert import insert_dataframe, insert_dataframe_chunked, CHUNK_SIZE
 from datawarp.utils.download import download_file
 from datawarp.supervisor.events import EventStore, create_event, EventType, EventLevel
+from datawarp.utils.zip_handler import ZipMember, hold_zip_cache, release_zip_cache
 
 log = logging.getLogger(__name__)
 
@@ -104,18 +105,30 @@ def load_file(
     wide_date_info: Optional[dict] = None,
     event_store: Optional[EventStore] = None,
     publication: str = None,
-    quiet: bool = False
+    quiet: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    extract: Optional[str] = None
 ) -> LoadResult:
     """Load a file. Handle drift. That's it.
 
+    When manifest_file_id is given, rows are inserted in chunks of chunk_size,
+    each checkpointed in tbl_load_checkpoints. A rerun for the same manifest
+    file resumes after the last committed chunk and reuses its _load_id.
+
     Args:
         unpivot: If True and wide date pattern detected, transform to long format
         wide_date_info: Pre-computed wide date detection results from manifest
         event_store: Optional EventStore for observability
         publication: Publication code for event logging
+        chunk_size: Rows per committed chunk (checkpointed loads only)
+        extract: Member to load when url is a ZIP (streamed, not extracted to
+            disk); sheet_name then selects the sheet inside it. Without it,
+            sheet_name names the ZIP member (legacy behaviour).
     """
     start = datetime.utcnow()
     columns_added = []
+    # Load history key: a ZIP member is tracked as url#member (matches manifest tracking)
+    history_url = f"{url}#{extract}" if extract else url
 
     if event_store:
         event_store.emit(create_event(
@@ -129,6 +142,8 @@ def load_file(
             context={'source_id': source_id, 'url': url, 'mode': mode}
         ))
     
+    # A batch holds the ZIP cache across files; a standalone load owns it
+    hold_zip_cache()
     try:
         # 1. Download
         if event_store:
@@ -166,11 +181,15 @@ def load_file(
             source = repository.get_source(source_id, conn)
             if not source:
                 raise ValueError(f"Source '{source_id}' not registered")
+
+            # 2.4 Resume state: chunks committed by a previous failed attempt
+            checkpoints = repository.get_load_checkpoints(manifest_file_id, conn) if manifest_file_id else []
             
             # 2.5 Check for duplicate load (URL-based deduplication)
-            existing = check_already_loaded(url, source.id, conn)
+            # Skipped when resuming: the history entry is our own partial load
+            existing = check_already_loaded(history_url, source.id, conn)
             
-            if existing['loaded'] and mode == 'append' and not force:
+            if existing['loaded'] and mode == 'append' and not force and not checkpoints:
                 # File already loaded - abort to prevent duplicates
                 when_str = existing['when'].strftime('%Y-%m-%d %H:%M:%S') if existing['when'] else 'unknown'
                 raise ValueError(
@@ -182,13 +201,14 @@ def load_file(
         from pathlib import Path
         file_ext = Path(filepath).suffix.lower()
 
-        # Handle ZIP files - extract specified file first
+        # Handle ZIP files - stream the specified member straight into the extractor
         zip_file_name = None  # Track ZIP filename for EventStore messages
         if file_ext == '.zip':
-            if not sheet_name:  # For ZIP, sheet_name is actually the extract filename
+            member_name = extract or sheet_name
+            if not member_name:
                 raise ValueError("ZIP files require 'extract' field in manifest to specify which file to extract")
-
-            from datawarp.utils.zip_handler import extract_file_from_zip
+            if not extract:
+                sheet_name = None  # Legacy: sheet_name was the member name
 
             zip_file_name = Path(filepath).name  # Save ZIP filename
 
@@ -200,15 +220,14 @@ def load_file(
                     period=period,
                     stage='extract',
                     level=EventLevel.DEBUG,
-                    message=f"Extracting {sheet_name} from ZIP: {zip_file_name}",
-                    context={'zip_file': str(filepath), 'extract': sheet_name}
+                    message=f"Extracting {member_name} from ZIP: {zip_file_name}",
+                    context={'zip_file': str(filepath), 'extract': member_name}
                 ))
 
-            filepath = extract_file_from_zip(Path(filepath), sheet_name)
-            file_ext = Path(filepath).suffix.lower()
+            filepath = ZipMember(Path(filepath), member_name)
+            file_ext = filepath.suffix
 
             if event_store:
-                extracted_name = Path(filepath).name
                 event_store.emit(create_event(
                     EventType.STAGE_COMPLETED,
                     event_store.run_id,
@@ -216,14 +235,14 @@ def load_file(
                     period=period,
                     stage='extract',
                     level=EventLevel.DEBUG,
-                    message=f"Processing {file_ext.upper()[1:]}: {extracted_name} from ZIP file {zip_file_name}",
+                    message=f"Processing {file_ext.upper()[1:]}: {Path(member_name).name} from ZIP file {zip_file_name}",
                     context={'extracted_path': str(filepath), 'zip_file': zip_file_name}
                 ))
 
         if file_ext == '.csv':
-            extractor = CSVExtractor(str(filepath), sheet_name=None)  # CSV doesn't have sheets
+            extractor = CSVExtractor(filepath, sheet_name=None)  # CSV doesn't have sheets
         elif file_ext in ['.xlsx', '.xls']:
-            extractor = FileExtractor(str(filepath), sheet_name)
+            extractor = FileExtractor(filepath, sheet_name)
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
         
@@ -246,7 +265,7 @@ def load_file(
 
             # If no sheet specified and first sheet is metadata, suggest trying a different sheet
             if not sheet_name and structure.sheet_type.name == 'METADATA':
-                sheets = FileExtractor.get_sheet_names(str(filepath))
+                sheets = FileExtractor.get_sheet_names(filepath)
                 raise ValueError(
                     f"{error_msg}. "
                     f"File has {len(sheets)} sheets. Try specifying --sheet with one of: {', '.join(sheets[:5])}"
@@ -306,6 +325,23 @@ def load_file(
         file_columns = list(df.columns)
         
         with get_connection() as conn:
+            # 3.7 Validate resume state against the file we just extracted
+            if checkpoints and checkpoints[-1]['total_rows'] != len(df):
+                # Source changed since the failed attempt - undo its chunks and start over
+                stale_load_id = checkpoints[-1]['load_id']
+                log.warning(
+                    f"Discarding {len(checkpoints)} checkpoints for {source_id}: file now has "
+                    f"{len(df):,} rows, checkpoints expected {checkpoints[-1]['total_rows']:,}"
+                )
+                cur = conn.cursor()
+                cur.execute(
+                    f"DELETE FROM {source.schema_name}.{source.table_name} WHERE _load_id = %s",
+                    (stale_load_id,)
+                )
+                cur.close()
+                repository.clear_load_checkpoints(manifest_file_id, conn)
+                checkpoints = []
+
             # 4. Ensure table exists
             db_columns = repository.get_db_columns(source.table_name, source.schema_name, conn)
             
@@ -339,7 +375,8 @@ def load_file(
                     ))
             else:
                 # Handle replace mode - period-aware deletion ONLY (no table truncation)
-                if mode == 'replace':
+                # Not on resume: the period was already cleared and refilled by earlier chunks
+                if mode == 'replace' and not checkpoints:
                     if not period:
                         raise ValueError(
                             "Replace mode requires a 'period' to avoid accidental data loss. "
@@ -396,7 +433,18 @@ def load_file(
                 progress_callback("uploading")
             
             # 6. Create audit entry (get load_id for lineage tracking)
-            load_id = repository.log_load(source.id, url, rows, columns_added, mode, conn)
+            # On resume reuse the original load_id so every row is stamped exactly once
+            if checkpoints:
+                # Resume by row offset, not chunk number: chunk_size may differ from the failed run
+                load_id = checkpoints[-1]['load_id']
+                start_chunk = checkpoints[-1]['chunk_index'] + 1
+                start_row = checkpoints[-1]['row_end']
+                if not quiet:
+                    print(f"      Resuming from row {start_row:,} ({len(checkpoints)} chunks already committed)")
+            else:
+                load_id = repository.log_load(source.id, history_url, rows, columns_added, mode, conn)
+                start_chunk = 0
+                start_row = 0
             
             # 7. Insert data with load_id stamping
             if event_store:
@@ -408,10 +456,18 @@ def load_file(
                     stage='insert',
                     level=EventLevel.DEBUG,
                     message=f"Inserting {rows:,} rows into {source.schema_name}.{source.table_name}",
-                    context={'rows': rows, 'table': f"{source.schema_name}.{source.table_name}"}
+                    context={'rows': rows, 'table': f"{source.schema_name}.{source.table_name}",
+                             'load_id': load_id, 'start_chunk': start_chunk, 'start_row': start_row}
                 ))
 
-            insert_dataframe(df, source.table_name, source.schema_name, load_id, period, manifest_file_id, conn)
+            if manifest_file_id:
+                insert_dataframe_chunked(
+                    df, source.table_name, source.schema_name, load_id, manifest_file_id,
+                    period=period, conn=conn, chunk_size=chunk_size, start_chunk=start_chunk,
+                    start_row=start_row
+                )
+            else:
+                insert_dataframe(df, source.table_name, source.schema_name, load_id, period, manifest_file_id, conn)
 
             if event_store:
                 event_store.emit(create_event(
@@ -473,3 +529,6 @@ def load_file(
             duration_ms=duration_ms,
             error=str(e)
         )
+    finally:
+        # Outside a batch, close the archive this load opened
+        release_zip_cache()
@@ -2,10 +2,12 @@
 
 from .manifest import generate_manifest, ManifestResult
 from .enricher import enrich_manifest, EnrichmentResult
-from .exporter import export_source_to_parquet, export_publication_to_parquet, ExportResult
+from .exporter import (
+    export_source_to_parquet, export_sources_to_parquet, export_publication_to_parquet, ExportResult
+)
 
 __all__ = [
     'generate_manifest', 'ManifestResult',
     'enrich_manifest', 'EnrichmentResult',
-    'export_source_to_parquet', 'export_publication_to_parquet', 'ExportResult'
+    'export_source_to_parquet', 'export_sources_to_parquet', 'export_publication_to_parquet', 'ExportResult'
 ]
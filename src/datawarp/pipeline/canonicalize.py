@@ -4,7 +4,12 @@ This module ensures cross-period consolidation by stripping temporal identifiers
 from LLM-generated source codes, enabling consistent table naming across periods.
 """
 import re
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from datawarp.registry.fingerprint import (
+    find_registry_match, register_canonical_source, source_fingerprint, fingerprint_to_json
+)
+from datawarp.storage import repository
 
 
 def remove_date_patterns(code: str) -> str:
@@ -116,3 +121,41 @@ def canonicalize_manifest(manifest: Dict) -> Dict:
     ]
 
     return manifest
+
+
+def match_registry_sources(manifest: Dict, conn, publication: str = None, period: str = None,
+                           threshold: float = 0.80) -> Dict[str, Tuple[str, float]]:
+    """Report registry matches for new source codes by structural fingerprint, and register sources.
+
+    An unregistered (date-stripped) code is matched against the same
+    publication's sources in tbl_canonical_sources through the persisted LSH
+    buckets. A match at or above threshold is recorded in tbl_source_mappings
+    (unreviewed) for a person to confirm; the manifest is not changed, so the
+    source still loads under its own code and table. Every source with
+    columns is then upserted with its current fingerprint, MinHash signature
+    and buckets. Caller commits.
+
+    Returns:
+        {new code: (matching canonical code, confidence)} for reported matches
+    """
+    matches = {}
+    manifest_codes = {source.get('code') for source in manifest.get('sources', [])}
+
+    for source in manifest.get('sources', []):
+        fp = source_fingerprint(source)
+        if fp is None or 'code' not in source:
+            continue
+
+        code = source['code']
+        if publication and repository.get_canonical_source(code, conn) is None:
+            match_code, confidence = find_registry_match(fp, conn, threshold, publication_id=publication)
+            # Sources of this same manifest are siblings, not earlier names
+            if match_code and match_code not in manifest_codes:
+                matches[code] = (match_code, confidence)
+                repository.log_source_mapping(code, period, match_code, confidence, 'fingerprint',
+                                              fingerprint_to_json(fp), conn)
+
+        register_canonical_source(code, fp, conn, publication_id=publication,
+                                  name=source.get('name'), table=source.get('table'), period=period)
+
+    return matches
@@ -5,15 +5,21 @@ Integrates with EventStore for observability.
 """
 import yaml
 import os
+import copy
 import json
 import re
 import time
+import hashlib
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from dotenv import load_dotenv
-from collections import OrderedDict
+from collections import OrderedDict, Counter, defaultdict
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Union, Any, Callable
 import uuid
 
 from datawarp.supervisor.events import EventStore, create_event, EventType, EventLevel
@@ -22,6 +28,12 @@ from datawarp.pipeline.column_compressor import compress_manifest_for_enrichment
 
 load_dotenv()
 
+# Generation config for enrichment calls (part of the response cache key)
+GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "max_output_tokens": 65536
+}
+
 
 # === DATABASE OBSERVABILITY FUNCTIONS ===
 # Ported from enrich_manifest_old.py to restore full database tracking
@@ -56,7 +68,8 @@ def _log_enrichment_start(manifest_name: str, total_sources: int,
 def _log_enrichment_complete(run_id: Optional[uuid.UUID], status: str,
                              validation_status: str, duration_ms: int,
                              total_input_tokens: int = 0, total_output_tokens: int = 0,
-                             reference_matched: int = 0, error_message: str = None) -> None:
+                             reference_matched: int = 0, error_message: str = None,
+                             total_api_calls: int = 1) -> None:
     """Update enrichment run with completion status.
 
     Updates datawarp.tbl_enrichment_runs with final metrics.
@@ -81,21 +94,42 @@ def _log_enrichment_complete(run_id: Optional[uuid.UUID], status: str,
                     total_input_tokens = %s,
                     total_output_tokens = %s,
                     total_cost = %s,
-                    total_api_calls = 1,
+                    total_api_calls = %s,
                     reference_matched = %s,
                     error_message = %s
                 WHERE run_id = %s
             """, (status, validation_status, duration_ms, total_input_tokens,
-                  total_output_tokens, total_cost, reference_matched, error_message, str(run_id)))
+                  total_output_tokens, total_cost, total_api_calls, reference_matched, error_message, str(run_id)))
             conn.commit()
     except Exception as e:
         print(f"⚠️  Failed to log enrichment completion: {e}")
 
 
+_api_call_cache_columns: Optional[bool] = None
+
+
+def _api_calls_have_cache_columns(conn) -> bool:
+    """Whether tbl_enrichment_api_calls has the cache columns (checked once per process)."""
+    global _api_call_cache_columns
+    if _api_call_cache_columns is None:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = 'datawarp' AND table_name = 'tbl_enrichment_api_calls'
+              AND column_name IN ('cache_hit', 'latency_saved_ms')
+        """)
+        _api_call_cache_columns = cur.fetchone()[0] == 2
+        if not _api_call_cache_columns:
+            print("⚠️  tbl_enrichment_api_calls has no cache columns - run scripts/schema/08_enrichment_cache.sql; "
+                  "logging API calls without cache_hit/latency_saved_ms")
+    return _api_call_cache_columns
+
+
 def _log_api_call(run_id: Optional[uuid.UUID], input_tokens: int, output_tokens: int,
                   latency_ms: int, model_name: str, status: str = 'success',
-                  error_message: str = None) -> float:
-    """Log individual LLM API call metrics.
+                  error_message: str = None, prompt_hash: str = None,
+                  cache_hit: bool = False, latency_saved_ms: int = None) -> float:
+    """Log individual LLM API call metrics (or a cache hit that replaced one).
 
     Writes to datawarp.tbl_enrichment_api_calls.
     Returns total cost for this call.
@@ -111,15 +145,26 @@ def _log_api_call(run_id: Optional[uuid.UUID], input_tokens: int, output_tokens:
 
         with get_connection() as conn:
             cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO datawarp.tbl_enrichment_api_calls
-                (run_id, call_timestamp, input_tokens, output_tokens, total_tokens,
-                 input_cost, output_cost, total_cost, latency_ms, model_name,
-                 status, error_message)
-                VALUES (%s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (str(run_id), input_tokens, output_tokens, input_tokens + output_tokens,
-                  input_cost, output_cost, total_cost, latency_ms, model_name,
-                  status, error_message))
+            params = (str(run_id), input_tokens, output_tokens, input_tokens + output_tokens,
+                      input_cost, output_cost, total_cost, latency_ms, model_name,
+                      status, error_message, prompt_hash)
+            # Cache columns only exist once 08_enrichment_cache.sql has run
+            if _api_calls_have_cache_columns(conn):
+                cur.execute("""
+                    INSERT INTO datawarp.tbl_enrichment_api_calls
+                    (run_id, call_timestamp, input_tokens, output_tokens, total_tokens,
+                     input_cost, output_cost, total_cost, latency_ms, model_name,
+                     status, error_message, prompt_hash, cache_hit, latency_saved_ms)
+                    VALUES (%s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, params + (cache_hit, latency_saved_ms))
+            else:
+                cur.execute("""
+                    INSERT INTO datawarp.tbl_enrichment_api_calls
+                    (run_id, call_timestamp, input_tokens, output_tokens, total_tokens,
+                     input_cost, output_cost, total_cost, latency_ms, model_name,
+                     status, error_message, prompt_hash)
+                    VALUES (%s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, params)
             conn.commit()
 
         return total_cost
@@ -127,6 +172,80 @@ def _log_api_call(run_id: Optional[uuid.UUID], input_tokens: int, output_tokens:
         print(f"⚠️  Failed to log API call: {e}")
         return 0.0
 
+
+# === LLM RESPONSE CACHE ===
+# Persistent cache in datawarp.tbl_enrichment_cache keyed by
+# (prompt hash, model name, generation config). Failures are non-fatal (treated as a miss).
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def _cache_key(prompt_hash: str, model_name: str, generation_config: dict) -> str:
+    key = json.dumps([prompt_hash, model_name, generation_config], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _cache_enabled() -> bool:
+    return os.getenv('DATAWARP_LLM_CACHE', '1').lower() not in ('0', 'false', 'off')
+
+
+def _cache_lookup(cache_key: str, ttl_hours: Optional[float] = None) -> Optional[dict]:
+    """Return cached response row (response_yaml, tokens, latency) or None.
+
+    Entries older than ttl_hours are ignored (None/0 = never expire).
+    """
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                UPDATE datawarp.tbl_enrichment_cache
+                SET hit_count = hit_count + 1, last_hit_at = NOW()
+                WHERE cache_key = %s
+                  AND (%s::float IS NULL OR created_at > NOW() - %s::float * INTERVAL '1 hour')
+                RETURNING response_yaml, input_tokens, output_tokens, latency_ms
+            """, (cache_key, ttl_hours or None, ttl_hours or None))
+            row = cur.fetchone()
+            conn.commit()
+
+        if row:
+            return {
+                'response_yaml': row[0],
+                'input_tokens': row[1] or 0,
+                'output_tokens': row[2] or 0,
+                'latency_ms': row[3] or 0
+            }
+        return None
+    except Exception as e:
+        print(f"⚠️  LLM cache lookup failed: {e}")
+        return None
+
+
+def _cache_store(cache_key: str, prompt_hash: str, model_name: str, generation_config: dict,
+                 response_yaml: str, input_tokens: int, output_tokens: int, latency_ms: int) -> None:
+    """Store a successfully parsed response (replaces an expired entry with the same key)."""
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                INSERT INTO datawarp.tbl_enrichment_cache
+                (cache_key, prompt_hash, model_name, generation_config, response_yaml,
+                 input_tokens, output_tokens, latency_ms)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    response_yaml = EXCLUDED.response_yaml,
+                    input_tokens = EXCLUDED.input_tokens,
+                    output_tokens = EXCLUDED.output_tokens,
+                    latency_ms = EXCLUDED.latency_ms,
+                    created_at = NOW(),
+                    hit_count = 0,
+                    last_hit_at = NULL
+            """, (cache_key, prompt_hash, model_name, json.dumps(generation_config), response_yaml,
+                  input_tokens, output_tokens, latency_ms))
+            conn.commit()
+    except Exception as e:
+        print(f"⚠️  LLM cache store failed: {e}")
+
 # === END DATABASE OBSERVABILITY ===
 
 
@@ -275,6 +394,72 @@ def fuzzy_match_score(s1: str, s2: str) -> float:
     return SequenceMatcher(None, s1, s2).ratio()
 
 
+class ColumnNameIndex:
+    """Trigram inverted index over normalized reference column names.
+
+    Proposes fuzzy-match candidates so SequenceMatcher only runs on a short
+    list. Results are identical to scoring every name in order: candidates
+    are scored most-shared-trigrams first, and the rest are discarded only
+    when an upper bound on their ratio (length, then character counts)
+    cannot reach the threshold or beat the best score so far.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = list(names)
+        self._counts = [Counter(name) for name in self.names]
+        self._by_length = sorted((len(name), i) for i, name in enumerate(self.names))
+        self._lengths = [length for length, _ in self._by_length]
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in self._trigrams(name):
+                self._grams[gram].append(i)
+
+    @staticmethod
+    def _trigrams(name: str) -> set:
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _length_window(self, length: int, threshold: float) -> List[int]:
+        """Ids whose length allows ratio >= threshold (ratio <= 2*min/(la+lb))."""
+        if threshold <= 0:
+            return [i for _, i in self._by_length]
+        lo = bisect_left(self._lengths, math.ceil(length * threshold / (2 - threshold)) - 1)
+        hi = bisect_right(self._lengths, math.floor(length * (2 - threshold) / threshold) + 1)
+        return [i for _, i in self._by_length[lo:hi]]
+
+    def best_match(self, query: str, threshold: float, exclude=()) -> Optional[int]:
+        """Index of the first name with the highest ratio >= threshold, or None."""
+        shared = Counter()
+        for gram in self._trigrams(query):
+            for i in self._grams.get(gram, ()):
+                shared[i] += 1
+
+        window = [i for i in self._length_window(len(query), threshold) if i not in exclude]
+        window.sort(key=lambda i: (-shared[i], i))
+
+        query_counts = Counter(query)
+        best_id, best_score = None, 0.0
+
+        def can_win(i: int, bound: float) -> bool:
+            if bound < threshold or bound < best_score:
+                return False
+            return bound > best_score or (best_id is not None and i < best_id)
+
+        for i in window:
+            name = self.names[i]
+            total = len(query) + len(name)
+            # Cheap upper bounds on SequenceMatcher.ratio() (as real_quick_ratio, quick_ratio)
+            if not can_win(i, 2.0 * min(len(query), len(name)) / total):
+                continue
+            common = sum(min(n, self._counts[i][c]) for c, n in query_counts.items())
+            if not can_win(i, 2.0 * common / total):
+                continue
+            score = fuzzy_match_score(query, name)
+            if score >= threshold and can_win(i, score):
+                best_id, best_score = i, score
+        return best_id
+
+
 def compute_sheet_fingerprint(source: dict) -> str:
     """Compute structural fingerprint for sheet/source matching.
 
@@ -317,7 +502,9 @@ def compute_sheet_fingerprint(source: dict) -> str:
 def match_columns_to_reference(
     draft_columns: List,
     ref_columns: List,
-    fuzzy_threshold: float = 0.8
+    fuzzy_threshold: float = 0.8,
+    use_index: bool = True,
+    ref_index: Optional[ColumnNameIndex] = None
 ) -> Tuple[List[dict], List[dict]]:
     """Match draft columns against reference columns with fuzzy matching.
 
@@ -335,6 +522,10 @@ def match_columns_to_reference(
         draft_columns: Columns from current period's draft manifest
         ref_columns: Columns from reference manifest with semantic names
         fuzzy_threshold: Minimum similarity for fuzzy match (default 0.8 = 80%)
+        use_index: Propose fuzzy candidates from a ColumnNameIndex instead of
+            scoring every reference column (same matches, much faster on wide sheets)
+        ref_index: Prebuilt ColumnNameIndex over these reference columns (e.g. from
+            a compiled ReferenceIndex); rebuilt if it doesn't match them
 
     Returns:
         Tuple of (matched_columns, new_columns)
@@ -368,6 +559,12 @@ def match_columns_to_reference(
 
     # Track which reference columns have been matched (avoid double-matching)
     matched_ref_names = set()
+    ref_names = list(ref_by_name)
+    ref_ids = {name: i for i, name in enumerate(ref_names)}
+    matched_ref_ids = set()
+    index = None
+    if use_index:
+        index = ref_index if ref_index is not None and ref_index.names == ref_names else ColumnNameIndex(ref_names)
 
     for draft_col in draft_columns:
         draft_name = get_column_name(draft_col)
@@ -384,25 +581,31 @@ def match_columns_to_reference(
             merged = merge_column_metadata(draft_dict, ref_col)
             matched.append(merged)
             matched_ref_names.add(norm_draft)
+            matched_ref_ids.add(ref_ids[norm_draft])
             continue
 
         # Strategy 2: Fuzzy match
         best_match_name = None
         best_score = 0.0
 
-        for ref_name in ref_by_name:
-            if ref_name in matched_ref_names:
-                continue
-            score = fuzzy_match_score(norm_draft, ref_name)
-            if score >= fuzzy_threshold and score > best_score:
-                best_score = score
-                best_match_name = ref_name
+        if index is not None:
+            best_id = index.best_match(norm_draft, fuzzy_threshold, exclude=matched_ref_ids)
+            best_match_name = ref_names[best_id] if best_id is not None else None
+        else:
+            for ref_name in ref_by_name:
+                if ref_name in matched_ref_names:
+                    continue
+                score = fuzzy_match_score(norm_draft, ref_name)
+                if score >= fuzzy_threshold and score > best_score:
+                    best_score = score
+                    best_match_name = ref_name
 
         if best_match_name:
             ref_col = ref_by_name[best_match_name]
             merged = merge_column_metadata(draft_dict, ref_col)
             matched.append(merged)
             matched_ref_names.add(best_match_name)
+            matched_ref_ids.add(ref_ids[best_match_name])
             continue
 
         # No match found - needs LLM enrichment
@@ -436,9 +639,62 @@ def merge_column_metadata(draft_col: dict, ref_col: dict) -> dict:
     return merged
 
 
+def _preview_column_set(source: dict) -> set:
+    """Normalized column names from a source's first file preview."""
+    cols = set()
+    files = source.get('files', [])
+    if files:
+        preview = files[0].get('preview', {})
+        for col in preview.get('columns', []):
+            name = col.get('name', col.get('original_name', '')) if isinstance(col, dict) else str(col)
+            cols.add(normalize_column_name(name))
+    return cols
+
+
+class ReferenceSourceIndex:
+    """Fingerprints and column postings for a reference manifest's sources.
+
+    Built once per reference, so matching a draft source is a dict lookup plus
+    overlap counts for the references that share a column with it, instead of
+    recomputing every reference fingerprint and column set per draft source.
+    """
+
+    def __init__(self, ref_sources: List[dict]):
+        self.sources = list(ref_sources)
+        self._by_fingerprint: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, src in enumerate(self.sources):
+            self._by_fingerprint.setdefault(compute_sheet_fingerprint(src), i)
+            for name in _preview_column_set(src):
+                self._postings[name].append(i)
+
+    def match(self, draft_source: dict, overlap_threshold: float = 0.7) -> Optional[dict]:
+        # Strategy 1: Exact fingerprint match
+        draft_fp = compute_sheet_fingerprint(draft_source)
+        if draft_fp in self._by_fingerprint:
+            return self.sources[self._by_fingerprint[draft_fp]]
+
+        # Strategy 2: Column overlap match (for splits/merges/renames)
+        draft_cols = _preview_column_set(draft_source)
+        shared = Counter()
+        for name in draft_cols:
+            for i in self._postings.get(name, ()):
+                shared[i] += 1
+
+        best_match = None
+        best_overlap = 0.0
+        for i in sorted(shared):
+            overlap = shared[i] / max(len(draft_cols), 1)
+            if overlap >= overlap_threshold and overlap > best_overlap:
+                best_overlap = overlap
+                best_match = self.sources[i]
+
+        return best_match
+
+
 def match_source_to_reference_by_fingerprint(
     draft_source: dict,
-    ref_sources: List[dict],
+    ref_sources: Union[List[dict], ReferenceSourceIndex],
     overlap_threshold: float = 0.7
 ) -> Optional[dict]:
     """Find best matching reference source using fingerprint and column overlap.
@@ -450,53 +706,16 @@ def match_source_to_reference_by_fingerprint(
 
     Args:
         draft_source: Source from current period's draft
-        ref_sources: All sources from reference manifest
+        ref_sources: All sources from reference manifest, or a ReferenceSourceIndex
+            built once over them (for matching many draft sources)
         overlap_threshold: Minimum column overlap for partial match (default 0.7 = 70%)
 
     Returns:
         Best matching reference source, or None if no good match
     """
-    draft_fp = compute_sheet_fingerprint(draft_source)
-    draft_cols = set()
-
-    # Extract draft column names
-    files = draft_source.get('files', [])
-    if files:
-        preview = files[0].get('preview', {})
-        for col in preview.get('columns', []):
-            name = col.get('name', col.get('original_name', '')) if isinstance(col, dict) else str(col)
-            draft_cols.add(normalize_column_name(name))
-
-    # Strategy 1: Exact fingerprint match
-    for ref_src in ref_sources:
-        if compute_sheet_fingerprint(ref_src) == draft_fp:
-            return ref_src
-
-    # Strategy 2: Column overlap match (for splits/merges/renames)
-    best_match = None
-    best_overlap = 0.0
-
-    for ref_src in ref_sources:
-        ref_cols = set()
-        ref_files = ref_src.get('files', [])
-        if ref_files:
-            ref_preview = ref_files[0].get('preview', {})
-            for col in ref_preview.get('columns', []):
-                name = col.get('name', col.get('original_name', '')) if isinstance(col, dict) else str(col)
-                ref_cols.add(normalize_column_name(name))
-
-        if not draft_cols or not ref_cols:
-            continue
-
-        # Calculate overlap ratio
-        intersection = len(draft_cols & ref_cols)
-        overlap = intersection / max(len(draft_cols), 1)
-
-        if overlap >= overlap_threshold and overlap > best_overlap:
-            best_overlap = overlap
-            best_match = ref_src
-
-    return best_match
+    if not isinstance(ref_sources, ReferenceSourceIndex):
+        ref_sources = ReferenceSourceIndex(ref_sources)
+    return ref_sources.match(draft_source, overlap_threshold)
 
 
 # === END ROLLING REFERENCE FUNCTIONS ===
@@ -617,25 +836,166 @@ Include ALL columns with ALL required fields (name, original_name, description,
     return prompt
 
 
+def _generate_via_gemini(model_name: str, prompt: str) -> Tuple[str, int, int]:
+    """Generate with the Gemini API. Returns (text, input_tokens, output_tokens)."""
+    import google.generativeai as genai
+
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in .env")
+
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=GENERATION_CONFIG
+    )
+    response = model.generate_content(prompt)
+
+    input_tokens = 0
+    output_tokens = 0
+    if hasattr(response, 'usage_metadata'):
+        input_tokens = response.usage_metadata.prompt_token_count
+        output_tokens = response.usage_metadata.candidates_token_count
+    return response.text.strip(), input_tokens, output_tokens
+
+
+def _generate_via_endpoint(endpoint: str, model_name: str, prompt: str) -> Tuple[str, int, int]:
+    """Generate with an Ollama-style /api/generate endpoint. Returns (text, input_tokens, output_tokens)."""
+    import requests
+
+    response = requests.post(
+        f"{endpoint.rstrip('/')}/api/generate",
+        json={
+            'model': model_name,
+            'prompt': prompt,
+            'stream': False,
+            'options': {
+                'temperature': GENERATION_CONFIG['temperature'],
+                'num_predict': GENERATION_CONFIG['max_output_tokens']
+            }
+        },
+        timeout=600
+    )
+    response.raise_for_status()
+    body = response.json()
+    return body.get('response', '').strip(), body.get('prompt_eval_count', 0), body.get('eval_count', 0)
+
+
+_record_lock = threading.Lock()
+
+
+def _record_response(prompt_hash: str, model_name: str, text: str) -> None:
+    """Append the raw response to DATAWARP_LLM_RECORD_FILE (JSONL) for stub replay."""
+    record_file = os.getenv('DATAWARP_LLM_RECORD_FILE')
+    if not record_file:
+        return
+    with _record_lock, open(record_file, 'a') as f:
+        f.write(json.dumps({'prompt_hash': prompt_hash, 'model': model_name, 'response': text}) + '\n')
+
+
+class LLMResponseError(ValueError):
+    """An LLM response that did not parse or validate; carries the call's metadata."""
+
+    def __init__(self, message: str, metadata: dict):
+        super().__init__(message)
+        self.metadata = metadata
+
+
 def call_gemini_api(prompt: str, event_store: Optional[EventStore] = None,
                    publication: str = None, period: str = None,
-                   db_run_id: Optional[uuid.UUID] = None) -> Tuple[dict, dict]:
+                   db_run_id: Optional[uuid.UUID] = None,
+                   use_cache: Optional[bool] = None,
+                   validate: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, dict]:
     """Call Gemini API and return parsed response with metadata.
 
+    Responses are cached in tbl_enrichment_cache by (prompt hash, model,
+    generation config); a hit skips the API call and is logged with the
+    latency it avoided. Expiry via DATAWARP_LLM_CACHE_TTL_HOURS. Only
+    responses that parse and pass validate are cached, and a cached entry
+    that fails validate is ignored, so a retry always asks the model again.
+
+    If DATAWARP_LLM_ENDPOINT is set, the prompt goes to that Ollama-style
+    /api/generate endpoint instead of Gemini (e.g. a local model, or the
+    stub server in scripts/stub_llm.py).
+
     Args:
         prompt: The enrichment prompt
         event_store: Optional EventStore for file/console logging
         publication: Publication code for event logging
         period: Period for event logging
         db_run_id: Database run ID for tbl_enrichment_api_calls tracking
+        use_cache: Override DATAWARP_LLM_CACHE (default: enabled)
+        validate: Check applied to the parsed response before it is cached or
+            returned; its return value replaces the parsed response
+
+    Raises:
+        LLMResponseError: Response did not parse or failed validate
+        Exception: The API request itself failed; carries the attempt's
+            metadata (no tokens) as .metadata
     """
-    import google.generativeai as genai
-
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in .env")
-
     model_name = os.getenv('LLM_MODEL', 'gemini-2.0-flash-exp')
+    endpoint = os.getenv('DATAWARP_LLM_ENDPOINT')
+    prompt_hash = _prompt_hash(prompt)
+    # Responses from a stand-in endpoint must never be served for the real model
+    cache_config = {**GENERATION_CONFIG, 'endpoint': endpoint} if endpoint else GENERATION_CONFIG
+    cache_key = _cache_key(prompt_hash, model_name, cache_config)
+    use_cache = _cache_enabled() if use_cache is None else use_cache
+
+    if use_cache:
+        lookup_start = time.time()
+        ttl_hours = float(os.getenv('DATAWARP_LLM_CACHE_TTL_HOURS', '0')) or None
+        cached = _cache_lookup(cache_key, ttl_hours)
+        if cached:
+            try:
+                parsed = yaml.safe_load(cached['response_yaml'])
+                if validate:
+                    parsed = validate(parsed)
+            except Exception as e:
+                # Stored before validation existed, or validation rules changed
+                print(f"⚠️  Ignoring cached LLM response that no longer validates: {e}")
+                cached = None
+        if cached:
+            latency_ms = int((time.time() - lookup_start) * 1000)
+            _log_api_call(
+                run_id=db_run_id,
+                input_tokens=0,
+                output_tokens=0,
+                latency_ms=latency_ms,
+                model_name=model_name,
+                status='cache_hit',
+                prompt_hash=prompt_hash,
+                cache_hit=True,
+                latency_saved_ms=cached['latency_ms']
+            )
+
+            if event_store:
+                event_store.emit(create_event(
+                    EventType.LLM_CALL,
+                    event_store.run_id,
+                    publication=publication,
+                    period=period,
+                    stage='enrich',
+                    level=EventLevel.INFO,
+                    message=f"LLM cache hit ({cached['latency_ms']:,}ms avoided)",
+                    context={
+                        'cache_hit': True,
+                        'prompt_hash': prompt_hash,
+                        'latency_ms': latency_ms,
+                        'latency_saved_ms': cached['latency_ms'],
+                        'tokens_saved': cached['input_tokens'] + cached['output_tokens'],
+                        'model': model_name
+                    }
+                ))
+
+            metadata = {
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'latency_ms': latency_ms,
+                'model_name': model_name,
+                'cache_hit': True,
+                'latency_saved_ms': cached['latency_ms']
+            }
+            return parsed, metadata
 
     if event_store:
         event_store.emit(create_event(
@@ -649,26 +1009,74 @@ def call_gemini_api(prompt: str, event_store: Optional[EventStore] = None,
             context={'prompt_length': len(prompt), 'model': model_name}
         ))
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(
-        model_name=model_name,
-        generation_config={
-            "temperature": 0.1,
-            "max_output_tokens": 65536
-        }
-    )
-
     start_time = time.time()
-    response = model.generate_content(prompt)
+    try:
+        if endpoint:
+            raw_text, input_tokens, output_tokens = _generate_via_endpoint(endpoint, model_name, prompt)
+        else:
+            raw_text, input_tokens, output_tokens = _generate_via_gemini(model_name, prompt)
+    except Exception as e:
+        # Rate limits, timeouts, server errors: still an attempt against the API
+        latency_ms = int((time.time() - start_time) * 1000)
+        _log_api_call(
+            run_id=db_run_id,
+            input_tokens=0,
+            output_tokens=0,
+            latency_ms=latency_ms,
+            model_name=model_name,
+            status='error',
+            error_message=str(e),
+            prompt_hash=prompt_hash
+        )
+        e.metadata = {
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'latency_ms': latency_ms,
+            'model_name': model_name,
+            'cache_hit': False
+        }
+        raise
     latency_ms = int((time.time() - start_time) * 1000)
 
-    raw_text = response.text.strip()
+    _record_response(prompt_hash, model_name, raw_text)
 
-    input_tokens = 0
-    output_tokens = 0
-    if hasattr(response, 'usage_metadata'):
-        input_tokens = response.usage_metadata.prompt_token_count
-        output_tokens = response.usage_metadata.candidates_token_count
+    metadata = {
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'latency_ms': latency_ms,
+        'model_name': model_name,
+        'cache_hit': False
+    }
+    cleaned_text = clean_yaml_response(raw_text)
+
+    try:
+        parsed = yaml.safe_load(cleaned_text)
+        if validate:
+            parsed = validate(parsed)
+    except Exception as e:
+        error = f"YAML parse error: {e}" if isinstance(e, yaml.YAMLError) else f"Invalid LLM response: {e}"
+        _log_api_call(
+            run_id=db_run_id,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_ms=latency_ms,
+            model_name=model_name,
+            status='invalid_response',
+            error_message=error,
+            prompt_hash=prompt_hash
+        )
+        if event_store:
+            event_store.emit(create_event(
+                EventType.ERROR,
+                event_store.run_id,
+                publication=publication,
+                period=period,
+                level=EventLevel.ERROR,
+                message=error,
+                context={'raw_output_length': len(raw_text), 'input_tokens': input_tokens,
+                         'output_tokens': output_tokens}
+            ))
+        raise LLMResponseError(error, metadata) from e
 
     # Log API call to database (tbl_enrichment_api_calls)
     _log_api_call(
@@ -677,7 +1085,8 @@ def call_gemini_api(prompt: str, event_store: Optional[EventStore] = None,
         output_tokens=output_tokens,
         latency_ms=latency_ms,
         model_name=model_name,
-        status='success'
+        status='success',
+        prompt_hash=prompt_hash
     )
 
     if event_store:
@@ -697,30 +1106,232 @@ def call_gemini_api(prompt: str, event_store: Optional[EventStore] = None,
             }
         ))
 
-    cleaned_text = clean_yaml_response(raw_text)
+    if use_cache:
+        _cache_store(cache_key, prompt_hash, model_name, cache_config,
+                     cleaned_text, input_tokens, output_tokens, latency_ms)
 
-    try:
-        parsed = yaml.safe_load(cleaned_text)
+    return parsed, metadata
 
-        metadata = {
-            'input_tokens': input_tokens,
-            'output_tokens': output_tokens,
-            'latency_ms': latency_ms,
-            'model_name': model_name
-        }
-        return parsed, metadata
-    except yaml.YAMLError as e:
-        if event_store:
-            event_store.emit(create_event(
-                EventType.ERROR,
-                event_store.run_id,
-                publication=publication,
-                period=period,
-                level=EventLevel.ERROR,
-                message=f"YAML parse error: {e}",
-                context={'raw_output_length': len(raw_text)}
-            ))
-        raise
+
+# === BATCHED ENRICHMENT ===
+# Sources are packed into token-budgeted batches that are enriched concurrently
+# (under a shared rate limit). A failed batch is retried on its own, then split
+# into single sources, so one bad response no longer loses the whole publication.
+
+DEFAULT_BATCH_TOKENS = 12000   # Prompt budget for the sources YAML of one batch
+DEFAULT_LLM_CONCURRENCY = 4
+DEFAULT_LLM_RPM = 60           # Requests per minute across all batches
+BATCH_RETRIES = 2              # Retries per batch before splitting it
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for batch budgeting."""
+    return len(text) // 4 + 1
+
+
+def plan_enrichment_batches(sources: List[dict], token_budget: int) -> List[List[int]]:
+    """Pack source indexes into batches, in order, each within token_budget.
+
+    Sizes are measured on the compressed preview, which is what the prompt
+    contains. A source larger than the budget gets a batch of its own.
+    """
+    compressed, _ = compress_manifest_for_enrichment(sources)
+
+    batches, current, used = [], [], 0
+    for idx, source in enumerate(compressed):
+        tokens = estimate_tokens(yaml.dump([source], default_flow_style=False))
+        if current and used + tokens > token_budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(idx)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class _RateLimiter:
+    """Spaces request starts to at most per_minute per minute across threads."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _extract_sources(parsed) -> List[dict]:
+    """Pull the sources list out of the different response shapes the LLM returns."""
+    if isinstance(parsed, dict):
+        if 'sources' in parsed:
+            return parsed['sources']
+        if 'manifest' in parsed:
+            manifest_data = parsed['manifest']
+            if isinstance(manifest_data, list):
+                return manifest_data
+            if isinstance(manifest_data, dict):
+                return manifest_data.get('sources', [])
+    return parsed
+
+
+def _enrich_batch(manifest: dict, sources: List[dict], limiter: _RateLimiter,
+                  event_store: Optional[EventStore], publication: str, period: str,
+                  db_run_id: Optional[uuid.UUID]) -> Tuple[List[dict], dict]:
+    """Compress, prompt, parse, expand and validate one batch of sources."""
+    # COMPRESS: Detect repetitive column patterns to avoid token limits
+    compressed_sources, compression_map = compress_manifest_for_enrichment(sources)
+    prompt = build_enrichment_prompt(manifest, compressed_sources)
+
+    def check(parsed) -> List[dict]:
+        enriched = _extract_sources(parsed)
+        if not isinstance(enriched, list):
+            raise ValueError(f"Unexpected LLM response shape: {type(enriched).__name__}")
+
+        # EXPAND: Restore full column set with pattern-based metadata
+        if compression_map:
+            enriched = expand_manifest_from_enrichment(enriched, compression_map)
+
+        # Every file in the batch must come back exactly once
+        validate_enrichment({'sources': sources}, {'sources': enriched})
+        return enriched
+
+    limiter.wait()
+    # Validated before caching: a bad response is never replayed to the retry
+    return call_gemini_api(prompt, event_store, publication, period, db_run_id=db_run_id, validate=check)
+
+
+def _add_call(totals: dict, metadata: Optional[dict]) -> None:
+    """Count one LLM attempt (or cache hit) in the batch totals.
+
+    metadata is None only for failures before any API request was made.
+    """
+    if metadata is None:
+        return
+    totals['input_tokens'] += metadata.get('input_tokens', 0)
+    totals['output_tokens'] += metadata.get('output_tokens', 0)
+    if metadata.get('cache_hit'):
+        totals['cache_hits'] += 1
+    else:
+        totals['llm_calls'] += 1
+
+
+def enrich_sources_batched(
+    manifest: dict,
+    data_sources: List[dict],
+    event_store: Optional[EventStore] = None,
+    publication: str = None,
+    period: str = None,
+    db_run_id: Optional[uuid.UUID] = None,
+    token_budget: int = None,
+    max_workers: int = None,
+    requests_per_minute: float = None,
+    max_retries: int = BATCH_RETRIES
+) -> Tuple[List[dict], dict]:
+    """Enrich data sources in concurrent, token-budgeted LLM batches.
+
+    Budget, concurrency and rate limit default to DATAWARP_LLM_BATCH_TOKENS,
+    DATAWARP_LLM_CONCURRENCY and DATAWARP_LLM_RPM. Sources that still fail
+    after retrying alone are returned disabled (enabled: false) rather than
+    failing the publication.
+
+    Returns:
+        (enriched_sources in input order, aggregated metadata)
+    """
+    token_budget = token_budget or int(os.getenv('DATAWARP_LLM_BATCH_TOKENS', str(DEFAULT_BATCH_TOKENS)))
+    max_workers = max_workers or int(os.getenv('DATAWARP_LLM_CONCURRENCY', str(DEFAULT_LLM_CONCURRENCY)))
+    if requests_per_minute is None:
+        requests_per_minute = float(os.getenv('DATAWARP_LLM_RPM', str(DEFAULT_LLM_RPM)))
+
+    start_time = time.time()
+    batches = plan_enrichment_batches(data_sources, token_budget)
+    limiter = _RateLimiter(requests_per_minute)
+
+    if event_store:
+        event_store.emit(create_event(
+            EventType.INFO,
+            event_store.run_id,
+            publication=publication,
+            period=period,
+            stage='enrich',
+            message=f"Enriching {len(data_sources)} sources in {len(batches)} batches "
+                    f"(≤{token_budget:,} tokens each, {max_workers} concurrent)",
+            context={'batches': len(batches), 'token_budget': token_budget, 'concurrency': max_workers}
+        ))
+
+    results: Dict[int, List[dict]] = {}  # first source index → enriched sources
+    failed: List[int] = []
+    totals = {'input_tokens': 0, 'output_tokens': 0, 'llm_calls': 0, 'cache_hits': 0, 'retries': 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit(indexes, attempt):
+            future = pool.submit(_enrich_batch, manifest, [data_sources[i] for i in indexes],
+                                 limiter, event_store, publication, period, db_run_id)
+            pending[future] = (indexes, attempt)
+
+        pending = {}
+        for indexes in batches:
+            submit(indexes, 0)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                indexes, attempt = pending.pop(future)
+                try:
+                    enriched, metadata = future.result()
+                except Exception as e:
+                    # A failed or rejected API attempt still counts as a call
+                    _add_call(totals, getattr(e, 'metadata', None))
+                    codes = [data_sources[i].get('code', '?') for i in indexes]
+                    if attempt < max_retries:
+                        action = 'retrying'
+                        submit(indexes, attempt + 1)
+                    elif len(indexes) > 1:
+                        action = 'splitting into single sources'
+                        for i in indexes:
+                            submit([i], 0)
+                    else:
+                        action = 'disabling source'
+                        failed.append(indexes[0])
+                    totals['retries'] += action != 'disabling source'
+
+                    if event_store:
+                        event_store.emit(create_event(
+                            EventType.WARNING,
+                            event_store.run_id,
+                            publication=publication,
+                            period=period,
+                            stage='enrich',
+                            level=EventLevel.WARNING,
+                            message=f"Enrichment batch {codes} failed (attempt {attempt + 1}): {e} - {action}",
+                            context={'sources': codes, 'attempt': attempt + 1, 'error': str(e)}
+                        ))
+                    continue
+
+                results[indexes[0]] = enriched
+                _add_call(totals, metadata)
+
+    # Sources that never enriched keep their draft form, disabled for loading
+    for i in failed:
+        source = dict(data_sources[i])
+        source['enabled'] = False
+        source['description'] = source.get('description', 'LLM enrichment failed (auto-disabled)')
+        results[i] = [source]
+
+    enriched_sources = [src for first in sorted(results) for src in results[first]]
+    metadata = {
+        **totals,
+        'latency_ms': int((time.time() - start_time) * 1000),
+        'batches': len(batches),
+        'failed_sources': [data_sources[i].get('code') for i in failed]
+    }
+    return enriched_sources, metadata
 
 
 def merge_technical_fields(original: dict, enriched: dict) -> dict:
@@ -848,41 +1459,12 @@ def enrich_manifest(
         # If reference manifest provided, apply intelligent matching
         if reference_path:
             try:
-                with open(reference_path) as f:
-                    ref_manifest = yaml.safe_load(f)
-
-                # Build THREE maps for hybrid matching:
+                # Compiled once per reference manifest and reused across periods/runs:
                 # 1. URL -> source (exact match for stable URLs like GP Practice)
                 # 2. URL pattern -> source (fuzzy match for variable URLs like Online Consultation)
                 # 3. (URL pattern, sheet) -> source (most specific for multi-file publications)
-                ref_map_url = {}
-                ref_map_pattern = {}
-                ref_map_pattern_sheet = {}
-
-                for src in ref_manifest.get('sources', []):
-                    files = src.get('files', [])
-                    for file in files:
-                        if 'url' in file:
-                            # Strategy 1: Exact URL matching (stable URLs)
-                            url_key = Path(file['url']).name
-                            if url_key not in ref_map_url:
-                                ref_map_url[url_key] = src
-
-                            # Strategy 2: Pattern-based URL matching (variable URLs)
-                            url_pattern = normalize_url(file['url'])
-                            if url_pattern not in ref_map_pattern:
-                                ref_map_pattern[url_pattern] = src
-
-                            # Strategy 3: Pattern + sheet/extract matching (most specific)
-                            if 'sheet' in file:
-                                pattern_sheet_key = (url_pattern, file['sheet'])
-                                if pattern_sheet_key not in ref_map_pattern_sheet:
-                                    ref_map_pattern_sheet[pattern_sheet_key] = src
-                            elif 'extract' in file:
-                                extract_pattern = normalize_url(file['extract'])
-                                pattern_extract_key = (url_pattern, extract_pattern)
-                                if pattern_extract_key not in ref_map_pattern_sheet:
-                                    ref_map_pattern_sheet[pattern_extract_key] = src
+                from datawarp.pipeline.reference_index import load_reference_index
+                ref_index = load_reference_index(reference_path)
 
                 if event_store:
                     event_store.emit(create_event(
@@ -891,59 +1473,19 @@ def enrich_manifest(
                         publication=publication,
                         period=period,
                         level=EventLevel.INFO,
-                        message=f"Reference loaded: {len(ref_map_url)} URLs, {len(ref_map_pattern)} patterns (from {reference_path})",
-                        context={'exact_urls': len(ref_map_url), 'patterns': len(ref_map_pattern),
-                                 'pattern_sheets': len(ref_map_pattern_sheet), 'reference_path': str(reference_path)}
+                        message=f"Reference loaded: {len(ref_index.url_map)} URLs, {len(ref_index.pattern_map)} patterns (from {reference_path})",
+                        context={'exact_urls': len(ref_index.url_map), 'patterns': len(ref_index.pattern_map),
+                                 'pattern_sheets': len(ref_index.pattern_sheet_map), 'reference_path': str(reference_path)}
                     ))
 
                 # Apply matching to data_sources
                 new_data_sources = []
 
                 for source in data_sources:
-                    matched = False
-                    ref_src = None
-                    match_method = None
-
-                    if source.get('files'):
-                        for file in source['files']:
-                            if 'url' in file:
-                                # Strategy 1: Exact URL match
-                                url_key = Path(file['url']).name
-                                if url_key in ref_map_url:
-                                    ref_src = ref_map_url[url_key]
-                                    matched = True
-                                    match_method = 'exact_url'
-                                    break
-
-                                # Strategy 2a: Pattern + Sheet match (Excel files)
-                                if not matched and 'sheet' in file:
-                                    url_pattern = normalize_url(file['url'])
-                                    pattern_sheet_key = (url_pattern, file['sheet'])
-                                    if pattern_sheet_key in ref_map_pattern_sheet:
-                                        ref_src = ref_map_pattern_sheet[pattern_sheet_key]
-                                        matched = True
-                                        match_method = 'pattern_sheet'
-                                        break
-
-                                # Strategy 2b: Pattern + Extract match (ZIP/CSV files)
-                                if not matched and 'extract' in file:
-                                    url_pattern = normalize_url(file['url'])
-                                    extract_pattern = normalize_url(file['extract'])
-                                    pattern_extract_key = (url_pattern, extract_pattern)
-                                    if pattern_extract_key in ref_map_pattern_sheet:
-                                        ref_src = ref_map_pattern_sheet[pattern_extract_key]
-                                        matched = True
-                                        match_method = 'pattern_extract'
-                                        break
-
-                                # Strategy 3: Pattern-only match (fallback)
-                                if not matched:
-                                    url_pattern = normalize_url(file['url'])
-                                    if url_pattern in ref_map_pattern:
-                                        ref_src = ref_map_pattern[url_pattern]
-                                        matched = True
-                                        match_method = 'pattern'
-                                        break
+                    ref_position, match_method = ref_index.match_source(source)
+                    matched = ref_position is not None
+                    # The index is shared across calls - never let this manifest alias its objects
+                    ref_src = copy.deepcopy(ref_index.sources[ref_position]) if matched else None
 
                     if matched and ref_src:
                         # Copy source-level semantic fields from reference
@@ -973,7 +1515,8 @@ def enrich_manifest(
 
                             if draft_columns:
                                 matched_cols, new_cols = match_columns_to_reference(
-                                    draft_columns, ref_columns, fuzzy_threshold=0.8
+                                    draft_columns, ref_columns, fuzzy_threshold=0.8,
+                                    ref_index=ref_index.column_index(ref_position)
                                 )
 
                                 # Update preview with matched column metadata
@@ -1031,64 +1574,12 @@ def enrich_manifest(
 
         # Call LLM on remaining data sources (those not matched by reference)
         if data_sources:
-            # COMPRESS: Detect repetitive column patterns to avoid token limits
-            compressed_sources, compression_map = compress_manifest_for_enrichment(data_sources)
-
-            if compression_map:
-                # Log compression stats
-                total_cols_before = sum(
-                    len(f.get('preview', {}).get('columns', []))
-                    for src in data_sources for f in src.get('files', [])
-                )
-                total_cols_after = sum(
-                    len(f.get('preview', {}).get('columns', []))
-                    for src in compressed_sources for f in src.get('files', [])
-                )
-                if event_store:
-                    event_store.emit(create_event(
-                        EventType.INFO,
-                        event_store.run_id,
-                        publication=publication,
-                        period=period,
-                        stage='enrich',
-                        message=f"Compressed {total_cols_before} columns → {total_cols_after} ({len(compression_map)} patterns detected)",
-                        context={'compression_ratio': f'{total_cols_after}/{total_cols_before}'}
-                    ))
-
-            # Send compressed sources to LLM
-            prompt = build_enrichment_prompt(original_manifest, compressed_sources)
-            enriched_data_sources, llm_metadata = call_gemini_api(
-                prompt, event_store, publication, period, db_run_id=db_run_id
+            enriched_data_sources, llm_metadata = enrich_sources_batched(
+                original_manifest, data_sources, event_store, publication, period, db_run_id=db_run_id
             )
-
-            # Handle different response formats
-            if isinstance(enriched_data_sources, dict):
-                if 'sources' in enriched_data_sources:
-                    enriched_data_sources = enriched_data_sources['sources']
-                elif 'manifest' in enriched_data_sources:
-                    manifest_data = enriched_data_sources['manifest']
-                    if isinstance(manifest_data, list):
-                        enriched_data_sources = manifest_data
-                    elif isinstance(manifest_data, dict):
-                        enriched_data_sources = manifest_data.get('sources', [])
-
-            # EXPAND: Restore full column set with pattern-based metadata
-            if compression_map:
-                enriched_data_sources = expand_manifest_from_enrichment(
-                    enriched_data_sources, compression_map
-                )
-                if event_store:
-                    event_store.emit(create_event(
-                        EventType.INFO,
-                        event_store.run_id,
-                        publication=publication,
-                        period=period,
-                        stage='enrich',
-                        message=f"Expanded {len(compression_map)} patterns back to full column set"
-                    ))
         else:
             enriched_data_sources = []
-            llm_metadata = {'input_tokens': 0, 'output_tokens': 0, 'latency_ms': 0}
+            llm_metadata = {'input_tokens': 0, 'output_tokens': 0, 'latency_ms': 0, 'llm_calls': 0}
 
         # Combine: reference-matched + LLM-enriched sources
         enriched_data_sources = reference_enriched_sources + enriched_data_sources
@@ -1143,7 +1634,8 @@ def enrich_manifest(
             duration_ms=duration_ms,
             total_input_tokens=llm_metadata.get('input_tokens', 0) if llm_metadata else 0,
             total_output_tokens=llm_metadata.get('output_tokens', 0) if llm_metadata else 0,
-            reference_matched=enriched_from_ref
+            reference_matched=enriched_from_ref,
+            total_api_calls=llm_metadata.get('llm_calls', 0) if llm_metadata else 0
         )
 
         if event_store:
@@ -1161,7 +1653,9 @@ def enrich_manifest(
                     'sources_from_reference': enriched_from_ref,
                     'duration_ms': duration_ms,
                     'llm_tokens_in': llm_metadata.get('input_tokens', 0) if llm_metadata else 0,
-                    'llm_tokens_out': llm_metadata.get('output_tokens', 0) if llm_metadata else 0
+                    'llm_tokens_out': llm_metadata.get('output_tokens', 0) if llm_metadata else 0,
+                    'llm_calls': llm_metadata.get('llm_calls', 0) if llm_metadata else 0,
+                    'llm_cache_hits': llm_metadata.get('cache_hits', 0) if llm_metadata else 0
                 }
             ))
 
@@ -1171,7 +1665,7 @@ def enrich_manifest(
             sources_enriched=len(enriched_data_sources),
             sources_from_reference=enriched_from_ref,
             sources_total=len(all_enriched_sources),
-            llm_calls_made=1 if data_sources else 0,
+            llm_calls_made=llm_metadata.get('llm_calls', 0) if llm_metadata else 0,
             input_tokens=llm_metadata.get('input_tokens', 0) if llm_metadata else 0,
             output_tokens=llm_metadata.get('output_tokens', 0) if llm_metadata else 0,
             latency_ms=llm_metadata.get('latency_ms', 0) if llm_metadata else 0
@@ -0,0 +1,212 @@
+"""Order-independent checksums for validating Parquet exports.
+
+Computes one aggregate fingerprint per column - null count, min/max, and a
+sum of per-value hashes - in a single scan, once in Postgres over the
+staging table and once in DuckDB over the exported Parquet files. Equal
+fingerprints mean the export holds the same values without any rows being
+pulled into Python.
+
+Hashes are taken over a canonical text form of each value that both engines
+produce identically (ISO dates, epoch microseconds for timestamps). Float
+columns (and NUMERIC, exported as float64 by default) are summed instead of
+hashed and compared with a relative tolerance. A row checksum over the
+exactly-hashed columns catches values swapped between rows, which
+per-column sums alone cannot see.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from datawarp.pipeline.exporter import dataset_files
+
+# Column kinds are 'text', 'integer', 'boolean', 'date', 'timestamp' (hashed) and 'float' (summed)
+FLOAT_KIND = 'float'
+NULL_TOKEN = '\\N'
+
+# Relative tolerance for float sums, min and max (float64 vs exact NUMERIC)
+DEFAULT_REL_TOL = 1e-9
+
+
+@dataclass
+class ColumnFingerprint:
+    """Aggregate fingerprint of one column."""
+    kind: str
+    nulls: int
+    min: object = None
+    max: object = None
+    checksum: Optional[int] = None      # Sum of value hashes (exact kinds)
+    total: Optional[float] = None       # Sum of values (float kind)
+
+
+@dataclass
+class TableFingerprint:
+    """Row count, per-column fingerprints and the row checksum."""
+    rows: int
+    columns: Dict[str, ColumnFingerprint] = field(default_factory=dict)
+    row_checksum: Optional[int] = None
+
+
+def column_kinds(schema: pa.Schema) -> Dict[str, str]:
+    """Fingerprint kind for each column of an exported Parquet schema."""
+    kinds = {}
+    for f in schema:
+        if pa.types.is_string(f.type) or pa.types.is_large_string(f.type):
+            kinds[f.name] = 'text'
+        elif pa.types.is_integer(f.type):
+            kinds[f.name] = 'integer'
+        elif pa.types.is_boolean(f.type):
+            kinds[f.name] = 'boolean'
+        elif pa.types.is_date(f.type):
+            kinds[f.name] = 'date'
+        elif pa.types.is_timestamp(f.type):
+            kinds[f.name] = 'timestamp'
+        elif pa.types.is_floating(f.type) or pa.types.is_decimal(f.type):
+            kinds[f.name] = FLOAT_KIND
+        # Other types (binary, nested) are covered by row counts only
+    return kinds
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+# Canonical text of a value, identical in both engines
+def _pg_text(column: str, kind: str) -> str:
+    if kind == 'date':
+        return f"to_char({column}, 'YYYY-MM-DD')"
+    if kind == 'timestamp':
+        return f"(EXTRACT(EPOCH FROM {column}) * 1000000)::bigint::text"
+    return f"{column}::text"
+
+
+def _duckdb_text(column: str, kind: str) -> str:
+    if kind == 'date':
+        return f"strftime({column}, '%Y-%m-%d')"
+    if kind == 'timestamp':
+        return f"CAST(epoch_us({column}) AS VARCHAR)"
+    return f"CAST({column} AS VARCHAR)"
+
+
+# First 60 bits of the MD5 of a text, as a BIGINT
+def _pg_hash(text: str) -> str:
+    return f"('x' || substr(md5({text}), 1, 15))::bit(60)::bigint"
+
+
+def _duckdb_hash(text: str) -> str:
+    return f"CAST('0x' || substr(md5({text}), 1, 15) AS BIGINT)"
+
+
+def _aggregates(kinds: Dict[str, str], dialect: str) -> List[str]:
+    """SELECT list: COUNT(*), per-column aggregates in kinds order, then the row checksum."""
+    text, hash_ = (_pg_text, _pg_hash) if dialect == 'postgres' else (_duckdb_text, _duckdb_hash)
+    double = 'float8' if dialect == 'postgres' else 'DOUBLE'
+    select = ['COUNT(*)']
+    row_parts = []
+    for name, kind in kinds.items():
+        column = _quote(name)
+        select.append(f"COUNT(*) - COUNT({column})")
+        if kind == FLOAT_KIND:
+            select += [f"CAST(MIN({column}) AS {double})", f"CAST(MAX({column}) AS {double})",
+                       f"CAST(SUM({column}) AS {double})"]
+            continue
+        if kind == 'boolean':
+            select += [f"bool_and({column})", f"bool_or({column})"]  # Postgres has no MIN(boolean)
+        else:
+            # Byte order for text min/max: Postgres would otherwise use the database collation
+            ordered = f'{column} COLLATE "C"' if dialect == 'postgres' and kind == 'text' else column
+            select += [f"MIN({ordered})", f"MAX({ordered})"]
+        select.append(f"SUM({hash_(text(column, kind))})")
+        row_parts.append(f"COALESCE({text(column, kind)}, '{NULL_TOKEN}')")
+    if row_parts:
+        select.append(f"SUM({hash_(' || chr(31) || '.join(row_parts))})")
+    return select
+
+
+def _parse(row: tuple, kinds: Dict[str, str]) -> TableFingerprint:
+    values = iter(row)
+    fingerprint = TableFingerprint(rows=next(values))
+    for name, kind in kinds.items():
+        nulls, low, high, aggregate = (next(values) for _ in range(4))
+        column = ColumnFingerprint(kind=kind, nulls=nulls, min=low, max=high)
+        if kind == FLOAT_KIND:
+            column.total = aggregate
+        else:
+            column.checksum = int(aggregate) if aggregate is not None else None
+        fingerprint.columns[name] = column
+    if any(kind != FLOAT_KIND for kind in kinds.values()):
+        checksum = next(values)
+        fingerprint.row_checksum = int(checksum) if checksum is not None else None
+    return fingerprint
+
+
+def postgres_fingerprint(conn, table_name: str, kinds: Dict[str, str]) -> TableFingerprint:
+    """Fingerprint a staging table in one scan.
+
+    Args:
+        conn: Database connection
+        table_name: schema.table
+        kinds: Column kinds, usually column_kinds() of the exported schema
+    """
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(_aggregates(kinds, 'postgres'))} FROM {table_name}")
+    return _parse(cur.fetchone(), kinds)
+
+
+def parquet_fingerprint(path, kinds: Optional[Dict[str, str]] = None) -> TableFingerprint:
+    """Fingerprint an exported Parquet file or dataset directory with DuckDB.
+
+    Args:
+        path: {code}.parquet or an incremental/hive dataset directory
+        kinds: Column kinds (default: column_kinds() of the first file's schema)
+    """
+    import duckdb
+
+    files = dataset_files(path)
+    if kinds is None:
+        kinds = column_kinds(pq.read_schema(files[0]))
+    file_list = ', '.join("'" + str(p).replace("'", "''") + "'" for p in files)
+    source = f"read_parquet([{file_list}], hive_partitioning = false, union_by_name = true)"
+
+    conn = duckdb.connect()
+    try:
+        row = conn.execute(f"SELECT {', '.join(_aggregates(kinds, 'duckdb'))} FROM {source}").fetchone()
+    finally:
+        conn.close()
+    return _parse(row, kinds)
+
+
+def _close(a, b, rel_tol: float) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(float(a), float(b), rel_tol=rel_tol, abs_tol=rel_tol)
+
+
+def compare_fingerprints(expected: TableFingerprint, actual: TableFingerprint,
+                         rel_tol: float = DEFAULT_REL_TOL) -> List[str]:
+    """Differences between two fingerprints, as readable messages (empty if they match)."""
+    problems = []
+    if expected.rows != actual.rows:
+        problems.append(f"row count {expected.rows} != {actual.rows}")
+
+    for name, want in expected.columns.items():
+        got = actual.columns.get(name)
+        if got is None:
+            problems.append(f"{name}: missing")
+            continue
+        if want.nulls != got.nulls:
+            problems.append(f"{name}: nulls {want.nulls} != {got.nulls}")
+        if want.kind == FLOAT_KIND:
+            for label in ('min', 'max', 'total'):
+                if not _close(getattr(want, label), getattr(got, label), rel_tol):
+                    problems.append(f"{name}: {label} {getattr(want, label)} != {getattr(got, label)}")
+        else:
+            for label in ('min', 'max', 'checksum'):
+                if getattr(want, label) != getattr(got, label):
+                    problems.append(f"{name}: {label} {getattr(want, label)!r} != {getattr(got, label)!r}")
+
+    if expected.row_checksum != actual.row_checksum:
+        problems.append("row checksum differs (values moved between rows)")
+    return problems
@@ -4,11 +4,21 @@ Extracts export logic from scripts/export_to_parquet.py for use as library.
 Integrates with EventStore for observability.
 """
 import os
-import pandas as pd
+import re
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass
-from typing import Optional, List, Dict
+import inspect
+from dataclasses import dataclass, field
+from urllib.parse import quote
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from datawarp.storage.connection import get_connection
 from datawarp.storage import repository
@@ -26,6 +36,508 @@ class ExportResult:
     parquet_path: str
     metadata_path: str
     error: Optional[str] = None
+    rows_written: int = 0                   # Rows rewritten by this export
+    periods_written: Optional[int] = None   # Periods rewritten (incremental export only)
+    duration_s: float = 0.0
+
+
+# Rows per server-side cursor fetch, and per Parquet row group
+DEFAULT_EXPORT_BATCH_ROWS = 100_000
+
+# Incremental export: merge per-period fragments once there are more than this
+DEFAULT_COMPACT_FRAGMENTS = 16
+EXPORT_STATE_FILE = '_export_state.json'
+EXPORT_STATE_VERSION = 1
+NULL_PERIOD_KEY = '__none__'
+
+# 'file': {code}.parquet (or flat fragments when incremental)
+# 'hive': {code}/_period=YYYY-MM/part-L<load_id>.parquet, so period filters prune whole files
+EXPORT_LAYOUTS = ('file', 'hive')
+
+# Query export profile: rows per row group (DuckDB's own row group size), and
+# how many declared dimension columns follow _period_start in the sort key
+DEFAULT_ROW_GROUP_ROWS = 122_880
+MAX_SORT_DIMENSIONS = 3
+EXPORT_PROFILES = ('default', 'query')
+
+# Parallel export: sources exported at once, and DB connections they may hold (one each)
+DEFAULT_EXPORT_WORKERS = 4
+DEFAULT_EXPORT_DB_CONNECTIONS = 4
+# Rough peak memory per row of a worker's in-flight batch (DB-API tuples + Arrow arrays)
+EXPORT_BYTES_PER_ROW = 2048
+
+
+def _arrow_type(data_type: str, precision: Optional[int] = None, scale: Optional[int] = None,
+                decimals: bool = False) -> pa.DataType:
+    """Map an information_schema.columns data_type to an Arrow type.
+
+    Integers widen to int64 and NUMERIC becomes float64, the dtypes pandas
+    wrote before streaming export, which the MCP servers rely on to pick
+    measure columns (select_dtypes int64/float64). decimals=True keeps
+    NUMERIC(p,s) as an exact decimal128 instead.
+    """
+    data_type = data_type.lower()
+    if data_type in ('integer', 'int', 'int4', 'serial', 'bigint', 'int8', 'bigserial', 'smallint', 'int2'):
+        return pa.int64()
+    if data_type == 'numeric':
+        # Unconstrained NUMERIC has no fixed scale for a Parquet decimal
+        if decimals and precision and precision <= 38:
+            return pa.decimal128(precision, scale or 0)
+        return pa.float64()
+    if data_type in ('double precision', 'float8', 'real', 'float4'):
+        return pa.float64()
+    if data_type == 'boolean':
+        return pa.bool_()
+    if data_type == 'date':
+        return pa.date32()
+    if data_type == 'timestamp without time zone':
+        return pa.timestamp('us')
+    if data_type == 'timestamp with time zone':
+        return pa.timestamp('us', tz='UTC')
+    return pa.string()
+
+
+def arrow_schema_from_columns(columns: List[Tuple[str, str, Optional[int], Optional[int]]],
+                              decimals: bool = False) -> pa.Schema:
+    """Build the Parquet schema from (column_name, data_type, numeric_precision, numeric_scale) rows."""
+    return pa.schema([pa.field(name, _arrow_type(data_type, precision, scale, decimals))
+                      for name, data_type, precision, scale in columns])
+
+
+def _to_arrow_array(values, arrow_type: pa.DataType) -> pa.Array:
+    if pa.types.is_floating(arrow_type):
+        values = [None if v is None else float(v) for v in values]
+    elif pa.types.is_string(arrow_type):
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    elif pa.types.is_decimal(arrow_type):
+        values = [v if v is None or isinstance(v, Decimal) else Decimal(str(v)) for v in values]
+    return pa.array(values, type=arrow_type)
+
+
+def rows_to_record_batch(rows: List[tuple], schema: pa.Schema) -> pa.RecordBatch:
+    """Convert DB-API rows (tuples in schema column order) to an Arrow record batch."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [_to_arrow_array(values, field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+@dataclass
+class WriteProfile:
+    """Parquet writer settings for an export.
+
+    The default profile writes one row group per fetched batch with pyarrow
+    defaults. query_profile() tunes files for DuckDB filters: data sorted
+    by period and dimensions, fixed-size row groups, a page index (per-page
+    min/max), dictionary encoding only for dimensions, optional bloom filters.
+    """
+    sort_columns: List[str] = field(default_factory=list)      # ORDER BY, recorded as sorting_columns
+    row_group_rows: Optional[int] = None                       # None: one row group per batch
+    dictionary_columns: Optional[List[str]] = None             # None: pyarrow default (every column)
+    page_index: bool = False
+    bloom_filter_columns: List[str] = field(default_factory=list)
+
+    def writer_options(self, schema: pa.Schema) -> dict:
+        """Keyword arguments for pq.ParquetWriter."""
+        options = {'compression': 'snappy'}
+        if self.dictionary_columns is not None:
+            options['use_dictionary'] = self.dictionary_columns or False
+        if self.page_index:
+            options['write_page_index'] = True
+        if self.sort_columns:
+            options['sorting_columns'] = [pq.SortingColumn(schema.get_field_index(name))
+                                          for name in self.sort_columns]
+        if self.bloom_filter_columns:
+            options['bloom_filter_options'] = {name: True for name in self.bloom_filter_columns}
+        return options
+
+
+def query_profile(schema: pa.Schema, dimension_columns: List[str], row_group_rows: int = None,
+                  bloom_filter_columns: List[str] = None) -> WriteProfile:
+    """Write profile for query-heavy datasets (MCP / DuckDB).
+
+    Sorts by _period_start then the first few declared dimensions
+    (tbl_column_metadata.is_dimension), so row group and page statistics
+    on those columns are tight and DuckDB skips most of the file for a
+    period or organisation filter.
+    """
+    names = set(schema.names)
+    dimensions = [name for name in dimension_columns if name in names and not name.startswith('_')]
+    sort_columns = (['_period_start'] if '_period_start' in names else []) + dimensions[:MAX_SORT_DIMENSIONS]
+
+    bloom_filter_columns = list(bloom_filter_columns or [])
+    unknown = [name for name in bloom_filter_columns if name not in names]
+    if unknown:
+        raise ValueError(f"Bloom filter columns not in table: {', '.join(unknown)}")
+    if bloom_filter_columns and 'bloom_filter_options' not in inspect.signature(pq.ParquetWriter).parameters:
+        raise ValueError("Bloom filters need a pyarrow whose ParquetWriter supports bloom_filter_options")
+
+    return WriteProfile(
+        sort_columns=sort_columns,
+        row_group_rows=row_group_rows or int(os.getenv('DATAWARP_EXPORT_ROW_GROUP_ROWS', str(DEFAULT_ROW_GROUP_ROWS))),
+        dictionary_columns=dimensions + [name for name in ('_period',) if name in names],
+        page_index=True,
+        bloom_filter_columns=bloom_filter_columns
+    )
+
+
+def write_parquet_batches(path: Path, schema: pa.Schema, batches: Iterable[List[tuple]],
+                          profile: Optional[WriteProfile] = None) -> Tuple[int, int]:
+    """Write row batches to Parquet.
+
+    By default each batch becomes one row group. With profile.row_group_rows,
+    batches are regrouped into row groups of exactly that many rows (the last
+    may be smaller). Only the current batch (plus at most one partial row
+    group) is held in memory. Writes to a temp file and renames on success,
+    so readers never see a partial file.
+
+    Returns:
+        (rows written, row groups written)
+    """
+    path = Path(path)
+    profile = profile or WriteProfile()
+    target = profile.row_group_rows
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    row_count = 0
+    row_groups = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, **profile.writer_options(schema)) as writer:
+            pending = pa.Table.from_batches([], schema=schema)
+            for rows in batches:
+                if not rows:
+                    continue
+                batch = rows_to_record_batch(rows, schema)
+                row_count += len(rows)
+                if not target:
+                    writer.write_table(pa.Table.from_batches([batch]), row_group_size=len(rows))
+                    row_groups += 1
+                    continue
+                pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+                while pending.num_rows >= target:
+                    writer.write_table(pending.slice(0, target), row_group_size=target)
+                    row_groups += 1
+                    pending = pending.slice(target)
+            if pending.num_rows:
+                writer.write_table(pending, row_group_size=pending.num_rows)
+                row_groups += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return row_count, row_groups
+
+
+def stream_query(conn, query: str, batch_rows: int, params=None) -> Iterator[List[tuple]]:
+    """Yield query results in batches from a named (server-side) cursor."""
+    cur = conn.cursor(name=f"datawarp_export_{uuid.uuid4().hex[:12]}")
+    cur.itersize = batch_rows
+    try:
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_rows)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+
+def _source_columns(canonical_code: str, source, conn) -> List[tuple]:
+    """Staging table columns joined with enriched metadata, in SELECT * order.
+
+    Rows are (column_name, data_type, ordinal_position, description,
+    original_name, numeric_precision, numeric_scale, is_dimension).
+    """
+    table_name = f"{source.schema_name}.{source.table_name}"
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = %s AND table_name = %s
+    """, (source.schema_name, source.table_name))
+
+    if cur.fetchone()[0] == 0:
+        raise ValueError(f"Table {table_name} does not exist")
+
+    cur.execute("""
+        SELECT
+            c.column_name,
+            c.data_type,
+            c.ordinal_position,
+            cm.description,
+            cm.original_name,
+            c.numeric_precision,
+            c.numeric_scale,
+            COALESCE(cm.is_dimension, FALSE)
+        FROM information_schema.columns c
+        LEFT JOIN datawarp.tbl_column_metadata cm
+            ON cm.canonical_source_code = %s
+            AND LOWER(cm.column_name) = LOWER(c.column_name)
+        WHERE c.table_schema || '.' || c.table_name = %s
+        ORDER BY c.ordinal_position
+    """, (canonical_code, table_name))
+    return cur.fetchall()
+
+
+def _write_metadata_md(md_path: Path, source, canonical_code: str, schema_rows: List[tuple],
+                       row_count: int, file_size_mb: float) -> None:
+    """Write the enriched .md description that sits next to the Parquet data."""
+    md_content = f"""# {source.name}
+
+**Dataset:** `{canonical_code}`
+**Rows:** {row_count:,}
+**Columns:** {len(schema_rows)}
+**File Size:** {file_size_mb:.2f} MB
+
+---
+
+## Columns
+
+"""
+    for col_name, data_type, _, description, original_name, *_ in schema_rows:
+        # Include enriched description if available
+        if description:
+            md_content += f"### `{col_name}`\n"
+            md_content += f"**Type:** `{data_type}`\n\n"
+            md_content += f"{description}\n\n"
+            if original_name and original_name != col_name:
+                md_content += f"*Source column:* `{original_name}`\n\n"
+        else:
+            # Fallback: simple list format if no enriched metadata
+            md_content += f"- `{col_name}` ({data_type})\n"
+
+    md_content += f"\n---\n\n*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
+    md_content += "*Source: DataWarp v2.2 with enriched metadata*\n"
+
+    with open(md_path, 'w') as f:
+        f.write(md_content)
+
+
+def _incremental_enabled() -> bool:
+    return os.getenv('DATAWARP_EXPORT_INCREMENTAL', '0').lower() in ('1', 'true', 'on')
+
+
+def _period_key(period) -> str:
+    return NULL_PERIOD_KEY if period is None else str(period)
+
+
+def _fragment_name(period_key: str, load_id, hive: bool = False) -> str:
+    """Path of a period's fragment, relative to the dataset directory."""
+    if hive:
+        # DuckDB URL-decodes partition values and reads _period=NULL as NULL
+        value = 'NULL' if period_key == NULL_PERIOD_KEY else quote(period_key, safe='')
+        return f"_period={value}/part-L{load_id}.parquet"
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '-', period_key).strip('-') or 'period'
+    return f"part-{slug}-L{load_id}.parquet"
+
+
+def _is_fragment(name: str) -> bool:
+    return Path(name).name.startswith('part-')
+
+
+def _remove_fragment(dataset_dir: Path, name: str) -> None:
+    path = dataset_dir / name
+    path.unlink(missing_ok=True)
+    if path.parent != dataset_dir and not any(path.parent.iterdir()):
+        path.parent.rmdir()  # Empty hive partition
+
+
+def dataset_files(path) -> List[Path]:
+    """Parquet files making up a dataset: the file itself, or every file under its directory.
+
+    Use this rather than reading a dataset directory directly: pyarrow and
+    pandas skip paths starting with '_', which includes hive _period=
+    partitions.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.rglob('*.parquet') if not p.name.startswith('.'))
+    return [path]
+
+
+def read_export_state(dataset_dir: Path) -> Optional[dict]:
+    """Load a dataset directory's export state, or None if missing or unusable."""
+    path = Path(dataset_dir) / EXPORT_STATE_FILE
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != EXPORT_STATE_VERSION:
+        return None
+    return state
+
+
+def _write_export_state(dataset_dir: Path, state: dict) -> None:
+    path = Path(dataset_dir) / EXPORT_STATE_FILE
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(state, indent=1))
+    os.replace(tmp_path, path)
+
+
+def dataset_size_mb(path) -> float:
+    """Size of a Parquet file, or of all Parquet files under a dataset directory."""
+    path = Path(path)
+    return sum(p.stat().st_size for p in dataset_files(path)) / 1024 / 1024
+
+
+def _row_group_period(parquet: pq.ParquetFile, index: int) -> str:
+    values = parquet.read_row_group(index, columns=['_period']).column('_period')
+    return _period_key(values[0].as_py() if len(values) else None)
+
+
+def _drop_periods(path: Path, schema: pa.Schema, period_keys: set, profile: WriteProfile) -> int:
+    """Rewrite a compacted file without the given periods' row groups.
+
+    Compacted files are built from single-period fragments, so every row
+    group belongs to one period. Returns rows kept (the file is removed if 0).
+    """
+    parquet = pq.ParquetFile(path)
+    keep = [i for i in range(parquet.metadata.num_row_groups)
+            if _row_group_period(parquet, i) not in period_keys]
+    rows = sum(parquet.metadata.row_group(i).num_rows for i in keep)
+    if not rows:
+        path.unlink()
+        return 0
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with pq.ParquetWriter(tmp_path, schema, **profile.writer_options(schema)) as writer:
+            for i in keep:
+                writer.write_table(parquet.read_row_group(i))
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return rows
+
+
+def _compact_fragments(dataset_dir: Path, schema: pa.Schema, state: dict,
+                       profile: WriteProfile) -> Optional[str]:
+    """Merge all single-period fragments into one compacted file, row group by row group.
+
+    Fragments are merged in period order, so a file sorted by _period_start
+    within each fragment stays sorted after compaction.
+    """
+    fragments = [entry['file'] for _, entry in sorted(state['periods'].items()) if _is_fragment(entry['file'])]
+    if len(fragments) < 2:
+        return None
+
+    name = f"compacted-{uuid.uuid4().hex[:12]}.parquet"
+    path = Path(dataset_dir) / name
+    tmp_path = path.with_name(f".{name}.{os.getpid()}.tmp")
+    try:
+        with pq.ParquetWriter(tmp_path, schema, **profile.writer_options(schema)) as writer:
+            for fragment in fragments:
+                parquet = pq.ParquetFile(Path(dataset_dir) / fragment)
+                for i in range(parquet.metadata.num_row_groups):
+                    writer.write_table(parquet.read_row_group(i))
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    for entry in state['periods'].values():
+        if entry['file'] in fragments:
+            entry['file'] = name
+    _write_export_state(dataset_dir, state)
+    for fragment in fragments:
+        _remove_fragment(Path(dataset_dir), fragment)
+    return name
+
+
+def _order_by(columns: List[str]) -> str:
+    return ' ORDER BY ' + ', '.join(f'"{name}"' for name in columns) if columns else ''
+
+
+def _export_incremental(conn, source, schema: pa.Schema, dataset_dir: Path, batch_rows: int,
+                        profile: WriteProfile, compact_threshold: int,
+                        layout: str = 'file', full: bool = False) -> Tuple[int, int, int]:
+    """Bring a dataset directory up to date with the staging table.
+
+    Each period lives in its own fragment (part-<period>-L<load_id>.parquet,
+    or _period=<period>/part-L<load_id>.parquet in the hive layout) until
+    compaction merges fragments; hive partitions are never compacted. A
+    period is rewritten only when its MAX(_load_id) or row count differs
+    from the saved state (every period when full). The per-period summary
+    is always read: a resumed chunked load adds rows under the load id it
+    started with, so an unchanged latest tbl_load_history id does not mean
+    the table is unchanged.
+
+    Returns:
+        (total rows, rows written, periods written)
+    """
+    table_name = f"{source.schema_name}.{source.table_name}"
+    hive = layout == 'hive'
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    schema_key = [[field.name, str(field.type)] for field in schema]
+
+    state = read_export_state(dataset_dir)
+    if state is None or state['schema'] != schema_key or state.get('layout', 'file') != layout:
+        # New dataset, changed columns or other layout: start from an empty directory
+        for path in dataset_files(dataset_dir):
+            _remove_fragment(dataset_dir, str(path.relative_to(dataset_dir)))
+        state = {'version': EXPORT_STATE_VERSION, 'layout': layout, 'last_load_id': None,
+                 'schema': schema_key, 'periods': {}}
+
+    def present(entry):
+        return (dataset_dir / entry['file']).exists()
+
+    cur = conn.cursor()
+    cur.execute(f"SELECT _period, MAX(_load_id), COUNT(*) FROM {table_name} GROUP BY _period")
+    current = {_period_key(period): (period, load_id, rows) for period, load_id, rows in cur.fetchall()}
+
+    saved = state['periods']
+    changed = [key for key, (_, load_id, rows) in current.items()
+               if full or key not in saved or saved[key]['load_id'] != load_id
+               or saved[key]['rows'] != rows or not present(saved[key])]
+    removed = [key for key in saved if key not in current]
+
+    order_by = _order_by(profile.sort_columns)
+    rows_written = 0
+    new_files = set()
+    for key in changed:
+        period, load_id, _ = current[key]
+        name = _fragment_name(key, load_id, hive)
+        (dataset_dir / name).parent.mkdir(exist_ok=True)
+        if period is None:
+            query, params = f"SELECT * FROM {table_name} WHERE _period IS NULL{order_by}", None
+        else:
+            query, params = f"SELECT * FROM {table_name} WHERE _period = %s{order_by}", (period,)
+        rows, _ = write_parquet_batches(dataset_dir / name, schema,
+                                        stream_query(conn, query, batch_rows, params), profile)
+        rows_written += rows
+        new_files.add(name)
+
+    # Retire the old copies of rewritten and deleted periods
+    stale_by_file: Dict[str, set] = {}
+    for key in changed + removed:
+        if key in saved and saved[key]['file'] not in new_files:
+            stale_by_file.setdefault(saved[key]['file'], set()).add(key)
+    for name, keys in stale_by_file.items():
+        path = dataset_dir / name
+        if not path.exists():
+            continue
+        if _is_fragment(name):
+            _remove_fragment(dataset_dir, name)
+        else:
+            _drop_periods(path, schema, keys, profile)
+
+    for key in removed:
+        del saved[key]
+    for key in changed:
+        _, load_id, rows = current[key]
+        saved[key] = {'load_id': load_id, 'rows': rows, 'file': _fragment_name(key, load_id, hive)}
+    # Newest load id actually exported (not tbl_load_history's, which may be uncommitted)
+    state['last_load_id'] = max((entry['load_id'] for entry in saved.values() if entry['load_id'] is not None),
+                                default=None)
+    _write_export_state(dataset_dir, state)
+
+    fragments = {entry['file'] for entry in saved.values() if _is_fragment(entry['file'])}
+    if not hive and len(fragments) > compact_threshold:
+        _compact_fragments(dataset_dir, schema, state, profile)
+
+    return sum(entry['rows'] for entry in saved.values()), rows_written, len(changed)
 
 
 def export_source_to_parquet(
@@ -33,20 +545,45 @@ def export_source_to_parquet(
     output_dir: str,
     event_store: Optional[EventStore] = None,
     publication: str = None,
-    period: str = None
+    period: str = None,
+    batch_rows: int = None,
+    decimals: bool = False,
+    incremental: Optional[bool] = None,
+    layout: Optional[str] = None,
+    profile: Optional[str] = None,
+    bloom_filters: Optional[List[str]] = None
 ) -> ExportResult:
     """Export a single source to Parquet + .md metadata.
 
+    Streams the staging table through a server-side cursor and writes one
+    Parquet row group per batch, so memory stays flat however large the
+    table is. The Parquet schema comes from information_schema.
+
+    Full export writes {output_dir}/{code}.parquet. Incremental export
+    maintains {output_dir}/{code}/ instead, one fragment per period, and
+    rewrites only periods whose _load_id changed since the last export
+    (see _export_incremental). The hive layout always writes the directory,
+    partitioned as _period=YYYY-MM/, rewriting every period unless incremental.
+
     Args:
         canonical_code: Canonical source identifier
         output_dir: Output directory path
         event_store: Optional EventStore for observability
         publication: Publication code for event logging
         period: Period identifier for event logging
+        batch_rows: Rows per fetch / row group (default DATAWARP_EXPORT_BATCH_ROWS or 100,000)
+        decimals: Write NUMERIC(p,s) as exact decimals rather than float64
+        incremental: Export changed periods only (default DATAWARP_EXPORT_INCREMENTAL)
+        layout: 'file' or 'hive' (default DATAWARP_EXPORT_LAYOUT, else 'file')
+        profile: 'default' or 'query' (default DATAWARP_EXPORT_PROFILE, else 'default');
+            see query_profile()
+        bloom_filters: Columns to write bloom filters for with the query profile
+            (default DATAWARP_EXPORT_BLOOM_FILTERS, comma-separated)
 
     Returns:
         ExportResult with export statistics
     """
+    start_time = time.time()
     try:
         if event_store:
             event_store.emit(create_event(
@@ -68,46 +605,70 @@ def export_source_to_parquet(
 
             table_name = f"{source.schema_name}.{source.table_name}"
 
-            # 2. Check if table exists
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT COUNT(*) FROM information_schema.tables
-                WHERE table_schema = %s AND table_name = %s
-            """, (source.schema_name, source.table_name))
-
-            if cur.fetchone()[0] == 0:
-                raise ValueError(f"Table {table_name} does not exist")
-
-            # 3. Get first column for deterministic ordering
-            cur.execute("""
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema || '.' || table_name = %s
-                ORDER BY ordinal_position
-                LIMIT 1
-            """, (table_name,))
-            first_column = cur.fetchone()
-            sort_column = first_column[0] if first_column else None
-
-            # 4. Read entire staging table
+            # 2. Get column schema + enriched metadata (ordinal order = SELECT * order)
+            schema_rows = _source_columns(canonical_code, source, conn)
+            schema = arrow_schema_from_columns([(row[0], row[1], row[5], row[6]) for row in schema_rows], decimals)
+
+            # 3. Writer profile: first column for deterministic ordering, or the query
+            #    profile's period + dimension sort key
+            profile = profile or os.getenv('DATAWARP_EXPORT_PROFILE', 'default')
+            if profile not in EXPORT_PROFILES:
+                raise ValueError(f"Unknown export profile '{profile}' (expected one of {', '.join(EXPORT_PROFILES)})")
+            if profile == 'query':
+                if bloom_filters is None:
+                    bloom_filters = [name.strip() for name in os.getenv('DATAWARP_EXPORT_BLOOM_FILTERS', '').split(',')
+                                     if name.strip()]
+                write_profile = query_profile(schema, [row[0] for row in schema_rows if row[7]],
+                                              bloom_filter_columns=bloom_filters)
+            else:
+                write_profile = WriteProfile(sort_columns=[schema_rows[0][0]] if schema_rows else [])
+
+            # 4. Create output directory
+            os.makedirs(output_dir, exist_ok=True)
+            batch_rows = batch_rows or int(os.getenv('DATAWARP_EXPORT_BATCH_ROWS', str(DEFAULT_EXPORT_BATCH_ROWS)))
+            if incremental is None:
+                incremental = _incremental_enabled()
+            layout = layout or os.getenv('DATAWARP_EXPORT_LAYOUT', 'file')
+            if layout not in EXPORT_LAYOUTS:
+                raise ValueError(f"Unknown export layout '{layout}' (expected one of {', '.join(EXPORT_LAYOUTS)})")
+            if not {'_period', '_load_id'} <= set(schema.names):
+                incremental, layout = False, 'file'  # Legacy table without load tracking columns
+            to_directory = incremental or layout == 'hive'
+            file_path = Path(output_dir) / f"{canonical_code}.parquet"
+            parquet_path = Path(output_dir) / canonical_code if to_directory else file_path
+
+            # 5. Stream staging table into Parquet, one row group per batch
             if event_store:
                 event_store.emit(create_event(
                     EventType.STAGE_STARTED,
                     event_store.run_id,
                     publication=publication,
                     period=period,
-                    stage='read',
+                    stage='write',
                     level=EventLevel.DEBUG,
-                    message=f"Reading data from {table_name}",
-                    context={'table': table_name, 'sort_column': sort_column}
+                    message=f"Streaming {table_name} to {parquet_path} ({batch_rows:,} rows per row group)",
+                    context={'table': table_name, 'sort_columns': write_profile.sort_columns,
+                             'path': str(parquet_path), 'batch_rows': batch_rows, 'incremental': incremental,
+                             'layout': layout, 'profile': profile}
                 ))
 
-            if sort_column:
-                df = pd.read_sql(f"SELECT * FROM {table_name} ORDER BY {sort_column}", conn)
+            if to_directory:
+                compact_threshold = int(os.getenv('DATAWARP_EXPORT_COMPACT_FRAGMENTS',
+                                                  str(DEFAULT_COMPACT_FRAGMENTS)))
+                row_count, rows_written, periods_written = _export_incremental(
+                    conn, source, schema, parquet_path, batch_rows, write_profile, compact_threshold,
+                    layout=layout, full=not incremental
+                )
+                # The directory replaces any earlier single-file export
+                file_path.unlink(missing_ok=True)
+                write_message = (f"Wrote {rows_written:,} rows for {periods_written} changed periods "
+                                 f"({row_count:,} rows total)")
             else:
-                df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
-
-            row_count = len(df)
+                query = f"SELECT * FROM {table_name}{_order_by(write_profile.sort_columns)}"
+                row_count, row_groups = write_parquet_batches(parquet_path, schema,
+                                                              stream_query(conn, query, batch_rows), write_profile)
+                rows_written, periods_written = row_count, None
+                write_message = f"Wrote {row_count:,} rows in {row_groups} row groups"
 
             if event_store:
                 event_store.emit(create_event(
@@ -115,90 +676,18 @@ def export_source_to_parquet(
                     event_store.run_id,
                     publication=publication,
                     period=period,
-                    stage='read',
-                    level=EventLevel.DEBUG,
-                    message=f"Read {row_count:,} rows from staging table",
-                    context={'rows': row_count, 'columns': len(df.columns)}
-                ))
-
-            # 5. Get column metadata (from schema + enriched metadata)
-            cur.execute("""
-                SELECT
-                    c.column_name,
-                    c.data_type,
-                    c.ordinal_position,
-                    cm.description,
-                    cm.original_name
-                FROM information_schema.columns c
-                LEFT JOIN datawarp.tbl_column_metadata cm
-                    ON cm.canonical_source_code = %s
-                    AND LOWER(cm.column_name) = LOWER(c.column_name)
-                WHERE c.table_schema || '.' || c.table_name = %s
-                ORDER BY c.ordinal_position
-            """, (canonical_code, table_name))
-            actual_columns = {
-                row[0]: {
-                    'data_type': row[1],
-                    'position': row[2],
-                    'description': row[3],
-                    'original_name': row[4]
-                } for row in cur.fetchall()
-            }
-
-            # 6. Create output directory
-            os.makedirs(output_dir, exist_ok=True)
-
-            # 7. Write Parquet file
-            parquet_path = Path(output_dir) / f"{canonical_code}.parquet"
-
-            if event_store:
-                event_store.emit(create_event(
-                    EventType.STAGE_STARTED,
-                    event_store.run_id,
-                    publication=publication,
-                    period=period,
                     stage='write',
                     level=EventLevel.DEBUG,
-                    message=f"Writing Parquet file: {parquet_path}",
-                    context={'path': str(parquet_path)}
+                    message=write_message,
+                    context={'rows': row_count, 'columns': len(schema), 'rows_written': rows_written,
+                             'periods_written': periods_written}
                 ))
 
-            df.to_parquet(parquet_path, index=False, engine='pyarrow', compression='snappy')
-            file_size_mb = parquet_path.stat().st_size / 1024 / 1024
+            file_size_mb = dataset_size_mb(parquet_path)
 
-            # 8. Generate enriched .md metadata file
+            # 6. Generate enriched .md metadata file
             md_path = Path(output_dir) / f"{canonical_code}.md"
-            md_content = f"""# {source.name}
-
-**Dataset:** `{canonical_code}`
-**Rows:** {row_count:,}
-**Columns:** {len(actual_columns)}
-**File Size:** {file_size_mb:.2f} MB
-
----
-
-## Columns
-
-"""
-            for col_name in sorted(actual_columns.keys(), key=lambda x: actual_columns[x]['position']):
-                col_info = actual_columns[col_name]
-
-                # Include enriched description if available
-                if col_info.get('description'):
-                    md_content += f"### `{col_name}`\n"
-                    md_content += f"**Type:** `{col_info['data_type']}`\n\n"
-                    md_content += f"{col_info['description']}\n\n"
-                    if col_info.get('original_name') and col_info['original_name'] != col_name:
-                        md_content += f"*Source column:* `{col_info['original_name']}`\n\n"
-                else:
-                    # Fallback: simple list format if no enriched metadata
-                    md_content += f"- `{col_name}` ({col_info['data_type']})\n"
-
-            md_content += f"\n---\n\n*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
-            md_content += "*Source: DataWarp v2.2 with enriched metadata*\n"
-
-            with open(md_path, 'w') as f:
-                f.write(md_content)
+            _write_metadata_md(md_path, source, canonical_code, schema_rows, row_count, file_size_mb)
 
             if event_store:
                 event_store.emit(create_event(
@@ -213,8 +702,9 @@ def export_source_to_parquet(
                         'parquet_path': str(parquet_path),
                         'metadata_path': str(md_path),
                         'rows': row_count,
-                        'columns': len(actual_columns),
-                        'size_mb': file_size_mb
+                        'columns': len(schema_rows),
+                        'size_mb': file_size_mb,
+                        'rows_written': rows_written
                     }
                 ))
 
@@ -222,10 +712,13 @@ def export_source_to_parquet(
                 success=True,
                 canonical_code=canonical_code,
                 row_count=row_count,
-                column_count=len(actual_columns),
+                column_count=len(schema_rows),
                 parquet_size_mb=file_size_mb,
                 parquet_path=str(parquet_path),
-                metadata_path=str(md_path)
+                metadata_path=str(md_path),
+                rows_written=rows_written,
+                periods_written=periods_written,
+                duration_s=time.time() - start_time
             )
 
     except Exception as e:
@@ -248,28 +741,124 @@ def export_source_to_parquet(
             parquet_size_mb=0.0,
             parquet_path="",
             metadata_path="",
-            error=str(e)
+            error=str(e),
+            duration_s=time.time() - start_time
         )
 
 
+def _available_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None  # Not available on this platform
+
+
+def export_worker_count(source_count: int, batch_rows: int = None, max_workers: int = None) -> int:
+    """How many sources to export at once.
+
+    The smallest of the requested workers (DATAWARP_EXPORT_WORKERS), the
+    DB connection budget (DATAWARP_EXPORT_DB_CONNECTIONS), the number of
+    sources, and how many in-flight batches fit in the memory budget
+    (DATAWARP_EXPORT_MEMORY_MB, default half of available memory).
+    """
+    workers = max_workers or int(os.getenv('DATAWARP_EXPORT_WORKERS', str(DEFAULT_EXPORT_WORKERS)))
+    connections = int(os.getenv('DATAWARP_EXPORT_DB_CONNECTIONS', str(DEFAULT_EXPORT_DB_CONNECTIONS)))
+    batch_rows = batch_rows or int(os.getenv('DATAWARP_EXPORT_BATCH_ROWS', str(DEFAULT_EXPORT_BATCH_ROWS)))
+
+    memory_mb = os.getenv('DATAWARP_EXPORT_MEMORY_MB')
+    if memory_mb:
+        memory_budget = int(memory_mb) * 1024 * 1024
+    else:
+        available = _available_memory_bytes()
+        memory_budget = available // 2 if available else None
+
+    limits = [workers, connections, source_count]
+    if memory_budget is not None:
+        limits.append(memory_budget // (batch_rows * EXPORT_BYTES_PER_ROW))
+    return max(1, min(limits))
+
+
+def export_sources_to_parquet(
+    source_codes: List[str],
+    output_dir: str,
+    event_store: Optional[EventStore] = None,
+    publication: str = None,
+    period: str = None,
+    incremental: Optional[bool] = None,
+    layout: Optional[str] = None,
+    max_workers: int = None,
+    profile: Optional[str] = None,
+    bloom_filters: Optional[List[str]] = None
+) -> List[ExportResult]:
+    """Export several sources, in parallel up to export_worker_count().
+
+    Each worker runs export_source_to_parquet on its own connection, so
+    per-source events and ExportResults are unchanged. Results come back
+    in source_codes order.
+    """
+    workers = export_worker_count(len(source_codes), max_workers=max_workers)
+
+    def export(code):
+        return export_source_to_parquet(code, output_dir, event_store, publication, period,
+                                        incremental=incremental, layout=layout, profile=profile,
+                                        bloom_filters=bloom_filters)
+
+    if workers <= 1:
+        return [export(code) for code in source_codes]
+
+    results: Dict[int, ExportResult] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(export, code): i for i, code in enumerate(source_codes)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if event_store:
+                event_store.emit(create_event(
+                    EventType.INFO,
+                    event_store.run_id,
+                    publication=publication,
+                    period=period,
+                    stage='export_batch',
+                    level=EventLevel.DEBUG,
+                    message=f"Exported {len(results)}/{len(source_codes)}: {result.canonical_code}"
+                            f" ({'ok' if result.success else 'failed'}, {result.duration_s:.1f}s)",
+                    context={'source': result.canonical_code, 'done': len(results),
+                             'total': len(source_codes), 'success': result.success}
+                ))
+    return [results[i] for i in range(len(source_codes))]
+
+
 def export_publication_to_parquet(
     publication: str,
     output_dir: str,
     event_store: Optional[EventStore] = None,
-    period: str = None
+    period: str = None,
+    incremental: Optional[bool] = None,
+    layout: Optional[str] = None,
+    max_workers: int = None,
+    profile: Optional[str] = None,
+    bloom_filters: Optional[List[str]] = None
 ) -> List[ExportResult]:
     """Export all sources for a publication to Parquet.
 
+    Sources are exported in parallel (see export_sources_to_parquet); the
+    completion event reports total wall time.
+
     Args:
         publication: Publication name (e.g., "adhd", "gp_practice")
         output_dir: Output directory path
         event_store: Optional EventStore for observability
         period: Optional period identifier for event logging
+        incremental: Export changed periods only (default DATAWARP_EXPORT_INCREMENTAL)
+        layout: 'file' or 'hive' (default DATAWARP_EXPORT_LAYOUT, else 'file')
+        max_workers: Sources exported at once (default DATAWARP_EXPORT_WORKERS)
+        profile: 'default' or 'query' writer profile (default DATAWARP_EXPORT_PROFILE)
+        bloom_filters: Bloom filter columns for the query profile
 
     Returns:
         List of ExportResult for each source
     """
-    results = []
+    start_time = time.time()
 
     try:
         if event_store:
@@ -300,15 +889,17 @@ def export_publication_to_parquet(
                 stage='export_batch',
                 level=EventLevel.INFO,
                 message=f"Found {len(sources_to_export)} sources to export",
-                context={'source_count': len(sources_to_export)}
+                context={'source_count': len(sources_to_export),
+                         'workers': export_worker_count(len(sources_to_export), max_workers=max_workers)}
             ))
 
-        for source_code in sources_to_export:
-            result = export_source_to_parquet(source_code, output_dir, event_store, publication, period)
-            results.append(result)
+        results = export_sources_to_parquet(sources_to_export, output_dir, event_store, publication, period,
+                                            incremental=incremental, layout=layout, max_workers=max_workers,
+                                            profile=profile, bloom_filters=bloom_filters)
 
         successful = [r for r in results if r.success]
         failed = [r for r in results if not r.success]
+        wall_time = time.time() - start_time
 
         if event_store:
             event_store.emit(create_event(
@@ -317,12 +908,16 @@ def export_publication_to_parquet(
                 publication=publication,
                 period=period,
                 level=EventLevel.INFO,
-                message=f"Parquet export completed: {len(successful)} successful, {len(failed)} failed",
+                message=f"Parquet export completed: {len(successful)} successful, {len(failed)} failed "
+                        f"in {wall_time:.1f}s",
                 context={
                     'successful': len(successful),
                     'failed': len(failed),
                     'total_rows': sum(r.row_count for r in successful),
-                    'total_size_mb': sum(r.parquet_size_mb for r in successful)
+                    'rows_written': sum(r.rows_written for r in successful),
+                    'total_size_mb': sum(r.parquet_size_mb for r in successful),
+                    'wall_time_s': round(wall_time, 2),
+                    'source_time_s': round(sum(r.duration_s for r in results), 2)
                 }
             ))
 
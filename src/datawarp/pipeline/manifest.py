@@ -5,9 +5,9 @@ Extracted from scripts/url_to_manifest.py for library use.
 """
 
 import re
+import logging
 import tempfile
 import yaml
-import requests
 from pathlib import Path
 from datetime import datetime
 from bs4 import BeautifulSoup
@@ -18,7 +18,14 @@ from dataclasses import dataclass
 from typing import Optional
 
 from datawarp.supervisor.events import EventStore, EventType, EventLevel, create_event
+from datawarp.utils import http, remote_zip
 
+logger = logging.getLogger(__name__)
+
+
+# Preview stage concurrency (overridable via DATAWARP_PREVIEW_DOWNLOADS / DATAWARP_PREVIEW_PROCESSES)
+PREVIEW_DOWNLOAD_WORKERS = 8
+PREVIEW_MAX_PROCESSES = 4
 
 MONTHS = {'jan':1,'feb':2,'mar':3,'apr':4,'may':5,'jun':6,
           'jul':7,'aug':8,'sep':9,'oct':10,'nov':11,'dec':12}
@@ -332,12 +339,8 @@ def scrape_resources(url, event_store: EventStore = None):
             level=EventLevel.DEBUG
         ))
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
-
-    response = requests.get(url, headers=headers)
+    # Browser-like User-Agent/Accept headers are set on the shared session
+    response = http.get(url)
     response.raise_for_status()
 
     soup = BeautifulSoup(response.content, 'html.parser')
@@ -371,12 +374,23 @@ def scrape_resources(url, event_store: EventStore = None):
 
 
 def get_excel_sheets(url):
-    """Download XLSX and return sheet names."""
+    """Return sheet names of a remote workbook.
+
+    XLSX/XLSM are read with HTTP Range requests (central directory plus
+    xl/workbook.xml only); servers without Range support and legacy .xls fall
+    back to a full download.
+    """
     import openpyxl
     from io import BytesIO
 
     try:
-        response = requests.get(url)
+        return remote_zip.list_remote_xlsx_sheets(url)
+    except Exception as e:
+        logger.debug(f"Range read of {url} failed ({e}), downloading full workbook")
+
+    try:
+        response = http.get(url)
+        response.raise_for_status()
         wb = openpyxl.load_workbook(BytesIO(response.content), read_only=True, data_only=True)
         return wb.sheetnames
     except Exception:
@@ -384,19 +398,32 @@ def get_excel_sheets(url):
 
 
 def inspect_zip(url):
-    """Download ZIP and list CSV/XLSX files."""
-    response = requests.get(url, stream=True)
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    for chunk in response.iter_content(8192):
-        tmp.write(chunk)
-    tmp.close()
+    """List CSV/XLSX files in a remote ZIP.
+
+    Reads only the central directory via HTTP Range requests, falling back to
+    a full download when the server does not support ranges.
+    """
+    try:
+        names = remote_zip.list_remote_zip(url)
+    except Exception as e:
+        logger.debug(f"Range read of {url} failed ({e}), downloading full ZIP")
+        names = None
+
+    if names is None:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
+        with http.get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(8192):
+                tmp.write(chunk)
+        tmp.close()
+
+        with ZipFile(tmp.name) as zf:
+            names = zf.namelist()
 
-    with ZipFile(tmp.name) as zf:
-        files = [f for f in zf.namelist()
-                if not f.endswith('/') and f.lower().endswith(('.csv', '.xlsx', '.xls'))]
+        Path(tmp.name).unlink()
 
-    Path(tmp.name).unlink()
-    return files
+    return [f for f in names
+            if not f.endswith('/') and f.lower().endswith(('.csv', '.xlsx', '.xls'))]
 
 
 def is_metadata_sheet(sheet_name: str) -> bool:
@@ -550,149 +577,223 @@ def generate_sources(groups):
     return sources
 
 
-def add_file_preview(file_entry: dict, event_store: EventStore = None) -> dict:
-    """Download file and add column preview for LLM enrichment.
+def build_file_previews(filepath: str, file_ext: str, sheets: list) -> dict:
+    """Compute previews for every requested sheet of one downloaded file.
 
-    Uses FileExtractor for Excel files to properly detect headers in files with metadata sections.
-    Returns file_entry with 'preview' field added containing actual column names.
+    Excel sheets use the header probe (probe_workbook): only the first rows
+    of each sheet are read, in one streaming open for all sheets. Top-level
+    and side-effect free so it can run in a worker process.
+
+    Returns:
+        {sheet: {'preview': {...}, 'sampling_info': {...}}} or {sheet: {'error': str}}
     """
     import pandas as pd
-    from pathlib import Path
-    from datawarp.utils.download import download_file
+    from datawarp.core.extractor import probe_workbook
 
-    url = file_entry['url']
-    file_name = Path(urlparse(url).path).name
-    file_ext = Path(file_name).suffix.lower()
+    results = {}
 
-    try:
-        # Download file using cached download utility (avoids re-downloading for multiple sheets)
-        tmp_path = download_file(url)
+    probes = None
+    if file_ext in ['.xlsx', '.xls', '.xlsm']:
+        # Header probe: streams only the top rows of each sheet, one workbook open
+        try:
+            probes = probe_workbook(filepath, sheets)
+        except Exception:
+            pass  # e.g. one missing sheet - probe sheets individually below
 
+    for sheet in sheets:
         try:
             if file_ext == '.csv':
                 # CSV: Simple pandas read (CSVs don't have metadata sections)
-                df = pd.read_csv(tmp_path, nrows=3)
-                columns = df.columns.tolist()
-                sample_rows = df.head(3).to_dict('records')
-
-                # Intelligent adaptive sampling for large CSV files
-                sample_rows, sampling_info = _adaptive_sample_rows(columns, sample_rows)
-
-                file_entry['preview'] = {
-                    'columns': columns,
-                    'sample_rows': sample_rows
-                }
-
-                if sampling_info['strategy'] != 'full' and event_store:
-                    event_store.emit(create_event(
-                        EventType.STAGE_COMPLETED,
-                        event_store.run_id,
-                        message=f"Adaptive sampling: {sampling_info['strategy']} ({sampling_info.get('sampled', len(columns))} of {len(columns)} columns)",
-                        stage="preview",
-                        level=EventLevel.DEBUG,
-                        context=sampling_info
-                    ))
-
+                df = pd.read_csv(filepath, nrows=3)
+                preview = {'columns': df.columns.tolist(), 'sample_rows': df.head(3).to_dict('records')}
             elif file_ext in ['.xlsx', '.xls', '.xlsm']:
-                # Excel: Use FileExtractor to correctly detect headers (handles metadata sections)
-                from datawarp.core.extractor import FileExtractor
-                import openpyxl
-
-                sheet_name = file_entry.get('sheet', 0)
-
-                # Use FileExtractor to detect structure (pass filepath, not worksheet)
-                extractor = FileExtractor(str(tmp_path), sheet_name=sheet_name)
-                structure = extractor.infer_structure()
-
-                if structure.is_valid:
-                    # Get actual column names from detected structure
-                    columns = [col.pg_name for col in structure.columns.values()]
-
-                    # Sample first 3 data rows (not metadata rows)
-                    sample_rows = []
-                    data_start = structure.data_start_row
-                    data_end = min(data_start + 2, structure.data_end_row)  # Up to 3 rows
-
-                    # Load workbook to read sample rows
-                    wb = openpyxl.load_workbook(tmp_path, read_only=True, data_only=True)
-                    ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name]
-
-                    for row_num in range(data_start, data_end + 1):
-                        row_dict = {}
-                        for col_idx, col_info in structure.columns.items():
-                            cell_value = ws.cell(row=row_num, column=col_idx).value
-                            row_dict[col_info.pg_name] = cell_value
-                        sample_rows.append(row_dict)
-
-                    wb.close()
-
-                    # Intelligent adaptive sampling for large files
-                    sample_rows, sampling_info = _adaptive_sample_rows(columns, sample_rows)
-
-                    file_entry['preview'] = {
-                        'columns': columns,
-                        'sample_rows': sample_rows
-                    }
-
-                    if sampling_info['strategy'] != 'full' and event_store:
-                        event_store.emit(create_event(
-                            EventType.STAGE_COMPLETED,
-                            event_store.run_id,
-                            message=f"Adaptive sampling: {sampling_info['strategy']} ({sampling_info.get('sampled', len(columns))} of {len(columns)} columns)",
-                            stage="preview",
-                            level=EventLevel.DEBUG,
-                            context=sampling_info
-                        ))
+                probe = probes[sheet] if probes else probe_workbook(filepath, [sheet])[sheet]
+                if probe.is_valid:
+                    preview = {'columns': probe.columns, 'sample_rows': probe.sample_rows}
                 else:
-                    # Fallback to pandas if FileExtractor fails
-                    df = pd.read_excel(tmp_path, sheet_name=sheet_name, nrows=3)
-                    columns = df.columns.tolist()
-                    sample_rows = df.head(3).to_dict('records')
-
-                    file_entry['preview'] = {
-                        'columns': columns,
-                        'sample_rows': sample_rows
-                    }
-
-            if event_store and 'preview' in file_entry:
-                event_store.emit(create_event(
-                    EventType.STAGE_COMPLETED,
-                    event_store.run_id,
-                    message=f"Preview generated: {len(file_entry['preview']['columns'])} columns",
-                    stage="preview",
-                    level=EventLevel.DEBUG,
-                    context={'file': file_name, 'columns': file_entry['preview']['columns']}
-                ))
-
-        except Exception as inner_e:
-            # Log error but don't fail - preview is optional
-            if event_store:
-                event_store.emit(create_event(
-                    EventType.WARNING,
-                    event_store.run_id,
-                    message=f"Preview extraction failed: {str(inner_e)}",
-                    stage="preview",
-                    level=EventLevel.WARNING,
-                    context={'file': file_name, 'error': str(inner_e)}
-                ))
-            # Note: Downloaded file will be cleaned up by clear_download_cache()
-
-    except Exception as e:
+                    # Fallback to pandas if header detection fails
+                    df = pd.read_excel(filepath, sheet_name=sheet, nrows=3)
+                    preview = {'columns': df.columns.tolist(), 'sample_rows': df.head(3).to_dict('records')}
+            else:
+                continue
+
+            # Intelligent adaptive sampling for large files
+            preview['sample_rows'], sampling_info = _adaptive_sample_rows(
+                preview['columns'], preview['sample_rows'])
+            results[sheet] = {'preview': preview, 'sampling_info': sampling_info}
+        except Exception as e:
+            results[sheet] = {'error': str(e)}
+    return results
+
+
+def _apply_preview(file_entry: dict, result: dict, event_store: EventStore = None):
+    """Attach a build_file_previews result to its manifest file entry and emit events."""
+    file_name = Path(urlparse(file_entry['url']).path).name
+
+    if 'error' in result:
+        # Log error but don't fail - preview is optional
         if event_store:
             event_store.emit(create_event(
                 EventType.WARNING,
                 event_store.run_id,
-                message=f"Preview generation failed: {str(e)}",
+                message=f"Preview extraction failed: {result['error']}",
                 stage="preview",
                 level=EventLevel.WARNING,
-                context={'file': file_name, 'error': str(e)}
+                context={'file': file_name, 'error': result['error']}
             ))
-        # Note: If no event_store (CLI mode), errors are silently ignored to allow
-        # manifest generation to continue. This is acceptable as preview is optional.
+        return
+
+    preview = result['preview']
+    sampling_info = result['sampling_info']
+    file_entry['preview'] = preview
+
+    if event_store:
+        columns = preview['columns']
+        if sampling_info['strategy'] != 'full':
+            event_store.emit(create_event(
+                EventType.STAGE_COMPLETED,
+                event_store.run_id,
+                message=f"Adaptive sampling: {sampling_info['strategy']} ({sampling_info.get('sampled', len(columns))} of {len(columns)} columns)",
+                stage="preview",
+                level=EventLevel.DEBUG,
+                context=sampling_info
+            ))
+        event_store.emit(create_event(
+            EventType.STAGE_COMPLETED,
+            event_store.run_id,
+            message=f"Preview generated: {len(columns)} columns",
+            stage="preview",
+            level=EventLevel.DEBUG,
+            context={'file': file_name, 'columns': columns}
+        ))
+
+
+def _preview_failed(file_entry: dict, error: Exception, event_store: EventStore = None):
+    # Note: If no event_store (CLI mode), errors are silently ignored to allow
+    # manifest generation to continue. This is acceptable as preview is optional.
+    if event_store:
+        file_name = Path(urlparse(file_entry['url']).path).name
+        event_store.emit(create_event(
+            EventType.WARNING,
+            event_store.run_id,
+            message=f"Preview generation failed: {str(error)}",
+            stage="preview",
+            level=EventLevel.WARNING,
+            context={'file': file_name, 'error': str(error)}
+        ))
+
+
+def _preview_sheet_key(file_entry: dict):
+    return file_entry.get('sheet', 0)
+
+
+def add_file_preview(file_entry: dict, event_store: EventStore = None) -> dict:
+    """Download file and add column preview for LLM enrichment.
+
+    Uses the FileExtractor header probe for Excel files to properly detect headers in files with metadata sections.
+    Returns file_entry with 'preview' field added containing actual column names.
+    """
+    from datawarp.utils.download import download_file
+
+    url = file_entry['url']
+    file_ext = Path(urlparse(url).path).suffix.lower()
+    sheet = _preview_sheet_key(file_entry)
+
+    try:
+        # Download file using cached download utility (avoids re-downloading for multiple sheets)
+        tmp_path = download_file(url)
+        results = build_file_previews(str(tmp_path), file_ext, [sheet])
+        if sheet in results:
+            _apply_preview(file_entry, results[sheet], event_store)
+    except Exception as e:
+        _preview_failed(file_entry, e, event_store)
 
     return file_entry
 
 
+def generate_file_previews(
+    file_entries: list,
+    event_store: EventStore = None,
+    download_workers: int = None,
+    max_processes: int = None
+) -> list:
+    """Add previews to many manifest file entries as a bounded concurrent stage.
+
+    Downloads run on a thread pool; each downloaded file is handed straight to
+    a process pool for structure detection (CPU-bound openpyxl work). Entries
+    that share a URL (several sheets of one workbook) download and open it
+    once. Events are emitted from the calling thread only.
+    """
+    import os
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+    from datawarp.utils.download import download_file
+
+    download_workers = download_workers or int(os.getenv('DATAWARP_PREVIEW_DOWNLOADS', str(PREVIEW_DOWNLOAD_WORKERS)))
+    if max_processes is None:
+        max_processes = int(os.getenv('DATAWARP_PREVIEW_PROCESSES', str(min(PREVIEW_MAX_PROCESSES, os.cpu_count() or 1))))
+
+    # Group entries by file so each is downloaded and opened once
+    by_url = defaultdict(list)
+    for entry in file_entries:
+        file_ext = Path(urlparse(entry['url']).path).suffix.lower()
+        if file_ext in ('.csv', '.xlsx', '.xls', '.xlsm'):
+            by_url[entry['url']].append(entry)
+    if not by_url:
+        return file_entries
+
+    def sheets_for(url):
+        return list(dict.fromkeys(_preview_sheet_key(e) for e in by_url[url]))
+
+    def apply(url, results):
+        for entry in by_url[url]:
+            sheet = _preview_sheet_key(entry)
+            if sheet in results:
+                _apply_preview(entry, results[sheet], event_store)
+
+    # A process pool only pays for itself with several files to parse
+    processes = min(max_processes, len(by_url))
+    # spawn, not fork: download threads are running when workers start
+    executor = ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+    ) if processes > 1 else None
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(download_workers, len(by_url))) as downloads:
+            download_futures = {downloads.submit(download_file, url): url for url in by_url}
+            parse_futures = {}
+
+            for future in as_completed(download_futures):
+                url = download_futures[future]
+                try:
+                    path = str(future.result())
+                except Exception as e:
+                    for entry in by_url[url]:
+                        _preview_failed(entry, e, event_store)
+                    continue
+
+                args = (path, Path(urlparse(url).path).suffix.lower(), sheets_for(url))
+                if executor:
+                    parse_futures[executor.submit(build_file_previews, *args)] = (url, args)
+                else:
+                    apply(url, build_file_previews(*args))
+
+        for future in as_completed(parse_futures):
+            url, args = parse_futures[future]
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                # Worker died (e.g. out of memory) - retry this file in-process
+                results = build_file_previews(*args)
+            apply(url, results)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return file_entries
+
+
 def generate_manifest(
     url: str,
     output_path: Path,
@@ -772,9 +873,10 @@ def generate_manifest(
                     stage="preview"
                 ))
 
-            for source in sources:
-                for file_entry in source.get('files', []):
-                    add_file_preview(file_entry, event_store)
+            generate_file_previews(
+                [file_entry for source in sources for file_entry in source.get('files', [])],
+                event_store
+            )
 
             # Clear caches after preview generation
             from datawarp.utils.download import clear_download_cache
@@ -0,0 +1,311 @@
+"""Compiled reference-manifest index for enrichment.
+
+enrich_manifest matches draft sources against a reference manifest by exact
+file name, URL pattern + sheet/extract, and URL pattern alone, then copies
+column metadata by (fuzzy) column name. Building those maps means parsing
+the reference YAML and running normalize_url over every file, which used to
+happen on every call.
+
+The compiled ReferenceIndex is saved as JSON next to the reference manifest
+(adhd_2025-11_enriched.yaml → adhd_2025-11_enriched.refindex.json) and kept
+in memory per process. It is reused while the manifest's mtime and size are
+unchanged, or while its content hash matches (e.g. after a touch or copy),
+and rebuilt otherwise. The file holds plain data only; the column and source
+indexes are rebuilt from it on load.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple
+
+import yaml
+
+from datawarp.pipeline import enricher
+from datawarp.pipeline.enricher import (
+    normalize_url, normalize_column_name, ColumnNameIndex, ReferenceSourceIndex
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _code_version() -> str:
+    """Hash of the code that builds and matches the index.
+
+    Any change to this module or to the enricher's normalization rules gives
+    a new version, so saved indexes are rebuilt without a manual bump.
+    """
+    digest = hashlib.sha256()
+    for module_file in (__file__, enricher.__file__):
+        digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+REFERENCE_INDEX_VERSION = _code_version()
+
+_memo: Dict[str, 'ReferenceIndex'] = {}
+_memo_lock = threading.Lock()
+
+
+@dataclass
+class ReferenceIndex:
+    """Lookup maps over one reference manifest's sources."""
+    reference_path: str
+    content_hash: str
+    mtime_ns: int
+    size: int
+    sources: List[dict]
+    url_map: Dict[str, int] = field(default_factory=dict)              # file name → source
+    pattern_map: Dict[str, int] = field(default_factory=dict)          # URL pattern → source
+    pattern_sheet_map: Dict[Tuple[str, str], int] = field(default_factory=dict)  # (pattern, sheet/extract) → source
+    column_indexes: Dict[int, ColumnNameIndex] = field(default_factory=dict)     # source → reference column names
+    source_index: Optional[ReferenceSourceIndex] = None                # fingerprints + column postings
+    version: str = REFERENCE_INDEX_VERSION
+
+    def match_source(self, source: dict) -> Tuple[Optional[int], Optional[str]]:
+        """Find the reference source for a draft source.
+
+        Strategies per file, first hit wins: exact file name, pattern + sheet,
+        pattern + extract, pattern only.
+
+        Returns:
+            (reference source position, match method) or (None, None)
+        """
+        for file in source.get('files') or []:
+            if 'url' not in file:
+                continue
+
+            # Strategy 1: Exact URL match
+            url_key = Path(file['url']).name
+            if url_key in self.url_map:
+                return self.url_map[url_key], 'exact_url'
+
+            url_pattern = normalize_url(file['url'])
+
+            # Strategy 2a: Pattern + Sheet match (Excel files)
+            if 'sheet' in file and (url_pattern, file['sheet']) in self.pattern_sheet_map:
+                return self.pattern_sheet_map[(url_pattern, file['sheet'])], 'pattern_sheet'
+
+            # Strategy 2b: Pattern + Extract match (ZIP/CSV files)
+            if 'extract' in file:
+                key = (url_pattern, normalize_url(file['extract']))
+                if key in self.pattern_sheet_map:
+                    return self.pattern_sheet_map[key], 'pattern_extract'
+
+            # Strategy 3: Pattern-only match (fallback)
+            if url_pattern in self.pattern_map:
+                return self.pattern_map[url_pattern], 'pattern'
+
+        return None, None
+
+    def column_index(self, position: int) -> Optional[ColumnNameIndex]:
+        """Prebuilt fuzzy-match index over a reference source's column names."""
+        return self.column_indexes.get(position)
+
+
+def index_path_for(reference_path) -> Path:
+    """Where the compiled index for a reference manifest lives."""
+    path = Path(reference_path)
+    return path.with_name(f"{path.stem}.refindex.json")
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_name(col) -> str:
+    if isinstance(col, dict):
+        return col.get('name', col.get('code', col.get('original_name', '')))
+    return str(col)
+
+
+def build_reference_index(reference_path) -> ReferenceIndex:
+    """Parse a reference manifest and compile its lookup maps."""
+    path = Path(reference_path)
+    stat = path.stat()
+    content_hash = _file_hash(path)
+    with open(path) as f:
+        ref_manifest = yaml.safe_load(f)
+
+    sources = ref_manifest.get('sources', []) or []
+    index = ReferenceIndex(
+        reference_path=str(path),
+        content_hash=content_hash,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        sources=sources
+    )
+    column_names = {}
+
+    # First source wins for every key, matching the order enrich_manifest scans them
+    for position, src in enumerate(sources):
+        for file in src.get('files', []):
+            if 'url' not in file:
+                continue
+            index.url_map.setdefault(Path(file['url']).name, position)
+            url_pattern = normalize_url(file['url'])
+            index.pattern_map.setdefault(url_pattern, position)
+            if 'sheet' in file:
+                index.pattern_sheet_map.setdefault((url_pattern, file['sheet']), position)
+            elif 'extract' in file:
+                index.pattern_sheet_map.setdefault((url_pattern, normalize_url(file['extract'])), position)
+
+        if src.get('columns'):
+            names = {}
+            for col in src['columns']:
+                norm_name = normalize_column_name(_column_name(col))
+                if norm_name:
+                    names[norm_name] = None
+            column_names[position] = list(names)
+
+    _attach_indexes(index, column_names)
+    return index
+
+
+def _attach_indexes(index: ReferenceIndex, column_names: Dict[int, List[str]]) -> None:
+    """Build the in-memory column and source indexes from plain data."""
+    index.column_indexes = {position: ColumnNameIndex(names) for position, names in column_names.items()}
+    index.source_index = ReferenceSourceIndex(index.sources)
+
+
+# YAML gives dates and datetimes; tag them so they come back as the same types
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_object(obj: dict):
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+    return obj
+
+
+def _index_to_json(index: ReferenceIndex) -> str:
+    return json.dumps({
+        'version': index.version,
+        'reference_path': index.reference_path,
+        'content_hash': index.content_hash,
+        'mtime_ns': index.mtime_ns,
+        'size': index.size,
+        'sources': index.sources,
+        'url_map': index.url_map,
+        'pattern_map': index.pattern_map,
+        'pattern_sheet_map': [[pattern, key, position]
+                              for (pattern, key), position in index.pattern_sheet_map.items()],
+        'column_names': [[position, column_index.names]
+                         for position, column_index in index.column_indexes.items()],
+    }, default=_encode_value)
+
+
+def _index_from_json(text: str) -> Optional[ReferenceIndex]:
+    data = json.loads(text, object_hook=_decode_object)
+    if data.get('version') != REFERENCE_INDEX_VERSION:
+        return None
+    index = ReferenceIndex(
+        reference_path=data['reference_path'],
+        content_hash=data['content_hash'],
+        mtime_ns=data['mtime_ns'],
+        size=data['size'],
+        sources=data['sources'],
+        url_map=data['url_map'],
+        pattern_map=data['pattern_map'],
+        pattern_sheet_map={(pattern, key): position
+                           for pattern, key, position in data['pattern_sheet_map']},
+    )
+    _attach_indexes(index, {position: names for position, names in data['column_names']})
+    return index
+
+
+def _read_index(index_path: Path) -> Optional[ReferenceIndex]:
+    try:
+        text = index_path.read_text()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Discarding unreadable reference index {index_path}: {e}")
+        return None
+    try:
+        return _index_from_json(text)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Discarding unreadable reference index {index_path}: {e}")
+        return None
+
+
+def _write_index(index: ReferenceIndex, index_path: Path) -> None:
+    """Atomic write; a read-only manifests directory just means no reuse across runs."""
+    tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+    try:
+        text = _index_to_json(index)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Could not save reference index {index_path}: {e}")
+        return
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        logger.warning(f"Could not save reference index {index_path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def _is_current(index: ReferenceIndex, path: Path, stat: os.stat_result) -> bool:
+    if index.mtime_ns == stat.st_mtime_ns and index.size == stat.st_size:
+        return True
+    if index.size == stat.st_size and index.content_hash == _file_hash(path):
+        # Same content, new mtime (touched or copied) - refresh the stamp
+        index.mtime_ns = stat.st_mtime_ns
+        return True
+    return False
+
+
+def load_reference_index(reference_path) -> ReferenceIndex:
+    """Get the compiled index for a reference manifest, rebuilding only if it changed.
+
+    Checks the in-process memo, then the .refindex.json file, then builds.
+    """
+    path = Path(reference_path).resolve()
+    stat = path.stat()
+    key = str(path)
+
+    with _memo_lock:
+        cached = _memo.get(key)
+    if cached and _is_current(cached, path, stat):
+        return cached
+
+    index_path = index_path_for(path)
+    index = _read_index(index_path)
+    if index is not None:
+        stamp = index.mtime_ns
+        if _is_current(index, path, stat):
+            if index.mtime_ns != stamp:
+                _write_index(index, index_path)
+        else:
+            index = None
+
+    if index is None:
+        index = build_reference_index(path)
+        _write_index(index, index_path)
+
+    with _memo_lock:
+        _memo[key] = index
+    return index
+
+
+def clear_reference_index_cache() -> None:
+    """Drop the in-process memo (files on disk are left in place)."""
+    with _memo_lock:
+        _memo.clear()
@@ -1,11 +1,25 @@
 """
 Structural fingerprinting for cross-period source matching.
 Pure deterministic - no LLM calls, no pattern matching.
+
+Candidate retrieval uses MinHash signatures with LSH banding: fingerprints
+sharing any band bucket are candidates, and only candidates get an exact
+Jaccard check. With 32 bands of 4 rows, a pair at Jaccard 0.8 becomes a
+candidate with probability > 0.9999999 (0.7: > 0.9998).
 """
 import hashlib
-from typing import List, Dict, Set, Tuple, Optional
+import random
+from typing import List, Dict, Set, Tuple, Optional, Iterable, Union
 from dataclasses import dataclass
 
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)  # Fixed seed: signatures are persisted, so permutations must never change
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+
 @dataclass
 class Fingerprint:
     """Structural fingerprint for source matching."""
@@ -45,21 +59,98 @@ def jaccard_similarity(fp1: Fingerprint, fp2: Fingerprint) -> float:
 
     return intersection / union if union > 0 else 0.0
 
-def find_best_match(
-    new_fp: Fingerprint,
-    registry: Dict[str, Fingerprint],
-    threshold: float = 0.80
-) -> Tuple[Optional[str], float]:
-    """
-    Find best matching canonical code from registry.
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
 
-    Returns:
-        (canonical_code, confidence) or (None, 0.0) if no match
+
+def minhash_signature(column_names: Iterable[str]) -> List[int]:
+    """MinHash signature of a column-name set (MINHASH_PERMUTATIONS values < 2^61)."""
+    hashes = [_hash64(name) for name in set(column_names)]
+    if not hashes:
+        return [_MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def lsh_buckets(signature: List[int], bands: int = LSH_BANDS) -> List[int]:
+    """One bucket id per band (band number mixed in, so ids never collide across bands).
+
+    Ids are signed 64-bit, to store as BIGINT[] and query with && (array overlap).
     """
+    rows = len(signature) // bands
+    buckets = []
+    for band in range(bands):
+        key = f"{band}:" + ','.join(map(str, signature[band * rows:(band + 1) * rows]))
+        buckets.append(_hash64(key) - (1 << 63))
+    return buckets
+
+
+def fingerprint_from_json(data: dict) -> Fingerprint:
+    """Rebuild a Fingerprint from its tbl_canonical_sources.fingerprint JSONB."""
+    col_names = set(data.get('column_names', []))
+    return Fingerprint(
+        column_names=col_names,
+        column_count=len(col_names),
+        signature_hash=data.get('signature_hash') or hashlib.md5('|'.join(sorted(col_names)).encode()).hexdigest()
+    )
+
+
+def fingerprint_to_json(fp: Fingerprint) -> dict:
+    """Serialise a Fingerprint for tbl_canonical_sources.fingerprint."""
+    return {'column_names': sorted(fp.column_names), 'signature_hash': fp.signature_hash}
+
+
+def source_fingerprint(source: dict) -> Optional[Fingerprint]:
+    """Fingerprint a manifest source from its column list (None if it has no columns)."""
+    columns = []
+    for col in source.get('columns') or []:
+        name = col.get('original_name') or col.get('name') if isinstance(col, dict) else col
+        if name:
+            columns.append({'original_name': str(name)})
+    return generate_fingerprint(columns) if columns else None
+
+
+class FingerprintIndex:
+    """In-memory MinHash/LSH index over registry fingerprints."""
+
+    def __init__(self, bands: int = LSH_BANDS):
+        self.bands = bands
+        self._fingerprints: Dict[str, Fingerprint] = {}
+        self._order: Dict[str, int] = {}
+        self._by_hash: Dict[str, str] = {}
+        self._buckets: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, canonical_code: str, fp: Fingerprint, signature: Optional[List[int]] = None) -> None:
+        if canonical_code in self._fingerprints:
+            raise ValueError(f"{canonical_code} already indexed")
+        self._fingerprints[canonical_code] = fp
+        self._order[canonical_code] = len(self._order)
+        self._by_hash.setdefault(fp.signature_hash, canonical_code)
+        for bucket in lsh_buckets(signature or minhash_signature(fp.column_names), self.bands):
+            self._buckets.setdefault(bucket, []).append(canonical_code)
+
+    def candidates(self, fp: Fingerprint) -> List[str]:
+        """Codes sharing at least one LSH bucket with fp, in insertion order."""
+        found = set()
+        for bucket in lsh_buckets(minhash_signature(fp.column_names), self.bands):
+            found.update(self._buckets.get(bucket, ()))
+        return sorted(found, key=self._order.__getitem__)
+
+    def find_best_match(self, new_fp: Fingerprint, threshold: float = 0.80) -> Tuple[Optional[str], float]:
+        """Like find_best_match, but exact Jaccard runs only on LSH candidates."""
+        if new_fp.signature_hash in self._by_hash:
+            return (self._by_hash[new_fp.signature_hash], 1.0)
+        return _best_of(new_fp, ((code, self._fingerprints[code]) for code in self.candidates(new_fp)), threshold)
+
+
+def _best_of(new_fp: Fingerprint, fingerprints: Iterable[Tuple[str, Fingerprint]],
+             threshold: float) -> Tuple[Optional[str], float]:
     best_match = None
     best_score = 0.0
 
-    for canonical_code, stored_fp in registry.items():
+    for canonical_code, stored_fp in fingerprints:
         score = jaccard_similarity(new_fp, stored_fp)
         if score > best_score:
             best_score = score
@@ -69,3 +160,63 @@ def find_best_match(
         return (best_match, best_score)
 
     return (None, 0.0)
+
+
+def find_best_match(
+    new_fp: Fingerprint,
+    registry: Union[Dict[str, Fingerprint], FingerprintIndex],
+    threshold: float = 0.80
+) -> Tuple[Optional[str], float]:
+    """
+    Find best matching canonical code from registry.
+
+    A FingerprintIndex registry scores only LSH candidates; a plain dict is
+    scanned in full.
+
+    Returns:
+        (canonical_code, confidence) or (None, 0.0) if no match
+    """
+    if isinstance(registry, FingerprintIndex):
+        return registry.find_best_match(new_fp, threshold)
+    return _best_of(new_fp, registry.items(), threshold)
+
+
+def find_registry_match(new_fp: Fingerprint, conn, threshold: float = 0.80,
+                        publication_id: Optional[str] = None) -> Tuple[Optional[str], float]:
+    """Find best match in tbl_canonical_sources via its persisted LSH buckets.
+
+    With publication_id, only sources of that publication are considered.
+    """
+    from datawarp.storage.repository import get_fingerprint_candidates
+
+    buckets = lsh_buckets(minhash_signature(new_fp.column_names))
+    candidates = get_fingerprint_candidates(buckets, conn, publication_id)
+    return _best_of(new_fp, ((row['canonical_code'], fingerprint_from_json(row['fingerprint']))
+                             for row in candidates), threshold)
+
+
+def register_canonical_source(canonical_code: str, fp: Fingerprint, conn, publication_id: str = None,
+                              name: str = None, table: str = None, period: str = None) -> None:
+    """Upsert a canonical source with its fingerprint, MinHash signature and LSH buckets. Caller commits."""
+    from datawarp.storage.repository import upsert_canonical_source
+
+    signature = minhash_signature(fp.column_names)
+    upsert_canonical_source(canonical_code, publication_id, name or canonical_code,
+                            table or f"tbl_{canonical_code}", fingerprint_to_json(fp), period,
+                            signature, lsh_buckets(signature), conn)
+
+
+def index_registry_fingerprints(conn) -> int:
+    """Compute and store MinHash signatures for registry rows that lack one.
+
+    Returns:
+        Number of canonical sources indexed
+    """
+    from datawarp.storage.repository import get_unindexed_fingerprints, set_fingerprint_signature
+
+    rows = get_unindexed_fingerprints(conn)
+    for row in rows:
+        signature = minhash_signature(fingerprint_from_json(row['fingerprint']).column_names)
+        set_fingerprint_signature(row['canonical_code'], signature, lsh_buckets(signature), conn)
+    conn.commit()
+    return len(rows)
@@ -216,6 +216,19 @@ def get_last_load(source_id: int, conn) -> Optional[LoadEvent]:
     )
 
 
+def get_latest_load_id(source_id: int, conn) -> Optional[int]:
+    """Highest tbl_load_history id (the staging _load_id) for a source, or None."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT MAX(id) FROM datawarp.tbl_load_history WHERE source_id = %s",
+        (source_id,)
+    )
+    row = cur.fetchone()
+    cur.close()
+
+    return row[0] if row else None
+
+
 # Manifest Tracking Functions
 
 def check_manifest_file_status(manifest_name: str, file_url: str, conn) -> Optional[dict]:
@@ -289,8 +302,16 @@ def record_manifest_file(
             loaded_at
         )
     )
+    manifest_file_id = cur.fetchone()[0]
+
+    # A completed load needs no resume point; cleared in the same transaction
+    if status == 'loaded':
+        cur.execute(
+            "DELETE FROM datawarp.tbl_load_checkpoints WHERE manifest_file_id = %s",
+            (manifest_file_id,)
+        )
 
-    return cur.fetchone()[0]
+    return manifest_file_id
 
 
 def get_manifest_summary(manifest_name: str, conn) -> dict:
@@ -375,6 +396,197 @@ def get_manifest_files(manifest_name: str, conn) -> List[dict]:
     return files
 
 
+# Load Checkpoint Functions (chunk-level resumable loads)
+
+def get_load_checkpoints(manifest_file_id: int, conn) -> List[dict]:
+    """Get committed chunk checkpoints for a manifest file, in chunk order."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT chunk_index, load_id, row_start, row_end, rows_committed, total_rows, committed_at
+        FROM datawarp.tbl_load_checkpoints
+        WHERE manifest_file_id = %s
+        ORDER BY chunk_index ASC
+        """,
+        (manifest_file_id,)
+    )
+
+    checkpoints = []
+    for row in cur.fetchall():
+        checkpoints.append({
+            'chunk_index': row[0],
+            'load_id': row[1],
+            'row_start': row[2],
+            'row_end': row[3],
+            'rows_committed': row[4],
+            'total_rows': row[5],
+            'committed_at': row[6]
+        })
+    cur.close()
+
+    return checkpoints
+
+
+def record_load_checkpoint(
+    manifest_file_id: int,
+    load_id: int,
+    chunk_index: int,
+    row_start: int,
+    row_end: int,
+    rows_committed: int,
+    total_rows: int,
+    conn
+) -> None:
+    """Record a committed chunk. Caller commits together with the chunk's rows."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO datawarp.tbl_load_checkpoints
+        (manifest_file_id, load_id, chunk_index, row_start, row_end, rows_committed, total_rows, committed_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+        """,
+        (manifest_file_id, load_id, chunk_index, row_start, row_end, rows_committed, total_rows)
+    )
+    cur.close()
+
+
+def clear_load_checkpoints(manifest_file_id: int, conn) -> int:
+    """Delete all checkpoints for a manifest file. Returns rows deleted."""
+    cur = conn.cursor()
+    cur.execute(
+        "DELETE FROM datawarp.tbl_load_checkpoints WHERE manifest_file_id = %s",
+        (manifest_file_id,)
+    )
+    deleted = cur.rowcount
+    cur.close()
+
+    return deleted
+
+
+def get_canonical_source(canonical_code: str, conn) -> Optional[dict]:
+    """Get a canonical source registry row by code."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT canonical_code, canonical_name, canonical_table, fingerprint, publication_id
+        FROM datawarp.tbl_canonical_sources
+        WHERE canonical_code = %s
+        """,
+        (canonical_code,)
+    )
+    row = cur.fetchone()
+    cur.close()
+
+    if not row:
+        return None
+    return {'canonical_code': row[0], 'canonical_name': row[1], 'canonical_table': row[2], 'fingerprint': row[3],
+            'publication_id': row[4]}
+
+
+def upsert_canonical_source(canonical_code: str, publication_id: Optional[str], canonical_name: str,
+                            canonical_table: str, fingerprint: dict, period: Optional[str],
+                            signature: List[int], buckets: List[int], conn) -> None:
+    """Register a canonical source, or refresh its fingerprint and last_seen_period. Caller commits.
+
+    The MinHash signature and LSH buckets are written with the fingerprint so
+    get_fingerprint_candidates can find the row.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO datawarp.tbl_canonical_sources
+        (canonical_code, publication_id, canonical_name, canonical_table, fingerprint,
+         first_seen_period, last_seen_period, minhash_signature, lsh_buckets)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (canonical_code) DO UPDATE SET
+            fingerprint = EXCLUDED.fingerprint,
+            last_seen_period = GREATEST(datawarp.tbl_canonical_sources.last_seen_period, EXCLUDED.last_seen_period),
+            minhash_signature = EXCLUDED.minhash_signature,
+            lsh_buckets = EXCLUDED.lsh_buckets,
+            updated_at = NOW()
+        """,
+        (canonical_code, publication_id, canonical_name, canonical_table, json.dumps(fingerprint),
+         period, period, signature, buckets)
+    )
+    cur.close()
+
+
+def log_source_mapping(llm_generated_code: str, period: Optional[str], canonical_code: str,
+                       confidence: float, method: str, fingerprint: dict, conn) -> None:
+    """Record which canonical source a generated code was mapped to. Caller commits."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO datawarp.tbl_source_mappings
+        (llm_generated_code, period, canonical_code, match_confidence, match_method, source_fingerprint)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (llm_generated_code, period) DO UPDATE SET
+            canonical_code = EXCLUDED.canonical_code,
+            match_confidence = EXCLUDED.match_confidence,
+            match_method = EXCLUDED.match_method,
+            source_fingerprint = EXCLUDED.source_fingerprint,
+            mapped_at = NOW()
+        """,
+        (llm_generated_code, period, canonical_code, confidence, method, json.dumps(fingerprint))
+    )
+    cur.close()
+
+
+def get_fingerprint_candidates(buckets: List[int], conn, publication_id: Optional[str] = None) -> List[dict]:
+    """Get canonical sources sharing any LSH bucket (GIN array overlap), in registry order.
+
+    With publication_id, only that publication's sources are candidates.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT canonical_code, fingerprint
+        FROM datawarp.tbl_canonical_sources
+        WHERE lsh_buckets && %s::bigint[]
+          AND (%s::text IS NULL OR publication_id = %s)
+        ORDER BY created_at ASC, canonical_code ASC
+        """,
+        (buckets, publication_id, publication_id)
+    )
+
+    candidates = [{'canonical_code': row[0], 'fingerprint': row[1]} for row in cur.fetchall()]
+    cur.close()
+
+    return candidates
+
+
+def get_unindexed_fingerprints(conn) -> List[dict]:
+    """Get canonical sources whose fingerprint has no MinHash signature yet."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT canonical_code, fingerprint
+        FROM datawarp.tbl_canonical_sources
+        WHERE minhash_signature IS NULL
+        ORDER BY created_at ASC, canonical_code ASC
+        """
+    )
+
+    rows = [{'canonical_code': row[0], 'fingerprint': row[1]} for row in cur.fetchall()]
+    cur.close()
+
+    return rows
+
+
+def set_fingerprint_signature(canonical_code: str, signature: List[int], buckets: List[int], conn) -> None:
+    """Store the MinHash signature and LSH buckets for a canonical source. Caller commits."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE datawarp.tbl_canonical_sources
+        SET minhash_signature = %s, lsh_buckets = %s, updated_at = NOW()
+        WHERE canonical_code = %s
+        """,
+        (signature, buckets, canonical_code)
+    )
+    cur.close()
+
+
 def store_column_metadata(canonical_source_code: str, columns: list, conn) -> int:
     """Store column metadata from manifest enrichment.
 
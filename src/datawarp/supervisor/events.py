@@ -10,6 +10,7 @@ Design principles:
 
 import json
 import logging
+import threading
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
@@ -145,19 +146,23 @@ class EventStore:
         # Open JSONL file for appending
         self._jsonl_handle = open(self.jsonl_file, 'a')
 
+        # Concurrent stages (previews, batched enrichment) emit from worker threads
+        self._emit_lock = threading.Lock()
+
     def emit(self, event: Event):
         """Emit event to all outputs."""
         # Ensure run_id matches
         event.run_id = self.run_id
 
-        # Console output (summary level)
-        self._emit_console(event)
+        with self._emit_lock:
+            # Console output (summary level)
+            self._emit_console(event)
 
-        # File log (detailed)
-        self._emit_file_log(event)
+            # File log (detailed)
+            self._emit_file_log(event)
 
-        # JSONL (everything)
-        self._emit_jsonl(event)
+            # JSONL (everything)
+            self._emit_jsonl(event)
 
     def _emit_console(self, event: Event):
         """Emit to console (summary level only)."""
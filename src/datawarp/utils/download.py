@@ -1,30 +1,250 @@
-"""File download utilities for DataWarp v2."""
+"""File download utilities for DataWarp v2.
 
+Downloads go through a persistent, content-addressed on-disk cache:
+
+    <cache_dir>/objects/<sha256><suffix>   file bytes (deduplicated across URLs)
+    <cache_dir>/index.json                 url → {sha256, etag, last_modified, size, last_used}
+
+Repeat requests send If-None-Match / If-Modified-Since, so an unchanged NHS
+file costs a 304 instead of a full download. The cache is size-bounded and
+evicts least-recently-used objects.
+
+Several processes may share one cache directory: index.json is only updated
+under an exclusive lock on index.lock, re-reading it first so concurrent
+writers merge rather than overwrite each other. Objects used in the last
+DEFAULT_EVICT_GRACE_SECONDS are not evicted, since a caller (e.g. a preview
+thread) may be about to open the path it was just given.
+"""
+
+import os
+import json
+import time
+import hashlib
 import tempfile
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-import requests
+from typing import Optional
+from urllib.parse import urlparse
+
+from datawarp.utils import http
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process index lock
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'datawarp' / 'downloads'
+DEFAULT_CACHE_MAX_MB = 2048
+DEFAULT_EVICT_GRACE_SECONDS = 30
+
 # Session-scoped download cache: url → local path
-# Prevents re-downloading same file for multiple sheets
+# Prevents re-validating same file for multiple sheets within one run
 _download_cache: dict[str, Path] = {}
 
+# Run-level download statistics (reported in batch/backfill summaries)
+_download_stats = {
+    'requests': 0,
+    'downloaded': 0,
+    'not_modified': 0,
+    'bytes_downloaded': 0,
+    'bytes_saved': 0,
+}
+
+# Guards _download_cache and _download_stats (downloads run on a thread pool)
+_state_lock = threading.Lock()
+
+
+def _count(**increments):
+    with _state_lock:
+        for key, value in increments.items():
+            _download_stats[key] += value
+
+
+class DiskCache:
+    """Content-addressed, size-bounded on-disk cache with LRU eviction."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int,
+                 evict_grace_seconds: float = DEFAULT_EVICT_GRACE_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.index_path = self.cache_dir / 'index.json'
+        self.lock_path = self.cache_dir / 'index.lock'
+        self.max_bytes = max_bytes
+        self.evict_grace_seconds = evict_grace_seconds
+        self._lock = threading.Lock()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            return json.loads(self.index_path.read_text())
+        except (json.JSONDecodeError, OSError):
+            logger.warning(f"Download cache index unreadable, starting empty: {self.index_path}")
+            return {}
+
+    def _write_index(self):
+        # Write-then-rename so a crash never leaves a half-written index
+        tmp = self.index_path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(self._index, indent=1))
+        tmp.replace(self.index_path)
+
+    @contextmanager
+    def _locked_index(self):
+        """Hold the thread and file locks around a read-modify-write of the index."""
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._index = self._read_index()
+                yield self._index
+                self._write_index()
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def object_path(self, sha256: str, suffix: str) -> Path:
+        return self.objects_dir / f"{sha256}{suffix}"
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the index entry for url if its object is still on disk."""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                # Another process may have stored it since we last read the index
+                self._index = self._read_index()
+                entry = self._index.get(url)
+        if entry and self.object_path(entry['sha256'], entry['suffix']).exists():
+            return entry
+        return None
+
+    def touch(self, url: str):
+        """Mark url as recently used."""
+        with self._locked_index() as index:
+            if url in index:
+                index[url]['last_used'] = time.time()
+
+    def store(self, url: str, tmp_path: Path, suffix: str, etag: Optional[str],
+              last_modified: Optional[str]) -> Path:
+        """Move a downloaded temp file into the cache and index it under url."""
+        sha = hashlib.sha256()
+        with open(tmp_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+
+        target = self.object_path(digest, suffix)
+        if target.exists():
+            tmp_path.unlink()  # Same bytes already cached under another URL
+        else:
+            tmp_path.replace(target)
+
+        with self._locked_index() as index:
+            index[url] = {
+                'sha256': digest,
+                'suffix': suffix,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': target.stat().st_size,
+                'last_used': time.time(),
+            }
+            self._evict(keep=(digest, suffix))
+        return target
+
+    def _evict(self, keep: tuple):
+        """Drop least-recently-used objects until under max_bytes. Caller holds lock.
+
+        The object just stored (keep) is never evicted, even if it alone exceeds the
+        limit. Objects used within evict_grace_seconds are skipped too; the cache may
+        stay over the limit until a later store() finds them old enough.
+        """
+        objects = {}
+        for url, entry in self._index.items():
+            key = (entry['sha256'], entry['suffix'])
+            last_used = max(objects.get(key, (0, 0))[0], entry['last_used'])
+            objects[key] = (last_used, entry['size'])
+
+        total = sum(size for _, size in objects.values())
+        recent = time.time() - self.evict_grace_seconds
+        for key, (last_used, size) in sorted(objects.items(), key=lambda kv: kv[1][0]):
+            if total <= self.max_bytes or last_used > recent:
+                break
+            if key == keep:
+                continue
+            path = self.object_path(*key)
+            path.unlink(missing_ok=True)
+            # Derived files (e.g. .xls → .xlsx conversion) share the object's stem
+            if key[1] == '.xls':
+                path.with_suffix('.xlsx').unlink(missing_ok=True)
+            self._index = {u: e for u, e in self._index.items() if (e['sha256'], e['suffix']) != key}
+            total -= size
+            logger.debug(f"Evicted cached download {path.name} ({size:,} bytes)")
+
+    def new_temp_file(self, suffix: str):
+        """Temp file inside the cache dir so store() is an atomic rename."""
+        return tempfile.NamedTemporaryFile(dir=self.objects_dir, suffix=suffix + '.part', delete=False)
+
+
+_disk_cache: Optional[DiskCache] = None
+
+
+def get_disk_cache() -> DiskCache:
+    """Get the process-wide disk cache (configured from environment)."""
+    global _disk_cache
+    if _disk_cache is None:
+        cache_dir = Path(os.getenv('DATAWARP_CACHE_DIR', str(DEFAULT_CACHE_DIR)))
+        max_mb = int(os.getenv('DATAWARP_CACHE_MAX_MB', str(DEFAULT_CACHE_MAX_MB)))
+        grace = float(os.getenv('DATAWARP_CACHE_EVICT_GRACE_SECONDS', str(DEFAULT_EVICT_GRACE_SECONDS)))
+        _disk_cache = DiskCache(cache_dir, max_mb * 1024 * 1024, grace)
+    return _disk_cache
+
 
 def clear_download_cache():
-    """Clear the download cache. Call at end of batch processing."""
-    _download_cache.clear()
+    """Clear the session download cache. Call at end of batch processing.
+
+    The on-disk cache is kept; files are revalidated with a conditional GET
+    on the next run.
+    """
+    with _state_lock:
+        _download_cache.clear()
+
+
+def get_download_stats() -> dict:
+    """Get download statistics for this run (requests, 304s, bytes saved)."""
+    with _state_lock:
+        return dict(_download_stats)
+
+
+def reset_download_stats():
+    """Reset download statistics. Call at the start of a run."""
+    with _state_lock:
+        for key in _download_stats:
+            _download_stats[key] = 0
+
+
+def format_download_stats(stats: dict) -> str:
+    """One-line human summary of download statistics."""
+    mb_downloaded = stats['bytes_downloaded'] / (1024 * 1024)
+    mb_saved = stats['bytes_saved'] / (1024 * 1024)
+    return (
+        f"{stats['downloaded']} downloaded ({mb_downloaded:.1f} MB), "
+        f"{stats['not_modified']} unchanged ({mb_saved:.1f} MB saved)"
+    )
 
 
 def download_file(url: str) -> Path:
-    """Download file to temp location. Handles URLs and local paths.
+    """Download file via the on-disk cache. Handles URLs and local paths.
 
     Args:
         url: URL or file path
 
     Returns:
-        Path to file (local or downloaded temp file)
+        Path to file (local path or cached download)
 
     Raises:
         requests.HTTPError: If download fails
@@ -39,40 +259,70 @@ def download_file(url: str) -> Path:
     if path.exists():
         return path
 
-    # Check cache first - avoid re-downloading same file for multiple sheets
-    if url in _download_cache:
-        cached_path = _download_cache[url]
+    # Check session cache first - avoid revalidating same file for multiple sheets
+    with _state_lock:
+        cached_path = _download_cache.get(url)
+    if cached_path is not None:
         if cached_path.exists():
             logger.debug(f"Using cached download: {cached_path.name}")
             return cached_path
 
+    cache = get_disk_cache()
+    entry = cache.lookup(url)
+
+    # Conditional GET: let the server tell us the cached copy is still current
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
     # Download without progress bar (batch.py shows inline progress)
-    from urllib.parse import urlparse
-
-    response = requests.get(url, stream=True, timeout=60)
-    response.raise_for_status()
-    
-    # Determine file extension from URL
-    suffix = Path(urlparse(url).path).suffix or '.xlsx'
-    
-    # Simple download
-    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-    
-    for chunk in response.iter_content(chunk_size=8192):
-        temp_file.write(chunk)
-    
-    temp_file.close()
-    
-    filepath = Path(temp_file.name)
+    _count(requests=1)
+    with http.get(url, stream=True, headers=headers) as response:
+        if entry and response.status_code == 304:
+            cache.touch(url)
+            filepath = cache.object_path(entry['sha256'], entry['suffix'])
+            _count(not_modified=1, bytes_saved=entry['size'])
+            logger.debug(f"Not modified, using disk cache: {filepath.name}")
+        else:
+            response.raise_for_status()
+
+            # Determine file extension from URL
+            suffix = Path(urlparse(url).path).suffix or '.xlsx'
+
+            # Stream into the cache directory, then move into place by content hash
+            temp_file = cache.new_temp_file(suffix)
+            try:
+                for chunk in response.iter_content(chunk_size=8192):
+                    temp_file.write(chunk)
+                temp_file.close()
+            except Exception:
+                temp_file.close()
+                Path(temp_file.name).unlink(missing_ok=True)
+                raise
+
+            filepath = cache.store(
+                url, Path(temp_file.name), suffix,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            _count(downloaded=1, bytes_downloaded=filepath.stat().st_size)
 
     # Auto-convert old .xls files to .xlsx format
     # FileExtractor only supports .xlsx (via openpyxl)
     if filepath.suffix.lower() == '.xls':
-        logger.info(f"Converting .xls to .xlsx: {filepath.name}")
-        filepath = convert_xls_to_xlsx(filepath)
-
-    # Cache the downloaded file path
-    _download_cache[url] = filepath
+        converted = filepath.with_suffix('.xlsx')
+        if converted.exists():
+            filepath = converted
+        else:
+            logger.info(f"Converting .xls to .xlsx: {filepath.name}")
+            filepath = convert_xls_to_xlsx(filepath)
+
+    # Cache the downloaded file path for this session
+    with _state_lock:
+        _download_cache[url] = filepath
     logger.debug(f"Downloaded and cached: {filepath.name}")
 
     return filepath
@@ -0,0 +1,211 @@
+"""Shared HTTP client for DataWarp v2.
+
+Every outbound GET/HEAD to NHS sites goes through here so we get:
+- One pooled keep-alive requests.Session per host
+- Exponential backoff on 429/5xx (honours Retry-After)
+- A per-host concurrency limit (polite to NHS servers, bounded for thread pools)
+- Default connect/read timeouts (no call can hang forever)
+- Latency and throughput metrics per host
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (10, 60)  # (connect, read) seconds
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5  # 0.5s, 1s, 2s, 4s
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+
+class HttpClient:
+    """Pooled, retrying, per-host-bounded HTTP client."""
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF,
+        timeout=DEFAULT_TIMEOUT
+    ):
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._sessions: dict[str, requests.Session] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0, 'latency_ms': 0.0
+        })
+
+    def _host_state(self, host: str):
+        """Get (session, semaphore) for host, creating on first use."""
+        with self._lock:
+            if host not in self._sessions:
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset({'GET', 'HEAD'}),
+                    respect_retry_after_header=True,
+                    raise_on_status=False  # Return last response so callers' raise_for_status() still works
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.max_per_host,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+                self._slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._sessions[host], self._slots[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Issue a request through the host's pooled session.
+
+        Non-streamed requests hold a host slot for the whole call. Streamed
+        requests hold it until the response is closed, so use them as a
+        context manager (``with client.get(url, stream=True) as r:``).
+        """
+        host = urlparse(url).netloc
+        session, slot = self._host_state(host)
+        kwargs.setdefault('timeout', self.timeout)
+        stream = kwargs.get('stream', False)
+
+        slot.acquire()
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            slot.release()
+            self._record(host, start, 0, retries=0, error=True)
+            raise
+
+        retries = len(response.raw.retries.history) if getattr(response.raw, 'retries', None) else 0
+
+        if not stream:
+            slot.release()
+            self._record(host, start, len(response.content), retries, error=response.status_code >= 400)
+            return response
+
+        # Streamed: release the slot (and record bytes) when the caller closes the response
+        original_close = response.close
+        released = threading.Event()
+
+        def close():
+            if not released.is_set():
+                released.set()
+                slot.release()
+                size = int(response.headers.get('Content-Length') or 0)
+                self._record(host, start, size, retries, error=response.status_code >= 400)
+            original_close()
+
+        response.close = close
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+    def _record(self, host: str, start: float, size: int, retries: int, error: bool):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            s = self._stats[host]
+            s['requests'] += 1
+            s['errors'] += int(error)
+            s['retries'] += retries
+            s['bytes'] += size
+            s['latency_ms'] += elapsed_ms
+        logger.debug(f"HTTP {host}: {size:,} bytes in {elapsed_ms:.0f}ms ({retries} retries)")
+
+    def stats(self) -> dict:
+        """Per-host request metrics with average latency and throughput."""
+        with self._lock:
+            result = {}
+            for host, s in self._stats.items():
+                seconds = s['latency_ms'] / 1000
+                result[host] = {
+                    **s,
+                    'avg_latency_ms': round(s['latency_ms'] / s['requests'], 1) if s['requests'] else 0.0,
+                    'throughput_mbps': round(s['bytes'] / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+                }
+            return result
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._slots.clear()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Get the process-wide HTTP client (configured from environment)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(
+                max_per_host=int(os.getenv('DATAWARP_HTTP_MAX_PER_HOST', str(DEFAULT_MAX_PER_HOST))),
+                retries=int(os.getenv('DATAWARP_HTTP_RETRIES', str(DEFAULT_RETRIES))),
+            )
+        return _client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET via the shared client."""
+    return get_client().get(url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    """HEAD via the shared client."""
+    return get_client().head(url, **kwargs)
+
+
+def get_http_stats() -> dict:
+    """Per-host HTTP metrics for this process."""
+    return get_client().stats()
+
+
+def format_http_stats(stats: dict) -> str:
+    """One-line human summary of get_http_stats() across all hosts."""
+    requests_total = sum(s['requests'] for s in stats.values())
+    retries = sum(s['retries'] for s in stats.values())
+    mb = sum(s['bytes'] for s in stats.values()) / (1024 * 1024)
+    seconds = sum(s['latency_ms'] for s in stats.values()) / 1000
+    avg_ms = seconds * 1000 / requests_total if requests_total else 0.0
+    rate = mb / seconds if seconds else 0.0
+    return (
+        f"{requests_total} requests to {len(stats)} hosts, avg {avg_ms:.0f}ms, "
+        f"{mb:.1f} MB at {rate:.1f} MB/s, {retries} retries"
+    )
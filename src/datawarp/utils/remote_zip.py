@@ -0,0 +1,164 @@
+"""Read ZIP-based remote files (ZIP, XLSX) with HTTP Range requests.
+
+Listing a ZIP's members or an xlsx's sheet names only needs the ZIP central
+directory (at the end of the file) and, for xlsx, the small
+``xl/workbook.xml`` member. HttpRangeFile is a seekable, read-only file
+object backed by Range requests, so ``zipfile.ZipFile`` can read those parts
+directly (ZIP64 included) and a 200 MB workbook costs a few KB.
+
+Servers that ignore Range raise RangeNotSupported; callers fall back to a
+full download.
+"""
+
+import re
+import io
+import zipfile
+import logging
+import xml.etree.ElementTree as ET
+from typing import List
+
+from datawarp.utils import http
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024  # Tail probe size and minimum fetch per read
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+
+class RangeNotSupported(Exception):
+    """Server did not honour a Range request."""
+
+
+class HttpRangeFile(io.RawIOBase):
+    """Seekable read-only file over HTTP Range requests, caching fetched ranges."""
+
+    def __init__(self, url: str, block_size: int = BLOCK_SIZE):
+        self.url = url
+        self.block_size = block_size
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._segments: list[tuple[int, bytes]] = []  # (offset, bytes) already fetched
+        self._pos = 0
+
+        # Probe with a suffix range: tells us Range support and total size, and
+        # fetches the tail where the central directory lives in one request
+        response = self._get(f"bytes=-{block_size}")
+        match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+        if response.status_code != 206 or not match:
+            raise RangeNotSupported(f"Server ignored Range request for {url} (HTTP {response.status_code})")
+
+        start, _, self.size = (int(g) for g in match.groups())
+        self._store(start, response.content)
+
+    def _get(self, byte_range: str):
+        self.requests += 1
+        with http.get(self.url, headers={'Range': byte_range}, stream=True) as response:
+            if response.status_code not in (200, 206):
+                response.raise_for_status()
+            if response.status_code == 200:
+                # Full body coming back - don't read it, caller falls back
+                return response
+            content = response.content
+        self.bytes_fetched += len(content)
+        return response
+
+    def _store(self, start: int, data: bytes):
+        self._segments.append((start, data))
+
+    def _cached(self, start: int, n: int):
+        """Bytes [start, start+n) if a fetched segment already covers them."""
+        for seg_start, data in self._segments:
+            if seg_start <= start and start + n <= seg_start + len(data):
+                offset = start - seg_start
+                return data[offset:offset + n]
+        return None
+
+    def _fetch(self, start: int, n: int):
+        """Fetch at least [start, start+n), rounded up to block_size."""
+        end = min(start + max(n, self.block_size), self.size) - 1
+        response = self._get(f"bytes={start}-{end}")
+        if response.status_code != 206:
+            raise RangeNotSupported(f"Server ignored Range request for {self.url}")
+        self._store(start, response.content)
+
+    # io.RawIOBase interface
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        self._pos = max(0, min(self._pos, self.size))
+        return self._pos
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            n = self.size - self._pos
+        n = min(n, self.size - self._pos)
+        if n <= 0:
+            return b''
+
+        result = self._cached(self._pos, n)
+        if result is None:
+            self._fetch(self._pos, n)
+            result = self._cached(self._pos, n) or b''
+        self._pos += len(result)
+        return result
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def list_remote_zip(url: str) -> List[str]:
+    """List member names of a remote ZIP using only its central directory.
+
+    Raises:
+        RangeNotSupported: Server does not support Range requests
+        zipfile.BadZipFile: Not a ZIP file
+    """
+    remote = HttpRangeFile(url)
+    with zipfile.ZipFile(remote) as zf:
+        names = zf.namelist()
+    logger.debug(f"Listed {len(names)} ZIP members of {url} with {remote.bytes_fetched:,} of {remote.size:,} bytes")
+    return names
+
+
+def list_remote_xlsx_sheets(url: str) -> List[str]:
+    """Read sheet names of a remote xlsx from xl/workbook.xml only.
+
+    Raises:
+        RangeNotSupported: Server does not support Range requests
+        zipfile.BadZipFile: Not an OOXML workbook (e.g. legacy .xls)
+        KeyError: Archive has no xl/workbook.xml
+    """
+    remote = HttpRangeFile(url)
+    with zipfile.ZipFile(remote) as zf:
+        workbook_xml = zf.read('xl/workbook.xml')
+    sheets = parse_workbook_sheet_names(workbook_xml)
+    logger.debug(f"Read {len(sheets)} sheet names of {url} with {remote.bytes_fetched:,} of {remote.size:,} bytes")
+    return sheets
+
+
+def parse_workbook_sheet_names(workbook_xml: bytes) -> List[str]:
+    """Sheet names in workbook order (same as openpyxl's wb.sheetnames)."""
+    root = ET.fromstring(workbook_xml)
+    # Namespace differs between transitional and strict OOXML - match on local name
+    return [
+        el.attrib['name']
+        for el in root.iter()
+        if el.tag.rsplit('}', 1)[-1] == 'sheet' and 'name' in el.attrib
+    ]
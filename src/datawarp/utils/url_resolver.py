@@ -212,6 +212,46 @@ def resolve_urls(pub_config: Dict, period_filter: str = None) -> Iterator[Tuple[
                 yield period, url_map[period]
 
 
+def resolve_all_urls(publications: Dict[str, Dict], period_filter: str = None,
+                     max_workers: int = 8) -> Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, Exception]]:
+    """Resolve period/URL pairs for many publications in one concurrent sweep.
+
+    Discover-mode publications spend their time waiting on NHS landing pages;
+    resolving them in a thread pool overlaps that wait. Template and explicit
+    modes do no I/O and resolve immediately.
+
+    Args:
+        publications: pub_code → publication configuration
+        period_filter: Optional period to filter to (e.g., "2025-04")
+        max_workers: Thread pool size
+
+    Returns:
+        (resolved, errors): pub_code → [(period, url), ...] for successes,
+        pub_code → exception for publications that failed to resolve
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    resolved, errors = {}, {}
+    if not publications:
+        return resolved, errors
+
+    def resolve(item):
+        pub_code, pub_config = item
+        try:
+            return pub_code, list(resolve_urls(pub_config, period_filter)), None
+        except Exception as e:
+            return pub_code, None, e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(publications))) as pool:
+        for pub_code, pairs, error in pool.map(resolve, publications.items()):
+            if error is not None:
+                errors[pub_code] = error
+            else:
+                resolved[pub_code] = pairs
+
+    return resolved, errors
+
+
 def get_all_periods(pub_config: Dict) -> List[str]:
     """Get all available periods for a publication."""
     periods_cfg = pub_config.get('periods', {})
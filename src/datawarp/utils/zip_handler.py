@@ -1,19 +1,147 @@
 """ZIP archive utilities for DataWarp v2.
 
-Simple, focused utility for extracting files from ZIP archives.
+Simple, focused utility for reading files from ZIP archives.
 Used by batch loader to handle ZIP files in manifests.
+
+Members are streamed with ZipFile.open rather than extracted to disk: a
+ZipMember is handed to the CSV/Excel extractors, which open it on demand.
+Open archives are cached per path so every member of one ZIP is read from
+a single handle. A batch holds the cache open across files with
+hold_zip_cache()/release_zip_cache(); a load outside a batch closes the
+archives it opened when it finishes.
 """
+import shutil
 import zipfile
 import tempfile
 import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import IO, Dict, List
 
 logger = logging.getLogger(__name__)
 
+# Archive cache: resolved zip path → open ZipFile
+_zip_cache: Dict[str, zipfile.ZipFile] = {}
+_zip_lock = threading.Lock()
+
+# Temp dirs created by extract_file_from_zip, removed by close_zip_cache
+_temp_dirs: List[str] = []
+
+# Nesting depth of hold_zip_cache(); the cache closes when it returns to 0
+_hold_depth = 0
+
+
+@dataclass(frozen=True)
+class ZipMember:
+    """A file inside a ZIP archive, read without extracting it."""
+    zip_path: Path
+    name: str
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix.lower()
+
+    def open(self) -> IO[bytes]:
+        """Open a streaming, read-only handle to the member."""
+        return open_zip_member(self.zip_path, self.name)
+
+    def read_bytes(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    @property
+    def cache_key(self) -> str:
+        """Identity for caches: resolved archive path + member (display names can collide)."""
+        return f"{Path(self.zip_path).resolve()}#{self.name}"
+
+    def __str__(self) -> str:
+        return f"{Path(self.zip_path).name}#{self.name}"
+
+
+def open_zip(zip_path: Path) -> zipfile.ZipFile:
+    """Get the cached ZipFile for an archive, opening it on first use.
+
+    Raises:
+        ValueError: If ZIP is corrupted or invalid
+    """
+    key = str(Path(zip_path).resolve())
+    with _zip_lock:
+        if key not in _zip_cache:
+            try:
+                _zip_cache[key] = zipfile.ZipFile(zip_path, 'r')
+            except zipfile.BadZipFile as e:
+                raise ValueError(
+                    f"{Path(zip_path).name} is not a valid ZIP file. "
+                    f"Error: {str(e)}"
+                ) from e
+        return _zip_cache[key]
+
+
+def open_zip_member(zip_path: Path, filename: str) -> IO[bytes]:
+    """Open a member of a ZIP archive as a decompressing stream.
+
+    Raises:
+        FileNotFoundError: If file not found in ZIP
+        ValueError: If ZIP is corrupted or invalid
+    """
+    zf = open_zip(zip_path)
+    namelist = zf.namelist()
+
+    if filename not in namelist:
+        # Show helpful error with available files
+        available = ', '.join(namelist[:5])
+        if len(namelist) > 5:
+            available += f' ... ({len(namelist)} total)'
+
+        raise FileNotFoundError(
+            f"File '{filename}' not found in ZIP. "
+            f"Available: {available}"
+        )
+
+    return zf.open(filename)
+
+
+def close_zip_cache():
+    """Close cached archives and remove temp extraction dirs. Call at end of batch processing."""
+    with _zip_lock:
+        _close_locked()
+
+
+def _close_locked():
+    for zf in _zip_cache.values():
+        try:
+            zf.close()
+        except Exception:
+            pass
+    _zip_cache.clear()
+
+    for temp_dir in _temp_dirs:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    _temp_dirs.clear()
+
+
+def hold_zip_cache():
+    """Keep cached archives open until the matching release_zip_cache()."""
+    global _hold_depth
+    with _zip_lock:
+        _hold_depth += 1
+
+
+def release_zip_cache():
+    """End a hold_zip_cache(); the outermost release closes the cache."""
+    global _hold_depth
+    with _zip_lock:
+        _hold_depth = max(0, _hold_depth - 1)
+        if _hold_depth == 0:
+            _close_locked()
+
 
 def extract_file_from_zip(zip_path: Path, filename: str) -> Path:
     """Extract single file from ZIP to temp location.
+
+    Prefer ZipMember, which streams the member without touching disk. Temp
+    dirs created here are removed by close_zip_cache().
     
     Args:
         zip_path: Path to ZIP file
@@ -49,6 +177,8 @@ def extract_file_from_zip(zip_path: Path, filename: str) -> Path:
             
             # Extract to temp directory
             temp_dir = tempfile.mkdtemp(prefix='datawarp_zip_')
+            with _zip_lock:
+                _temp_dirs.append(temp_dir)
             extracted_path = zf.extract(filename, temp_dir)
             
             logger.info(f"Extracted '{filename}' from ZIP to {temp_dir}")
@@ -77,11 +207,4 @@ def list_zip_contents(zip_path: Path) -> List[str]:
         >>> contents = list_zip_contents(Path('/tmp/data.zip'))
         >>> # ['data.csv', 'metadata.txt', 'README.md']
     """
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            return zf.namelist()
-    except zipfile.BadZipFile as e:
-        raise ValueError(
-            f"{zip_path.name} is not a valid ZIP file. "
-            f"Error: {str(e)}"
-        ) from e
+    return open_zip(zip_path).namelist()
@@ -0,0 +1,212 @@
+"""Tests for concurrent, token-budgeted batched enrichment."""
+
+import re
+import threading
+import time
+
+from types import SimpleNamespace
+
+import google.generativeai as genai
+import pytest
+import yaml
+
+from datawarp.pipeline import enricher
+
+
+MANIFEST = {'manifest': {'name': 'test', 'source_url': 'https://example.org/pub'}}
+
+
+def _sources(n, columns=5):
+    return [{
+        'code': f'src_{i}',
+        'name': f'Source {i}',
+        'files': [{
+            'url': f'https://example.org/file_{i}.xlsx',
+            'sheet': f'Table {i}',
+            'preview': {'columns': [f'column_{i}_{c}' for c in range(columns)]}
+        }]
+    } for i in range(n)]
+
+
+class FakeModel:
+    """Echoes batch sources back enriched; fails chosen sources a set number of times."""
+
+    def __init__(self, fail=None, delay=0.0):
+        self.fail = dict(fail or {})  # code → failures left (-1 = always)
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt, event_store=None, publication=None, period=None, db_run_id=None,
+                 validate=None):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            sources = yaml.safe_load(re.search(r'```yaml\n(.*?)```', prompt, re.S).group(1))
+            with self.lock:
+                for src in sources:
+                    left = self.fail.get(src['code'], 0)
+                    if left:
+                        self.fail[src['code']] = left - 1 if left > 0 else left
+                        raise yaml.YAMLError(f"bad yaml for {src['code']}")
+            enriched = [{'code': f"{s['code']}_enriched", 'files': [{'url': f['url']} for f in s['files']]}
+                        for s in sources]
+            return validate({'sources': enriched}), {'input_tokens': len(prompt) // 4, 'output_tokens': 10}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(enricher, 'call_gemini_api', fake)
+    return fake
+
+
+def test_batches_respect_token_budget_and_order():
+    sources = _sources(10)
+    one = enricher.estimate_tokens(yaml.dump([sources[0]], default_flow_style=False))
+
+    batches = enricher.plan_enrichment_batches(sources, token_budget=one * 3)
+
+    assert [i for b in batches for i in b] == list(range(10))
+    assert all(len(b) <= 3 for b in batches)
+    # An oversized source still gets its own batch
+    assert enricher.plan_enrichment_batches(sources[:2], token_budget=1) == [[0], [1]]
+
+
+def test_concurrent_batches_merge_in_source_order(model):
+    model.delay = 0.05
+    sources = _sources(8)
+
+    enriched, meta = enricher.enrich_sources_batched(
+        MANIFEST, sources, token_budget=1, max_workers=4, requests_per_minute=0)
+
+    assert [s['code'] for s in enriched] == [f'src_{i}_enriched' for i in range(8)]
+    assert meta['batches'] == 8 and meta['llm_calls'] == 8
+    assert model.max_active > 1
+
+
+def test_failed_batch_retried_alone(model):
+    model.fail = {'src_3': 1}
+
+    enriched, meta = enricher.enrich_sources_batched(
+        MANIFEST, _sources(6), token_budget=1, max_workers=2, requests_per_minute=0)
+
+    assert [s['code'] for s in enriched] == [f'src_{i}_enriched' for i in range(6)]
+    assert meta['retries'] == 1
+    assert len(model.prompts) == 7  # 6 batches + 1 retry of the failing batch only
+
+
+def test_persistent_failure_splits_then_disables_only_bad_source(model):
+    model.fail = {'src_1': -1}
+    sources = _sources(3)
+
+    enriched, meta = enricher.enrich_sources_batched(
+        MANIFEST, sources, token_budget=10**6, max_workers=2, requests_per_minute=0, max_retries=1)
+
+    assert [s['code'] for s in enriched] == ['src_0_enriched', 'src_1', 'src_2_enriched']
+    assert enriched[1]['enabled'] is False
+    assert meta['failed_sources'] == ['src_1']
+    # URLs all preserved, so the publication still validates
+    enricher.validate_enrichment({'sources': sources}, {'sources': enriched})
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = enricher._RateLimiter(per_minute=600)  # 0.1s apart
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - start >= 0.29
+
+
+class BadReplyModel:
+    """Gemini stand-in whose replies drop a file URL, so they never validate."""
+    calls = 0
+
+    def __init__(self, model_name, generation_config):
+        pass
+
+    def generate_content(self, prompt):
+        BadReplyModel.calls += 1
+        return SimpleNamespace(
+            text="sources:\n- code: a_enriched\n  files: []\n",
+            usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=20)
+        )
+
+
+def test_invalid_response_is_not_cached_and_retry_calls_model(monkeypatch):
+    store = {}
+
+    def save(cache_key, prompt_hash, model_name, config, response_yaml, input_tokens, output_tokens, latency_ms):
+        store[cache_key] = {'response_yaml': response_yaml, 'input_tokens': input_tokens,
+                            'output_tokens': output_tokens, 'latency_ms': latency_ms}
+
+    monkeypatch.setattr(enricher, '_cache_lookup', lambda key, ttl_hours=None: store.get(key))
+    monkeypatch.setattr(enricher, '_cache_store', save)
+    monkeypatch.setattr(enricher, '_log_api_call', lambda **kw: 0.0)
+    monkeypatch.setattr(genai, 'configure', lambda **kw: None)
+    monkeypatch.setattr(genai, 'GenerativeModel', BadReplyModel)
+    monkeypatch.setenv('GEMINI_API_KEY', 'test')
+    monkeypatch.delenv('DATAWARP_LLM_ENDPOINT', raising=False)
+    monkeypatch.delenv('DATAWARP_LLM_CACHE', raising=False)
+    BadReplyModel.calls = 0
+
+    sources = [{'code': 'a', 'name': 'A', 'files': [{'url': 'https://example.org/a.xlsx', 'sheet': 'T1'}]}]
+    _, meta = enricher.enrich_sources_batched(MANIFEST, sources, max_workers=1,
+                                              requests_per_minute=0, max_retries=2)
+
+    assert BadReplyModel.calls == 3  # First attempt + 2 retries, none served from cache
+    assert store == {}
+    assert meta['llm_calls'] == 3 and meta['cache_hits'] == 0
+    assert meta['input_tokens'] == 300 and meta['output_tokens'] == 60
+    assert meta['failed_sources'] == ['a']
+
+    # A poisoned entry left by an older version is ignored rather than replayed
+    store['stale'] = {'response_yaml': 'sources: []', 'input_tokens': 0, 'output_tokens': 0, 'latency_ms': 0}
+    monkeypatch.setattr(enricher, '_cache_key', lambda *a: 'stale')
+    enricher.enrich_sources_batched(MANIFEST, sources, max_workers=1, requests_per_minute=0, max_retries=0)
+    assert BadReplyModel.calls == 4
+
+
+class RateLimitedModel(BadReplyModel):
+    """Gemini stand-in that is rate limited once, then replies correctly."""
+
+    def generate_content(self, prompt):
+        BadReplyModel.calls += 1
+        if BadReplyModel.calls == 1:
+            raise RuntimeError("429 Resource has been exhausted")
+        return SimpleNamespace(
+            text="sources:\n- code: a_enriched\n  files:\n  - url: https://example.org/a.xlsx\n",
+            usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=20)
+        )
+
+
+def test_failed_api_attempts_are_counted(monkeypatch):
+    logged = []
+    monkeypatch.setattr(enricher, '_cache_lookup', lambda key, ttl_hours=None: None)
+    monkeypatch.setattr(enricher, '_cache_store', lambda *a: None)
+    monkeypatch.setattr(enricher, '_log_api_call', lambda **kw: logged.append(kw['status']) or 0.0)
+    monkeypatch.setattr(genai, 'configure', lambda **kw: None)
+    monkeypatch.setattr(genai, 'GenerativeModel', RateLimitedModel)
+    monkeypatch.setenv('GEMINI_API_KEY', 'test')
+    monkeypatch.delenv('DATAWARP_LLM_ENDPOINT', raising=False)
+    BadReplyModel.calls = 0
+
+    sources = [{'code': 'a', 'name': 'A', 'files': [{'url': 'https://example.org/a.xlsx', 'sheet': 'T1'}]}]
+    enriched, meta = enricher.enrich_sources_batched(MANIFEST, sources, max_workers=1,
+                                                     requests_per_minute=0, max_retries=1)
+
+    assert [s['code'] for s in enriched] == ['a_enriched']
+    assert meta['llm_calls'] == 2 and meta['retries'] == 1
+    assert meta['input_tokens'] == 100 and meta['output_tokens'] == 20
+    assert logged == ['error', 'success']
@@ -0,0 +1,60 @@
+"""Tests for indexed fuzzy column matching against reference manifests."""
+
+import random
+
+import pytest
+
+from datawarp.pipeline.enricher import ColumnNameIndex, match_columns_to_reference
+
+WORDS = ['total', 'patients', 'referrals', 'waiting', 'weeks', 'age', 'group', 'count', 'rate',
+         'icb', 'sub', 'org', 'code', 'name', 'region', 'male', 'female', 'under', 'over', 'fte']
+
+
+def _mutate(rng, name):
+    """Simulate a between-period rename: typo, dropped word, suffix or case change."""
+    choice = rng.random()
+    if choice < 0.25 and len(name) > 4:
+        i = rng.randrange(len(name))
+        return name[:i] + rng.choice('abcdefgh_') + name[i + 1:]
+    if choice < 0.5 and '_' in name:
+        parts = name.split('_')
+        parts.pop(rng.randrange(len(parts)))
+        return '_'.join(parts)
+    if choice < 0.7:
+        return f"{name}_{rng.randint(1, 9)}"
+    return name.upper().replace('_', ' ')
+
+
+def _columns(rng, n):
+    return ['_'.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f"_{rng.randint(0, 30)}"
+            for _ in range(n)]
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('threshold', [0.6, 0.8, 0.95])
+def test_index_gives_same_matches_as_linear_scan(seed, threshold):
+    rng = random.Random(seed)
+    ref = [{'name': c, 'description': f'ref {c}'} for c in _columns(rng, 120)]
+    draft = [_mutate(rng, c['name']) if rng.random() < 0.6 else c['name'] for c in ref]
+    draft += _columns(rng, 30)
+    rng.shuffle(draft)
+
+    assert (match_columns_to_reference(draft, ref, threshold, use_index=True)
+            == match_columns_to_reference(draft, ref, threshold, use_index=False))
+
+
+def test_ties_resolve_to_first_reference_column():
+    index = ColumnNameIndex(['patients_b', 'patients_a', 'patients_c'])
+    assert index.best_match('patients_x', 0.8) == 0
+    assert index.best_match('patients_x', 0.8, exclude={0}) == 1
+    assert index.best_match('referrals', 0.8) is None
+
+
+def test_renamed_column_inherits_reference_metadata():
+    ref = [{'name': 'waiting_list_size', 'description': 'Patients waiting'}, {'name': 'org_code'}]
+
+    matched, new = match_columns_to_reference(['Org Code', 'Waiting List Sizes', 'Median Wait'], ref)
+
+    assert [c['original_name'] for c in matched] == ['Org Code', 'Waiting List Sizes']
+    assert matched[1]['description'] == 'Patients waiting'
+    assert new == [{'name': 'Median Wait'}]
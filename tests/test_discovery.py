@@ -0,0 +1,103 @@
+"""Tests for concurrent NHS landing-page discovery and the shared HTML cache."""
+
+import threading
+
+import pytest
+
+from datawarp.discovery import html_parser
+from datawarp.utils.url_resolver import resolve_all_urls
+
+LANDING = "https://digital.nhs.uk/data-and-information/publications/statistical/mi-adhd"
+PAGES = {
+    LANDING: "".join(
+        f'<a href="/data-and-information/publications/statistical/mi-adhd/{m}-2025">x</a>'
+        for m in ("april", "may", "june", "july")
+    ),
+    **{
+        f"https://digital.nhs.uk/data-and-information/publications/statistical/mi-adhd/{m}-2025":
+            f'<a href="https://files.digital.nhs.uk/adhd_{m}_2025.xlsx">data</a>'
+        for m in ("april", "may", "june", "july")
+    },
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    """Serve PAGES, tracking fetch counts and peak concurrency.
+
+    A sub-page fetch waits until another fetch is in flight, so peak > 1
+    proves fetches overlap without timing assertions (the timeout only
+    bounds a sequential run, which then reports peak == 1).
+    """
+    state = {'fetches': [], 'active': 0, 'peak': 0}
+    lock = threading.Lock()
+    overlapped = threading.Event()
+
+    def fake_get(url, **kwargs):
+        with lock:
+            state['fetches'].append(url)
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            if state['active'] > 1:
+                overlapped.set()
+        if url in PAGES and url != LANDING:
+            overlapped.wait(timeout=2)
+        with lock:
+            state['active'] -= 1
+        return FakeResponse(PAGES[url])
+
+    monkeypatch.setattr(html_parser.http, "get", fake_get)
+    html_parser.clear_html_cache()
+    yield state
+    html_parser.clear_html_cache()
+
+
+def test_subpages_fetched_concurrently(fake_site):
+    """NHS Digital sub-pages are fetched in parallel, not one at a time."""
+    links = html_parser.extract_nhs_england_links(LANDING)
+
+    assert len(links) == 4
+    assert fake_site['peak'] > 1
+
+
+def _discover_config(landing_page, periods):
+    return {'landing_page': landing_page, 'periods': periods, 'url': {'mode': 'discover'}}
+
+
+def test_shared_landing_page_fetched_once(fake_site):
+    """Publications sharing a landing page reuse the cached HTML."""
+    publications = {
+        'adhd_may': _discover_config(LANDING, ['2025-05']),
+        'adhd_june': _discover_config(LANDING, ['2025-06']),
+        'templated': {'landing_page': 'https://example.org/pub', 'periods': ['2025-05'],
+                      'url': {'mode': 'template', 'pattern': '{landing_page}/{month_name}-{year}.csv'}},
+    }
+
+    resolved, errors = resolve_all_urls(publications)
+
+    assert errors == {}
+    assert resolved['adhd_may'] == [('2025-05', 'https://files.digital.nhs.uk/adhd_may_2025.xlsx')]
+    assert resolved['adhd_june'] == [('2025-06', 'https://files.digital.nhs.uk/adhd_june_2025.xlsx')]
+    assert resolved['templated'] == [('2025-05', 'https://example.org/pub/may-2025.csv')]
+    assert fake_site['fetches'].count(LANDING) == 1
+    assert len(fake_site['fetches']) == 5  # Landing page + 4 sub-pages, no repeats
+
+
+def test_publications_resolve_concurrently_and_failures_are_isolated(fake_site):
+    missing = "https://digital.nhs.uk/data-and-information/publications/statistical/missing"
+    publications = {f'adhd_{i}': _discover_config(LANDING, ['2025-04', '2025-07']) for i in range(4)}
+    publications['broken'] = _discover_config(missing, ['2025-04'])
+
+    resolved, errors = resolve_all_urls(publications)
+
+    assert list(errors) == ['broken'] and isinstance(errors['broken'], KeyError)
+    assert all(len(pairs) == 2 for pairs in resolved.values()) and len(resolved) == 4
+    assert fake_site['peak'] > 1  # Fetches overlapped
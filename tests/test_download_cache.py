@@ -0,0 +1,148 @@
+"""Tests for the persistent on-disk download cache (conditional GET, LRU eviction)."""
+
+from pathlib import Path
+
+import pytest
+
+from datawarp.utils import download
+from datawarp.utils.download import DiskCache, download_file, get_download_stats, reset_download_stats
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    disk_cache = DiskCache(tmp_path / "cache", max_bytes=10_000, evict_grace_seconds=0)
+    monkeypatch.setattr(download, "_disk_cache", disk_cache)
+    download.clear_download_cache()
+    reset_download_stats()
+    yield disk_cache
+    download.clear_download_cache()
+
+
+def test_repeat_download_uses_conditional_get(cache, monkeypatch):
+    """Second run sends If-None-Match and a 304 reuses the cached bytes."""
+    calls = []
+
+    def fake_get(url, headers=None, **kwargs):
+        calls.append(headers or {})
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, b"a,b\n1,2\n", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Sep 2025 00:00:00 GMT"})
+
+    monkeypatch.setattr(download.http, "get", fake_get)
+
+    first = download_file("https://example.nhs.uk/data.csv")
+    download.clear_download_cache()  # New run: session cache is empty, disk cache is not
+    second = download_file("https://example.nhs.uk/data.csv")
+
+    assert first == second
+    assert second.read_bytes() == b"a,b\n1,2\n"
+    assert calls[1]["If-None-Match"] == '"v1"'
+    assert calls[1]["If-Modified-Since"] == "Mon, 01 Sep 2025 00:00:00 GMT"
+
+    stats = get_download_stats()
+    assert stats["downloaded"] == 1
+    assert stats["not_modified"] == 1
+    assert stats["bytes_saved"] == len(b"a,b\n1,2\n")
+
+
+def test_identical_content_is_stored_once(cache, monkeypatch):
+    """Content addressing: two URLs with the same bytes share one object."""
+    monkeypatch.setattr(download.http, "get", lambda url, **kw: FakeResponse(200, b"same"))
+
+    a = download_file("https://example.nhs.uk/a.csv")
+    b = download_file("https://example.nhs.uk/b.csv")
+
+    assert a == b
+    assert len(list(cache.objects_dir.glob("*.csv"))) == 1
+
+
+def test_lru_eviction_keeps_cache_under_limit(cache, monkeypatch):
+    """Least recently used objects are evicted once max_bytes is exceeded."""
+    payloads = {f"https://example.nhs.uk/{i}.csv": bytes([i]) * 4_000 for i in range(3)}
+    monkeypatch.setattr(download.http, "get", lambda url, **kw: FakeResponse(200, payloads[url]))
+
+    for url in payloads:
+        download_file(url)
+
+    assert cache.lookup("https://example.nhs.uk/0.csv") is None
+    assert cache.lookup("https://example.nhs.uk/2.csv") is not None
+    total = sum(p.stat().st_size for p in cache.objects_dir.glob("*.csv"))
+    assert total <= 10_000
+
+
+def test_recently_used_objects_are_not_evicted(cache, monkeypatch):
+    """An object handed out moments ago may be about to be opened; eviction waits."""
+    cache.evict_grace_seconds = 60
+    payloads = {f"https://example.nhs.uk/{i}.csv": bytes([i]) * 4_000 for i in range(4)}
+    monkeypatch.setattr(download.http, "get", lambda url, **kw: FakeResponse(200, payloads[url]))
+
+    for i in range(3):
+        download_file(f"https://example.nhs.uk/{i}.csv")
+    assert cache.lookup("https://example.nhs.uk/0.csv") is not None
+
+    # Once the grace period has passed, the next store catches up
+    now = download.time.time()
+    monkeypatch.setattr(download.time, "time", lambda: now + 120)
+    download_file("https://example.nhs.uk/3.csv")
+    assert cache.lookup("https://example.nhs.uk/0.csv") is None
+    assert cache.lookup("https://example.nhs.uk/1.csv") is None
+
+
+def test_index_updates_merge_across_processes(tmp_path):
+    """Two caches on one directory (as two processes) don't drop each other's entries."""
+    first = DiskCache(tmp_path / "cache", max_bytes=10_000)
+    second = DiskCache(tmp_path / "cache", max_bytes=10_000)
+
+    for disk_cache, url, content in [(first, "https://example.nhs.uk/a.csv", b"a"),
+                                     (second, "https://example.nhs.uk/b.csv", b"b")]:
+        tmp = disk_cache.new_temp_file(".csv")
+        tmp.write(content)
+        tmp.close()
+        disk_cache.store(url, Path(tmp.name), ".csv", etag=None, last_modified=None)
+
+    reopened = DiskCache(tmp_path / "cache", max_bytes=10_000)
+    assert reopened.lookup("https://example.nhs.uk/a.csv") is not None
+    assert reopened.lookup("https://example.nhs.uk/b.csv") is not None
+    assert first.lookup("https://example.nhs.uk/b.csv") is not None
+
+
+def test_concurrent_downloads_count_every_request(cache, monkeypatch):
+    """Stats and the session cache are shared by the download thread pool."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache.max_bytes = 1_000_000
+    monkeypatch.setattr(download.http, "get", lambda url, **kw: FakeResponse(200, url.encode()))
+    urls = [f"https://example.nhs.uk/{i}.csv" for i in range(40)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(pool.map(download_file, urls))
+
+    assert [p.read_bytes() for p in paths] == [u.encode() for u in urls]
+    stats = get_download_stats()
+    assert stats["requests"] == stats["downloaded"] == 40
+    assert stats["bytes_downloaded"] == sum(len(u) for u in urls)
+    assert set(download._download_cache) == set(urls)
@@ -0,0 +1,66 @@
+"""Tests for DuckDBBackend dataset views and cursor pool."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mcp_server.backends.duckdb_parquet import DuckDBBackend
+
+
+def _write(path, n, start=0):
+    pq.write_table(pa.table({'org_code': [f'ORG{i}' for i in range(start, start + n)],
+                             'patients': list(range(start, start + n))}), path)
+
+
+def _views(backend):
+    return sorted(row[0] for row in backend.conn.execute(
+        "SELECT view_name FROM duckdb_views() WHERE NOT internal AND NOT temporary").fetchall())
+
+
+def test_view_is_reused_until_files_change(tmp_path):
+    path = tmp_path / 'adhd_referrals.parquet'
+    _write(path, 10)
+    backend = DuckDBBackend({})
+    assert backend.conn.execute("SELECT current_setting('parquet_metadata_cache')").fetchone()[0]
+
+    assert backend.get_stats(str(path))['row_count'] == 10
+    [view] = _views(backend)
+    assert view.startswith('ds_adhd_referrals_')
+    signature = backend._views[str(path.resolve())][0]
+    assert backend.execute(str(path), 'SELECT COUNT(*) AS n FROM data') == [{'n': 10}]
+    assert backend._views[str(path.resolve())][0] == signature
+
+    _write(path, 25)
+    os.utime(path, ns=(signature[0] + 10**9, signature[0] + 10**9))
+    assert backend.get_column_stats(str(path), 'patients')['max'] == 24
+    assert _views(backend) == [view]
+
+
+def test_directory_view_sees_new_fragments(tmp_path):
+    dataset = tmp_path / 'adhd_referrals'
+    dataset.mkdir()
+    _write(dataset / 'part-2025-10-L1.parquet', 10)
+    backend = DuckDBBackend({})
+    assert backend.query(str(dataset), 'SELECT COUNT(*) AS n FROM data')['rows'] == [{'n': 10}]
+
+    _write(dataset / 'part-2025-11-L2.parquet', 5, start=10)
+    assert backend.query(str(dataset), 'SELECT COUNT(*) AS n FROM data')['rows'] == [{'n': 15}]
+
+
+def test_concurrent_queries_on_different_datasets(tmp_path):
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f'dataset_{i}.parquet')
+        _write(paths[-1], 100 * (i + 1))
+    backend = DuckDBBackend({'pool_size': 3})
+
+    def count(path):
+        return backend.query(str(path), 'SELECT COUNT(*) AS n FROM data')['rows'][0]['n']
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(count, paths * 10))
+
+    assert results == [100, 200, 300, 400] * 10
+    assert len(_views(backend)) == 4 and backend._cursors.qsize() == 3
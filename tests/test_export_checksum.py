@@ -0,0 +1,125 @@
+"""Tests for order-independent export checksums."""
+
+import hashlib
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from datawarp.pipeline import export_checksum
+from datawarp.pipeline.export_checksum import compare_fingerprints, parquet_fingerprint
+
+
+def _table(rows):
+    return pa.table({
+        'org_code': pa.array([r[0] for r in rows], pa.string()),
+        'patients': pa.array([r[1] for r in rows], pa.int64()),
+        'rate': pa.array([r[2] for r in rows], pa.float64()),
+        'flag': pa.array([r[3] for r in rows], pa.bool_()),
+        '_period_start': pa.array([r[4] for r in rows], pa.date32()),
+        '_loaded_at': pa.array([r[5] for r in rows], pa.timestamp('us')),
+    })
+
+
+ROWS = [
+    ('ORG001', 10, 1.5, True, date(2025, 10, 1), datetime(2025, 11, 1, 9, 30)),
+    ('ORG002', None, 2.25, False, date(2025, 11, 1), datetime(2025, 11, 1, 9, 30, 0, 500000)),
+    ('org003', 7, None, None, date(2025, 11, 1), None),
+]
+
+
+def _md5_60(text):
+    return int(hashlib.md5(text.encode()).hexdigest()[:15], 16)
+
+
+def _canonical(value):
+    """What Postgres' ::text / to_char / EXTRACT(EPOCH) produce for each kind."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return str(int((value - datetime(1970, 1, 1)).total_seconds() * 1_000_000))
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def test_parquet_fingerprint_matches_canonical_hashes(tmp_path):
+    path = tmp_path / 'adhd_referrals.parquet'
+    pq.write_table(_table(ROWS), path)
+
+    fingerprint = parquet_fingerprint(path)
+
+    assert fingerprint.rows == 3
+    org = fingerprint.columns['org_code']
+    assert (org.nulls, org.min, org.max) == (0, 'ORG001', 'org003')  # Byte order, not collation
+    assert org.checksum == sum(_md5_60(r[0]) for r in ROWS)
+    assert fingerprint.columns['patients'].checksum == _md5_60('10') + _md5_60('7')
+    assert fingerprint.columns['flag'].checksum == _md5_60('true') + _md5_60('false')
+    assert (fingerprint.columns['flag'].min, fingerprint.columns['flag'].max) == (False, True)
+    assert fingerprint.columns['_period_start'].checksum == sum(_md5_60(_canonical(r[4])) for r in ROWS)
+    assert fingerprint.columns['_loaded_at'].checksum == sum(_md5_60(_canonical(r[5])) for r in ROWS[:2])
+    assert fingerprint.columns['rate'].total == 3.75 and fingerprint.columns['rate'].nulls == 1
+
+    exact = [0, 1, 3, 4, 5]
+    assert fingerprint.row_checksum == sum(
+        _md5_60('\x1f'.join('\\N' if r[i] is None else _canonical(r[i]) for i in exact)) for r in ROWS)
+
+
+def test_fingerprint_ignores_order_and_files(tmp_path):
+    single = tmp_path / 'single.parquet'
+    pq.write_table(_table(ROWS), single)
+    dataset = tmp_path / 'dataset'
+    (dataset / '_period=2025-11').mkdir(parents=True)
+    pq.write_table(_table(ROWS[:1]), dataset / 'part-2025-10-L1.parquet')
+    pq.write_table(_table(ROWS[:0:-1]), dataset / '_period=2025-11' / 'part-L2.parquet')
+
+    assert compare_fingerprints(parquet_fingerprint(single), parquet_fingerprint(dataset)) == []
+
+
+def test_fingerprint_detects_corruption(tmp_path):
+    def fingerprint(rows, name):
+        pq.write_table(_table(rows), tmp_path / name)
+        return parquet_fingerprint(tmp_path / name)
+
+    expected = fingerprint(ROWS, 'expected.parquet')
+
+    deleted = compare_fingerprints(expected, fingerprint(ROWS[1:], 'deleted.parquet'))
+    assert 'row count 3 != 2' in deleted
+
+    changed = [ROWS[0][:1] + (10 + 9999,) + ROWS[0][2:]] + ROWS[1:]
+    assert any(p.startswith('patients: checksum') for p in compare_fingerprints(
+        expected, fingerprint(changed, 'changed.parquet')))
+
+    rate = [ROWS[0][:2] + (1.5 + 1e-3,) + ROWS[0][3:]] + ROWS[1:]
+    assert any(p.startswith('rate: total') for p in compare_fingerprints(
+        expected, fingerprint(rate, 'rate.parquet')))
+
+    # Same values per column, moved between rows
+    swapped = [(ROWS[1][0],) + ROWS[0][1:], (ROWS[0][0],) + ROWS[1][1:], ROWS[2]]
+    assert compare_fingerprints(expected, fingerprint(swapped, 'swapped.parquet')) == [
+        'row checksum differs (values moved between rows)']
+
+
+def test_postgres_fingerprint_runs_one_scan():
+    kinds = export_checksum.column_kinds(_table(ROWS).schema)
+    queries = []
+
+    class Cursor:
+        def execute(self, query):
+            queries.append(query)
+
+        def fetchone(self):
+            return (3,) + (0, None, None, None) * len(kinds) + (None,)
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+    fingerprint = export_checksum.postgres_fingerprint(Conn(), 'staging.tbl_adhd_referrals', kinds)
+
+    assert fingerprint.rows == 3 and set(fingerprint.columns) == set(kinds)
+    [query] = queries
+    assert query.endswith('FROM staging.tbl_adhd_referrals')
+    assert """MIN("org_code" COLLATE "C")""" in query
+    assert """to_char("_period_start", 'YYYY-MM-DD')""" in query
+    assert '::bit(60)::bigint' in query
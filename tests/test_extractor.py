@@ -9,7 +9,8 @@ from datawarp.core.extractor import (
     TableStructure,
     SheetType,
     DataOrientation,
-    FirstColumnType
+    FirstColumnType,
+    probe_workbook
 )
 
 
@@ -44,4 +45,95 @@ def test_first_column_type_enum():
     assert FirstColumnType.UNKNOWN
 
 
-# Integration tests will be added once we have test fixtures
+@pytest.fixture
+def nhs_style_workbook(tmp_path):
+    """Workbook with a contents sheet and title blocks above each table."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    wb.active.title = 'Contents'
+    wb.active.append(['Contents'])
+    wb.active.append(['Table 1: Attendances by provider'])
+    for s in range(1, 4):
+        ws = wb.create_sheet(f'Table {s}')
+        ws.append([f'Table {s}: Attendances by provider'])
+        ws.append(['Source: NHS England'])
+        ws.append([])
+        ws.append(['Org Code', 'Org Name', 'Region', 'Attendances'])
+        for i in range(500):
+            ws.append([f'R{i:03d}', f'Trust {i}', 'North', i * s])
+    path = tmp_path / 'publication.xlsx'
+    wb.save(path)
+    return path
+
+
+def test_probe_matches_full_extraction(nhs_style_workbook):
+    """Header probe finds the same columns and data start as a full extraction."""
+    probes = probe_workbook(nhs_style_workbook, max_rows=30)
+    full = FileExtractor(str(nhs_style_workbook), 'Table 2').infer_structure()
+
+    probe = probes['Table 2']
+    assert probe.columns == [c.pg_name for c in full.columns.values()]
+    assert probe.data_start_row == full.data_start_row == 5
+    assert [r['attendances'] for r in probe.sample_rows] == [0, 2, 4]
+    assert not probes['Contents'].is_valid
+
+
+def test_probe_selected_sheets_by_name_or_index(nhs_style_workbook):
+    probes = probe_workbook(nhs_style_workbook, sheets=['Table 3', 1], sample_size=1)
+
+    assert list(probes) == ['Table 3', 1]
+    assert probes[1].sheet_name == 'Table 1'
+    assert len(probes['Table 3'].sample_rows) == 1
+
+    with pytest.raises(ValueError, match='not found'):
+        probe_workbook(nhs_style_workbook, sheets=['Missing'])
+
+
+def test_probe_expands_merged_headers(tmp_path):
+    """Merged group headers expand the same way in the probe as in a full load."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Table 1'
+    ws.append(['Table 1: A&E activity'])
+    ws.append([])
+    ws.append(['Org Code', 'Attendances', None, 'Admissions', None])
+    ws.append([None, 'Type 1', 'Type 2', 'Type 1', 'Type 2'])
+    ws.merge_cells('B3:C3')
+    ws.merge_cells('D3:E3')
+    ws.merge_cells('A3:A4')
+    for i in range(200):
+        ws.append([f'R{i:03d}', i, i + 1, i + 2, i + 3])
+    path = tmp_path / 'merged.xlsx'
+    wb.save(path)
+
+    full = FileExtractor(str(path), 'Table 1').infer_structure()
+    probe = probe_workbook(path, max_rows=30)['Table 1']  # Longer than max_rows: spans inferred
+
+    assert probe.columns == [c.pg_name for c in full.columns.values()]
+    assert 'attendances_type_2' in probe.columns and 'admissions_type_2' in probe.columns
+    assert probe.data_start_row == full.data_start_row
+
+
+def test_merged_ranges_read_only_within_probe_rows(tmp_path):
+    """Merges are read from short sheets; the scan stops once it passes max_rows rows."""
+    import openpyxl
+    from datawarp.core.extractor import _read_merged_ranges
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Table 1'
+    ws.append(['Region', 'Attendances', None])
+    ws.append([None, 'Type 1', 'Type 2'])
+    ws.merge_cells('B1:C1')
+    ws.merge_cells('A1:A2')
+    for i in range(20):
+        ws.append([f'R{i}', i, i])
+    path = tmp_path / 'short.xlsx'
+    wb.save(path)
+
+    assert sorted(_read_merged_ranges(str(path), 'Table 1', max_rows=30)) == ['A1:A2', 'B1:C1']
+    assert _read_merged_ranges(str(path), 'Table 1', max_rows=10) is None
+    assert _read_merged_ranges(str(path), 'Missing', max_rows=30) is None
@@ -0,0 +1,136 @@
+"""Tests for MinHash/LSH fingerprint matching and the reference source index."""
+
+import random
+
+import pytest
+
+from datawarp.pipeline.enricher import ReferenceSourceIndex, match_source_to_reference_by_fingerprint
+from datawarp.registry import fingerprint as fpm
+from datawarp.storage import repository
+
+
+def _fp(names):
+    return fpm.generate_fingerprint([{'original_name': n} for n in names])
+
+
+@pytest.fixture(scope='module')
+def registry():
+    """300 random fingerprints, plus near-duplicates of a few of them."""
+    rng = random.Random(7)
+    vocab = [f'col_{i}' for i in range(400)]
+    registry = {f'src_{i}': _fp(rng.sample(vocab, rng.randint(8, 40))) for i in range(300)}
+    queries = []
+    for code in ['src_3', 'src_50', 'src_120', 'src_299']:
+        names = sorted(registry[code].column_names)
+        queries.append(_fp(names[:-1]))                      # Dropped column
+        queries.append(_fp(names + ['brand_new_col']))       # Added column
+    queries.append(_fp(rng.sample(vocab, 20)))               # Unrelated
+    return registry, queries
+
+
+def test_lsh_matches_full_scan(registry):
+    registry, queries = registry
+    index = fpm.FingerprintIndex()
+    for code, fp in registry.items():
+        index.add(code, fp)
+
+    for query in queries:
+        assert fpm.find_best_match(query, index) == fpm.find_best_match(query, registry)
+        # Exact Jaccard runs on a small candidate list, not the whole registry
+        assert len(index.candidates(query)) < len(registry) // 10
+
+
+def test_exact_signature_short_circuits(registry):
+    registry, _ = registry
+    index = fpm.FingerprintIndex()
+    for code, fp in registry.items():
+        index.add(code, fp)
+    assert index.find_best_match(registry['src_42']) == ('src_42', 1.0)
+
+
+def test_signatures_are_stable():
+    signature = fpm.minhash_signature(['org_code', 'patients'])
+    assert signature == fpm.minhash_signature({'patients', 'org_code'})
+    assert len(signature) == fpm.MINHASH_PERMUTATIONS
+    buckets = fpm.lsh_buckets(signature)
+    assert len(set(buckets)) == fpm.LSH_BANDS
+    assert all(-(1 << 63) <= b < (1 << 63) for b in buckets)
+
+
+def test_registry_match_uses_persisted_buckets(monkeypatch):
+    rows = [{'canonical_code': code, 'fingerprint': {'column_names': names},
+             'buckets': set(fpm.lsh_buckets(fpm.minhash_signature(names)))}
+            for code, names in [('a', ['x', 'y', 'z', 'w', 'v']), ('b', ['p', 'q', 'r'])]]
+
+    def candidates(buckets, conn, publication_id=None):
+        return [r for r in rows if r['buckets'] & set(buckets)]
+
+    monkeypatch.setattr(repository, 'get_fingerprint_candidates', candidates)
+
+    assert fpm.find_registry_match(_fp(['x', 'y', 'z', 'w', 'v', 'u']), conn=None) == ('a', 5 / 6)
+    assert fpm.find_registry_match(_fp(['m', 'n']), conn=None) == (None, 0.0)
+
+
+def _source(sheet, columns):
+    return {'files': [{'url': 'https://example.org/f.xlsx', 'sheet': sheet, 'preview': {'columns': columns}}]}
+
+
+def test_reference_index_matches_renames_and_overlaps():
+    refs = [
+        _source('Table 1', ['Org Code', 'Patients', 'Referrals']),
+        _source('Table 2', ['Org Code', 'Region', 'Waiting', 'Median Wait']),
+        _source('Table 3', ['Org Code', 'Region', 'Waiting', 'Mean Wait']),
+    ]
+    index = ReferenceSourceIndex(refs)
+
+    # Renamed sheet, same columns
+    assert index.match(_source('Renamed', ['Referrals', 'Patients', 'Org Code'])) is refs[0]
+    # 3 of 4 columns shared with Tables 2 and 3: first reference wins the tie
+    assert index.match(_source('New', ['Org Code', 'Region', 'Waiting', 'P90 Wait'])) is refs[1]
+    # Below overlap threshold
+    assert index.match(_source('Other', ['Org Code', 'A', 'B', 'C'])) is None
+    # List and prebuilt index give the same answer
+    draft = _source('New', ['Org Code', 'Region', 'Mean Wait', 'X'])
+    assert match_source_to_reference_by_fingerprint(draft, refs) is index.match(draft) is refs[2]
+
+
+def test_canonicalize_registers_signatures_and_reports_matches(monkeypatch):
+    from datawarp.pipeline.canonicalize import match_registry_sources
+
+    registry, mappings = {}, []
+
+    def upsert(code, publication, name, table, fingerprint, period, signature, buckets, conn):
+        registry[code] = {'canonical_code': code, 'canonical_table': table, 'publication_id': publication,
+                          'fingerprint': fingerprint, 'buckets': set(buckets)}
+
+    def candidates(buckets, conn, publication_id=None):
+        return [row for row in registry.values() if row['buckets'] & set(buckets)
+                and publication_id in (None, row['publication_id'])]
+
+    monkeypatch.setattr(repository, 'get_canonical_source', lambda code, conn: registry.get(code))
+    monkeypatch.setattr(repository, 'upsert_canonical_source', upsert)
+    monkeypatch.setattr(repository, 'get_fingerprint_candidates', candidates)
+    monkeypatch.setattr(repository, 'log_source_mapping', lambda *a: mappings.append(a[:5]))
+
+    columns = [{'name': n, 'original_name': n.title()} for n in ['org_code', 'org_name', 'region',
+                                                                  'referrals', 'waiting', 'median_wait']]
+    first = {'sources': [{'code': 'adhd_referrals', 'table': 'tbl_adhd_referrals', 'columns': columns}]}
+    assert match_registry_sources(first, None, 'adhd', '2025-10') == {}
+    assert registry['adhd_referrals']['buckets']  # Signature written at registration
+
+    # Next period the LLM names it differently and a column was added
+    renamed = {'sources': [{'code': 'adhd_referral_counts', 'table': 'tbl_adhd_referral_counts',
+                            'columns': columns + [{'name': 'p90_wait'}]}]}
+    matches = match_registry_sources(renamed, None, 'adhd', '2025-11')
+
+    # Reported for review, not remapped: the source still loads under its own code and table
+    assert matches == {'adhd_referral_counts': ('adhd_referrals', 6 / 7)}
+    assert renamed['sources'][0]['code'] == 'adhd_referral_counts'
+    assert renamed['sources'][0]['table'] == 'tbl_adhd_referral_counts'
+    assert mappings == [('adhd_referral_counts', '2025-11', 'adhd_referrals', 6 / 7, 'fingerprint')]
+    assert 'adhd_referral_counts' in registry
+
+    # A structurally similar table in another publication is not a candidate
+    other = {'sources': [{'code': 'waits_by_region', 'table': 'tbl_waits_by_region', 'columns': columns}]}
+    assert match_registry_sources(other, None, 'mh_waits', '2025-11') == {}
+    assert len(mappings) == 1
@@ -0,0 +1,64 @@
+"""Tests for the shared HTTP client (retries, per-host pooling, metrics)."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from datawarp.utils.http import HttpClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Returns 503 for the first N requests to /flaky, then 200."""
+    failures_left = 0
+
+    def do_GET(self):
+        if self.path == '/flaky' and FlakyHandler.failures_left > 0:
+            FlakyHandler.failures_left -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'hello world'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_retries_transient_5xx(server):
+    """503s are retried with backoff and the final 200 is returned."""
+    FlakyHandler.failures_left = 2
+    client = HttpClient(retries=3, backoff_factor=0)
+
+    response = client.get(f"{server}/flaky")
+
+    assert response.status_code == 200
+    stats = client.stats()[server.split('//')[1]]
+    assert stats['requests'] == 1
+    assert stats['retries'] == 2
+
+
+def test_streamed_response_releases_host_slot(server):
+    """A closed streamed response frees its slot for the next request."""
+    client = HttpClient(max_per_host=1, backoff_factor=0)
+
+    for _ in range(3):
+        with client.get(f"{server}/file", stream=True) as response:
+            assert b''.join(response.iter_content(4)) == b'hello world'
+
+    stats = client.stats()[server.split('//')[1]]
+    assert stats['requests'] == 3
+    assert stats['bytes'] == 33
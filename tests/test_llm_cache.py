@@ -0,0 +1,131 @@
+"""Tests for the enrichment LLM response cache."""
+
+from types import SimpleNamespace
+
+import google.generativeai as genai
+import pytest
+
+from datawarp.pipeline import enricher
+
+
+class FakeModel:
+    calls = 0
+    reply = "sources:\n- code: adhd_referrals\n  name: ADHD referrals\n"
+
+    def __init__(self, model_name, generation_config):
+        self.model_name = model_name
+
+    def generate_content(self, prompt):
+        FakeModel.calls += 1
+        return SimpleNamespace(
+            text=FakeModel.reply,
+            usage_metadata=SimpleNamespace(prompt_token_count=1200, candidates_token_count=300)
+        )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Dict-backed stand-in for tbl_enrichment_cache; records api-call log rows."""
+    store, logged = {}, []
+
+    def lookup(cache_key, ttl_hours=None):
+        return store.get(cache_key)
+
+    def save(cache_key, prompt_hash, model_name, config, response_yaml, input_tokens, output_tokens, latency_ms):
+        store[cache_key] = {'response_yaml': response_yaml, 'input_tokens': input_tokens,
+                            'output_tokens': output_tokens, 'latency_ms': 4200}
+
+    monkeypatch.setattr(enricher, '_cache_lookup', lookup)
+    monkeypatch.setattr(enricher, '_cache_store', save)
+    monkeypatch.setattr(enricher, '_log_api_call', lambda **kw: logged.append(kw) or 0.0)
+    monkeypatch.setattr(genai, 'configure', lambda **kw: None)
+    monkeypatch.setattr(genai, 'GenerativeModel', FakeModel)
+    monkeypatch.setenv('GEMINI_API_KEY', 'test')
+    monkeypatch.setenv('LLM_MODEL', 'model-a')
+    monkeypatch.delenv('DATAWARP_LLM_CACHE', raising=False)
+    FakeModel.calls = 0
+    FakeModel.reply = "sources:\n- code: adhd_referrals\n  name: ADHD referrals\n"
+    return SimpleNamespace(store=store, logged=logged)
+
+
+def test_second_call_is_served_from_cache(cache, monkeypatch):
+    first, meta1 = enricher.call_gemini_api("prompt", db_run_id='run')
+
+    monkeypatch.delenv('GEMINI_API_KEY')  # A hit must not need the API at all
+    second, meta2 = enricher.call_gemini_api("prompt", db_run_id='run')
+
+    assert FakeModel.calls == 1
+    assert first == second
+    assert meta1['cache_hit'] is False and meta1['input_tokens'] == 1200
+    assert meta2['cache_hit'] is True and meta2['input_tokens'] == 0
+    assert meta2['latency_saved_ms'] == 4200
+
+    hit_log = cache.logged[-1]
+    assert hit_log['status'] == 'cache_hit' and hit_log['cache_hit'] is True
+    assert hit_log['latency_saved_ms'] == 4200
+    assert hit_log['prompt_hash'] == cache.logged[0]['prompt_hash']
+
+
+def test_key_includes_model_and_generation_config(cache, monkeypatch):
+    enricher.call_gemini_api("prompt")
+    monkeypatch.setenv('LLM_MODEL', 'model-b')
+    enricher.call_gemini_api("prompt")
+    assert FakeModel.calls == 2
+
+    h = enricher._prompt_hash("prompt")
+    assert enricher._cache_key(h, 'm', {'temperature': 0.1}) != enricher._cache_key(h, 'm', {'temperature': 0.2})
+    assert enricher._cache_key(h, 'm', {'a': 1, 'b': 2}) == enricher._cache_key(h, 'm', {'b': 2, 'a': 1})
+
+
+def test_unparseable_response_is_not_cached(cache):
+    FakeModel.reply = "sources: [unclosed"
+
+    with pytest.raises(Exception):
+        enricher.call_gemini_api("prompt")
+
+    assert cache.store == {}
+
+
+def test_cache_can_be_disabled(cache, monkeypatch):
+    monkeypatch.setenv('DATAWARP_LLM_CACHE', '0')
+    enricher.call_gemini_api("prompt")
+    enricher.call_gemini_api("prompt")
+    assert FakeModel.calls == 2
+    assert cache.store == {}
+
+
+@pytest.mark.parametrize('cache_columns', [0, 2])
+def test_api_call_log_works_without_cache_migration(monkeypatch, cache_columns):
+    from contextlib import contextmanager
+    statements = []
+
+    class Cursor:
+        def execute(self, query, params=None):
+            statements.append((query, params))
+
+        def fetchone(self):
+            return (cache_columns,)
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+    @contextmanager
+    def connection():
+        yield Conn()
+
+    monkeypatch.setattr(enricher, 'get_connection', connection)
+    monkeypatch.setattr(enricher, '_api_call_cache_columns', None)
+
+    enricher._log_api_call('run', 100, 10, 50, 'model-a', prompt_hash='abc')
+    enricher._log_api_call('run', 100, 10, 50, 'model-a', prompt_hash='abc')
+
+    inserts = [(q, p) for q, p in statements if 'INSERT' in q]
+    assert len(statements) == 3  # Column check runs once per process
+    for query, params in inserts:
+        assert ('cache_hit' in query) == bool(cache_columns)
+        assert 'prompt_hash' in query and 'abc' in params  # In the base schema (05)
+        assert query.count('%s') == len(params)
@@ -0,0 +1,84 @@
+"""Tests for the concurrent preview stage of manifest generation."""
+
+import openpyxl
+import pytest
+
+from datawarp.pipeline import manifest
+from datawarp.utils import download
+
+
+def _workbook(path, sheets):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name in sheets:
+        ws = wb.create_sheet(name)
+        ws.append([f'{name} table'])
+        ws.append([])
+        ws.append(['Org Code', 'Region', 'Patients'])
+        for i in range(10):
+            ws.append([f'{name[:3].upper()}{i:02d}', 'North', i * 5])
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def entries(tmp_path):
+    first = _workbook(tmp_path / 'first.xlsx', ['Table 1', 'Table 2'])
+    second = _workbook(tmp_path / 'second.xlsx', ['Data'])
+    csv = tmp_path / 'extract.csv'
+    csv.write_text('Org Code,Attendances\nA01,5\nA02,7\nA03,9\nA04,11\n')
+    return [
+        {'url': first, 'sheet': 'Table 1'},
+        {'url': first, 'sheet': 'Table 2'},
+        {'url': second, 'sheet': 'Data'},
+        {'url': str(csv)},
+        {'url': str(tmp_path / 'bundle.zip'), 'extract': 'x.csv'},
+    ]
+
+
+@pytest.fixture
+def download_calls(monkeypatch):
+    calls = []
+    original = download.download_file
+
+    def counting(url):
+        calls.append(url)
+        return original(url)
+
+    monkeypatch.setattr(download, 'download_file', counting)
+    return calls
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_previews_match_serial_and_share_downloads(entries, download_calls, processes):
+    expected = [manifest.add_file_preview(dict(e)) for e in entries]
+    download_calls.clear()
+
+    manifest.generate_file_previews(entries, max_processes=processes)
+
+    assert [e.get('preview') for e in entries] == [e.get('preview') for e in expected]
+    # One download per distinct file; ZIPs have no preview
+    assert sorted(download_calls) == sorted({e['url'] for e in entries[:4]})
+
+
+def test_sample_rows_skip_title_rows(entries):
+    manifest.generate_file_previews(entries[:1], max_processes=0)
+
+    preview = entries[0]['preview']
+    assert preview['columns'] == ['org_code', 'region', 'patients']
+    assert [row['org_code'] for row in preview['sample_rows']] == ['TAB00', 'TAB01', 'TAB02']
+
+
+def test_failed_download_does_not_stop_stage(entries, monkeypatch):
+    entries.insert(0, {'url': 'https://example.invalid/missing.xlsx', 'sheet': 'X'})
+
+    def fail_remote(url, _original=download.download_file):
+        if url.startswith('https://'):
+            raise OSError('unreachable')
+        return _original(url)
+
+    monkeypatch.setattr(download, 'download_file', fail_remote)
+    manifest.generate_file_previews(entries, max_processes=0)
+
+    assert 'preview' not in entries[0]
+    assert entries[1]['preview']['columns'] == ['org_code', 'region', 'patients']
@@ -0,0 +1,111 @@
+"""Tests for the hybrid Parquet + live Postgres MCP backend."""
+
+import json
+
+import pyarrow as pa
+import pytest
+
+from datawarp.pipeline.exporter import EXPORT_STATE_FILE, EXPORT_STATE_VERSION
+from mcp_server.backends.hybrid import HybridBackend
+
+
+class LocalHybridBackend(HybridBackend):
+    """Stands the in-memory DuckDB database in for the attached Postgres one."""
+
+    def __init__(self, config):
+        super().__init__({**config, 'catalog': 'memory'})
+        self.remote = []
+
+    def _attach(self):
+        pass
+
+    def _remote_rows(self, sql):
+        self.remote.append(sql)
+        return self.conn.execute(sql).fetchall()
+
+
+@pytest.fixture
+def hybrid(tmp_path):
+    backend = LocalHybridBackend({'base_path': str(tmp_path)})
+    backend.conn.execute("""
+        CREATE SCHEMA datawarp;
+        CREATE SCHEMA staging;
+        CREATE TABLE datawarp.tbl_data_sources (id INTEGER, code VARCHAR, schema_name VARCHAR, table_name VARCHAR);
+        CREATE TABLE datawarp.tbl_load_history (id INTEGER, source_id INTEGER);
+        CREATE TABLE staging.tbl_adhd_referrals (org_code VARCHAR, patients BIGINT, _load_id INTEGER, _period VARCHAR);
+        INSERT INTO datawarp.tbl_data_sources VALUES (1, 'adhd_referrals', 'staging', 'tbl_adhd_referrals');
+        INSERT INTO datawarp.tbl_load_history VALUES (11, 1), (12, 1);
+        INSERT INTO staging.tbl_adhd_referrals
+            SELECT 'ORG' || i, i, 11, '2025-10' FROM range(30) t(i)
+            UNION ALL SELECT 'ORG' || i, i, 12, '2025-11' FROM range(20) t(i);
+    """)
+    backend.conn.execute(f"COPY staging.tbl_adhd_referrals TO '{tmp_path / 'adhd_referrals.parquet'}' (FORMAT parquet)")
+    return backend
+
+
+def test_parquet_only_when_nothing_loaded_since_export(hybrid):
+    assert hybrid.bind('adhd_referrals') == 'parquet'
+    table = hybrid.query_arrow('adhd_referrals', 'SELECT COUNT(*) AS n FROM data')
+    assert isinstance(table, pa.Table) and table.to_pylist() == [{'n': 50}]
+
+
+def test_newer_periods_come_from_postgres(hybrid):
+    # 2025-11 reloaded in replace mode and 2025-12 appended after the export
+    hybrid.conn.execute("""
+        DELETE FROM staging.tbl_adhd_referrals WHERE _period = '2025-11';
+        INSERT INTO datawarp.tbl_load_history VALUES (13, 1), (14, 1);
+        INSERT INTO staging.tbl_adhd_referrals
+            SELECT 'ORG' || i, 100 + i, 13, '2025-11' FROM range(25) t(i)
+            UNION ALL SELECT 'ORG' || i, i, 14, '2025-12' FROM range(5) t(i);
+    """)
+
+    assert hybrid.bind('adhd_referrals') == 'parquet+postgres'
+    result = hybrid.query('adhd_referrals', 'SELECT _period, COUNT(*) AS n, MIN(_load_id) AS load_id '
+                                            'FROM data GROUP BY 1 ORDER BY 1')
+    assert result['rows'] == [{'_period': '2025-10', 'n': 30, 'load_id': 11},
+                              {'_period': '2025-11', 'n': 25, 'load_id': 13},
+                              {'_period': '2025-12', 'n': 5, 'load_id': 14}]
+
+    limited = hybrid.query('adhd_referrals', 'SELECT * FROM data WHERE patients >= ?', [100], max_rows=10)
+    assert len(limited['rows']) == 10 and limited['truncated']
+    assert hybrid.get_columns('adhd_referrals') == ['org_code', 'patients', '_load_id', '_period']
+
+
+def test_unexported_dataset_reads_postgres(hybrid, tmp_path):
+    (tmp_path / 'adhd_referrals.parquet').unlink()
+    assert hybrid.bind('adhd_referrals') == 'postgres'
+    assert hybrid.query('adhd_referrals', 'SELECT COUNT(*) AS n FROM data')['rows'] == [{'n': 50}]
+
+    with pytest.raises(ValueError, match='Dataset not found'):
+        hybrid.bind('missing')
+
+
+def test_rows_committed_under_an_exported_load_id_are_read_live(hybrid):
+    # A resumed load commits more 2025-11 rows under load 12 and removes 2025-10
+    hybrid.conn.execute("""
+        INSERT INTO staging.tbl_adhd_referrals SELECT 'ORG' || i, i, 12, '2025-11' FROM range(20, 26) t(i);
+        DELETE FROM staging.tbl_adhd_referrals WHERE _period = '2025-10';
+    """)
+
+    assert hybrid.bind('adhd_referrals') == 'postgres'
+    assert hybrid.query('adhd_referrals', 'SELECT _period, COUNT(*) AS n FROM data GROUP BY 1')['rows'] == [
+        {'_period': '2025-11', 'n': 26}]
+
+
+def test_export_state_periods_decide_what_is_read_live(hybrid, tmp_path):
+    # Incremental export directory whose state recorded 2025-11 before its last 5 rows
+    (tmp_path / 'adhd_referrals.parquet').unlink()
+    dataset = tmp_path / 'adhd_referrals'
+    dataset.mkdir()
+    hybrid.conn.execute(f"COPY (SELECT * FROM staging.tbl_adhd_referrals WHERE _period = '2025-10') "
+                        f"TO '{dataset / 'part-2025-10-L11.parquet'}' (FORMAT parquet)")
+    hybrid.conn.execute(f"COPY (SELECT * FROM staging.tbl_adhd_referrals WHERE _period = '2025-11' LIMIT 15) "
+                        f"TO '{dataset / 'part-2025-11-L12.parquet'}' (FORMAT parquet)")
+    (dataset / EXPORT_STATE_FILE).write_text(json.dumps({
+        'version': EXPORT_STATE_VERSION, 'layout': 'fragments', 'last_load_id': 12, 'schema': None,
+        'periods': {'2025-10': {'load_id': 11, 'rows': 30, 'file': 'part-2025-10-L11.parquet'},
+                    '2025-11': {'load_id': 12, 'rows': 15, 'file': 'part-2025-11-L12.parquet'}}}))
+
+    assert hybrid.bind('adhd_referrals') == 'parquet+postgres'
+    assert hybrid.query('adhd_referrals', 'SELECT _period, COUNT(*) AS n FROM data GROUP BY 1 ORDER BY 1')['rows'] == [
+        {'_period': '2025-10', 'n': 30}, {'_period': '2025-11', 'n': 20}]
@@ -0,0 +1,122 @@
+"""Tests for MCP query pushdown to DuckDB over Parquet and to Postgres."""
+
+from contextlib import contextmanager
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from mcp_server.backends import postgres
+from mcp_server.backends.duckdb_parquet import DuckDBBackend
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / 'adhd_referrals.parquet'
+    pq.write_table(pa.table({
+        'org_code': [f'ORG{i:04d}' for i in range(5000)],
+        'age_band': ['0-17', '18-64'] * 2500,
+        'patients': list(range(5000)),
+    }), path)
+    return path
+
+
+def test_duckdb_query_runs_over_full_dataset(dataset):
+    backend = DuckDBBackend({})
+
+    result = backend.query(str(dataset), 'SELECT age_band, SUM(patients) AS total FROM data GROUP BY 1 ORDER BY 1;')
+
+    assert result['columns'] == ['age_band', 'total']
+    assert result['rows'] == [{'age_band': '0-17', 'total': sum(range(0, 5000, 2))},
+                              {'age_band': '18-64', 'total': sum(range(1, 5000, 2))}]
+    assert not result['truncated']
+
+
+def test_duckdb_query_limits_result_rows(dataset):
+    backend = DuckDBBackend({})
+
+    result = backend.query(str(dataset), 'SELECT org_code FROM data WHERE age_band = ?', ['18-64'], max_rows=100)
+    assert len(result['rows']) == 100 and result['truncated']
+    assert result['rows'][0] == {'org_code': 'ORG0001'}
+
+    exact = backend.query(str(dataset), 'SELECT * FROM data WHERE patients < 100', max_rows=100)
+    assert len(exact['rows']) == 100 and not exact['truncated']
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+
+    def execute(self, query, params=None):
+        self.conn.statements.append((query, params))
+        if 'tbl_data_sources' in query:
+            self.result = [('staging', 'tbl_adhd_referrals')]
+        elif query.startswith('WITH data'):
+            self.description = [('org_code',), ('patients',)]
+            self.result = [(f'ORG{i}', i) for i in range(5)]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchmany(self, size):
+        self.conn.fetched = size
+        return self.result[:size]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements, self.rolled_back = [], False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_postgres_query_binds_data_to_staging_table(monkeypatch):
+    conn = FakeConnection()
+
+    @contextmanager
+    def connection():
+        yield conn
+    monkeypatch.setattr(postgres, 'get_connection', connection)
+    monkeypatch.setenv('DATAWARP_MCP_QUERY_TIMEOUT_MS', '5000')
+
+    result = postgres.PostgreSQLBackend().query(
+        'adhd_referrals', 'SELECT org_code, patients FROM data WHERE age_band = %s', ['18-64'], max_rows=3)
+
+    assert result['rows'] == [{'org_code': 'ORG0', 'patients': 0}, {'org_code': 'ORG1', 'patients': 1},
+                              {'org_code': 'ORG2', 'patients': 2}]
+    assert result['truncated'] and conn.fetched == 4
+
+    statements = [query for query, _ in conn.statements]
+    assert statements[:2] == ['SET TRANSACTION READ ONLY', 'SET LOCAL statement_timeout = 5000']
+    query, params = conn.statements[-1]
+    assert query == ('WITH data AS NOT MATERIALIZED (SELECT * FROM "staging"."tbl_adhd_referrals") '
+                     'SELECT * FROM (SELECT org_code, patients FROM data WHERE age_band = %s) AS result LIMIT 4')
+    assert params == ['18-64'] and conn.rolled_back
+
+
+def test_postgres_query_rejects_other_relations_and_runs_as_query_role(monkeypatch):
+    conn = FakeConnection()
+
+    @contextmanager
+    def connection():
+        yield conn
+    monkeypatch.setattr(postgres, 'get_connection', connection)
+    monkeypatch.setenv('DATAWARP_MCP_QUERY_ROLE', 'mcp_reader')
+    backend = postgres.PostgreSQLBackend()
+
+    with pytest.raises(ValueError, match="dataset table .data."):
+        backend.query('adhd_referrals', 'SELECT * FROM datawarp.tbl_data_sources')
+    with pytest.raises(ValueError, match='pg_terminate_backend'):
+        backend.query('adhd_referrals', 'SELECT pg_terminate_backend(pid) FROM data')
+    assert conn.statements == []
+
+    backend.query('adhd_referrals', 'SELECT org_code, patients FROM data')
+    statements = [query for query, _ in conn.statements]
+    # Role is switched after the registry lookup, before the agent's SQL
+    assert statements[3] == 'SET LOCAL ROLE "mcp_reader"'
+    assert statements[4].startswith('WITH data')
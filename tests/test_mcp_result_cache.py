@@ -0,0 +1,49 @@
+"""Tests for the MCP tool result cache."""
+
+from mcp_server.core.result_cache import ResultCache, cache_key, normalize_sql
+
+
+def test_cache_key_normalizes_equivalent_calls():
+    sql = cache_key('query', 'adhd', {'dataset': 'adhd', 'question': 'SELECT *\n  FROM data  ;', 'limit': 10.0})
+    assert sql == cache_key('query', 'adhd', {'question': 'SELECT * FROM data', 'limit': 10})
+
+    question = cache_key('query', 'adhd', {'question': 'Show  Referrals by Region'})
+    assert question == cache_key('query', 'adhd', {'question': 'show referrals by region '})
+
+    # Quoted literals are kept as written
+    assert normalize_sql("SELECT * FROM data WHERE org = 'A  b';") == "SELECT * FROM data WHERE org = 'A  b'"
+    assert cache_key('query', 'adhd', {'question': "SELECT 'A' FROM data"}) != \
+        cache_key('query', 'adhd', {'question': "SELECT 'a' FROM data"})
+
+
+def test_hits_and_invalidation_on_new_version():
+    cache = ResultCache()
+    key = cache_key('get_schema', 'adhd', {'dataset': 'adhd'})
+
+    assert cache.get(key, (1, None)) is None
+    cache.put(key, (1, None), '{"columns": []}', 0.5)
+    assert cache.get(key, (1, None)) == '{"columns": []}'
+    assert cache.get(key, (1, None)) == '{"columns": []}'
+
+    # A new load makes the entry stale
+    assert cache.get(key, (2, None)) is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (2, 2, 1)
+    assert stats['hit_ratio'] == 0.5 and stats['saved_seconds'] == 1.0
+    assert stats['entries'] == 0 and stats['size_kb'] == 0
+
+
+def test_eviction_by_entries_and_size():
+    cache = ResultCache(max_entries=2, max_bytes=10)
+    cache.put('a', 1, 'aaa', 0)
+    cache.put('b', 1, 'bbb', 0)
+    cache.get('a', 1)  # 'b' is now least recently used
+    cache.put('c', 1, 'ccc', 0)
+    assert cache.get('b', 1) is None and cache.get('a', 1) == 'aaa'
+
+    cache.put('d', 1, 'dddddddd', 0)  # Over 10 bytes with anything else
+    assert cache.get('a', 1) is None and cache.get('d', 1) == 'dddddddd'
+    cache.put('e', 1, 'x' * 11, 0)  # Larger than the whole cache: not stored
+    assert cache.get('e', 1) is None and cache.get('d', 1) == 'dddddddd'
+    assert cache.stats()['evictions'] == 3
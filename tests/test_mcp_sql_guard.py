@@ -0,0 +1,60 @@
+"""Tests for the SQL guard applied to agent queries before pushdown."""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from mcp_server.backends.duckdb_parquet import DuckDBBackend
+from mcp_server.core.sql_guard import check_sql
+
+
+@pytest.mark.parametrize('sql', [
+    # Shapes the stdio server generates itself
+    'SELECT COUNT(*) as count FROM data',
+    'SELECT SUM("patients") as total FROM data WHERE "_period" = ?',
+    'SELECT AVG("patients") as average FROM data',
+    'SELECT "age_band", COUNT(*) FROM data GROUP BY "age_band" ORDER BY 2 DESC LIMIT 20',
+    'SELECT DISTINCT "org_code" FROM data ORDER BY "org_code";',
+    'SELECT MAX("_period") FROM data WHERE "org_code" = %s',
+    # Agent-written SQL
+    "SELECT EXTRACT(year FROM d), SUBSTRING(name FROM 1 FOR 3), TRIM(BOTH ' ' FROM n) FROM data",
+    'WITH t AS (SELECT a FROM data), u AS MATERIALIZED (SELECT * FROM t) SELECT * FROM t JOIN u ON t.a = u.a',
+    'SELECT * FROM (SELECT a, b FROM data) s, data d WHERE s.a IN (SELECT a FROM data)',
+    'SELECT CAST(x AS numeric(10,2)), x::date, COUNT(*) FILTER (WHERE y > 0) OVER (PARTITION BY z) FROM data',
+    "SELECT 'it''s -- not a comment', \"a /* b\" FROM data",
+])
+def test_queries_over_data_are_allowed(sql):
+    assert check_sql(sql) is None
+
+
+@pytest.mark.parametrize('sql', [
+    'SELECT * FROM datawarp.tbl_data_sources',
+    'SELECT * FROM pg_class',
+    'SELECT * FROM data, staging.tbl_other',
+    'SELECT * FROM data UNION TABLE pg_shadow',
+    'SELECT (SELECT relname FROM pg_class LIMIT 1) FROM data',
+    'WITH x AS (SELECT * FROM pg_class) SELECT * FROM x',
+    "SELECT * FROM read_csv('/etc/passwd')",
+    "SELECT * FROM '/etc/passwd'",
+    'SELECT pg_terminate_backend(1)',
+    "SELECT set_config('role', 'postgres', true)",
+    'SELECT pg_catalog.lower(a) FROM data',
+    'SELECT * FROM data; DROP TABLE data',
+    'WITH x AS (DELETE FROM data RETURNING *) SELECT * FROM x',
+    'SELECT * INTO copy_of_data FROM data',
+    'SELECT 1 -- comment',
+    "SELECT E'\\'' , pg_sleep(1) --'",
+    'SELECT $$text$$ FROM data',
+])
+def test_other_relations_and_functions_are_rejected(sql):
+    assert check_sql(sql)
+
+
+def test_duckdb_query_cannot_read_files(tmp_path):
+    path = tmp_path / 'adhd_referrals.parquet'
+    pq.write_table(pa.table({'patients': [1, 2]}), path)
+    backend = DuckDBBackend({})
+
+    assert backend.query(str(path), 'SELECT SUM(patients) AS n FROM data')['rows'] == [{'n': 3}]
+    with pytest.raises(ValueError, match='read_parquet'):
+        backend.query(str(path), f"SELECT * FROM read_parquet('{path}')")
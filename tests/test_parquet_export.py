@@ -0,0 +1,449 @@
+"""Tests for the streaming Parquet exporter."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+from datawarp.pipeline import exporter
+from datawarp.storage.models import Source
+
+STAGING_COLUMNS = [
+    ('org_code', 'character varying', None, None),
+    ('patients', 'integer', 32, 0),
+    ('rate', 'numeric', 18, 6),
+    ('score', 'numeric', None, None),
+    ('ratio', 'double precision', 53, None),
+    ('flag', 'boolean', None, None),
+    ('_load_id', 'integer', 32, 0),
+    ('_loaded_at', 'timestamp without time zone', None, None),
+    ('_period', 'character varying', None, None),
+    ('_period_start', 'date', None, None),
+]
+
+
+def _rows(n, start=0):
+    return [(f'ORG{i:05d}', i if i % 7 else None, Decimal('1.2345'), Decimal('3.5'), i / 3,
+             i % 2 == 0, 12, datetime(2025, 11, 1, 9, 30), '2025-11', date(2025, 11, 1))
+            for i in range(start, start + n)]
+
+
+def test_schema_from_information_schema():
+    schema = exporter.arrow_schema_from_columns(STAGING_COLUMNS)
+
+    assert schema.field('org_code').type == pa.string()
+    assert schema.field('patients').type == pa.int64()
+    assert schema.field('rate').type == pa.float64()
+    assert schema.field('score').type == pa.float64()
+    assert schema.field('_period_start').type == pa.date32()
+    assert schema.field('_loaded_at').type == pa.timestamp('us')
+
+    exact = exporter.arrow_schema_from_columns(STAGING_COLUMNS, decimals=True)
+    assert exact.field('rate').type == pa.decimal128(18, 6)
+    assert exact.field('score').type == pa.float64()  # Unconstrained NUMERIC
+
+
+def test_batches_become_row_groups(tmp_path):
+    schema = exporter.arrow_schema_from_columns(STAGING_COLUMNS)
+    path = tmp_path / 'adhd_referrals.parquet'
+
+    batches = (_rows(n, start) for start, n in [(0, 1000), (1000, 1000), (2000, 500)])
+    rows, groups = exporter.write_parquet_batches(path, schema, batches)
+
+    assert (rows, groups) == (2500, 3)
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == schema
+
+    table = parquet.read()
+    assert table.column('patients').null_count == len([i for i in range(2500) if i % 7 == 0])
+    assert table.column('rate')[0].as_py() == 1.2345
+    assert table.column('org_code')[-1].as_py() == 'ORG02499'
+
+
+def test_batches_regrouped_to_target_row_group_size(tmp_path):
+    schema = exporter.arrow_schema_from_columns(STAGING_COLUMNS)
+    path = tmp_path / 'adhd_referrals.parquet'
+    profile = exporter.WriteProfile(row_group_rows=400)
+
+    batches = (_rows(n, start) for start, n in [(0, 300), (300, 300), (600, 450)])
+    rows, groups = exporter.write_parquet_batches(path, schema, batches, profile)
+
+    assert (rows, groups) == (1050, 3)
+    metadata = pq.ParquetFile(path).metadata
+    assert [metadata.row_group(i).num_rows for i in range(3)] == [400, 400, 250]
+    assert pq.read_table(path).column('org_code').to_pylist() == [f'ORG{i:05d}' for i in range(1050)]
+
+
+def test_empty_table_writes_schema_only(tmp_path):
+    schema = exporter.arrow_schema_from_columns(STAGING_COLUMNS)
+    path = tmp_path / 'empty.parquet'
+
+    assert exporter.write_parquet_batches(path, schema, iter([])) == (0, 0)
+    assert pq.read_table(path).schema == schema
+
+
+def test_failed_write_leaves_previous_file(tmp_path):
+    schema = exporter.arrow_schema_from_columns(STAGING_COLUMNS)
+    path = tmp_path / 'source.parquet'
+    exporter.write_parquet_batches(path, schema, [_rows(10)])
+
+    def failing():
+        yield _rows(10)
+        raise ConnectionError('server closed the connection')
+
+    with pytest.raises(ConnectionError):
+        exporter.write_parquet_batches(path, schema, failing())
+
+    assert pq.read_table(path).num_rows == 10
+    assert [p.name for p in tmp_path.iterdir()] == ['source.parquet']
+
+
+class NamedCursor:
+    def __init__(self, rows, period_index=None, queries=None):
+        self.rows, self.fetches, self.closed = rows, [], False
+        self.period_index = period_index
+        self.queries = queries if queries is not None else []
+
+    def execute(self, query, params=None):
+        self.query = query
+        self.queries.append(query)
+        if 'WHERE _period IS NULL' in query:
+            self.rows = [r for r in self.rows if r[self.period_index] is None]
+        elif 'WHERE _period = %s' in query:
+            self.rows = [r for r in self.rows if r[self.period_index] == params[0]]
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.fetches.append(size)
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_query_uses_named_cursor():
+    cursor = NamedCursor(_rows(25))
+
+    class Conn:
+        def cursor(self, name=None):
+            assert name and name.startswith('datawarp_export_')
+            return cursor
+
+    batches = list(exporter.stream_query(Conn(), 'SELECT * FROM staging.tbl_x', batch_rows=10))
+
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert cursor.itersize == 10 and cursor.closed
+
+
+class FakeConnection:
+    """Answers the exporter's catalog queries; SELECT * streams through a named cursor."""
+
+    def __init__(self, columns, rows, dimensions=()):
+        self.columns, self.rows, self.dimensions = columns, rows, set(dimensions)
+        self.queries = []
+        names = [c[0] for c in columns]
+        self.period_index = names.index('_period') if '_period' in names else None
+        self.load_index = names.index('_load_id') if '_load_id' in names else None
+
+    def cursor(self, name=None):
+        if name:
+            return NamedCursor(list(self.rows), self.period_index, self.queries)
+        return CatalogCursor(self)
+
+
+class CatalogCursor:
+    def __init__(self, db):
+        self.db, self.result = db, []
+
+    def execute(self, query, params=None):
+        self.db.queries.append(query)
+        if 'information_schema.tables' in query:
+            self.result = [(1,)]
+        elif 'information_schema.columns' in query:
+            self.result = [(name, data_type, position, None, None, precision, scale, name in self.db.dimensions)
+                           for position, (name, data_type, precision, scale) in enumerate(self.db.columns, 1)]
+        elif 'tbl_load_history' in query:
+            self.result = [(max((r[self.db.load_index] for r in self.db.rows), default=None),)]
+        elif 'GROUP BY _period' in query:
+            periods = {}
+            for r in self.db.rows:
+                load_id, count = periods.get(r[self.db.period_index], (0, 0))
+                periods[r[self.db.period_index]] = (max(load_id, r[self.db.load_index]), count + 1)
+            self.result = [(p, load_id, count) for p, (load_id, count) in periods.items()]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    from contextlib import contextmanager
+
+    def install(columns, rows, dimensions=()):
+        db = FakeConnection(columns, rows, dimensions)
+
+        @contextmanager
+        def connection():
+            yield db
+
+        source = Source(id=1, code='adhd_referrals', name='ADHD referrals', table_name='tbl_adhd_referrals')
+        monkeypatch.setattr(exporter, 'get_connection', connection)
+        monkeypatch.setattr(exporter.repository, 'get_source', lambda code, conn: source)
+        return db
+    return install
+
+
+def test_export_keeps_pandas_dtypes(tmp_path, fake_db):
+    """Streamed files read back with the dtypes of the old pandas export."""
+    rows = _rows(50)
+    fake_db(STAGING_COLUMNS, rows)
+
+    result = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), batch_rows=20)
+    assert result.success and result.row_count == 50
+
+    streamed = pd.read_parquet(result.parquet_path)
+    # What pd.read_sql(...).to_parquet(...) produced before streaming export
+    legacy_path = tmp_path / 'legacy.parquet'
+    pd.DataFrame.from_records(rows, columns=[c[0] for c in STAGING_COLUMNS],
+                              coerce_float=True).to_parquet(legacy_path, index=False)
+    legacy = pd.read_parquet(legacy_path)
+
+    measures = ['patients', 'rate', 'score', 'ratio', '_load_id']
+    assert list(streamed.select_dtypes(include=['int64', 'float64']).columns) == measures
+    assert list(legacy.select_dtypes(include=['int64', 'float64']).columns) == measures
+    for column in ['org_code', 'flag', '_period']:
+        assert streamed[column].dtype == legacy[column].dtype
+
+
+def _period_rows(period, load_id, n, start=0):
+    return [row[:6] + (load_id, row[7], period, date(int(period[:4]), int(period[5:]), 1))
+            for row in _rows(n, start)]
+
+
+def test_incremental_export_rewrites_only_changed_periods(tmp_path, fake_db):
+    db = fake_db(STAGING_COLUMNS, _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 12, 20))
+    (tmp_path / 'adhd_referrals.parquet').write_bytes(b'stale single-file export')
+
+    first = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert first.success and (first.row_count, first.rows_written, first.periods_written) == (50, 50, 2)
+    assert first.parquet_path == str(tmp_path / 'adhd_referrals')
+    assert not (tmp_path / 'adhd_referrals.parquet').exists()
+
+    # No new load: the period summary matches the state, nothing is read or written
+    db.queries.clear()
+    again = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert (again.row_count, again.rows_written, again.periods_written) == (50, 0, 0)
+    assert any('GROUP BY _period' in q for q in db.queries)
+    assert not any(q.startswith('SELECT * FROM') for q in db.queries)
+
+    # 2025-11 reloaded in replace mode, 2025-12 appended
+    db.rows = (_period_rows('2025-10', 11, 30) + _period_rows('2025-11', 13, 25, start=100)
+               + _period_rows('2025-12', 14, 5))
+    third = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert (third.row_count, third.rows_written, third.periods_written) == (60, 30, 2)
+
+    dataset = tmp_path / 'adhd_referrals'
+    assert sorted(p.name for p in dataset.glob('*.parquet')) == [
+        'part-2025-10-L11.parquet', 'part-2025-11-L13.parquet', 'part-2025-12-L14.parquet']
+    table = pq.read_table(dataset)
+    assert table.num_rows == 60
+    november = table.filter(pc.equal(table['_period'], '2025-11'))
+    assert set(november['_load_id'].to_pylist()) == {13}
+    assert november['org_code'][0].as_py() == 'ORG00100'
+
+
+def test_incremental_export_picks_up_resumed_load(tmp_path, fake_db):
+    """A chunked load resumed under the same _load_id after an export is still exported."""
+    db = fake_db(STAGING_COLUMNS, _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 12, 8))
+
+    # Exported while load 12 was interrupted after its first chunk
+    partial = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert (partial.row_count, partial.rows_written) == (38, 38)
+
+    # The load resumes under the same id; tbl_load_history's latest id does not change
+    db.rows = _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 12, 20)
+    resumed = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+
+    assert (resumed.row_count, resumed.rows_written, resumed.periods_written) == (50, 20, 1)
+    table = pq.read_table(tmp_path / 'adhd_referrals')
+    assert table.filter(pc.equal(table['_period'], '2025-11')).num_rows == 20
+
+
+def test_incremental_export_compacts_fragments(tmp_path, fake_db, monkeypatch):
+    monkeypatch.setenv('DATAWARP_EXPORT_COMPACT_FRAGMENTS', '2')
+    db = fake_db(STAGING_COLUMNS, [row for i, period in enumerate(['2025-09', '2025-10', '2025-11'])
+                                   for row in _period_rows(period, 10 + i, 10)])
+    dataset = tmp_path / 'adhd_referrals'
+
+    exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    files = [p.name for p in dataset.glob('*.parquet')]
+    assert len(files) == 1 and files[0].startswith('compacted-')
+    assert pq.ParquetFile(dataset / files[0]).metadata.num_row_groups == 3
+
+    # Replacing a compacted period drops its row group from the compacted file
+    db.rows = [r for r in db.rows if r[8] != '2025-10'] + _period_rows('2025-10', 20, 4)
+    result = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert (result.row_count, result.rows_written) == (24, 4)
+    assert pq.ParquetFile(dataset / files[0]).metadata.num_rows == 20
+    table = pq.read_table(dataset)
+    assert sorted(table.filter(pc.equal(table['_period'], '2025-10'))['_load_id'].to_pylist()) == [20] * 4
+
+    state = exporter.read_export_state(dataset)
+    assert state['last_load_id'] == 20 and state['periods']['2025-10']['file'] == 'part-2025-10-L20.parquet'
+
+
+def test_duckdb_backend_reads_incremental_directory(tmp_path, fake_db):
+    from mcp_server.backends.duckdb_parquet import DuckDBBackend
+    from mcp_server.core.router import QueryRouter
+
+    fake_db(STAGING_COLUMNS, _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 12, 20))
+    exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+
+    path = QueryRouter(registry=object())._resolve_path({'path': str(tmp_path / 'adhd_referrals.parquet')})
+    assert path == str(tmp_path / 'adhd_referrals')
+    rows = DuckDBBackend({}).execute(path, 'SELECT _period, COUNT(*) AS n FROM data GROUP BY 1 ORDER BY 1')
+    assert rows == [{'_period': '2025-10', 'n': 30}, {'_period': '2025-11', 'n': 20}]
+
+
+def test_hive_layout_partitions_by_period(tmp_path, fake_db):
+    from mcp_server.backends.duckdb_parquet import DuckDBBackend
+
+    db = fake_db(STAGING_COLUMNS, _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 12, 20))
+    dataset = tmp_path / 'adhd_referrals'
+
+    result = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), layout='hive')
+    assert result.success and result.parquet_path == str(dataset)
+    assert [str(p.relative_to(dataset)) for p in exporter.dataset_files(dataset)] == [
+        '_period=2025-10/part-L11.parquet', '_period=2025-11/part-L12.parquet']
+
+    # Incremental hive export replaces one partition and drops the emptied directory
+    db.rows = _period_rows('2025-10', 11, 30) + _period_rows('2025-11', 13, 5)
+    result = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), layout='hive', incremental=True)
+    assert (result.row_count, result.rows_written, result.periods_written) == (35, 5, 1)
+    assert [str(p.relative_to(dataset)) for p in exporter.dataset_files(dataset)] == [
+        '_period=2025-10/part-L11.parquet', '_period=2025-11/part-L13.parquet']
+
+    backend = DuckDBBackend({})
+    assert backend.execute(str(dataset), "SELECT COUNT(*) AS n FROM data WHERE _period = '2025-11'") == [{'n': 5}]
+    assert {c['name']: c['type'] for c in backend.get_schema(str(dataset))}['_period'] == 'VARCHAR'
+
+    # Switching back to the flat layout starts the directory afresh
+    exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), incremental=True)
+    assert sorted(p.name for p in dataset.iterdir()) == [
+        '_export_state.json', 'part-2025-10-L11.parquet', 'part-2025-11-L13.parquet']
+
+
+def test_query_profile_sorts_and_indexes_for_filters(tmp_path, fake_db, monkeypatch):
+    import duckdb
+
+    monkeypatch.setenv('DATAWARP_EXPORT_ROW_GROUP_ROWS', '40')
+    db = fake_db(STAGING_COLUMNS, _rows(100), dimensions={'org_code', 'flag'})
+
+    result = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), batch_rows=30,
+                                               profile='query', bloom_filters=['org_code'])
+    assert result.success, result.error
+    assert any('ORDER BY "_period_start", "org_code", "flag"' in q for q in db.queries)
+
+    metadata = pq.ParquetFile(result.parquet_path).metadata
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [40, 40, 20]
+    assert [c.column_index for c in metadata.row_group(0).sorting_columns] == [9, 0, 5]
+
+    group = metadata.row_group(0)
+    columns = {group.column(i).path_in_schema: group.column(i) for i in range(group.num_columns)}
+    assert columns['org_code'].has_dictionary_page and columns['_period'].has_dictionary_page
+    assert not columns['ratio'].has_dictionary_page
+    assert columns['org_code'].bloom_filter_offset and not columns['patients'].bloom_filter_offset
+    assert all(column.has_column_index for column in columns.values())
+
+    # DuckDB point lookup on the bloom-filtered dimension
+    assert duckdb.sql(f"SELECT COUNT(*) FROM '{result.parquet_path}' WHERE org_code = 'ORG00042'").fetchone() == (1,)
+
+    bad = exporter.export_source_to_parquet('adhd_referrals', str(tmp_path), profile='query',
+                                            bloom_filters=['missing'])
+    assert not bad.success and 'missing' in bad.error
+
+
+def test_export_worker_count_bounded_by_connections_and_memory(monkeypatch):
+    monkeypatch.setenv('DATAWARP_EXPORT_WORKERS', '8')
+    monkeypatch.setenv('DATAWARP_EXPORT_DB_CONNECTIONS', '3')
+    monkeypatch.setenv('DATAWARP_EXPORT_MEMORY_MB', '10000')
+    assert exporter.export_worker_count(20, batch_rows=100_000) == 3
+    assert exporter.export_worker_count(2, batch_rows=100_000) == 2
+
+    # 300 MB holds one 100k-row batch at ~2 KB per row, or three of 50k rows
+    monkeypatch.setenv('DATAWARP_EXPORT_MEMORY_MB', '300')
+    assert exporter.export_worker_count(20, batch_rows=100_000) == 1
+    assert exporter.export_worker_count(20, batch_rows=50_000) == 3
+    assert exporter.export_worker_count(20, batch_rows=50_000, max_workers=2) == 2
+
+
+def test_publication_export_runs_sources_in_parallel(tmp_path, monkeypatch):
+    import threading
+    import time
+    from contextlib import contextmanager
+
+    monkeypatch.setenv('DATAWARP_EXPORT_MEMORY_MB', '100000')
+    codes = [f'adhd_table_{i}' for i in range(6)]
+
+    class Cursor:
+        def execute(self, query, params=None):
+            pass
+
+        def fetchall(self):
+            return [(code,) for code in codes]
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+    @contextmanager
+    def connection():
+        yield Conn()
+
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def export_source(code, output_dir, event_store, publication, period, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return exporter.ExportResult(success=code != 'adhd_table_3', canonical_code=code, row_count=10,
+                                     column_count=2, parquet_size_mb=0.1, parquet_path='', metadata_path='',
+                                     duration_s=0.05)
+
+    class Events:
+        run_id = 'test'
+
+        def __init__(self):
+            self.events = []
+
+        def emit(self, event):
+            self.events.append(event)
+
+    monkeypatch.setattr(exporter, 'get_connection', connection)
+    monkeypatch.setattr(exporter, 'export_source_to_parquet', export_source)
+    events = Events()
+
+    results = exporter.export_publication_to_parquet('adhd', str(tmp_path), events, max_workers=3)
+
+    assert [r.canonical_code for r in results] == codes
+    assert [r.success for r in results] == [True, True, True, False, True, True]
+    assert peak[0] == 3
+    progress = [e for e in events.events if e.message.startswith('Exported ')]
+    assert len(progress) == 6
+    summary = events.events[-1].details['context']
+    assert (summary['successful'], summary['failed']) == (5, 1)
+    assert summary['wall_time_s'] < summary['source_time_s']
@@ -0,0 +1,91 @@
+"""Tests for building catalog.parquet from Parquet footers."""
+
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+import rebuild_catalog  # noqa: E402
+
+
+def _write(path, periods, rows_per_period=10, row_group_size=10):
+    table = pa.table({
+        'org_code': [f'ORG{i}' for p in periods for i in range(rows_per_period)],
+        '_period': [p.strftime('%Y-%m') for p in periods for _ in range(rows_per_period)],
+        '_period_start': [p for p in periods for _ in range(rows_per_period)],
+    })
+    pq.write_table(table, path, row_group_size=row_group_size)
+
+
+def test_catalog_built_from_footers(tmp_path, monkeypatch):
+    _write(tmp_path / 'adhd_referrals.parquet', [date(2025, 9, 1), date(2025, 11, 1)])
+    dataset = tmp_path / 'gp_appointments'
+    (dataset / '_period=2025-10').mkdir(parents=True)
+    (dataset / '_export_state.json').write_text('{}')
+    _write(dataset / '_period=2025-10' / 'part-L3.parquet', [date(2025, 10, 1)], rows_per_period=5)
+    (tmp_path / 'adhd_referrals.md').write_text('# ADHD')
+
+    def no_full_reads(*args, **kwargs):
+        raise AssertionError('catalog rebuild read a whole dataset')
+    monkeypatch.setattr(pd, 'read_parquet', no_full_reads)
+
+    catalog = rebuild_catalog.rebuild_catalog(str(tmp_path)).set_index('source_code')
+
+    assert catalog.loc['adhd_referrals', 'row_count'] == 20
+    assert catalog.loc['adhd_referrals', 'column_count'] == 3
+    assert catalog.loc['adhd_referrals', 'min_date'] == pd.Timestamp('2025-09-01')
+    assert catalog.loc['adhd_referrals', 'max_date'] == pd.Timestamp('2025-11-01')
+    assert catalog.loc['adhd_referrals', 'md_path'] == str(tmp_path / 'adhd_referrals.md')
+    assert catalog.loc['gp_appointments', 'row_count'] == 5
+    assert catalog.loc['gp_appointments', 'max_date'] == pd.Timestamp('2025-10-01')
+
+
+def test_only_changed_datasets_are_reread(tmp_path, monkeypatch):
+    for code in ['a', 'b', 'c']:
+        _write(tmp_path / f'{code}.parquet', [date(2025, 10, 1)])
+    rebuild_catalog.rebuild_catalog(str(tmp_path))
+
+    changed = tmp_path / 'b.parquet'
+    _write(changed, [date(2025, 10, 1), date(2025, 12, 1)])
+    os.utime(changed, (changed.stat().st_atime, changed.stat().st_mtime + 10))
+    (tmp_path / 'c.parquet').unlink()
+
+    read = []
+    entry = rebuild_catalog.catalog_entry
+    monkeypatch.setattr(rebuild_catalog, 'catalog_entry',
+                        lambda dataset, output_path: read.append(dataset.name) or entry(dataset, output_path))
+
+    catalog = rebuild_catalog.rebuild_catalog(str(tmp_path)).set_index('source_code')
+
+    assert read == ['b.parquet']
+    assert sorted(catalog.index) == ['a', 'b']
+    assert catalog.loc['b', 'row_count'] == 20
+    assert catalog.loc['b', 'max_date'] == pd.Timestamp('2025-12-01')
+
+    read.clear()
+    rebuild_catalog.rebuild_catalog(str(tmp_path), full=True)
+    assert read == ['a.parquet', 'b.parquet']
+
+
+def test_string_date_columns_are_parsed_not_compared_as_text(tmp_path):
+    # DD/MM/YYYY sorts wrongly as text; 'Unknown' is the text max and must be dropped
+    pq.write_table(pa.table({
+        'org_code': ['A', 'B', 'C', 'D'],
+        'report_date': ['15/01/2025', '02/11/2024', 'Unknown', '28/02/2025'],
+    }), tmp_path / 'waits.parquet')
+    pq.write_table(pa.table({
+        'org_code': ['A', 'B'],
+        '_period': ['2024-12', '2025-03'],
+    }), tmp_path / 'iso.parquet')
+
+    catalog = rebuild_catalog.rebuild_catalog(str(tmp_path)).set_index('source_code')
+
+    assert catalog.loc['waits', 'min_date'] == pd.Timestamp('2024-11-02')
+    assert catalog.loc['waits', 'max_date'] == pd.Timestamp('2025-02-28')
+    assert catalog.loc['iso', 'min_date'] == pd.Timestamp('2024-12-01')
+    assert catalog.loc['iso', 'max_date'] == pd.Timestamp('2025-03-01')
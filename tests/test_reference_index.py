@@ -0,0 +1,135 @@
+"""Tests for the compiled, persisted reference-manifest index."""
+
+import datetime
+import json
+import os
+
+import pytest
+import yaml
+
+from datawarp.pipeline import enricher, reference_index
+from datawarp.pipeline.reference_index import index_path_for, load_reference_index
+
+REFERENCE = {
+    'manifest': {'name': 'adhd_2025-10', 'source_url': 'https://example.org/adhd'},
+    'sources': [
+        {
+            'code': 'adhd_referrals', 'name': 'ADHD referrals', 'table': 'tbl_adhd_referrals',
+            'files': [{'url': 'https://example.org/ADHD-Oct-2025-12345.xlsx', 'sheet': 'Table 1'}],
+            'columns': [{'name': 'org_code', 'description': 'Organisation code'},
+                        {'name': 'referrals_received', 'description': 'Referrals received'}]
+        },
+        {
+            'code': 'adhd_waits', 'name': 'ADHD waits', 'table': 'tbl_adhd_waits',
+            'files': [{'url': 'https://example.org/ADHD-Oct-2025-12345.xlsx', 'sheet': 'Table 2'}]
+        },
+        {
+            'code': 'adhd_csv', 'name': 'ADHD CSV', 'table': 'tbl_adhd_csv',
+            'files': [{'url': 'https://example.org/adhd-data-oct-2025.zip', 'extract': 'adhd-oct-2025.csv'}]
+        },
+    ]
+}
+
+
+@pytest.fixture
+def reference(tmp_path):
+    path = tmp_path / 'adhd_2025-10_enriched.yaml'
+    path.write_text(yaml.safe_dump(REFERENCE, sort_keys=False))
+    reference_index.clear_reference_index_cache()
+    yield path
+    reference_index.clear_reference_index_cache()
+
+
+def test_match_strategies(reference):
+    index = load_reference_index(reference)
+
+    def match(file):
+        return index.match_source({'files': [file]})
+
+    assert match({'url': 'https://example.org/ADHD-Oct-2025-12345.xlsx', 'sheet': 'Table 2'}) == (0, 'exact_url')
+    assert match({'url': 'https://example.org/ADHD-Nov-2025-67890.xlsx', 'sheet': 'Table 2'}) == (1, 'pattern_sheet')
+    assert match({'url': 'https://example.org/adhd-data-nov-2025.zip',
+                  'extract': 'adhd-nov-2025.csv'}) == (2, 'pattern_extract')
+    assert match({'url': 'https://example.org/ADHD-Nov-2025-67890.xlsx', 'sheet': 'New'}) == (0, 'pattern')
+    assert match({'url': 'https://example.org/other.xlsx'}) == (None, None)
+    assert index.column_index(0).names == ['org_code', 'referrals_received']
+
+
+def test_index_persisted_and_reused(reference, monkeypatch):
+    load_reference_index(reference)
+    assert index_path_for(reference).exists()
+
+    # New process: loads from disk without rebuilding, even after a touch
+    reference_index.clear_reference_index_cache()
+    st = reference.stat()
+    os.utime(reference, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    monkeypatch.setattr(reference_index, 'build_reference_index', lambda p: pytest.fail('rebuilt'))
+    assert load_reference_index(reference).url_map
+
+
+def test_index_rebuilt_when_reference_changes(reference):
+    load_reference_index(reference)
+
+    changed = dict(REFERENCE, sources=REFERENCE['sources'][:1])
+    reference.write_text(yaml.safe_dump(changed, sort_keys=False))
+
+    assert len(load_reference_index(reference).sources) == 1
+    reference_index.clear_reference_index_cache()
+    assert len(load_reference_index(reference).sources) == 1
+
+
+def test_enrich_manifest_uses_reference_without_llm(reference, tmp_path, monkeypatch):
+    monkeypatch.setattr(enricher, '_log_enrichment_start', lambda **kw: None)
+    monkeypatch.setattr(enricher, '_log_enrichment_complete', lambda **kw: None)
+    monkeypatch.setattr(enricher, 'call_gemini_api', lambda *a, **kw: pytest.fail('LLM called'))
+
+    draft = {
+        'manifest': {'name': 'adhd_2025-11', 'source_url': 'https://example.org/adhd'},
+        'sources': [{'code': 'table_1', 'name': 'Table 1', 'files': [{
+            'url': 'https://example.org/ADHD-Nov-2025-67890.xlsx', 'sheet': 'Table 1',
+            'preview': {'columns': ['Org Code', 'Referrals Received']}
+        }]}]
+    }
+    draft_path = tmp_path / 'adhd_2025-11.yaml'
+    draft_path.write_text(yaml.safe_dump(draft))
+
+    for period in ['2025-11', '2025-12']:  # Second run reuses the in-memory index
+        output = tmp_path / f'adhd_{period}_enriched.yaml'
+        result = enricher.enrich_manifest(str(draft_path), str(output), reference_path=str(reference))
+        assert result.success and result.sources_from_reference == 1
+
+        source = yaml.safe_load(output.read_text())['sources'][0]
+        assert source['code'] == 'adhd_referrals'
+        assert source['columns'][1]['description'] == 'Referrals received'
+
+    # Enrichment must not have mutated the shared index
+    assert load_reference_index(reference).sources == REFERENCE['sources']
+
+
+def test_saved_index_is_plain_json(reference):
+    dated = dict(REFERENCE, sources=[dict(REFERENCE['sources'][0], published=datetime.date(2025, 10, 9))])
+    reference.write_text(yaml.safe_dump(dated, sort_keys=False))
+    built = load_reference_index(reference)
+
+    saved = json.loads(index_path_for(reference).read_text())
+    assert saved['version'] == reference_index.REFERENCE_INDEX_VERSION
+
+    reference_index.clear_reference_index_cache()
+    loaded = load_reference_index(reference)
+    assert loaded.sources == built.sources
+    assert loaded.sources[0]['published'] == datetime.date(2025, 10, 9)
+    assert loaded.pattern_sheet_map == built.pattern_sheet_map
+    assert loaded.column_index(0).names == ['org_code', 'referrals_received']
+    assert loaded.source_index.match(REFERENCE['sources'][0]) == built.sources[0]
+
+
+def test_index_from_other_code_version_is_rebuilt(reference, monkeypatch):
+    load_reference_index(reference)
+    reference_index.clear_reference_index_cache()
+
+    monkeypatch.setattr(reference_index, 'REFERENCE_INDEX_VERSION', 'changed')
+    rebuilt = []
+    build = reference_index.build_reference_index
+    monkeypatch.setattr(reference_index, 'build_reference_index', lambda p: rebuilt.append(p) or build(p))
+    load_reference_index(reference)
+    assert rebuilt
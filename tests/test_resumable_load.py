@@ -0,0 +1,128 @@
+"""Tests for chunked, checkpointed inserts (resumable loads)."""
+
+import pandas as pd
+import pytest
+
+from datawarp.loader.insert import insert_dataframe_chunked
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        if 'tbl_load_checkpoints' in sql:
+            self.conn.pending_checkpoints.append(params)
+
+    def copy_expert(self, sql, buffer):
+        rows = [line for line in buffer.getvalue().splitlines() if line]
+        if self.conn.fail_on_copy is not None and self.conn.copies == self.conn.fail_on_copy:
+            raise ValueError("invalid input syntax for type integer")
+        self.conn.copies += 1
+        self.conn.pending_rows.extend(rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records committed rows/checkpoints; rollback discards the open transaction."""
+
+    def __init__(self, fail_on_copy=None):
+        self.fail_on_copy = fail_on_copy
+        self.copies = 0
+        self.pending_rows, self.pending_checkpoints = [], []
+        self.rows, self.checkpoints = [], []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.rows += self.pending_rows
+        self.checkpoints += self.pending_checkpoints
+        self.pending_rows, self.pending_checkpoints = [], []
+
+    def rollback(self):
+        self.pending_rows, self.pending_checkpoints = [], []
+
+
+def make_df(n):
+    return pd.DataFrame({'org_code': [f"R{i:04d}" for i in range(n)], 'value': range(n)})
+
+
+def test_chunked_insert_checkpoints_every_chunk():
+    """Each chunk commits with one checkpoint carrying its row range."""
+    conn = FakeConnection()
+    inserted = insert_dataframe_chunked(make_df(25), 'tbl_x', 'staging', load_id=7,
+                                        manifest_file_id=3, conn=conn, chunk_size=10)
+
+    assert inserted == 25
+    assert len(conn.rows) == 25
+    # params: (manifest_file_id, load_id, chunk_index, row_start, row_end, rows_committed, total_rows)
+    assert [c[2:6] for c in conn.checkpoints] == [(0, 0, 10, 10), (1, 10, 20, 10), (2, 20, 25, 5)]
+    assert all(c[1] == 7 and c[6] == 25 for c in conn.checkpoints)
+
+
+def test_failed_chunk_resumes_exactly_once():
+    """A failure keeps earlier chunks; resuming inserts only the remainder."""
+    conn = FakeConnection(fail_on_copy=2)
+    with pytest.raises(ValueError):
+        insert_dataframe_chunked(make_df(25), 'tbl_x', 'staging', load_id=7,
+                                 manifest_file_id=3, conn=conn, chunk_size=10)
+
+    assert len(conn.rows) == 20
+    assert len(conn.checkpoints) == 2
+
+    conn.fail_on_copy = None
+    last = conn.checkpoints[-1]
+    inserted = insert_dataframe_chunked(make_df(25), 'tbl_x', 'staging', load_id=last[1],
+                                        manifest_file_id=3, conn=conn, chunk_size=10,
+                                        start_chunk=last[2] + 1)
+
+    assert inserted == 5
+    assert len(conn.rows) == 25
+    assert len(set(conn.rows)) == 25  # No duplicated rows
+    assert [c[2] for c in conn.checkpoints] == [0, 1, 2]
+
+
+def test_resume_with_different_chunk_size():
+    """Resuming from the last row_end is exact even if chunk_size changed."""
+    conn = FakeConnection(fail_on_copy=2)
+    with pytest.raises(ValueError):
+        insert_dataframe_chunked(make_df(25), 'tbl_x', 'staging', load_id=7,
+                                 manifest_file_id=3, conn=conn, chunk_size=10)
+
+    conn.fail_on_copy = None
+    last = dict(zip(['manifest_file_id', 'load_id', 'chunk_index', 'row_start', 'row_end'], conn.checkpoints[-1]))
+    inserted = insert_dataframe_chunked(make_df(25), 'tbl_x', 'staging', load_id=last['load_id'],
+                                        manifest_file_id=3, conn=conn, chunk_size=3,
+                                        start_chunk=last['chunk_index'] + 1, start_row=last['row_end'])
+
+    assert inserted == 5
+    assert sorted(conn.rows) == sorted(set(conn.rows)) and len(conn.rows) == 25
+    assert [c[2:5] for c in conn.checkpoints[2:]] == [(2, 20, 23), (3, 23, 25)]
+
+
+def test_marking_file_loaded_clears_checkpoints():
+    from datawarp.storage import repository
+
+    statements = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            statements.append((sql, params))
+
+        def fetchone(self):
+            return (42,)
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+    for status in ['failed', 'loaded']:
+        repository.record_manifest_file('adhd_2025-11', 'm.yaml', 'adhd', 'https://x/f.csv', '2025-11',
+                                        status, 10, None, None, Conn())
+
+    deletes = [p for sql, p in statements if 'DELETE FROM datawarp.tbl_load_checkpoints' in sql]
+    assert deletes == [(42,)]
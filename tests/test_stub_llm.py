@@ -0,0 +1,102 @@
+"""Tests for the stub LLM server and enrichment against it."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+import yaml
+
+from datawarp.pipeline import enricher
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+from stub_llm import StubLLMServer  # noqa: E402
+
+
+def _manifest(path, n):
+    sources = [{
+        'code': f'src_{i}',
+        'name': f'Source {i}',
+        'files': [{
+            'url': f'https://example.org/file_{i}.xlsx',
+            'sheet': f'Table {i}',
+            'preview': {'columns': ['Org Code', 'Region', f'Measure {i}']}
+        }]
+    } for i in range(n)]
+    manifest = {'manifest': {'name': 'stub_test', 'source_url': 'https://example.org/pub'}, 'sources': sources}
+    path.write_text(yaml.safe_dump(manifest))
+    return str(path)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Point enrichment at the stub with no database and no cache."""
+    monkeypatch.setattr(enricher, '_log_enrichment_start', lambda **kw: None)
+    monkeypatch.setattr(enricher, '_log_enrichment_complete', lambda **kw: None)
+    monkeypatch.setattr(enricher, '_log_api_call', lambda **kw: 0.0)
+    monkeypatch.setenv('DATAWARP_LLM_CACHE', '0')
+    monkeypatch.setenv('DATAWARP_LLM_RPM', '0')
+    monkeypatch.setenv('DATAWARP_LLM_BATCH_TOKENS', '1')  # One source per batch
+    monkeypatch.delenv('DATAWARP_LLM_RECORD_FILE', raising=False)
+
+
+def _run(monkeypatch, server, tmp_path, n=4):
+    monkeypatch.setenv('DATAWARP_LLM_ENDPOINT', server.url)
+    output = tmp_path / 'enriched.yaml'
+    result = enricher.enrich_manifest(_manifest(tmp_path / 'draft.yaml', n), str(output))
+    assert result.success, result.error
+    return result, yaml.safe_load(output.read_text())
+
+
+def test_enrich_manifest_against_stub(offline, monkeypatch, tmp_path):
+    with StubLLMServer(latency_ms=20) as server:
+        result, enriched = _run(monkeypatch, server, tmp_path)
+
+    assert result.llm_calls_made == 4 and server.stats['requests'] == 4
+    assert [s['code'] for s in enriched['sources']] == ['src_0', 'src_1', 'src_2', 'src_3']
+    assert enriched['sources'][0]['columns'][0]['original_name'] == 'Org Code'
+
+
+@pytest.mark.parametrize('fail_mode', ['bad_yaml', 'http_500'])
+def test_injected_failures_are_recovered(offline, monkeypatch, tmp_path, fail_mode):
+    with StubLLMServer(fail_rate=1.0, fail_mode=fail_mode, fail_attempts=1) as server:
+        result, enriched = _run(monkeypatch, server, tmp_path, n=3)
+
+    # Every prompt fails once, then succeeds on retry
+    assert server.stats['failures_injected'] == 3 and server.stats['requests'] == 6
+    assert all(s.get('enabled', True) for s in enriched['sources'])
+
+
+def test_persistent_failure_disables_source(offline, monkeypatch, tmp_path):
+    with StubLLMServer(fail_rate=1.0, fail_attempts=-1) as server:
+        _, enriched = _run(monkeypatch, server, tmp_path, n=2)
+
+    assert [s['enabled'] for s in enriched['sources']] == [False, False]
+
+
+def test_recorded_responses_are_replayed(offline, monkeypatch, tmp_path):
+    record_file = tmp_path / 'recordings.jsonl'
+    monkeypatch.setenv('DATAWARP_LLM_RECORD_FILE', str(record_file))
+    with StubLLMServer() as server:
+        _run(monkeypatch, server, tmp_path, n=2)
+
+    records = [json.loads(line) for line in record_file.read_text().splitlines()]
+    assert len(records) == 2
+    monkeypatch.delenv('DATAWARP_LLM_RECORD_FILE')
+
+    with StubLLMServer(recordings=record_file) as server:
+        _run(monkeypatch, server, tmp_path, n=2)
+    assert server.stats['replayed'] == 2 and server.stats['synthesised'] == 0
+
+
+def test_failures_are_deterministic_and_health_endpoint():
+    first, second = StubLLMServer(fail_rate=0.5), StubLLMServer(fail_rate=0.5)
+    prompts = [f'prompt {i}' for i in range(40)]
+    outcomes = [[s._should_fail(enricher._prompt_hash(p)) for p in prompts] for s in (first, second)]
+    assert outcomes[0] == outcomes[1] and 0 < sum(outcomes[0]) < 40
+
+    with StubLLMServer() as server:
+        assert requests.get(f"{server.url}/health", timeout=5).json()['status'] == 'ok'
+    for s in (first, second):
+        s.stop()
@@ -0,0 +1,134 @@
+"""Tests for streaming ZIP members into the extractors without extracting to disk."""
+
+import io
+import zipfile
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from datawarp.core.csv_extractor import CSVExtractor
+from datawarp.core.extractor import FileExtractor, clear_workbook_cache
+from datawarp.utils import zip_handler
+from datawarp.utils.zip_handler import ZipMember
+
+
+@pytest.fixture
+def archive(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.append(['Org Code', 'Region', 'Patients'])
+    for i in range(20):
+        ws.append([f'ORG{i:03d}', 'North', i * 10])
+    xlsx = io.BytesIO()
+    wb.save(xlsx)
+
+    path = tmp_path / 'bundle.zip'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('csv/activity.csv', 'Org Code,Attendances\nA01,5\nA02,7\n')
+        zf.writestr('xlsx/workforce.xlsx', xlsx.getvalue())
+    yield path
+    zip_handler.close_zip_cache()
+    clear_workbook_cache()
+
+
+@pytest.fixture
+def no_temp_dirs(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("member was extracted to disk")
+    monkeypatch.setattr(zip_handler.tempfile, 'mkdtemp', fail)
+
+
+def test_csv_member_streams_into_extractor(archive, no_temp_dirs):
+    extractor = CSVExtractor(ZipMember(archive, 'csv/activity.csv'))
+
+    structure = extractor.infer_structure()
+    df = extractor.to_dataframe()
+
+    assert [c.pg_name for c in structure.columns.values()] == ['org_code', 'attendances']
+    assert df['attendances'].tolist() == [5, 7]
+
+
+def test_xlsx_member_streams_into_extractor(archive, no_temp_dirs):
+    member = ZipMember(archive, 'xlsx/workforce.xlsx')
+
+    extractor = FileExtractor(member, 'Data')
+    structure = extractor.infer_structure()
+
+    assert structure.is_valid
+    assert FileExtractor.get_sheet_names(member) == ['Data']
+    assert len(extractor.to_dataframe()) == 20
+
+
+def test_members_share_one_archive_handle(archive):
+    first = zip_handler.open_zip(archive)
+
+    with ZipMember(archive, 'csv/activity.csv').open() as f:
+        assert f.readline().startswith(b'Org Code')
+
+    assert zip_handler.open_zip(Path(str(archive))) is first
+    with pytest.raises(FileNotFoundError):
+        ZipMember(archive, 'missing.csv').open()
+
+
+def test_close_zip_cache_removes_temp_dirs(archive):
+    extracted = zip_handler.extract_file_from_zip(archive, 'csv/activity.csv')
+    assert extracted.exists()
+
+    zip_handler.close_zip_cache()
+
+    assert not extracted.parent.exists()
+
+
+def test_same_named_archives_do_not_share_cached_workbooks(tmp_path):
+    """Two periods' ZIPs with the same file name are distinct cache entries."""
+    paths = []
+    for period, patients in [('2025-10', 1), ('2025-11', 2)]:
+        wb = openpyxl.Workbook()
+        wb.active.title = 'Data'
+        wb.active.append(['Org Code', 'Region', 'Patients'])
+        for i in range(10):
+            wb.active.append([f'ORG{i:03d}', 'North', patients * 100 + i])
+        data = io.BytesIO()
+        wb.save(data)
+        (tmp_path / period).mkdir()
+        path = tmp_path / period / 'bundle.zip'
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr('workforce.xlsx', data.getvalue())
+        paths.append(path)
+
+    try:
+        members = [ZipMember(p, 'workforce.xlsx') for p in paths]
+        assert str(members[0]) == str(members[1])
+        firsts = [FileExtractor(m, 'Data').to_dataframe()['patients'].iloc[0] for m in members]
+        assert firsts == [100, 200]
+    finally:
+        clear_workbook_cache()
+        zip_handler.close_zip_cache()
+
+
+def test_cache_closes_when_outermost_hold_released(archive):
+    zip_handler.hold_zip_cache()
+    zip_handler.hold_zip_cache()  # e.g. load_file inside a batch
+    zip_handler.open_zip(archive)
+
+    zip_handler.release_zip_cache()
+    assert zip_handler._zip_cache  # Batch still holds it
+
+    zip_handler.release_zip_cache()
+    assert not zip_handler._zip_cache
+
+
+def test_batch_releases_hold_when_interrupted(archive, monkeypatch):
+    from datawarp.loader import batch
+
+    def interrupted(manifest_path):
+        zip_handler.open_zip(archive)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch, 'parse_manifest', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        batch.load_from_manifest('manifest.yaml')
+
+    assert zip_handler._hold_depth == 0 and not zip_handler._zip_cache